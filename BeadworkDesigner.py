@@ -1,67 +1,84 @@
+import time
+
+STARTED = time.perf_counter()   # as early as possible, for --profile-startup
+
 import argparse
-import datetime
 import logging
-import glob
 import os
 import sys
 
-from PySide6.QtWidgets import QApplication
+from BeadworkDesigner import cli
+
+def main():
+    parser = argparse.ArgumentParser(description="Beadwork Designer: An attempt at a Python-based desktop application for designing loom-based beadwork (https://en.wikipedia.org/wiki/Beadwork), also known as beadweaving (https://en.wikipedia.org/wiki/Bead_weaving).",
+                                     epilog=f"Batch commands, run without the GUI: {', '.join(sorted(cli.COMMANDS))}. See 'BeadworkDesigner.py <command> --help'.")
+    parser.add_argument("--debug", help="Enable debug mode", action="store_true")
+    parser.add_argument("--trace", help="Also log every bead change and repaint (very verbose)", action="store_true")
+    parser.add_argument("--log", help="Log file", type=str, default=None)
+    parser.add_argument("--load", help="Load project", type=str, default=None)
+    parser.add_argument("--profile-startup", help="Print how long each phase of startup takes, up to the first paint", action="store_true")
+    parser.add_argument("--profile", help="Profile the whole run with cProfile and tracemalloc; reports are written to profiles/ on exit", action="store_true")
+    parser.add_argument("--record-session", help="Record every action to this session file, to replay with 'BeadworkDesigner.py replay'", type=str, default=None)
+
+    args = parser.parse_args()
+
+    from BeadworkDesigner.StartupProfiler import profiler
+    if args.profile_startup:
+        profiler.start(STARTED)
+    profiler.mark("arguments and QtCore import")
 
-from BeadworkDesigner.MainWindow import MainWindow
-from BeadworkDesigner.utils import readConfigFile, loadProject
+    from PySide6.QtWidgets import QApplication
 
-try:
-    project_configs, app_configs = readConfigFile(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin/config.json"))  # import config file
-except ImportError:
-    logging.error("Custom config not found, importing default.")
-    project_configs, app_configs = readConfigFile(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin/default_config.json"))  # import default config file
+    from BeadworkDesigner.Log import TRACE, setupLogging
+    from BeadworkDesigner.MainWindow import MainWindow
+    from BeadworkDesigner.ConfigService import readConfigs
+    from BeadworkDesigner.utils import loadProject
+    profiler.mark("application imports")
 
-parser = argparse.ArgumentParser(description="Beadwork Designer: An attempt at a Python-based desktop application for designing loom-based beadwork (https://en.wikipedia.org/wiki/Beadwork), also known as beadweaving (https://en.wikipedia.org/wiki/Bead_weaving).")
-parser.add_argument("--debug", help="Enable debug mode", action="store_true")
-parser.add_argument("--log", help="Log file", type=str, default=None)
-parser.add_argument("--load", help="Load project", type=str, default=None)
+    project_configs, app_configs = readConfigs()    # bin/config.json, or the defaults if it is missing or corrupt
 
-args = parser.parse_args()
+    debug = (args.debug) or app_configs["debug"]  # check if debug flag is set
 
-debug = (args.debug) or app_configs["debug"]  # check if debug flag is set
+    # primary log directory
+    logDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
 
-# primary log directory
-logDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+    # config logging: records are written on a background thread, and the
+    # log file is rotated by size rather than one file per launch
+    setupLogging(level=(TRACE if args.trace else logging.DEBUG if debug else logging.INFO),
+                 logDir=logDir,
+                 logFile=args.log)
 
-# check how many log files there are and remove oldest if there are more than 5
-logFiles = sorted(glob.glob(os.path.join(logDir, '*')), key=os.path.getmtime)
-if len(logFiles) >= 5:
-    os.remove(logFiles[0])
+    logging.info("Starting...")
+    profiler.mark("config and logging")
 
-# get current time for log file name
-nowTime = datetime.datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+    app = QApplication(sys.argv)
+    profiler.mark("QApplication")
 
-# config logging
-logging.basicConfig(level=(logging.DEBUG if debug else logging.INFO), 
-                    format='%(filename)s:\t'
-                            '%(levelname)s:\t'
-                            '%(funcName)s():\t'
-                            '%(lineno)d:\t'
-                            '%(message)s',
-                    handlers=[logging.StreamHandler(sys.stdout), # output to console
-                              logging.FileHandler(os.path.join(logDir, args.log) if args.log else   # output to custom log file if specified
-                                                  os.path.join(logDir, f'{nowTime}.txt'))])         # else output to default log file
+    if args.load:
+        json = loadProject(args.load)
+        for key in json['project_configs'].keys():
+            project_configs[key] = json['configs'][key]        # replace any config with the loaded one
 
-logging.info("Starting...")
+    window = MainWindow(debug=debug, app_configs=app_configs, project_configs=project_configs)  # check if debug flag is set
 
-app = QApplication(sys.argv)
+    if args.load: window.origModel.importData(json['project'])
 
-if args.load:
-    json = loadProject(args.load)
-    for key in json['project_configs'].keys():
-        project_configs[key] = json['configs'][key]        # replace any config with the loaded one
+    if args.debug: window.performancePanelAction.setChecked(True)   # show live performance counters
+    if args.record_session: window.startSessionRecording(args.record_session)
+    if args.profile: window.profilingAction.setChecked(True)       # covers the event loop until the window closes
 
-window = MainWindow(debug=debug, app_configs=app_configs, project_configs=project_configs)  # check if debug flag is set
+    profiler.watchFirstPaint(window.beadworkView.viewport())
+    window.show()
+    profiler.mark("show")
 
-if args.load: window.origModel.importData(json['project'])
+    logging.info("Executing...")
 
-window.show()
+    app.exec()
 
-logging.info("Executing...")
+    window.profilingAction.setChecked(False)    # if the loop ended without closing the window
 
-app.exec()
\ No newline at end of file
+if __name__ == "__main__":
+    # batch commands run headless, without importing any widgets
+    if cli.isCommand(sys.argv[1:]):
+        sys.exit(cli.main(sys.argv[1:]))
+    main()
@@ -1,15 +1,34 @@
 import logging
+import time
 
 from PySide6.QtWidgets import (QItemDelegate, QStyle)
-from PySide6.QtCore import (QSize, Qt)
-from PySide6.QtGui import (QColor)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import (QBrush, QColor)
+
+from BeadworkDesigner import Instrumentation
+from BeadworkDesigner.BeadSprites import BEAD_STYLES, spriteAtlas
+from BeadworkDesigner.ColorPool import COLOR_BRUSH_ROLE
 
 logger = logging.getLogger(__name__)
 
+# the color between beads, and around selected beads
+BORDER_COLOR = "#FFFFFF"
+SELECTED_BORDER_COLOR = "#000000"
+
+SELECTED = QStyle.StateFlag.State_Selected
+
 class BeadDelegate(QItemDelegate):
     """A delegate for painting beads in the BeadworkView.
 
     Must call setItemDelegate() with an instance of this delegate on the BeadworkView.
+
+    Painting a bead is two rectangle fills: the whole cell with the border
+    brush, then the bead inset by one pixel with the bead's pooled brush,
+    read through COLOR_BRUSH_ROLE. The brushes and the bead size are made
+    once, when the delegate is created and when the bead size changes, so
+    painting allocates nothing per bead, and nothing is drawn outside the
+    cell. In the realistic bead styles, the bead is a blit of its sprite
+    from the shared sprite atlas instead of a fill.
     """
     
     def __init__(self, beadWidth=12, beadHeight=22):
@@ -21,8 +40,12 @@ class BeadDelegate(QItemDelegate):
         """
         super().__init__()
 
-        self.beadWidth = beadWidth-2    # subtract 2 to account for the 1 pixel border
-        self.beadHeight = beadHeight-2  # subtract 2 to account for the 1 pixel border
+        self.borderBrush = QBrush(QColor(BORDER_COLOR))
+        self.selectedBorderBrush = QBrush(QColor(SELECTED_BORDER_COLOR))
+
+        self.beadStyle = "Flat"
+        self.devicePixelRatio = 1.0
+        self.changeBeadDimensions(beadWidth-1, beadHeight-1)    # subtract 1 to account for the 1 pixel border
 
         logger.info("BeadDelegate initialized.")
      
@@ -34,39 +57,52 @@ class BeadDelegate(QItemDelegate):
             option (QStyleOptionViewItem): The option for the item.
             index (QModelIndex): The index of the item.
         """
-        # draw outside black rectangle if selected
-        # TODO: this sometimes leaves an artifact of the black rectangle, investigate
-        if bool(option.state & QStyle.StateFlag.State_Selected):
-            # logger.debug(f"painting selected: {index.data()} at {index.row()}, {index.column()}.")
-            painter.setPen(QColor("#000000"))
-            painter.drawRect(option.rect)
-        else:
-            # logger.debug(f"painting unselected: {index.data()} at {index.row()}, {index.column()}.")
-            painter.setPen(QColor("#FFFFFF"))
-            painter.drawRect(option.rect)
+        timing = __debug__ and Instrumentation.enabled
+        if timing:
+            started = time.perf_counter()
 
-        # translate
-        option.rect.translate(1, 1)
+        rect = option.rect
+        painter.fillRect(rect, self.selectedBorderBrush if option.state & SELECTED else self.borderBrush)
+        # the model's data() directly, as index.data() would wrap the brush in a QVariant and back
+        if self.beadStyle == "Flat":
+            painter.fillRect(rect.x() + 1, rect.y() + 1, self.beadWidth, self.beadHeight, index.model().data(index, COLOR_BRUSH_ROLE))
+        else:
+            sprite = spriteAtlas.sprite(index.model().data(index, Qt.ItemDataRole.DisplayRole), self.beadStyle,
+                                        self.beadWidth, self.beadHeight, self.vertical, self.devicePixelRatio)
+            painter.drawPixmap(rect.x() + 1, rect.y() + 1, sprite)
 
-        # resize
-        option.rect.setSize(QSize(self.beadWidth, self.beadHeight))
-        
-        # draw a rectangle
-        background_color = index.data(role = Qt.ItemDataRole.BackgroundRole)
-        painter.fillRect(option.rect, background_color)
+        if timing:
+            Instrumentation.record("paint", time.perf_counter() - started)
 
     def changeBeadDimensions(self, width, height):
-        """Changes the dimensions of the beads.
+        """Changes the dimensions of the beads, without their border.
 
         Args:
             width (int): The new width, in pixels, of the beads.
             height (int): The new height, in pixels, of the beads.
         """
         logger.debug(f"Changing bead dimensions to {width}, {height}.")
-        self.beadWidth = width
-        self.beadHeight = height
+        self.beadWidth = max(width, 1)
+        self.beadHeight = max(height, 1)
+        self.vertical = self.beadHeight >= self.beadWidth
 
     def changeOrientation(self):
         """Changes the orientation of the beads. Swaps the width and height."""
         logger.debug(f"Changing bead dimensions to {self.beadHeight}, {self.beadWidth}.")
-        self.beadWidth, self.beadHeight = self.beadHeight, self.beadWidth
\ No newline at end of file
+        self.beadWidth, self.beadHeight = self.beadHeight, self.beadWidth
+        self.vertical = self.beadHeight >= self.beadWidth
+
+    def setBeadStyle(self, style):
+        """Sets how beads are drawn.
+
+        Args:
+            style (str): one of BEAD_STYLES: "Flat" for filled rectangles, or a realistic, shaded bead.
+        """
+        if style not in BEAD_STYLES:
+            raise ValueError(f"Unknown bead style {style}, expected one of {', '.join(BEAD_STYLES)}.")
+        logger.debug(f"Changing bead style to {style}.")
+        self.beadStyle = style
+
+    def setDevicePixelRatio(self, ratio):
+        """Sets the device pixel ratio the sprites are rendered for, so they stay sharp on high DPI screens."""
+        self.devicePixelRatio = ratio
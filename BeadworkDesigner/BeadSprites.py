@@ -0,0 +1,105 @@
+#####################
+# Shaded bead sprites for realistic previews.
+#
+# Drawing a shaded, rounded bead with gradients for every bead painted is far
+# too slow, so each bead is rendered once per (color, style, size,
+# orientation, device pixel ratio) into a pixmap, and painting a bead is a
+# single blit of it. The sprites are kept in an LRU cache bounded in bytes:
+# a zoom or orientation change makes a new set of sprites, and the old ones
+# age out.
+#####################
+
+import logging
+from collections import OrderedDict
+
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import (QColor, QLinearGradient, QPainter, QPixmap,
+                           QRadialGradient)
+
+logger = logging.getLogger(__name__)
+
+# "Flat" beads are filled rectangles; the others are rendered sprites
+BEAD_STYLES = ("Flat", "Delica", "Seed")
+
+MAX_SPRITE_BYTES = 32 * 1024 * 1024
+
+def renderBead(color, style, width, height, vertical, devicePixelRatio):
+    """Renders one shaded bead.
+
+    Delica beads are cylinders with slightly rounded ends, shaded across
+    their axis; seed beads are rounder, shaded from a highlight off center.
+
+    Args:
+        color (str): the bead's hex color.
+        style (str): "Delica" or "Seed".
+        width (int): width of the bead, in device independent pixels.
+        height (int): height of the bead, in device independent pixels.
+        vertical (bool): the bead's hole runs vertically, i.e. its rows are stacked top to bottom.
+        devicePixelRatio (float): the ratio of the device it will be drawn on.
+
+    Returns:
+        QPixmap: the bead, on a transparent background.
+    """
+    pixmap = QPixmap(max(1, round(width * devicePixelRatio)), max(1, round(height * devicePixelRatio)))
+    pixmap.setDevicePixelRatio(devicePixelRatio)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    base = QColor(color)
+    rect = QRectF(0, 0, width, height)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+
+    if style == "Seed":
+        radius = min(width, height) / 2
+        gradient = QRadialGradient(width * 0.35, height * 0.3, max(width, height) * 0.75)
+        gradient.setColorAt(0, base.lighter(160))
+        gradient.setColorAt(0.45, base)
+        gradient.setColorAt(1, base.darker(180))
+    else:
+        radius = min(width, height) / 5
+        # across the hole's axis, so the bead looks like a cylinder lying along it
+        gradient = QLinearGradient(0, 0, width, 0) if vertical else QLinearGradient(0, 0, 0, height)
+        gradient.setColorAt(0, base.darker(160))
+        gradient.setColorAt(0.3, base.lighter(140))
+        gradient.setColorAt(0.5, base)
+        gradient.setColorAt(1, base.darker(180))
+    painter.setBrush(gradient)
+    painter.drawRoundedRect(rect, radius, radius)
+
+    painter.end()
+    return pixmap
+
+def spriteBytes(pixmap):
+    return pixmap.width() * pixmap.height() * 4
+
+class SpriteAtlas:
+    """An LRU cache of rendered bead sprites, bounded in bytes."""
+
+    def __init__(self, maxBytes=MAX_SPRITE_BYTES):
+        self.maxBytes = maxBytes
+        self.sprites = OrderedDict()    # (color, style, width, height, vertical, devicePixelRatio) -> QPixmap, least recently used first
+        self.bytes = 0
+
+    def sprite(self, color, style, width, height, vertical, devicePixelRatio):
+        """Returns the sprite of a bead, rendering it on first use. See renderBead for the arguments."""
+        key = (color, style, width, height, vertical, devicePixelRatio)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = renderBead(*key)
+            self.bytes += spriteBytes(sprite)
+            while self.bytes > self.maxBytes and len(self.sprites) > 1:
+                self.bytes -= spriteBytes(self.sprites.popitem(last=False)[1])
+        else:
+            self.sprites.move_to_end(key)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+# shared by every delegate
+spriteAtlas = SpriteAtlas()
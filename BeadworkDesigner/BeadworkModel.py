@@ -2,26 +2,48 @@ import logging
 from math import ceil
 
 from PySide6 import QtCore, QtGui
-from PySide6.QtCore import Qt, QTransposeProxyModel
-
-### FOR DEBUGGING ###
-def generate_random_color():
-    import random
-    colorString = '#{:06x}'.format(random.randint(0, 0xFFFFFF))
-    return colorString.upper()
-def color(random=False):
-    if random:
-        color = generate_random_color()
-        logger.debug(f"picked random color: {color}")
-        return color
-    else:
-        return "#FFFFFF"
-#####################
-        
+from PySide6.QtCore import Qt
+
+from BeadworkDesigner.ColorPool import (COLOR_BRUSH_ROLE, COLOR_VALUE_ROLE,
+                                         colorPool)
+from BeadworkDesigner.core.Fill import floodFill
+from BeadworkDesigner.core.Grid import Grid
+from BeadworkDesigner.core.Palette import normalizePattern
+from BeadworkDesigner.Log import trace
+from BeadworkDesigner import Instrumentation
+
 logger = logging.getLogger(__name__)
 
+def headerMarker(section, count):
+    """Returns the marker displayed in the header for a row or column: "||" for
+    the center of an odd count, "|" for every 5th, otherwise None.
+
+    Args:
+        section (int): the row or column.
+        count (int): the total number of rows or columns.
+
+    Returns:
+        str: the marker, or None.
+    """
+    if (count % 2 != 0) and (section == ceil(count / 2) - 1):
+        return "||"
+    elif ((section + 1) % 5 == 0):
+        return "|"
+    return None
+
 class BeadworkModel(QtCore.QAbstractTableModel):
-    """A model for the beadwork, internally represented as a 2D list of hex colors."""
+    """A model for the beadwork, internally represented as a 2D list of hex colors.
+
+    The data is held in a core Grid; this class adapts it to Qt and emits the
+    model signals. It has the same editing methods as Grid, so the undo records
+    in core.Edits apply to it directly.
+
+    The model can show the grid transposed - rows become columns and columns
+    become rows - without copying it: while transposed is set, every row and
+    column the model is given or returns is swapped before the grid is read or
+    edited. The grid itself is always stored vertically, so exportData() and
+    replaceData() use its orientation, not the displayed one.
+    """
 
     def __init__(self, data = None, debug=False, defaultHeight=7, defaultWidth=5):
         """Initializes the BeadworkModel. If debug is True, generates random colors for all beads.
@@ -34,23 +56,66 @@ class BeadworkModel(QtCore.QAbstractTableModel):
         """
         super().__init__()
 
-        self._debug = debug
-        
         if not data:
             logger.info("No data given to BeadworkModel, loading initial project.")
-            if self._debug:
-                # generate random hex colors in array
-                logger.debug("Generating BeadworkModel with random colors.")
-                self._data = [[generate_random_color() for _ in range(defaultWidth)] for _ in range(defaultHeight)]
-            else:
-                logger.debug("Generating BeadworkModel with blank fields.")
-                self._data = [['#FFFFFF' for _ in range(defaultWidth)] for _ in range(defaultHeight)]
+            logger.debug(f"Generating BeadworkModel with {'random colors' if debug else 'blank fields'}.")
         else:
             logger.info("Data given to BeadworkModel, loading given project.")
-            self._data = data
+        self.grid = Grid(data, width=defaultWidth, height=defaultHeight, debug=debug)
+
+        self.transposed = False
+        # the editing methods in each orientation, indexed by transposed
+        self.orientations = (FixedOrientation(self, False), FixedOrientation(self, True))
 
         logger.info(f"BeadworkModel {self} created.")
 
+    @property
+    def _data(self):
+        return self.grid.rows
+
+    @property
+    def _debug(self):
+        return self.grid.debug
+
+    ### ORIENTATION
+
+    def setTransposed(self, transposed):
+        """Shows the grid transposed, or not, in O(1) for the data.
+
+        Emits layoutChanged rather than resetting the model, moving every
+        persistent index (the views' selection and current index) to the same
+        bead, so the selection is kept.
+
+        Args:
+            transposed (bool): whether rows are shown as columns and columns as rows.
+        """
+        if transposed == self.transposed:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        self.transposed = transposed
+        self.changePersistentIndexList(persistent, [self.index(index.column(), index.row()) for index in persistent])
+        self.layoutChanged.emit()
+        logger.debug(f"BeadworkModel {'transposed' if transposed else 'not transposed'}.")
+
+    def gridCell(self, row, column):
+        """Returns the grid's (row, column) of the bead shown at row, column."""
+        return (column, row) if self.transposed else (row, column)
+
+    def indexForCell(self, row, column):
+        """Returns the index showing the grid's bead at row, column."""
+        return self.index(column, row) if self.transposed else self.index(row, column)
+
+    def editTarget(self):
+        """Returns the editing methods in the current orientation, for undo records.
+
+        The undo records keep their rows and columns, so they must keep
+        applying to the orientation they were made in after it changes.
+        """
+        return self.orientations[self.transposed]
+
+    ### QT MODEL
+
     def data(self, index, role):
         """Returns the data at the given index for the given role.
 
@@ -59,25 +124,30 @@ class BeadworkModel(QtCore.QAbstractTableModel):
             role (Qt.ItemDataRole.DisplayRole,
                   Qt.ItemDataRole.BackgroundRole,
                   Qt.ItemDataRole.DecorationRole,
-                  Qt.ItemDataRole.SizeHintRole): type of data to retrieve.
+                  Qt.ItemDataRole.SizeHintRole,
+                  COLOR_VALUE_ROLE,
+                  COLOR_BRUSH_ROLE): type of data to retrieve.
 
         Returns:
             Qt.ItemDataRole.DisplayRole -> str: color, in hex, of the bead.
-            Qt.ItemDataRole.BackgroundRole -> QColor: color of the bead.
-            Qt.ItemDataRole.DecorationRole -> QColor: color of the bead.
+            Qt.ItemDataRole.BackgroundRole -> QColor: color of the bead, shared through the color pool.
+            Qt.ItemDataRole.DecorationRole -> QColor: color of the bead, shared through the color pool.
             Qt.ItemDataRole.SizeHintRole -> QSize: size hint for the bead.
+            COLOR_VALUE_ROLE -> int: color of the bead, as 0xRRGGBB.
+            COLOR_BRUSH_ROLE -> QBrush: color of the bead, shared through the color pool.
         """
-        #logger.debug(f"Getting data: {self._data[index.row()][index.column()]} for role {role}.")
+        if role == COLOR_BRUSH_ROLE:   # first, as the delegate asks for it for every bead painted
+            return colorPool.brush(self.cellColor(index.row(), index.column()))
 
         if role == Qt.ItemDataRole.DisplayRole:
-            return self._data[index.row()][index.column()]
+            return self.cellColor(index.row(), index.column())
+
+        if role == Qt.ItemDataRole.BackgroundRole or role == Qt.ItemDataRole.DecorationRole:
+            return colorPool.color(self.cellColor(index.row(), index.column()))
+
+        if role == COLOR_VALUE_ROLE:
+            return colorPool.value(self.cellColor(index.row(), index.column()))
 
-        if role == Qt.ItemDataRole.BackgroundRole:
-            return QtGui.QColor(self._data[index.row()][index.column()])
-        
-        if role == Qt.ItemDataRole.DecorationRole:
-            return QtGui.QColor(self._data[index.row()][index.column()])
-        
         # Size hint is passed but does not seem to affect the view.
         if role == Qt.ItemDataRole.SizeHintRole:
             return QtCore.QSize(22, 12)
@@ -91,10 +161,12 @@ class BeadworkModel(QtCore.QAbstractTableModel):
             role (Qt.ItemDataRole.EditRole): type of data to set.
         """
         if role == Qt.ItemDataRole.EditRole:
-            logger.debug(f"Setting data to {value} at {index.row()}, {index.column()}.")
-            self._data[index.row()][index.column()] = value
+            trace(logger, "Setting data to %s at %d, %d.", value, index.row(), index.column())
+            self.grid.setCells({self.gridCell(index.row(), index.column()): value})
+            if __debug__ and Instrumentation.enabled:
+                Instrumentation.count("dataChanged")
+                Instrumentation.count("dataChanged cells")
             self.dataChanged.emit(index, index)
-            logger.debug(f"Data changed at {index.row()}, {index.column()}.")
             return True
         return False  
     
@@ -108,31 +180,201 @@ class BeadworkModel(QtCore.QAbstractTableModel):
             role (Qt.ItemDataRole.DisplayRole): the role of the header data.
         """
         if role == Qt.ItemDataRole.DisplayRole:
-            headerData = None
             if orientation == Qt.Orientation.Horizontal: 
-                if (self.columnCount(None) % 2 != 0) and (section == ceil(self.columnCount(None) / 2) - 1):
-                    headerData = "||"
-                elif ((section + 1) % 5 == 0):
-                    headerData = "|"
-
-            if orientation == Qt.Orientation.Vertical:
-                if (self.rowCount(None) % 2 != 0) and (section == ceil(self.rowCount(None) / 2) - 1):
-                    headerData = "||"
-                elif ((section + 1) % 5 == 0):
-                    headerData = "|"
+                headerData = headerMarker(section, self.columnCount(None))
+            else:
+                headerData = headerMarker(section, self.rowCount(None))
             
             #logger.debug(f"returning header data {headerData if headerData else ''} for {orientation} {section}")
             return headerData
         
     def rowCount(self, index=None):
         """Returns the number of rows in the model."""
-        # length of outer list
-        return len(self._data)
+        return self.grid.columnCount() if self.transposed else self.grid.rowCount()
     
     def columnCount(self, index=None):
         """Returns the number of columns in the model."""
-        # only works if all rows are an equal length
-        return len(self._data[0])   
+        return self.grid.rowCount() if self.transposed else self.grid.columnCount()
+
+    ### GRID EDITING METHODS, shared with core.Grid, in the displayed orientation
+
+    def cellColor(self, row, column):
+        """Returns the hex color of the bead at row, column."""
+        return self.grid.rows[column][row] if self.transposed else self.grid.rows[row][column]
+
+    def setCells(self, cells):
+        """Sets the color of many beads at once, emitting a single dataChanged
+        covering all of them.
+
+        Args:
+            cells (dict): (row, column) mapped to the new hex color.
+        """
+        self.editTarget().setCells(cells)
+
+    def block(self, row, column, rowCount, columnCount):
+        """Returns a copy of the rowCount x columnCount beads from row, column, as a 2D list of hex colors."""
+        return self.editTarget().block(row, column, rowCount, columnCount)
+
+    def setBlock(self, row, column, block):
+        """Sets the colors of a rectangle of beads at once, emitting a single dataChanged.
+
+        Args:
+            row (int): the top row of the rectangle.
+            column (int): its left column.
+            block (list): a 2D list of hex colors, with None for beads left as they are.
+        """
+        self.editTarget().setBlock(row, column, block)
+
+    # overrides QAbstractItemModel.insertRows etc., so they can also be called through Qt
+    # unlike the edit targets' removeRows and removeColumns, these return a bool, as Qt expects
+    def insertRows(self, row, count=1, parent=QtCore.QModelIndex()):
+        """Inserts count rows before row. If row is rowCount(), the rows are appended."""
+        return self.editTarget().insertRows(row, count)
+
+    def removeRows(self, row, count=1, parent=QtCore.QModelIndex()):
+        """Removes count rows starting at row."""
+        self.editTarget().removeRows(row, count)
+        return True
+
+    def insertColumns(self, column, count=1, parent=QtCore.QModelIndex()):
+        """Inserts count columns before column. If column is columnCount(), the columns are appended."""
+        return self.editTarget().insertColumns(column, count)
+
+    def removeColumns(self, column, count=1, parent=QtCore.QModelIndex()):
+        """Removes count columns starting at column."""
+        self.editTarget().removeColumns(column, count)
+        return True
+
+    def resize(self, rowCount, columnCount, rowOffset=0, columnOffset=0, fill=None):
+        """Crops or pads the pattern on any side, as Grid.resize; fill is in the grid's orientation."""
+        return self.editTarget().resize(rowCount, columnCount, rowOffset, columnOffset, fill)
+
+    def replaceData(self, data):
+        """Replaces the whole pattern, keeping the debug setting, as a model reset. data is in the
+        grid's orientation and comes from the app itself, e.g. an earlier exportData(), so is not checked."""
+        self.resetData(data, self._debug)
+
+    ### GRID EDITING METHODS, in the grid's orientation
+
+    def setGridCells(self, cells):
+        """Sets the color of many beads, given by the grid's (row, column), emitting a single dataChanged."""
+        if not cells:
+            return
+        self.grid.setCells(cells)
+        rows = [row for row, _ in cells]
+        columns = [column for _, column in cells]
+        if __debug__ and Instrumentation.enabled:
+            Instrumentation.count("dataChanged")
+            Instrumentation.count("dataChanged cells", (max(rows) - min(rows) + 1) * (max(columns) - min(columns) + 1))
+        self.dataChanged.emit(self.indexForCell(min(rows), min(columns)), self.indexForCell(max(rows), max(columns)))
+
+    def setGridBlock(self, row, column, block):
+        """Sets the colors of a rectangle of the grid's beads, from the grid's row, column, emitting a single dataChanged."""
+        if not block or not block[0]:
+            return
+        self.grid.setBlock(row, column, block)
+        bottom, right = row + len(block) - 1, column + len(block[0]) - 1
+        if __debug__ and Instrumentation.enabled:
+            Instrumentation.count("dataChanged")
+            Instrumentation.count("dataChanged cells", len(block) * len(block[0]))
+        self.dataChanged.emit(self.indexForCell(row, column), self.indexForCell(bottom, right))
+
+    def insertGridRows(self, row, count=1, beads=None):
+        """Inserts count of the grid's rows before row, of beads from an earlier removeGridRows, or new beads."""
+        logger.debug(f"Inserting {count} grid row(s) before {row}.")
+        if self.transposed:
+            self.beginInsertColumns(QtCore.QModelIndex(), row, row+(count-1))
+        else:
+            self.beginInsertRows(QtCore.QModelIndex(), row, row+(count-1))
+        self.grid.insertRows(row, count, beads)
+        if self.transposed:
+            self.endInsertColumns()
+        else:
+            self.endInsertRows()
+        if beads is not None:
+            # their colors may not be in the pattern any more, e.g. for the color list, which rescans on dataChanged
+            self.dataChanged.emit(self.indexForCell(row, 0), self.indexForCell(row + count - 1, self.grid.columnCount() - 1))
+        return True
+
+    def removeGridRows(self, row, count=1):
+        """Removes count of the grid's rows starting at row.
+
+        Returns:
+            list: the removed beads, as Grid.removeRows.
+        """
+        logger.debug(f"Removing {count} grid row(s) at {row}.")
+        if self.transposed:
+            self.beginRemoveColumns(QtCore.QModelIndex(), row, row+(count-1))
+        else:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row+(count-1))
+        removed = self.grid.removeRows(row, count)
+        if self.transposed:
+            self.endRemoveColumns()
+        else:
+            self.endRemoveRows()
+        return removed
+
+    def insertGridColumns(self, column, count=1, beads=None):
+        """Inserts count of the grid's columns before column, of beads from an earlier removeGridColumns, or new beads."""
+        logger.debug(f"Inserting {count} grid column(s) before {column}.")
+        if self.transposed:
+            self.beginInsertRows(QtCore.QModelIndex(), column, column+(count-1))
+        else:
+            self.beginInsertColumns(QtCore.QModelIndex(), column, column+(count-1))
+        self.grid.insertColumns(column, count, beads)
+        if self.transposed:
+            self.endInsertRows()
+        else:
+            self.endInsertColumns()
+        if beads is not None:
+            # as in insertGridRows
+            self.dataChanged.emit(self.indexForCell(0, column), self.indexForCell(self.grid.rowCount() - 1, column + count - 1))
+        return True
+
+    def removeGridColumns(self, column, count=1):
+        """Removes count of the grid's columns starting at column.
+
+        Returns:
+            list: the removed beads, as Grid.removeColumns.
+        """
+        logger.debug(f"Removing {count} grid column(s) at {column}.")
+        if self.transposed:
+            self.beginRemoveRows(QtCore.QModelIndex(), column, column+(count-1))
+        else:
+            self.beginRemoveColumns(QtCore.QModelIndex(), column, column+(count-1))
+        removed = self.grid.removeColumns(column, count)
+        if self.transposed:
+            self.endRemoveRows()
+        else:
+            self.endRemoveColumns()
+        return removed
+
+    def resizeGrid(self, rowCount, columnCount, rowOffset=0, columnOffset=0, fill=None):
+        """Crops or pads the grid, in its orientation, as Grid.resize.
+
+        However many sides change, this is a single layout change: the views
+        relayout once, and persistent indexes (the selection and current
+        index) move with their beads, or become invalid if cropped away. One
+        dataChanged then covers the whole pattern, for the color list.
+        """
+        logger.debug(f"Resizing grid to {rowCount}x{columnCount}, moving it by {rowOffset}, {columnOffset}.")
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        cells = [self.gridCell(index.row(), index.column()) for index in persistent]
+        self.grid.resize(rowCount, columnCount, rowOffset, columnOffset, fill)
+        moved = []
+        for row, column in cells:
+            row, column = row + rowOffset, column + columnOffset
+            inside = 0 <= row < rowCount and 0 <= column < columnCount
+            moved.append(self.indexForCell(row, column) if inside else QtCore.QModelIndex())
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+        if rowCount and columnCount:
+            if __debug__ and Instrumentation.enabled:
+                Instrumentation.count("dataChanged")
+                Instrumentation.count("dataChanged cells", rowCount * columnCount)
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+        return True
      
     # from https://doc.qt.io/qtforpython-6/PySide6/QtCore/QAbstractItemModel.html#PySide6.QtCore.QAbstractItemModel.insertRows:
     #   inserts count rows into the model before the given row
@@ -146,30 +388,11 @@ class BeadworkModel(QtCore.QAbstractTableModel):
             count (int, optional): The number of rows to insert. Defaults to 1.
             parent (QModelIndex, optional): The parent index. Defaults to None.
         """
-        if row == 0:
-            logger.debug(f"Prepending {count} row(s) at beginning of model.")
-            self.beginInsertRows(QtCore.QModelIndex(), row, row+(count-1))
-            for i in range(count):
-                self._data.insert(i, [color(random=self._debug) for _ in range(self.columnCount())])
-            self.endInsertRows()
-            logger.debug(f"{count} new row(s) at index 0.")
-        elif row == self.rowCount():
-            logger.debug(f"Appending {count} row(s) at end of model.")
-            self.beginInsertRows(QtCore.QModelIndex(), row, row+(count-1))
-            for i in range(count):
-                self._data.insert(row+i, [color(random=self._debug) for _ in range(self.columnCount())])
-            self.endInsertRows()
-            logger.debug(f"{count} new row(s) at index {row}.")
-        else:
-            logger.debug(f"Inserting {count} row(s) before {row}.")
-            self.beginInsertRows(QtCore.QModelIndex(), row, row+(count-1))
-            for i in range(count):
-                self._data.insert(row+i, [color(random=self._debug) for _ in range(self.columnCount())])
-            self.endInsertRows()
-            logger.debug(f"{count} new row(s) at index {row}.")
+        self.insertRows(row, count)
     
     def removeRow(self, row, count=1, parent=None):
-        """Removes a row at the given index.
+        """Removes a row at the given index. If row is rowCount(), the last count
+        rows are removed.
         
         Args:
             row (int): The index of the row to remove.
@@ -179,21 +402,13 @@ class BeadworkModel(QtCore.QAbstractTableModel):
         Returns:
             list[[str]]: The rows removed from the model.
         """
-        rowsRemoved = []
-        logger.debug(f"Removing row at {row}.")
-        if row == self.rowCount(): # if row index is at end of model, continue to remove the last row
-            self.beginRemoveRows(QtCore.QModelIndex(), row-count, row-1)
-            for i in range(count):
-                rowsRemoved.append(self._data.pop(row-(i+1)))
-        else:       # otherwise, remove the row at the given index
-            self.beginRemoveRows(QtCore.QModelIndex(), row, row+(count-1))
-            try:    # try to remove the row, and if it doesn't exist, log the error
-                for _ in range(count):
-                    rowsRemoved.append(self._data.pop(row))
-            except IndexError:
-                logger.error(f"Index out of range: {row}")
-        self.endRemoveRows()
-        logger.debug(f"Removed row at {row}.")
+        if row == self.rowCount():  # if row index is at end of model, remove the last rows
+            row -= count
+        if row < 0 or row + count > self.rowCount():
+            logger.error(f"Index out of range: {row}")
+            return []
+        rowsRemoved = [[self.cellColor(r, c) for c in range(self.columnCount())] for r in range(row, row+count)]
+        self.removeRows(row, count)
         return rowsRemoved
 
     def insertColumn(self, column, count=1, parent=None):
@@ -204,33 +419,11 @@ class BeadworkModel(QtCore.QAbstractTableModel):
             count (int, optional): The number of columns to insert. Defaults to 1.
             parent (QModelIndex, optional): The parent index. Defaults to None.
         """
-        if column == 0:
-            logger.debug(f"Prepending {count} column(s) at beginning of model.")
-            self.beginInsertColumns(QtCore.QModelIndex(), column, column+(count-1))
-            for i in range(count):
-                for row in range(self.rowCount()):
-                    self._data[row].insert(i, color(random=self._debug))
-            self.endInsertColumns()
-            logger.debug(f"{count} new column(s) at index 0.")
-        elif column == self.columnCount():
-            logger.debug(f"Appending {count} column(s) at end of model.")
-            self.beginInsertColumns(QtCore.QModelIndex(), column, column+(count-1))
-            for i in range(count):
-                for row in range(self.rowCount()):
-                    self._data[row].append(color(random=self._debug))
-            self.endInsertColumns()
-            logger.debug(f"{count} new column(s) at index {column}.")
-        else:
-            logger.debug(f"Inserting {count} column(s) before {column}.")
-            self.beginInsertColumns(QtCore.QModelIndex(), column, column+(count-1))
-            for i in range(count):
-                for row in range(self.rowCount()):
-                    self._data[row].insert(column+i, color(random=self._debug))
-            self.endInsertColumns()
-            logger.debug(f"{count} new column(s) at index {column}.")
+        self.insertColumns(column, count)
     
     def removeColumn(self, column, count=1, parent=None):
-        """Removes a column at the given index.
+        """Removes a column at the given index. If column is columnCount(), the
+        last count columns are removed.
 
         Args:
             column (int): The index of the column to remove.
@@ -240,35 +433,15 @@ class BeadworkModel(QtCore.QAbstractTableModel):
         Returns:
             dict(row: [columns]): The columns removed from the model.
         """
-        columnsRemoved = {}
-        logger.debug(f"Removing column at {column}.")
-        if column == self.columnCount(): # if column index is at end of model, continue to remove the last column
-            self.beginRemoveColumns(QtCore.QModelIndex(), column-count, column-1)
-            for i in range(count):
-                for row in range(self.rowCount()):
-                    try:
-                        columnsRemoved[row] += [self._data[row].pop(column-(i+1))]
-                    except KeyError:    # if the key doesn't exist, create it
-                        columnsRemoved[row] = []
-                        columnsRemoved[row] += [self._data[row].pop(column-(i+1))]
-        else:       # otherwise, remove the column at the given index
-            self.beginRemoveColumns(QtCore.QModelIndex(), column, column+(count-1))
-            try:    # try to remove the column, and if it doesn't exist, log the error
-                for i in range(count):
-                    for row in range(self.rowCount()):
-                        try:
-                            columnsRemoved[row] += [self._data[row].pop(column)]
-                        except KeyError:   # if the key doesn't exist, create it
-                            columnsRemoved[row] = []
-                            columnsRemoved[row] += [self._data[row].pop(column)]            
-            except IndexError: # if the index is out of range, log the error
-                logger.error(f"Index out of range: {column}")
-        self.endRemoveColumns()
-        logger.debug(f"Removed column at {column}.")
+        if column == self.columnCount():  # if column index is at end of model, remove the last columns
+            column -= count
+        if column < 0 or column + count > self.columnCount():
+            logger.error(f"Index out of range: {column}")
+            return {}
+        columnsRemoved = {r: [self.cellColor(r, c) for c in range(column, column+count)] for r in range(self.rowCount())}
+        self.removeColumns(column, count)
         return columnsRemoved
-    
 
-    # TODO: optimize this function?
     def nearbyIndicesThatMatch(self, index):
         """Finds all nearby beads that match the data at the given index.
         
@@ -278,100 +451,110 @@ class BeadworkModel(QtCore.QAbstractTableModel):
         Returns:
             list[QIndex]: a list of indices of nearby beads that match the data.
         """
-
-        nearby = []
-
-        def findAllNearbyThatMatchData(row, column, data):
-            nonlocal nearby   # use the nearby variable from the outer function
-            for i in range(-1, 2):
-                for j in range(-1, 2):
-                    try:                            # how do I get this to only check the 4 immediate neighbors?
-                        new_row = row + i
-                        new_column = column + j
-                        # logger.debug(f"Checking {new_row}, {new_column}")
-                        # check we're within bounds and the bead matches the data
-                        if self._data[new_row][new_column] == data and new_row >= 0 and new_column >= 0 and new_row < self.rowCount(None) and new_column < self.columnCount(None):
-                            # check that the bead is either immediately above, below, left, or right of the current bead
-                            if (i == 0 and j != 0) or (i != 0 and j == 0):
-                                # check we haven't already found this bead
-                                if (new_row, new_column) not in nearby:
-                                    logger.debug(f"Found nearby bead that matches data: {new_row}, {new_column}")
-                                    nearby += [(new_row, new_column)]
-                                    findAllNearbyThatMatchData(new_row, new_column, data)
-                    except IndexError as e:
-                        pass
-            return nearby
-
-        findAllNearbyThatMatchData(index.row(), index.column(), self.data(index, role=Qt.ItemDataRole.DisplayRole))
-
-        return [self.index(row, column) for row, column in nearby]
+        row, column = self.gridCell(index.row(), index.column())
+        return [self.indexForCell(r, c) for r, c in floodFill(self.grid.rows, row, column)]
     
-    def importData(self, data, debug=False):    # debug flag will fix issues importing data from a debug model to a non-debug existing model
-        """Imports data into the BeadworkModel.
+    def importData(self, data, debug=False, validate=True):    # debug flag will fix issues importing data from a debug model to a non-debug existing model
+        """Imports data into the BeadworkModel, such as a loaded project, as a model reset.
 
         Args:
-            data (list): a 2D list of hex colors.
+            data (list): a 2D list of hex colors, or a GridSnapshot, in the grid's orientation.
+                         Shared copy-on-write, so it is never modified.
             debug (bool, optional): If set, will generate random colors for beads. Defaults to False.
+            validate (bool, optional): Check data and normalize its colors with normalizePattern first;
+                                       pass False for data that already has been. Defaults to True.
+
+        Raises:
+            ValueError: if validate is set and data is not a rectangular 2D list of hex colors.
+                        The model is left unchanged.
         """
-        self._data = data
-        self._debug = debug
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount(None), self.columnCount(None)))
+        if validate:
+            data = normalizePattern(data)
+        self.resetData(data, debug)
         logger.debug(f"Data imported to BeadworkModel.")
 
+    def resetData(self, data, debug):
+        """Replaces the grid's data inside beginResetModel and endResetModel, so views,
+        the color list and the selection rebuild once, for the new dimensions."""
+        self.beginResetModel()
+        self.grid.replaceData(data)
+        self.grid.debug = debug
+        self.endResetModel()
+
     def exportData(self):
-        """Exports data from the BeadworkModel.
+        """Exports data from the BeadworkModel, in O(1), in the grid's orientation.
 
         Returns:
-            list: a 2D list of hex colors.
+            GridSnapshot: an immutable 2D sequence of hex colors, safe to read from other threads.
         """
         logger.debug(f"Data exported from BeadworkModel.")
-        return self._data
-
-class BeadworkTransposeModel(QTransposeProxyModel):
-    """A proxy model to transpose the beadwork model - i.e., rows become columns and columns become rows.
+        return self.grid.exportData()
 
-    Must call setSourceModel() with a BeadworkModel input to use this model.
+class FixedOrientation:
+    """The editing methods of a BeadworkModel in one orientation, whichever
+    orientation the model is shown in; the target of the undo records made
+    while the model was shown that way.
     """
 
-    def __init__(self, parent=None):
-        """Initializes the BeadworkTransposeModel.
-        
+    def __init__(self, model, transposed):
+        """
         Args:
-            parent (QObject, optional): The parent object. Defaults to None.
+            model (BeadworkModel): the model to edit.
+            transposed (bool): whether rows and columns are swapped.
         """
-        super().__init__(parent)
+        self.model = model
+        self.transposed = transposed
 
-        logger.info(f"BeadworkTransposeModel {self} created.")
+    @property
+    def grid(self):
+        return self.model.grid
 
-    def rowCount(self, parent=None):
-        """Returns the number of rows in the model."""
-        return self.sourceModel().columnCount(parent)
-    
-    def columnCount(self, parent=None):
-        """Returns the number of columns in the model."""
-        return self.sourceModel().rowCount(parent)
-    
-    def insertRow(self, row, count=1):
-        """Inserts a row at the given index."""
-        logger.debug("Calling insertColumn from BeadworkTransposeModel.")
-        self.sourceModel().insertColumn(row, count)
-
-    def insertColumn(self, column, count=1):
-        """Inserts a column at the given index."""
-        logger.debug("Calling insertRow from BeadworkTransposeModel.")
-        self.sourceModel().insertRow(column, count)
-
-    def removeRow(self, row, count=1):
-        """Removes a row at the given index."""
-        logger.debug("Calling removeColumn from BeadworkTransposeModel.")
-        self.sourceModel().removeColumn(row, count)
-    
-    def removeColumn(self, column, count=1):
-        """Removes a column at the given index."""
-        logger.debug("Calling removeRow from BeadworkTransposeModel.")
-        self.sourceModel().removeRow(column, count)
+    def rowCount(self):
+        return self.grid.columnCount() if self.transposed else self.grid.rowCount()
 
-    def nearbyIndicesThatMatch(self, index):
-        """Finds all nearby beads that match the data at the given index."""
-        logger.debug("Calling nearbyIndicesThatMatch from BeadworkTransposeModel.")
-        return self.sourceModel().nearbyIndicesThatMatch(index)
\ No newline at end of file
+    def columnCount(self):
+        return self.grid.rowCount() if self.transposed else self.grid.columnCount()
+
+    def cellColor(self, row, column):
+        return self.grid.rows[column][row] if self.transposed else self.grid.rows[row][column]
+
+    def setCells(self, cells):
+        if self.transposed:
+            cells = {(column, row): color for (row, column), color in cells.items()}
+        self.model.setGridCells(cells)
+
+    def block(self, row, column, rowCount, columnCount):
+        if self.transposed:
+            return [list(beads) for beads in zip(*self.model.grid.block(column, row, columnCount, rowCount))]
+        return self.model.grid.block(row, column, rowCount, columnCount)
+
+    def setBlock(self, row, column, block):
+        if self.transposed:
+            self.model.setGridBlock(column, row, [list(beads) for beads in zip(*block)])
+        else:
+            self.model.setGridBlock(row, column, block)
+
+    # beads, like what removeRows and removeColumns return, is in the grid's orientation
+    def insertRows(self, row, count=1, beads=None):
+        return self.model.insertGridColumns(row, count, beads) if self.transposed else self.model.insertGridRows(row, count, beads)
+
+    def removeRows(self, row, count=1):
+        return self.model.removeGridColumns(row, count) if self.transposed else self.model.removeGridRows(row, count)
+
+    def insertColumns(self, column, count=1, beads=None):
+        return self.model.insertGridRows(column, count, beads) if self.transposed else self.model.insertGridColumns(column, count, beads)
+
+    def removeColumns(self, column, count=1):
+        return self.model.removeGridRows(column, count) if self.transposed else self.model.removeGridColumns(column, count)
+
+    def resize(self, rowCount, columnCount, rowOffset=0, columnOffset=0, fill=None):
+        # fill, like exportData(), is in the grid's orientation
+        if self.transposed:
+            return self.model.resizeGrid(columnCount, rowCount, columnOffset, rowOffset, fill)
+        return self.model.resizeGrid(rowCount, columnCount, rowOffset, columnOffset, fill)
+
+    def replaceData(self, data):
+        self.model.replaceData(data)
+
+    def exportData(self):
+        return self.model.exportData()
@@ -1,16 +1,26 @@
 import logging
 import math
+from bisect import bisect_left
 
+from PySide6.QtGui import QColor, QPainter
 from PySide6.QtWidgets import QAbstractItemView, QAbstractSlider, QHeaderView, QMenu, QTableView
-from PySide6.QtCore import (QItemSelection,
+from PySide6.QtCore import (QEvent,
+                            QItemSelection,
                             QItemSelectionModel,
                             QItemSelectionRange,
-                            Qt)
+                            QModelIndex,
+                            Qt,
+                            Signal)
 
+from BeadworkDesigner.ColorPool import colorPool
 from BeadworkDesigner.Commands import CommandInsertRow, CommandInsertColumn, CommandRemoveRow, CommandRemoveColumn
+from BeadworkDesigner import Instrumentation
+from BeadworkDesigner.Log import trace
 
 logger = logging.getLogger(__name__)
 
+PREVIEW_OPACITY = 0.6
+
 class BeadworkHeaderView(QHeaderView):
     """A header view for the BeadworkModel that displays the row and column headers as numbers."""
 
@@ -74,8 +84,24 @@ class BeadworkView(QTableView):
     """A view for the BeadworkModel that displays the beadwork as a grid of colored beads.
 
     Must call setModel() with a BeadworkModel to display the beadwork.
+
+    While strokeMode is set, dragging with the left button draws a stroke
+    instead of selecting: strokeStarted is emitted with the bead pressed,
+    strokeMoved with each bead the mouse moves onto, and strokeFinished on
+    release. The view does not select or emit clicked meanwhile.
+
+    setPreview shows beads, given as spans, over the pattern without
+    changing the model, e.g. a shape while it is drawn; setPreviewBlock
+    shows a block of beads, e.g. what is about to be pasted. While mouse
+    tracking is on, beadHovered is emitted with each bead the mouse moves
+    onto without a button pressed.
     """
 
+    strokeStarted = Signal(QModelIndex)
+    strokeMoved = Signal(QModelIndex)
+    strokeFinished = Signal()
+    beadHovered = Signal(QModelIndex)
+
     def __init__(self, beadHeight=22, beadWidth=12, parent=None):
         """Initializes the BeadworkView.
 
@@ -98,6 +124,12 @@ class BeadworkView(QTableView):
 
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection) # allows using shift and ctrl when selecting
 
+        self.strokeMode = False
+        self.strokeIndex = None     # the last bead of the stroke being drawn, if any
+        self.preview = None         # (spans, QColor) drawn over the pattern, if any
+        self.previewBlock = None    # (row, column, block) drawn over the pattern, if any
+        self.hoverIndex = None      # the bead last hovered while tracking the mouse
+
         logger.info("BeadworkView initialized.")
 
     def setModel(self, model):
@@ -127,7 +159,7 @@ class BeadworkView(QTableView):
             selectionRanges.append(QItemSelectionRange(index))  # selection range (possible room for optimization)
         itemSelection.append(selectionRanges) # append all ranges to the selection we want
         self.selectionModel().select(itemSelection, command)    # select the selection
-        logger.debug(f"Selected list {selection} in BeadworkView.")
+        trace(logger, "Selected list %s in BeadworkView.", selection)
 
     def dataChanged(self, topLeft, bottomRight, roles):
         """Slot for when the data in the model changes.
@@ -137,7 +169,7 @@ class BeadworkView(QTableView):
             bottomRight (QModelIndex): The bottom right index of the data that changed.
             roles (list): The roles that changed.
         """
-        logger.debug(f"Data changed: {topLeft}, {bottomRight}, {roles}.")
+        trace(logger, "Data changed: %s, %s, %s.", topLeft, bottomRight, roles)
         super().dataChanged(topLeft, bottomRight, roles)
         self.setBeadSize()
 
@@ -145,10 +177,141 @@ class BeadworkView(QTableView):
     # this is necessary because the view does not seem to update the row and column sizes when the model initially loads
     def repaint(self):
         """Repaints the view."""
-        logger.debug("Repainting.")
+        trace(logger, "Repainting.")
         self.setBeadSize()
         super().repaint()
 
+    def paintEvent(self, event):
+        """Paints the viewport, counting frames for the performance panel."""
+        if __debug__ and Instrumentation.enabled:
+            Instrumentation.count("frames")
+        super().paintEvent(event)
+        if self.preview is not None:
+            self.paintPreview()
+        if self.previewBlock is not None:
+            self.paintPreviewBlock()
+
+    def setPreview(self, spans, color):
+        """Shows beads over the pattern, without changing the model.
+
+        Args:
+            spans (list): (row, firstColumn, lastColumn) spans of displayed beads, sorted by row.
+            color (str): the hex color to show them in.
+        """
+        self.preview = (spans, QColor(color))
+        self.viewport().update()
+
+    def setPreviewBlock(self, row, column, block):
+        """Shows a block of beads over the pattern, without changing the model.
+
+        Args:
+            row (int): the displayed row of the top of the block.
+            column (int): the displayed column of its left side.
+            block (list): a 2D list of hex colors, with None where nothing is shown.
+        """
+        self.previewBlock = (row, column, block)
+        self.viewport().update()
+
+    def clearPreview(self):
+        """Stops showing the previews."""
+        if self.preview is not None or self.previewBlock is not None:
+            self.preview = None
+            self.previewBlock = None
+            self.viewport().update()
+
+    def paintPreview(self):
+        """Draws the preview spans that are in view, a rectangle per span."""
+        spans, color = self.preview
+        top, _, bottom, _ = self.visibleCells()
+
+        painter = QPainter(self.viewport())
+        painter.setOpacity(PREVIEW_OPACITY)
+        for i in range(bisect_left(spans, (top,)), len(spans)):
+            row, first, last = spans[i]
+            if row > bottom:
+                break
+            x = self.columnViewportPosition(first)
+            width = self.columnViewportPosition(last) + self.columnWidth(last) - x
+            painter.fillRect(x, self.rowViewportPosition(row), width, self.rowHeight(row), color)
+        painter.end()
+
+    def visibleCells(self):
+        """Returns the displayed (top, left, bottom, right) beads visible in the viewport."""
+        viewport = self.viewport()
+        bottom, right = self.rowAt(viewport.height() - 1), self.columnAt(viewport.width() - 1)
+        return (max(self.rowAt(0), 0), max(self.columnAt(0), 0),
+                bottom if bottom >= 0 else self.model().rowCount(None) - 1,
+                right if right >= 0 else self.model().columnCount(None) - 1)
+
+    def paintPreviewBlock(self):
+        """Draws the beads of the preview block that are in view."""
+        row, column, block = self.previewBlock
+        top, left, bottom, right = self.visibleCells()
+        top, left = max(top, row), max(left, column)
+        bottom, right = min(bottom, row + len(block) - 1), min(right, column + (len(block[0]) if block else 0) - 1)
+
+        painter = QPainter(self.viewport())
+        painter.setOpacity(PREVIEW_OPACITY)
+        for r in range(top, bottom + 1):
+            blockRow = block[r - row]
+            y, height = self.rowViewportPosition(r), self.rowHeight(r)
+            for c in range(left, right + 1):
+                bead = blockRow[c - column]
+                if bead is not None:
+                    painter.fillRect(self.columnViewportPosition(c), y, self.columnWidth(c), height, colorPool.color(bead))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        """Starts a stroke in stroke mode, otherwise selects as usual."""
+        if self.strokeMode and event.button() == Qt.MouseButton.LeftButton:
+            index = self.indexAt(event.position().toPoint())
+            if index.isValid():
+                self.strokeIndex = (index.row(), index.column())
+                self.strokeStarted.emit(index)
+            return
+        super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        """In stroke mode, the second click of a double click starts another stroke."""
+        if self.strokeMode:
+            self.mousePressEvent(event)
+            return
+        super().mouseDoubleClickEvent(event)
+
+    def mouseMoveEvent(self, event):
+        """Extends the stroke being drawn to the bead under the mouse, if it moved onto another one."""
+        if self.hasMouseTracking() and event.buttons() == Qt.MouseButton.NoButton:
+            index = self.indexAt(event.position().toPoint())
+            if index.isValid() and (index.row(), index.column()) != self.hoverIndex:
+                self.hoverIndex = (index.row(), index.column())
+                self.beadHovered.emit(index)
+        if self.strokeIndex is not None:
+            index = self.indexAt(event.position().toPoint())
+            if index.isValid() and (index.row(), index.column()) != self.strokeIndex:
+                self.strokeIndex = (index.row(), index.column())
+                self.strokeMoved.emit(index)
+            return
+        if self.strokeMode:
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        """Finishes the stroke being drawn."""
+        if self.strokeIndex is not None:
+            if event.button() == Qt.MouseButton.LeftButton:
+                self.strokeIndex = None
+                self.strokeFinished.emit()
+            return
+        if self.strokeMode and event.button() == Qt.MouseButton.LeftButton:
+            return
+        super().mouseReleaseEvent(event)
+
+    def changeEvent(self, event):
+        """Renders the bead sprites again when the view moves to a screen with a different pixel ratio."""
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self.setBeadSize()
+        super().changeEvent(event)
+
     def setBeadSize(self, height=None, width=None):
         """Sets the size of the beads in the view. If no height or width is given, uses the stored values.
         
@@ -166,13 +329,17 @@ class BeadworkView(QTableView):
         if width != None:
             self.beadWidth = math.ceil(width)   # round up to ensure that the bead size is always at least 1 pixel
 
-        for i in range(self.model().rowCount(None)):
-            self.setRowHeight(i, self.beadHeight)
-        for i in range(self.model().columnCount(None)):
-            self.setColumnWidth(i, self.beadWidth)
+        # the default size applies to every section of the old default size, and to sections added
+        # later, without a call per row and column; only sections resized on their own need one
+        for header, size in ((self.verticalHeader(), self.beadHeight), (self.horizontalHeader(), self.beadWidth)):
+            header.setDefaultSectionSize(size)
+            if header.length() != header.count() * size:
+                for i in range(header.count()):
+                    header.resizeSection(i, size)
 
         # may need to scale the 1 pixel border to fit with size -- a large bead size should have a larger border
         self.itemDelegate().changeBeadDimensions(self.beadWidth-1, self.beadHeight-1)
+        self.itemDelegate().setDevicePixelRatio(self.viewport().devicePixelRatioF())
 
         logger.debug(f"Bead size set to {self.beadWidth}, {self.beadHeight}.")
 
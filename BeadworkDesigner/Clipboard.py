@@ -0,0 +1,96 @@
+#####################
+# Copying blocks of beads to and from the system clipboard. A block is put
+# on the clipboard in three formats: its own MIME type and plain text, both
+# in the compact text format of core.Blocks, and an image of one pixel per
+# bead, transparent where the block has no bead, for other applications.
+# Pasting reads the first of them that is there, so beads can also be
+# pasted from an image copied elsewhere.
+#####################
+
+import logging
+
+from PySide6.QtCore import QMimeData
+from PySide6.QtGui import QGuiApplication, QImage
+
+from BeadworkDesigner.ColorPool import colorPool
+from BeadworkDesigner.core.Blocks import blockColors, blockFromText, blockToText
+from BeadworkDesigner.core.Palette import hexColor
+
+logger = logging.getLogger(__name__)
+
+BLOCK_MIME_TYPE = "application/x-beadwork-block"
+OPAQUE = 0xFF000000
+
+def blockToImage(block):
+    """Returns a block as an image of one pixel per bead, transparent where it has no bead."""
+    import numpy as np     # imported here so that importing Clipboard stays fast at startup
+
+    height, width = len(block), len(block[0]) if block else 0
+    pixel = {color: OPAQUE | colorPool.value(color) for color in blockColors(block)}
+    pixel[None] = 0
+    pixels = np.array([list(map(pixel.__getitem__, row)) for row in block], dtype=np.uint32).reshape(height, width)
+    return QImage(pixels.tobytes(), width, height, width * 4, QImage.Format.Format_ARGB32).copy()
+
+def blockFromImage(image, maxRows=None, maxColumns=None):
+    """Returns the beads of an image, one per pixel, with pixels under half opacity left out (None).
+
+    Args:
+        image (QImage): the image.
+        maxRows (int, optional): read at most this many rows of pixels, from the top. Defaults to all.
+        maxColumns (int, optional): read at most this many columns of pixels, from the left. Defaults to all.
+    """
+    import numpy as np
+
+    width = min(image.width(), maxColumns or image.width())
+    height = min(image.height(), maxRows or image.height())
+    image = image.copy(0, 0, width, height).convertToFormat(QImage.Format.Format_ARGB32)
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint32, count=image.sizeInBytes() // 4)
+    pixels = pixels.reshape(height, image.bytesPerLine() // 4)[:, :width]
+
+    # one string per distinct color, shared by its beads, and 1 << 24 for a missing bead
+    keys = np.where(pixels >> 24 >= 0x80, pixels & 0xFFFFFF, 1 << 24)
+    values, inverse = np.unique(keys, return_inverse=True)
+    palette = [hexColor(int(v)) if v < 1 << 24 else None for v in values]
+    return [list(map(palette.__getitem__, row)) for row in inverse.reshape(height, width).tolist()]
+
+def copyBlock(block, clipboard=None):
+    """Puts a block on the clipboard, as a block, text and an image.
+
+    Args:
+        block (list): a 2D list of hex colors, with None for no bead.
+        clipboard (QClipboard, optional): Defaults to the system clipboard.
+    """
+    text = blockToText(block)
+    mimeData = QMimeData()
+    mimeData.setData(BLOCK_MIME_TYPE, text.encode("ascii"))
+    mimeData.setText(text)
+    mimeData.setImageData(blockToImage(block))
+    (clipboard or QGuiApplication.clipboard()).setMimeData(mimeData)
+    logger.debug(f"Copied a {len(block[0]) if block else 0}x{len(block)} block, {len(text)} characters as text.")
+
+def pastedBlock(maxRows=None, maxColumns=None, clipboard=None):
+    """Returns the block on the clipboard, read from a block, text or an image, or None if there is none.
+
+    Args:
+        maxRows (int, optional): for an image, read at most this many rows. Defaults to all.
+        maxColumns (int, optional): for an image, read at most this many columns. Defaults to all.
+        clipboard (QClipboard, optional): Defaults to the system clipboard.
+    """
+    mimeData = (clipboard or QGuiApplication.clipboard()).mimeData()
+    if mimeData is None:
+        return None
+    texts = []
+    if mimeData.hasFormat(BLOCK_MIME_TYPE):
+        texts.append(bytes(mimeData.data(BLOCK_MIME_TYPE)).decode("ascii", errors="replace"))
+    if mimeData.hasText():
+        texts.append(mimeData.text())
+    for text in texts:
+        try:
+            return blockFromText(text)
+        except ValueError as e:
+            logger.debug(f"Clipboard text is not a block: {e}")
+    if mimeData.hasImage():
+        image = QImage(mimeData.imageData())
+        if not image.isNull():
+            return blockFromImage(image, maxRows, maxColumns)
+    return None
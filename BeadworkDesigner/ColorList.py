@@ -1,10 +1,14 @@
 import logging
 
 from PySide6.QtCore import QAbstractProxyModel, QModelIndex, Qt
-from PySide6.QtGui import QAction, QColor
+from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QColorDialog, QListView, QMenu
 
+from BeadworkDesigner.ColorPool import COLOR_VALUE_ROLE, colorPool
 from BeadworkDesigner.Commands import CommandChangeMultipleColors
+from BeadworkDesigner.core.Palette import colorPositions
+from BeadworkDesigner.Log import trace
+from BeadworkDesigner import Instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,8 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
 
         self._colors = {}
         self._colors_index = []
+        self._deferred = False  # while set, source changes are only noted
+        self._stale = False
 
         logger.info("BeadworkToColorListProxyModel initialized.")
 
@@ -38,6 +44,7 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
         super().setSourceModel(sourceModel)  
 
         self._sourceModel = sourceModel
+        sourceModel.modelReset.connect(self.sourceReset)
         
         self.evaluateModelForUniqueColors()
 
@@ -47,16 +54,20 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
         Args:
             index (QModelIndex): The index of the data.
             role (Qt.ItemDataRole.DisplayRole,
-                  Qt.ItemDataRole.BackgroundRole): The role of the data.
+                  Qt.ItemDataRole.BackgroundRole,
+                  COLOR_VALUE_ROLE): The role of the data.
 
         Returns:
             Qt.ItemDataRole.DisplayRole -> str: The color at the given index.
-            Qt.ItemDataRole.BackgroundRole -> QColor: The color at the given index.
+            Qt.ItemDataRole.BackgroundRole -> QColor: The color at the given index, shared through the color pool.
+            COLOR_VALUE_ROLE -> int: The color at the given index, as 0xRRGGBB.
         """
         if role == Qt.ItemDataRole.DisplayRole:
             return self._colors_index[index.row()]
         elif role == Qt.ItemDataRole.BackgroundRole:
-            return QColor(self._colors_index[index.row()])
+            return colorPool.color(self._colors_index[index.row()])
+        elif role == COLOR_VALUE_ROLE:
+            return colorPool.value(self._colors_index[index.row()])
         else:
             return None
 
@@ -140,9 +151,9 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
             self.evaluateModelForUniqueColors()
             proxyIndex = self.index(0, 0)
             color = self.data(proxyIndex, Qt.ItemDataRole.DisplayRole)
-        #logger.debug(f"Mapping to source color: {color}, index: {proxyIndex}")
+        #trace(logger, "Mapping to source color: %s, index: %s", color, proxyIndex)
         r, c = self._colors[color][0] # we only return the first index of the color
-        sourceIndex = self.sourceModel().index(r, c) 
+        sourceIndex = self.sourceModel().indexForCell(r, c) 
         #logger.debug(f"Mapped to source index: {sourceIndex}")
         return sourceIndex
     
@@ -169,10 +180,10 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
             list: A list of all indexes in the source model that have the same color as proxyIndex.
         """
         try:
-            logger.debug(f"Mapping to source color: {color}, index: {proxyIndex}")
+            trace(logger, "Mapping to source color: %s, index: %s", color, proxyIndex)
             indexes = self._colors[color]
-            logger.debug(f"Mapped to source indexes: {indexes}")
-            sourceIndexes = map(lambda index: self.sourceModel().index(index[0], index[1]),
+            trace(logger, "Mapped to source indexes: %s", indexes)
+            sourceIndexes = map(lambda index: self.sourceModel().indexForCell(index[0], index[1]),
                                 indexes)
             return list(sourceIndexes)
         except KeyError:    # just in case the color is not valid
@@ -190,22 +201,32 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
         self.undoStack.push(CommandChangeMultipleColors(self.sourceModel(), indexes, newColor[1:])) # skip the '#' in the color as it is added in the command
 
     # runs through model and creates a dictionary of unique colors
+    @Instrumentation.timed("evaluateModelForUniqueColors")
     def evaluateModelForUniqueColors(self):
         """Evaluates the source model for unique colors and stores them in a dictionary.
 
-        The dictionary is stored as self._colors, with the color as the key and a list of indexes as the value.
+        The dictionary is stored as self._colors, with the color as the key and a list of positions as the value.
+        The positions are the grid's (row, column), which do not change with the model's orientation, so
+        changing orientation does not need a rescan.
         """
-        self._colors = {} # reinitialize whenever we call this to prevent carryovers
-        for row in range(self.sourceModel().rowCount(None)):
-            for column in range(self.sourceModel().columnCount(None)):
-                color = self.sourceModel().data(self._sourceModel.index(row, column), Qt.ItemDataRole.DisplayRole)
-                if color not in self._colors:
-                    self._colors[color] = [(row, column)]
-                else:
-                    self._colors[color].append((row, column))
+        # read the grid directly rather than through data() for every bead
+        self._colors = colorPositions(self.sourceModel().grid.rows)
         self._colors_index = list(self._colors)
         self._colors_index.sort()
 
+    def memoryUsage(self, seen=None):
+        """Measures what the color list holds, for the memory report.
+
+        Args:
+            seen (set, optional): ids of objects already counted elsewhere, see Instrumentation.approximateSize. Defaults to None.
+
+        Returns:
+            tuple[int, int, int]: the approximate bytes held, the number of colors and the number of bead positions.
+        """
+        seen = set() if seen is None else seen
+        size = Instrumentation.approximateSize(self._colors, seen=seen) + Instrumentation.approximateSize(self._colors_index, seen=seen)
+        return size, len(self._colors), sum(len(positions) for positions in self._colors.values())
+
     ### SLOTS
     def updateList(self, topLeft, bottomRight):
         """Slot for when the data in the source model changes.
@@ -214,10 +235,32 @@ class BeadworkToColorListProxyModel(QAbstractProxyModel):
             topLeft (QModelIndex): The top left index of the data that changed.
             bottomRight (QModelIndex): The bottom right index of the data that changed.
         """
-        logger.debug(f"Data changed: {topLeft}, {bottomRight}.")
+        trace(logger, "Data changed: %s, %s.", topLeft, bottomRight)
+        if self._deferred:
+            self._stale = True
+            return
         self.evaluateModelForUniqueColors()
         self.dataChanged.emit(self.mapFromSource(topLeft), self.mapFromSource(bottomRight))
 
+    def setUpdatesDeferred(self, deferred):
+        """Defers updating the list while the source changes many times in a row, e.g.
+        during a brush stroke. When resumed, the list is rebuilt once if anything changed.
+
+        Args:
+            deferred (bool): whether to defer updates.
+        """
+        self._deferred = deferred
+        if not deferred and self._stale:
+            self._stale = False
+            self.sourceReset()
+
+    def sourceReset(self):
+        """Slot for when the source model is reset, e.g. a project is loaded: rebuilds the list once."""
+        logger.debug("Source model reset, rebuilding the color list.")
+        self.beginResetModel()
+        self.evaluateModelForUniqueColors()
+        self.endResetModel()
+
 class ColorList(QListView):
     """A view for the ColorListProxyModel that displays a list of unique colors.
 
@@ -232,8 +275,7 @@ class ColorList(QListView):
 
         self.triggeredIndex = None # index of the item that was right-clicked
 
-        self.colorDialog = QColorDialog() # used to select the new color
-        self.colorDialog.colorSelected.connect(lambda c: self.triggerChangeAll(c.name().upper()))
+        self._colorDialog = None # used to select the new color, built when first opened
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.customContextMenu)
@@ -248,6 +290,14 @@ class ColorList(QListView):
 
         logger.info("ColorList initialized.")
 
+    @property
+    def colorDialog(self):
+        """The color dialog used to select the new color, built on first use."""
+        if self._colorDialog is None:
+            self._colorDialog = QColorDialog()
+            self._colorDialog.colorSelected.connect(lambda c: self.triggerChangeAll(c.name().upper()))
+        return self._colorDialog
+
     def customContextMenu(self, point):
         """Opens a custom context menu when right-clicked.
 
@@ -0,0 +1,69 @@
+#####################
+# One prebuilt QColor and QBrush per distinct bead color, shared by the
+# models, the delegate and anything else painting beads.
+#
+# The grid stores each color as a hex string, and normalizePattern makes
+# equal colors share one string, so a lookup here is a dict hit on a string
+# whose hash is already cached: no parsing and no allocation per bead.
+#
+# COLOR_VALUE_ROLE returns a bead's color as a 0xRRGGBB integer, for
+# consumers that compare or pack colors and need no Qt object at all, and
+# COLOR_BRUSH_ROLE its pooled QBrush, for painting.
+#####################
+
+import logging
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor
+
+from BeadworkDesigner.core.Palette import colorValue
+
+logger = logging.getLogger(__name__)
+
+COLOR_VALUE_ROLE = Qt.ItemDataRole.UserRole + 1
+COLOR_BRUSH_ROLE = Qt.ItemDataRole.UserRole + 2
+
+MAX_COLORS = 1024   # a pattern rarely has more than a few hundred colors
+
+class ColorPool:
+    """A bounded cache of hex color -> (QColor, QBrush, 0xRRGGBB).
+
+    Once MAX_COLORS colors are cached, the oldest one is dropped for each new
+    one, so a stream of colors (e.g. debug patterns) cannot grow it without
+    bound.
+    """
+
+    def __init__(self, maxColors=MAX_COLORS):
+        self.maxColors = maxColors
+        self.entries = {}   # hex color -> (QColor, QBrush, int), in insertion order
+
+    def entry(self, hexColor):
+        """Returns the cached (QColor, QBrush, int) for hexColor, building it on first use."""
+        entry = self.entries.get(hexColor)
+        if entry is None:
+            if len(self.entries) >= self.maxColors:
+                del self.entries[next(iter(self.entries))]
+            color = QColor(hexColor)
+            entry = self.entries[hexColor] = (color, QBrush(color), colorValue(hexColor))
+        return entry
+
+    def color(self, hexColor):
+        """Returns the shared QColor for hexColor. Must not be modified."""
+        return self.entry(hexColor)[0]
+
+    def brush(self, hexColor):
+        """Returns the shared QBrush for hexColor. Must not be modified."""
+        return self.entry(hexColor)[1]
+
+    def value(self, hexColor):
+        """Returns hexColor as a 0xRRGGBB integer."""
+        return self.entry(hexColor)[2]
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+# shared by every model and delegate
+colorPool = ColorPool()
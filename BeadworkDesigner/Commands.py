@@ -1,10 +1,16 @@
 import logging
 
-from PySide6.QtCore import Qt, QModelIndex
 from PySide6.QtGui import QUndoCommand
 
+from BeadworkDesigner.core import Edits
+from BeadworkDesigner.Log import trace
+from BeadworkDesigner import Instrumentation
+
 logger = logging.getLogger(__name__)
 
+# Each command wraps an undo record from core.Edits, which does the actual
+# editing; the commands add the QUndoStack integration and view repaints.
+
 class CommandChangeColor(QUndoCommand):
     """Command to change the color of a bead in the BeadworkModel. 
     This command is used to implement undo/redo functionality."""
@@ -23,16 +29,19 @@ class CommandChangeColor(QUndoCommand):
         self.model = model
         self.index = index
 
-        self.oldColor = self.model.data(index, Qt.ItemDataRole.DisplayRole)
+        self.oldColor = self.model.cellColor(index.row(), index.column())
         self.newColor = f"#{color}"
+        self.edit = Edits.SetCells(model.editTarget(), {(index.row(), index.column()): self.newColor}, description)
         
+    @Instrumentation.timedCommand
     def redo(self):
-        logger.debug(f"Changing color at {self.index} from {self.oldColor} to {self.newColor}")
-        self.model.setData(self.index, self.newColor, Qt.ItemDataRole.EditRole)
+        trace(logger, "Changing color at %s from %s to %s", self.index, self.oldColor, self.newColor)
+        self.edit.redo()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        logger.debug(f"Undoing color change at {self.index} from {self.oldColor} to {self.newColor}")
-        self.model.setData(self.index, self.oldColor, Qt.ItemDataRole.EditRole)
+        trace(logger, "Undoing color change at %s from %s to %s", self.index, self.oldColor, self.newColor)
+        self.edit.undo()
 
 class CommandChangeMultipleColors(QUndoCommand):
     """Command to change the color of multiple beads in the BeadworkModel."""
@@ -51,20 +60,79 @@ class CommandChangeMultipleColors(QUndoCommand):
         self.model = model
         self.indexes = indexes
         self.color = f"#{color}"
-
-        self.oldColors = {}
-        for index in indexes:
-            self.oldColors[index] = self.model.data(index, Qt.ItemDataRole.DisplayRole)
+        self.edit = Edits.SetCells(model.editTarget(), {(index.row(), index.column()): self.color for index in indexes}, description)
         
+    @Instrumentation.timedCommand
+    def redo(self):
+        trace(logger, "Changing %d bead(s) to %s", len(self.indexes), self.color)
+        self.edit.redo()
+
+    @Instrumentation.timedCommand
+    def undo(self):
+        trace(logger, "Undoing change of %d bead(s) to %s", len(self.indexes), self.color)
+        self.edit.undo()
+
+class CommandStroke(QUndoCommand):
+    """Command for a brush stroke in the BeadworkModel. The stroke has already
+    been painted as it was drawn, so the first redo, when the command is
+    pushed, does nothing."""
+
+    def __init__(self, model, cells, oldCells, description=None):
+        """Create a new CommandStroke object.
+
+        Args:
+            model (BeadworkModel): The model the stroke was painted on.
+            cells (dict): (row, column) mapped to the new hex color, for each bead the stroke changed.
+            oldCells (dict): (row, column) mapped to the hex color before the stroke.
+            description (str, optional): The description of the command. Defaults to None.
+        """
+        super().__init__(description)
+
+        self.model = model
+        self.edit = Edits.SetCells(model.editTarget(), cells, description, oldCells=oldCells)
+        self.painted = True
+
+    @Instrumentation.timedCommand
+    def redo(self):
+        if self.painted:
+            self.painted = False
+            return
+        trace(logger, "Repainting stroke of %d bead(s)", len(self.edit.newCells))
+        self.edit.redo()
+
+    @Instrumentation.timedCommand
+    def undo(self):
+        trace(logger, "Undoing stroke of %d bead(s)", len(self.edit.newCells))
+        self.edit.undo()
+
+class CommandSetBlock(QUndoCommand):
+    """Command to change the colors of a rectangle of beads in the BeadworkModel
+    at once, such as a shape."""
+
+    def __init__(self, model, row, column, block, description=None):
+        """Create a new CommandSetBlock object.
+
+        Args:
+            model (BeadworkModel): The model that contains the data to be changed.
+            row (int): The top row of the rectangle.
+            column (int): Its left column.
+            block (list): A 2D list of hex colors, with None for beads left as they are.
+            description (str, optional): The description of the command. Defaults to None.
+        """
+        super().__init__(description)
+
+        self.model = model
+        self.edit = Edits.SetBlock(model.editTarget(), row, column, block, description)
+
+    @Instrumentation.timedCommand
     def redo(self):
-        for index in self.indexes:
-            logger.debug(f"Changing color at {index} from {self.oldColors[index]} to {self.color}")
-            self.model.setData(index, self.color, Qt.ItemDataRole.EditRole)
+        trace(logger, "Setting block at %d, %d", self.edit.row, self.edit.column)
+        self.edit.redo()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        for index in self.indexes:
-            logger.debug(f"Undoing color change at {index} from {self.oldColors[index]} to {self.color}")
-            self.model.setData(index, self.oldColors[index], Qt.ItemDataRole.EditRole)
+        trace(logger, "Undoing block at %d, %d", self.edit.row, self.edit.column)
+        self.edit.undo()
 
 class CommandInsertRow(QUndoCommand):
     """Command to insert a row into the BeadworkModel."""
@@ -87,15 +155,16 @@ class CommandInsertRow(QUndoCommand):
 
         self.model = model
         self.view = view
-        self.row = row
-        self.count = rowCount
+        self.edit = Edits.InsertRows(model.editTarget(), row, rowCount, description)
 
+    @Instrumentation.timedCommand
     def redo(self):
-        self.model.insertRow(self.row, self.count)
+        self.edit.redo()
         self.view.repaint()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        self.model.removeRow(self.row, self.count)
+        self.edit.undo()
         self.view.repaint()
 
 class CommandRemoveRow(QUndoCommand):
@@ -107,7 +176,7 @@ class CommandRemoveRow(QUndoCommand):
         Args:
             model (BeadworkModel): The model to remove the row from.
             view (BeadworkView): The view to repaint after the row is removed.
-            row (int): The row to remove.
+            row (int): The row to remove. If row is rowCount(), the last rows are removed.
             rowCount (int, optional): The number of rows to remove. Defaults to 1.
             description (str, optional): The description of the command. Defaults to None.
         """
@@ -115,33 +184,16 @@ class CommandRemoveRow(QUndoCommand):
 
         self.model = model
         self.view = view
-        self.row = row
-
-        self.count = rowCount
-
-        self.rowCountBefore = self.model.rowCount(None)
-        self.rowCountAfter = None
-
-        self.rowData = []   # to store rows removed
+        self.edit = Edits.RemoveRows(model.editTarget(), row, rowCount, description)
 
+    @Instrumentation.timedCommand
     def redo(self):
-        self.rowData = self.model.removeRow(self.row, self.count)
-        self.rowCountAfter = self.model.rowCount(None)
+        self.edit.redo()
         self.view.repaint()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        if self.row == self.rowCountBefore:
-            self.model.insertRow(self.rowCountAfter, self.count)
-
-            for i in range(self.count):
-                for j in range(self.model.columnCount()):
-                    self.model.setData(self.model.index(self.row + (i-1), j), self.rowData[i][j], Qt.ItemDataRole.EditRole)
-        else:
-            self.model.insertRow(self.row, self.count)
-
-            for i in range(self.count):
-                for j in range(self.model.columnCount()):
-                    self.model.setData(self.model.index(self.row + i, j), self.rowData[i][j], Qt.ItemDataRole.EditRole)
+        self.edit.undo()
         self.view.repaint()
       
 class CommandInsertColumn(QUndoCommand):
@@ -157,24 +209,20 @@ class CommandInsertColumn(QUndoCommand):
             columnCount (int, optional): The number of columns to insert. Defaults to 1.
             description (str, optional): The description of the command. Defaults to None.
         """
-        # from https://doc.qt.io/qtforpython-6/PySide6/QtCore/QAbstractItemModel.html#PySide6.QtCore.QAbstractItemModel.insertRows:
-        #   inserts count rows into the model before the given row
-        #   If row is 0, the rows are prepended to any existing rows in the parent.
-        #   If row is rowCount() , the rows are appended to any existing rows in the parent.
         super().__init__(description)
 
         self.model = model
         self.view = view
-        self.column = column
-        self.count = columnCount
+        self.edit = Edits.InsertColumns(model.editTarget(), column, columnCount, description)
 
+    @Instrumentation.timedCommand
     def redo(self):
-        self.model.insertColumn(self.column, self.count)
+        self.edit.redo()
         self.view.repaint()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        # TODO: only for testing, refactor when removeColumn is fixed
-        self.model.removeColumn(self.column, self.count)
+        self.edit.undo()
         self.view.repaint()
 
 class CommandRemoveColumn(QUndoCommand):
@@ -186,7 +234,7 @@ class CommandRemoveColumn(QUndoCommand):
         Args:
             model (BeadworkModel): The model to remove the column from.
             view (BeadworkView): The view to repaint after the column is removed.
-            column (int): The column to remove.
+            column (int): The column to remove. If column is columnCount(), the last columns are removed.
             columnCount (int, optional): The number of columns to remove. Defaults to 1.
             description (str, optional): The description of the command. Defaults to None.
         """
@@ -194,34 +242,75 @@ class CommandRemoveColumn(QUndoCommand):
 
         self.model = model
         self.view = view
-        self.column = column
+        self.edit = Edits.RemoveColumns(model.editTarget(), column, columnCount, description)
 
-        self.count = columnCount
+    @Instrumentation.timedCommand
+    def redo(self):
+        self.edit.redo()
+        self.view.repaint()
 
-        self.columnCountBefore = self.model.columnCount(None)
-        self.columnCountAfter = None
+    @Instrumentation.timedCommand
+    def undo(self):
+        self.edit.undo()
+        self.view.repaint()
 
-        self.columnData = []   # to store rows removed
+class CommandReplaceData(QUndoCommand):
+    """Command to replace all of the data in the BeadworkModel at once, such as
+    after reducing colors or importing an image."""
 
+    def __init__(self, model, view, data, description=None):
+        """Create a new CommandReplaceData object.
+
+        Args:
+            model (BeadworkModel): The model whose data will be replaced.
+            view (BeadworkView): The view to repaint after the data is replaced.
+            data (list): The new data as a 2D list of hex colors.
+            description (str, optional): The description of the command. Defaults to None.
+        """
+        super().__init__(description)
+
+        self.model = model
+        self.view = view
+        self.edit = Edits.ReplaceData(model.editTarget(), data, description)
+
+    @Instrumentation.timedCommand
     def redo(self):
-        self.columnData = self.model.removeColumn(self.column, self.count)
-        self.columnCountAfter = self.model.columnCount(None)
+        self.edit.redo()
         self.view.repaint()
 
+    @Instrumentation.timedCommand
     def undo(self):
-        if self.column == self.columnCountBefore:
-            self.model.insertColumn(self.columnCountAfter, self.count)
-        
-            for i in range(self.count):
-                for r in range(self.model.rowCount()): 
-                        logger.debug(f"Setting data at {r}, {self.column + (i-1)} to {self.columnData[r][i]}")
-                        self.model.setData(self.model.index(r, self.column + (i-1)), self.columnData[r][i], Qt.ItemDataRole.EditRole)
-
-        else:
-            self.model.insertColumn(self.column, self.count)
-
-            for i in range(self.count):
-                for r in range(self.model.rowCount()): 
-                        logger.debug(f"Setting data at {r}, {self.column + i} to {self.columnData[r][i]}")
-                        self.model.setData(self.model.index(r, self.column + i), self.columnData[r][i], Qt.ItemDataRole.EditRole)
-        self.view.repaint()
\ No newline at end of file
+        self.edit.undo()
+        self.view.repaint()
+
+class CommandResize(QUndoCommand):
+    """Command to crop or pad the BeadworkModel on any side at once, such as
+    when adjusting its dimensions."""
+
+    def __init__(self, model, view, rowCount, columnCount, rowOffset=0, columnOffset=0, description=None):
+        """Create a new CommandResize object.
+
+        Args:
+            model (BeadworkModel): The model to resize.
+            view (BeadworkView): The view to repaint after the model is resized.
+            rowCount (int): The new number of rows.
+            columnCount (int): The new number of columns.
+            rowOffset (int, optional): How far the existing rows move down. Defaults to 0.
+            columnOffset (int, optional): How far the existing columns move right. Defaults to 0.
+            description (str, optional): The description of the command. Defaults to None.
+        """
+        super().__init__(description)
+
+        self.model = model
+        self.view = view
+        self.edit = Edits.Resize(model.editTarget(), rowCount, columnCount, rowOffset, columnOffset, description)
+
+    @Instrumentation.timedCommand
+    def redo(self):
+        self.edit.redo()
+        self.view.repaint()
+
+    @Instrumentation.timedCommand
+    def undo(self):
+        self.edit.undo()
+        self.view.repaint()
@@ -0,0 +1,238 @@
+#####################
+# Configuration layers, resolved through one cached, merged view:
+#   project configs  - the open project (width, height, orientation, ...)
+#   app configs      - application preferences, saved in bin/config.json
+#   defaults         - bin/default_config.json, used for anything missing
+#
+# Lookups are a single dict access. bin/config.json is watched for changes
+# made outside the application, and is written atomically; writes caused by
+# setConfig() are debounced, explicit saves are written straight away.
+#####################
+
+import json
+import logging
+import os
+import stat
+import tempfile
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from BeadworkDesigner.core.Serialization import readConfigFile
+
+logger = logging.getLogger(__name__)
+
+base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+bin_dir = os.path.join(base_dir, "bin")
+configFile = os.path.join(bin_dir, "config.json")
+defaultConfigFile = os.path.join(bin_dir, "default_config.json")
+
+SAVE_DELAY = 500    # ms to wait for further changes before writing
+
+def coerceConfig(value, like):
+    """Converts value, usually text from a settings field, to the type of like.
+
+    Args:
+        value: the value to convert.
+        like: an existing value of the config, whose type is kept.
+
+    Returns:
+        the converted value, or value unchanged if it cannot be converted.
+    """
+    if not isinstance(value, str) or isinstance(like, str) or like is None:
+        return value
+    try:
+        if isinstance(like, bool):
+            return value.strip().lower() in ("true", "1", "yes", "on")
+        if isinstance(like, int):
+            return int(value)
+        if isinstance(like, float):
+            return float(value)
+    except ValueError:
+        logger.warning(f"Could not convert {value!r} to {type(like).__name__}, keeping it as text.")
+    return value
+
+def writeJSONAtomically(data, filename):
+    """Writes data as JSON to a temporary file next to filename, then replaces
+    filename with it, so readers never see a half written file. The file keeps
+    its permissions, or is readable by everyone if it is new."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    handle, temporary = tempfile.mkstemp(prefix=".config-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(handle, "w") as file:
+            json.dump(data, file)
+        os.chmod(temporary, mode)     # mkstemp creates it readable only by its owner
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+def readConfigs(filename=configFile, defaultFilename=defaultConfigFile):
+    """Reads the project and app configs from the config file, or from the
+    default config file if the config file is missing or cannot be read.
+
+    Returns:
+        tuple[dict, dict]: the project configs and the app configs.
+
+    Raises:
+        OSError, KeyError or ValueError: if neither file can be read.
+    """
+    try:
+        return readConfigFile(filename)
+    except (OSError, KeyError, ValueError) as e:
+        logger.error(f"Could not read {filename} ({e}), using {defaultFilename}.")
+        return readConfigFile(defaultFilename)
+
+class ConfigService(QObject):
+    """Resolves configuration keys through the project, app and default layers."""
+
+    changed = Signal(str)   # key
+    reloaded = Signal()     # config file changed on disk
+
+    def __init__(self, app_configs=None, project_configs=None, filename=configFile, defaultFilename=defaultConfigFile, watch=True):
+        """Initializes the ConfigService.
+
+        Args:
+            app_configs (dict, optional): The application configurations. Kept and updated in place. Defaults to None.
+            project_configs (dict, optional): The project configurations. Kept and updated in place. Defaults to None.
+            filename (str, optional): The config file app configs are saved to. Defaults to bin/config.json.
+            defaultFilename (str, optional): The default config file. Defaults to bin/default_config.json.
+            watch (bool, optional): Reload when the config file is changed by something else. Defaults to True.
+        """
+        super().__init__()
+
+        self.app_configs = app_configs if app_configs is not None else {}
+        self.project_configs = project_configs if project_configs is not None else {}
+        self.filename = filename
+
+        try:
+            self.default_project_configs, self.default_app_configs = readConfigFile(defaultFilename)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Could not read the defaults in {defaultFilename}: {e}.")
+            self.default_project_configs, self.default_app_configs = {}, {}
+        try:
+            # the default project configs saved in the config file, written back unchanged with the app configs
+            self.saved_project_configs, self.saved_app_configs = readConfigFile(filename)
+        except (OSError, KeyError, ValueError):
+            logger.warning(f"Could not read {filename}, using defaults.")
+            self.saved_project_configs, self.saved_app_configs = dict(self.default_project_configs), {}
+
+        self.resolved = {}
+        self.rebuild()
+
+        self.saveTimer = QTimer(self)
+        self.saveTimer.setSingleShot(True)
+        self.saveTimer.setInterval(SAVE_DELAY)
+        self.saveTimer.timeout.connect(self.save)
+
+        self.watcher = None
+        if watch and os.path.exists(filename):
+            self.watcher = QFileSystemWatcher([filename], self)
+            self.watcher.fileChanged.connect(self.fileChanged)
+
+    def rebuild(self):
+        """Rebuilds the merged view; the project layer wins over the app layer, which wins over the defaults."""
+        self.resolved = {**self.default_app_configs, **self.default_project_configs, **self.app_configs, **self.project_configs}
+
+    def layerOf(self, key):
+        """Returns the layer a key is set in: the project or app configs, or None."""
+        if key in self.project_configs:
+            return self.project_configs
+        if key in self.app_configs:
+            return self.app_configs
+        return None
+
+    def get(self, key, config=None):
+        """Returns the value of a config.
+
+        A key only found in the defaults is copied into the matching project or
+        app configs, so it can be changed with set().
+
+        Args:
+            key (str): The key to retrieve.
+            config (dict, optional): Only look in this layer, the project or app configs. Defaults to None.
+
+        Raises:
+            KeyError: if the key is not in any layer.
+        """
+        if config is not None:
+            return config[key]
+        try:
+            value = self.resolved[key]
+        except KeyError:
+            logger.error(f"Config {key} not found.")
+            raise
+        if self.layerOf(key) is None:
+            # adopt the default so that the config can be changed later
+            layer = self.project_configs if key in self.default_project_configs else self.app_configs
+            layer[key] = value
+        return value
+
+    def set(self, key, value):
+        """Changes a config in the layer it is set in. App configs are saved to the
+        config file after a short delay, so bursts of changes are written once."""
+        layer = self.layerOf(key)
+        if layer is None:
+            logger.error(f"Config {key} not found in project or app configs.")
+            return
+        if layer.get(key) == value:
+            return
+        layer[key] = value
+        self.resolved[key] = value
+        self.changed.emit(key)
+        if layer is self.app_configs:
+            self.scheduleSave()
+
+    def setLayers(self, app_configs=None, project_configs=None):
+        """Replaces the contents of the app and/or project configs, keeping the dicts themselves."""
+        if app_configs is not None and app_configs is not self.app_configs:
+            self.app_configs.clear()
+            self.app_configs.update(app_configs)
+        if project_configs is not None and project_configs is not self.project_configs:
+            self.project_configs.clear()
+            self.project_configs.update(project_configs)
+        self.rebuild()
+
+    def scheduleSave(self):
+        """Saves the app configs once no further changes have been made for SAVE_DELAY ms."""
+        self.saveTimer.start()
+
+    def save(self):
+        """Writes the app configs, and the saved default project configs, to the config file now."""
+        self.saveTimer.stop()
+        self.saved_app_configs = dict(self.app_configs)
+        self.writeConfigFile()
+
+    def saveDefaultProjectConfigs(self, project_configs):
+        """Writes project_configs to the config file as the defaults for new projects,
+        leaving the saved app configs as they are."""
+        self.saved_project_configs = dict(project_configs)
+        self.writeConfigFile()
+
+    def writeConfigFile(self):
+        writeJSONAtomically({"app_configs": self.saved_app_configs, "project_configs": self.saved_project_configs}, self.filename)
+        logger.info(f"Config file saved to {self.filename}.")
+        # replacing the file stops it being watched
+        if self.watcher is not None and self.filename not in self.watcher.files():
+            self.watcher.addPath(self.filename)
+
+    def fileChanged(self, path):
+        """Reloads the config file after it was changed by something else."""
+        if not os.path.exists(path):
+            return     # being replaced, a new file will be in place shortly
+        if path not in self.watcher.files():
+            self.watcher.addPath(path)
+        try:
+            project_configs, app_configs = readConfigFile(path)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Could not reload {path}: {e}.")
+            return
+        if app_configs == self.saved_app_configs and project_configs == self.saved_project_configs:
+            return     # our own write
+        logger.info(f"{path} changed, reloading app configs.")
+        self.saved_project_configs, self.saved_app_configs = project_configs, app_configs
+        self.setLayers(app_configs=dict(app_configs))
+        self.reloaded.emit()
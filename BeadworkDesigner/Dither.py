@@ -0,0 +1,341 @@
+#####################
+# Color quantization and dithering for imported images and palette reduction.
+#
+# All work is done in CIELAB so that "nearest color" and the diffused error
+# follow perceived differences rather than raw RGB distance. Grids are handled
+# as numpy arrays; error diffusion walks the image row by row and spreads each
+# finished row's error into the rows below in one vectorized step.
+#####################
+
+import logging
+from enum import Enum
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class DitherMethod(Enum):
+    NONE = "None"
+    FLOYD_STEINBERG = "Floyd-Steinberg"
+    ATKINSON = "Atkinson"
+    BAYER = "Ordered (Bayer)"
+
+# (row offset, column offset, weight) for each error diffusion kernel
+DIFFUSION_KERNELS = {
+    DitherMethod.FLOYD_STEINBERG: [(0, 1, 7/16), (1, -1, 3/16), (1, 0, 5/16), (1, 1, 1/16)],
+    DitherMethod.ATKINSON: [(0, 1, 1/8), (0, 2, 1/8), (1, -1, 1/8), (1, 0, 1/8), (1, 1, 1/8), (2, 0, 1/8)],
+}
+
+BAYER_8X8 = np.array([[ 0, 32,  8, 40,  2, 34, 10, 42],
+                      [48, 16, 56, 24, 50, 18, 58, 26],
+                      [12, 44,  4, 36, 14, 46,  6, 38],
+                      [60, 28, 52, 20, 62, 30, 54, 22],
+                      [ 3, 35, 11, 43,  1, 33,  9, 41],
+                      [51, 19, 59, 27, 49, 17, 57, 25],
+                      [15, 47,  7, 39, 13, 45,  5, 37],
+                      [63, 31, 55, 23, 61, 29, 53, 21]]) / 64.0
+
+PROGRESS_REPORTS = 100  # progress reports while dithering an image
+
+# D65 white point
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+_RGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+
+########################################
+# COLOR CONVERSIONS
+########################################
+
+def hexToRgb(colors):
+    """Converts a sequence of hex color strings to RGB values.
+
+    Args:
+        colors (list[str]): hex colors, e.g. "#FF0000".
+
+    Returns:
+        np.ndarray: an (N, 3) array of uint8 RGB values.
+    """
+    values = np.array([int(color[1:], 16) for color in colors], dtype=np.uint32)
+    return np.stack([(values >> 16) & 0xFF, (values >> 8) & 0xFF, values & 0xFF], axis=-1).astype(np.uint8)
+
+def rgbToHex(rgb):
+    """Converts RGB values to hex color strings.
+
+    Args:
+        rgb (np.ndarray): an (N, 3) array of RGB values.
+
+    Returns:
+        list[str]: uppercase hex colors, e.g. "#FF0000".
+    """
+    rgb = np.clip(np.rint(rgb), 0, 255).astype(np.uint32)
+    values = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    return ['#{:06X}'.format(value) for value in values.tolist()]
+
+def gridToRgb(data):
+    """Converts a 2D list of hex colors to an RGB array. Each distinct color is
+    only parsed once.
+
+    Args:
+        data (list[list[str]]): a 2D list of hex colors.
+
+    Returns:
+        np.ndarray: a (rows, columns, 3) array of uint8 RGB values.
+    """
+    colors, inverse = np.unique(np.array(data), return_inverse=True)
+    return hexToRgb(colors.tolist())[inverse.reshape(len(data), len(data[0]))]
+
+def rgbToLab(rgb):
+    """Converts sRGB values (0-255) to CIELAB.
+
+    Args:
+        rgb (np.ndarray): an (..., 3) array of RGB values.
+
+    Returns:
+        np.ndarray: an (..., 3) float array of L*, a*, b* values.
+    """
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = (c @ _RGB_TO_XYZ.T) / _WHITE
+    f = np.where(xyz > 216/24389, np.cbrt(xyz), (24389/27 * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+def labToRgb(lab):
+    """Converts CIELAB values to sRGB (0-255). Out of gamut values are clipped.
+
+    Args:
+        lab (np.ndarray): an (..., 3) array of L*, a*, b* values.
+
+    Returns:
+        np.ndarray: an (..., 3) float array of RGB values.
+    """
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f ** 3 > 216/24389, f ** 3, (116 * f - 16) / (24389/27)) * _WHITE
+    c = np.clip(xyz @ _XYZ_TO_RGB.T, 0, 1)
+    c = np.where(c > 0.0031308, 1.055 * c ** (1 / 2.4) - 0.055, 12.92 * c)
+    return c * 255
+
+########################################
+# PALETTES
+########################################
+
+def nearestColor(lab, paletteLab, chunk=65536, progress=None):
+    """Finds the index of the nearest palette color for every pixel.
+
+    Args:
+        lab (np.ndarray): an (..., 3) array of Lab colors.
+        paletteLab (np.ndarray): a (K, 3) array of Lab palette colors.
+        chunk (int, optional): pixels compared per step, bounds memory use. Defaults to 65536.
+        progress (function, optional): called with the fraction done after each step. Defaults to None.
+
+    Returns:
+        np.ndarray: an integer array of palette indexes with the shape of lab[..., 0].
+    """
+    flat = lab.reshape(-1, 3)
+    result = np.empty(len(flat), dtype=np.intp)
+    for start in range(0, len(flat), chunk):
+        part = flat[start:start+chunk]
+        distances = ((part[:, None, :] - paletteLab[None, :, :]) ** 2).sum(axis=-1)
+        result[start:start+chunk] = distances.argmin(axis=1)
+        if progress is not None:
+            progress(min(start + chunk, len(flat)) / len(flat))
+    return result.reshape(lab.shape[:-1])
+
+def medianCutPalette(lab, weights, count):
+    """Builds a palette of at most count colors by weighted median cut in Lab space.
+
+    Args:
+        lab (np.ndarray): an (N, 3) array of distinct Lab colors.
+        weights (np.ndarray): the number of pixels for each color.
+        count (int): the maximum number of colors in the palette.
+
+    Returns:
+        np.ndarray: a (K, 3) array of Lab palette colors, K <= count.
+    """
+    boxes = [np.arange(len(lab))]
+    while len(boxes) < count:
+        # split the box with the widest spread, weighted by how many pixels it covers
+        spreads = [np.ptp(lab[box], axis=0).max() * weights[box].sum() if len(box) > 1 else -1 for box in boxes]
+        widest = int(np.argmax(spreads))
+        if spreads[widest] <= 0:
+            break
+        box = boxes.pop(widest)
+        axis = int(np.argmax(np.ptp(lab[box], axis=0)))
+        box = box[np.argsort(lab[box, axis], kind='stable')]
+        cumulative = np.cumsum(weights[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2, side='right'))
+        split = min(max(split, 1), len(box) - 1)
+        boxes += [box[:split], box[split:]]
+    return np.array([np.average(lab[box], axis=0, weights=weights[box]) for box in boxes])
+
+########################################
+# DITHERING
+########################################
+
+def quantize(lab, paletteLab, method=DitherMethod.FLOYD_STEINBERG, progress=None):
+    """Maps an image onto a palette, optionally dithering.
+
+    Args:
+        lab (np.ndarray): a (rows, columns, 3) array of Lab colors.
+        paletteLab (np.ndarray): a (K, 3) array of Lab palette colors.
+        method (DitherMethod, optional): the dithering method. Defaults to DitherMethod.FLOYD_STEINBERG.
+        progress (function, optional): called with the fraction done; it may raise to stop. Defaults to None.
+
+    Returns:
+        np.ndarray: a (rows, columns) array of palette indexes.
+    """
+    if method == DitherMethod.NONE or len(paletteLab) < 2:
+        return nearestColor(lab, paletteLab, progress=progress)
+    if method == DitherMethod.BAYER:
+        return orderedDither(lab, paletteLab, progress)
+    return errorDiffusion(lab, paletteLab, DIFFUSION_KERNELS[method], progress)
+
+def orderedDither(lab, paletteLab, progress=None):
+    """Ordered dithering with an 8x8 Bayer matrix. Fully vectorized.
+
+    The threshold offset is scaled to the typical distance between palette
+    colors, so sparse palettes get a stronger pattern than dense ones.
+
+    Args:
+        lab (np.ndarray): a (rows, columns, 3) array of Lab colors.
+        paletteLab (np.ndarray): a (K, 3) array of Lab palette colors.
+        progress (function, optional): see nearestColor. Defaults to None.
+
+    Returns:
+        np.ndarray: a (rows, columns) array of palette indexes.
+    """
+    rows, columns = lab.shape[:2]
+    distances = np.sqrt(((paletteLab[:, None, :] - paletteLab[None, :, :]) ** 2).sum(axis=-1))
+    np.fill_diagonal(distances, np.inf)
+    spread = float(np.median(distances.min(axis=1)))
+    threshold = np.tile(BAYER_8X8, (rows // 8 + 1, columns // 8 + 1))[:rows, :columns] - 0.5
+    return nearestColor(lab + (threshold * spread)[..., None], paletteLab, progress=progress)
+
+def errorDiffusion(lab, paletteLab, kernel, progress=None):
+    """Error diffusion dithering, processed row by row.
+
+    Within a row each pixel depends on its left neighbour, so that part stays
+    sequential (with a memo of already-seen colors to skip repeated palette
+    searches). Error pushed to the following rows is applied to the whole row
+    at once with array slices.
+
+    Args:
+        lab (np.ndarray): a (rows, columns, 3) array of Lab colors.
+        paletteLab (np.ndarray): a (K, 3) array of Lab palette colors.
+        kernel (list[tuple]): (row offset, column offset, weight) entries.
+        progress (function, optional): called with the fraction of rows done. Defaults to None.
+
+    Returns:
+        np.ndarray: a (rows, columns) array of palette indexes.
+    """
+    rows, columns = lab.shape[:2]
+    depth = max(dy for dy, _, _ in kernel) + 1
+    sameRow = [(dx, w) for dy, dx, w in kernel if dy == 0]
+    belowRows = [(dy, dx, w) for dy, dx, w in kernel if dy > 0]
+
+    carry = np.zeros((depth, columns, 3))   # error waiting to be added to this row and the ones below
+    result = np.empty((rows, columns), dtype=np.intp)
+    palette = paletteLab.tolist()
+    memo = {}
+    step = max(1, rows // PROGRESS_REPORTS)
+
+    def nearest(l, a, b):
+        key = (round(l), round(a), round(b))
+        index = memo.get(key)
+        if index is None:
+            index = int(((paletteLab - (l, a, b)) ** 2).sum(axis=1).argmin())
+            memo[key] = index
+        return index
+
+    for r in range(rows):
+        if progress is not None and r % step == 0:
+            progress(r / rows)
+        current = (lab[r] + carry[0]).tolist()
+        errors = []
+        indexes = []
+        for c in range(columns):
+            l, a, b = current[c]
+            index = nearest(l, a, b)
+            indexes.append(index)
+            pl, pa, pb = palette[index]
+            el, ea, eb = l - pl, a - pa, b - pb
+            errors.append((el, ea, eb))
+            for dx, w in sameRow:
+                if c + dx < columns:
+                    target = current[c + dx]
+                    target[0] += el * w
+                    target[1] += ea * w
+                    target[2] += eb * w
+        result[r] = indexes
+        errors = np.array(errors)
+
+        # spread this row's error into the rows below in one pass per kernel entry
+        carry[:-1] = carry[1:]
+        carry[-1] = 0
+        for dy, dx, w in belowRows:
+            if dx >= 0:
+                carry[dy-1, dx:] += errors[:columns-dx] * w
+            else:
+                carry[dy-1, :dx] += errors[-dx:] * w
+    return result
+
+########################################
+# HIGH LEVEL OPERATIONS
+########################################
+
+def quantizeImage(rgb, count, method=DitherMethod.FLOYD_STEINBERG, progress=None):
+    """Quantizes an RGB image to at most count colors for use as a pattern.
+
+    Args:
+        rgb (np.ndarray): a (rows, columns, 3) array of RGB values.
+        count (int): the maximum number of colors in the pattern.
+        method (DitherMethod, optional): the dithering method. Defaults to DitherMethod.FLOYD_STEINBERG.
+        progress (function, optional): called with the fraction of the image mapped so far; it may raise to stop. Defaults to None.
+
+    Returns:
+        list[list[str]]: a 2D list of hex colors.
+    """
+    rows, columns = rgb.shape[:2]
+    lab = rgbToLab(rgb)
+    flat = np.ascontiguousarray(rgb.reshape(-1, 3))
+    colors, counts = np.unique(flat, axis=0, return_counts=True)
+    paletteLab = medianCutPalette(rgbToLab(colors), counts, count)
+    paletteHex = rgbToHex(labToRgb(paletteLab))
+    indexes = quantize(lab, paletteLab, method, progress)
+    logger.info(f"Quantized {columns}x{rows} image to {len(paletteHex)} colors with {method.value}.")
+    return [[paletteHex[i] for i in row] for row in indexes.tolist()]
+
+def reduceColors(data, count, method=DitherMethod.FLOYD_STEINBERG, progress=None):
+    """Reduces a pattern to at most count of its own colors.
+
+    The palette is picked by median cut and then snapped to the closest colors
+    already in the pattern, so the result only uses beads that were there before.
+
+    Args:
+        data (list[list[str]]): a 2D list of hex colors.
+        count (int): the maximum number of colors to keep.
+        method (DitherMethod, optional): the dithering method. Defaults to DitherMethod.FLOYD_STEINBERG.
+        progress (function, optional): called with the fraction of the pattern mapped so far; it may raise to stop. Defaults to None.
+
+    Returns:
+        list[list[str]]: a new 2D list of hex colors.
+    """
+    colors, inverse, counts = np.unique(np.array(data), return_inverse=True, return_counts=True)
+    if len(colors) <= count:
+        return [row[:] for row in data]
+
+    colorsLab = rgbToLab(hexToRgb(colors.tolist()))
+    centroids = medianCutPalette(colorsLab, counts, count)
+    keep = np.unique(nearestColor(centroids, colorsLab))
+    paletteLab = colorsLab[keep]
+    paletteHex = colors[keep].tolist()
+
+    lab = colorsLab[inverse.reshape(len(data), len(data[0]))]
+    indexes = quantize(lab, paletteLab, method, progress)
+    logger.info(f"Reduced pattern from {len(colors)} to {len(paletteHex)} colors with {method.value}.")
+    return [[paletteHex[i] for i in row] for row in indexes.tolist()]
@@ -0,0 +1,726 @@
+#####################
+# Exports the beadwork pattern to image files for sharing and printing.
+#
+# PNG export renders the pattern in horizontal strips and streams each strip
+# through zlib into the file as it goes, so memory use depends on the strip
+# size and not on the size of the pattern. SVG export merges each run of
+# same-colored beads in a row into a single rect. PDF export draws each page
+# as it goes through QPdfWriter, so long patterns never build up in memory.
+#
+# Every export accepts a progress callback and a cancelled callable, so it
+# can be run on a worker thread with ExportWorker.
+#####################
+
+import logging
+import os
+import struct
+import zlib
+from itertools import groupby
+
+import numpy as np
+from PySide6.QtCore import QMarginsF, QObject, QRect, Qt, QThread, Signal
+from PySide6.QtGui import (QColor, QFont, QFontMetrics, QImage, QPageLayout,
+                           QPageSize, QPainter, QPdfWriter, QPen)
+
+from BeadworkDesigner.BeadworkModel import headerMarker
+from BeadworkDesigner.core import Pages
+from BeadworkDesigner.core.Statistics import colorCounts
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_COLOR = "#FFFFFF"
+GRID_COLOR = "#808080"
+MARKER_COLOR = "#000000"
+
+STRIP_BYTES = 16 * 1024 * 1024     # rough memory budget for one rendered strip
+
+PAGE_SIZES = {name: getattr(QPageSize.PageSizeId, name) for name in Pages.PAGE_SIZES}
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled part way through. The partial file is removed."""
+
+def colorRuns(row):
+    """Splits a row of beads into runs of the same color.
+
+    Args:
+        row (list[str]): a row of hex colors.
+
+    Returns:
+        list[tuple[int, int, str]]: (first column, length, color) for each run.
+    """
+    runs = []
+    start = 0
+    for color, group in groupby(row):
+        length = sum(1 for _ in group)
+        runs.append((start, length, color))
+        start += length
+    return runs
+
+def markerMargin(beadWidth, beadHeight, markers=True):
+    """Returns the size, in pixels, of the margin that holds the row and column markers."""
+    return max(12, min(beadWidth, beadHeight)) if markers else 0
+
+class PatternRenderer:
+    """Renders rows of a pattern, with optional grid lines and markers, into QImages."""
+
+    def __init__(self, data, beadWidth=12, beadHeight=22, gridLines=True, markers=True):
+        """Initializes the PatternRenderer.
+
+        Args:
+            data (list): the pattern as a 2D list of hex colors, in the orientation to draw.
+            beadWidth (int, optional): Width, in pixels, of a bead. Defaults to 12.
+            beadHeight (int, optional): Height, in pixels, of a bead. Defaults to 22.
+            gridLines (bool, optional): Draw lines between beads. Defaults to True.
+            markers (bool, optional): Draw the center and every-5 markers in a margin. Defaults to True.
+        """
+        self.data = data
+        self.rows = len(data)
+        self.columns = len(data[0])
+        self.beadWidth = beadWidth
+        self.beadHeight = beadHeight
+        self.gridLines = gridLines
+        self.markers = markers
+
+        self.margin = markerMargin(beadWidth, beadHeight, markers)
+        extra = 1 if gridLines else 0   # room for the closing grid line
+        self.width = self.margin + self.columns * beadWidth + extra
+        self.height = self.margin + self.rows * beadHeight + extra
+
+        self.colors = {}    # hex string -> QColor, so each color is only parsed once
+
+    def color(self, hexColor):
+        """Returns a cached QColor for the hex color."""
+        color = self.colors.get(hexColor)
+        if color is None:
+            color = self.colors[hexColor] = QColor(hexColor)
+        return color
+
+    def rowsPerStrip(self):
+        """Returns how many rows of beads fit into one strip within STRIP_BYTES."""
+        return max(1, STRIP_BYTES // (self.width * 3 * self.beadHeight))
+
+    def newImage(self, height):
+        image = QImage(self.width, height, QImage.Format.Format_RGB888)
+        image.fill(QColor(BACKGROUND_COLOR))
+        return image
+
+    def markerFont(self):
+        font = QFont()
+        font.setPixelSize(max(6, self.margin * 2 // 3))
+        return font
+
+    def renderColumnMarkers(self):
+        """Renders the margin above the pattern with the column markers.
+
+        Returns:
+            QImage: an image the full width of the export and the height of the margin.
+        """
+        image = self.newImage(self.margin)
+        painter = QPainter(image)
+        painter.setFont(self.markerFont())
+        painter.setPen(QColor(MARKER_COLOR))
+        for column in range(self.columns):
+            marker = headerMarker(column, self.columns)
+            if marker:
+                painter.drawText(QRect(self.margin + column * self.beadWidth, 0, self.beadWidth, self.margin),
+                                 Qt.AlignmentFlag.AlignCenter, marker)
+        painter.end()
+        return image
+
+    def renderRows(self, first, last):
+        """Renders a horizontal strip of the pattern, including its part of the row marker margin.
+
+        Args:
+            first (int): the first row to render.
+            last (int): the row after the last one to render.
+
+        Returns:
+            QImage: an image the full width of the export.
+        """
+        closing = 1 if (self.gridLines and last == self.rows) else 0   # bottom grid line belongs to the last strip
+        height = (last - first) * self.beadHeight + closing
+        image = self.newImage(height)
+        painter = QPainter(image)
+
+        for row in range(first, last):
+            y = (row - first) * self.beadHeight
+            for start, length, hexColor in colorRuns(self.data[row]):
+                painter.fillRect(self.margin + start * self.beadWidth, y, length * self.beadWidth, self.beadHeight, self.color(hexColor))
+
+        if self.markers:
+            painter.setFont(self.markerFont())
+            painter.setPen(QColor(MARKER_COLOR))
+            for row in range(first, last):
+                marker = headerMarker(row, self.rows)
+                if marker:
+                    painter.drawText(QRect(0, (row - first) * self.beadHeight, self.margin, self.beadHeight),
+                                     Qt.AlignmentFlag.AlignCenter, marker)
+
+        painter.end()
+
+        if self.gridLines:
+            # set whole pixel rows and columns at once instead of drawing thousands of lines
+            pixels = np.frombuffer(image.bits(), dtype=np.uint8, count=image.sizeInBytes())
+            pixels = pixels.reshape(height, image.bytesPerLine())[:, :self.width * 3].reshape(height, self.width, 3)
+            gridColor = QColor(GRID_COLOR)
+            gridRgb = (gridColor.red(), gridColor.green(), gridColor.blue())
+            right = self.margin + self.columns * self.beadWidth
+            pixels[:, self.margin:right + 1:self.beadWidth] = gridRgb
+            pixels[0:height:self.beadHeight, self.margin:right + 1] = gridRgb
+        return image
+
+class PNGWriter:
+    """Writes an 8-bit RGB PNG file a strip of scanlines at a time."""
+
+    def __init__(self, file, width, height):
+        """Initializes the PNGWriter and writes the PNG header.
+
+        Args:
+            file (file): a file opened for writing in binary mode.
+            width (int): the width of the image in pixels.
+            height (int): the height of the image in pixels.
+        """
+        self.file = file
+        self.width = width
+        self.height = height
+        self.compressor = zlib.compressobj()
+        self.previous = np.zeros(width * 3, dtype=np.uint8)    # last scanline written, for the Up filter
+
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self.writeChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def writeChunk(self, kind, payload):
+        self.file.write(struct.pack(">I", len(payload)) + kind)
+        self.file.write(payload)
+        self.file.write(struct.pack(">I", zlib.crc32(payload, zlib.crc32(kind))))
+
+    def writeImage(self, image):
+        """Compresses and appends every scanline of an RGB888 QImage with the writer's width.
+
+        Args:
+            image (QImage): the strip to append.
+        """
+        pixels = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+        pixels = pixels.reshape(image.height(), image.bytesPerLine())[:, :self.width * 3]
+
+        # Up filter: beads repeat vertically, so most bytes become 0 and compress well
+        scanlines = np.empty((image.height(), 1 + self.width * 3), dtype=np.uint8)
+        scanlines[:, 0] = 2
+        scanlines[0, 1:] = pixels[0] - self.previous
+        scanlines[1:, 1:] = pixels[1:] - pixels[:-1]
+        self.previous = pixels[-1].copy()
+
+        compressed = self.compressor.compress(scanlines.tobytes())
+        if compressed:
+            self.writeChunk(b"IDAT", compressed)
+
+    def close(self):
+        """Flushes the remaining compressed data and ends the file."""
+        self.writeChunk(b"IDAT", self.compressor.flush())
+        self.writeChunk(b"IEND", b"")
+
+def exportPNG(data, filename, beadWidth=12, beadHeight=22, gridLines=True, markers=True, progress=None, cancelled=None):
+    """Exports the pattern to a PNG image, rendered and written in strips.
+
+    Args:
+        data (list): the pattern as a 2D list of hex colors, in the orientation to draw.
+        filename (str): the file to write.
+        beadWidth (int, optional): Width, in pixels, of a bead. Defaults to 12.
+        beadHeight (int, optional): Height, in pixels, of a bead. Defaults to 22.
+        gridLines (bool, optional): Draw lines between beads. Defaults to True.
+        markers (bool, optional): Draw the center and every-5 markers in a margin. Defaults to True.
+        progress (callable, optional): called with (rows done, total rows) after each strip. Defaults to None.
+        cancelled (callable, optional): returns True to stop the export. Defaults to None.
+
+    Raises:
+        ExportCancelled: if cancelled returned True.
+    """
+    renderer = PatternRenderer(data, beadWidth, beadHeight, gridLines, markers)
+    rowsPerStrip = renderer.rowsPerStrip()
+    logger.info(f"Exporting {renderer.width}x{renderer.height} PNG to {filename} in strips of {rowsPerStrip} rows.")
+
+    isCancelled = False
+    with open(filename, 'wb') as file:
+        writer = PNGWriter(file, renderer.width, renderer.height)
+        if markers:
+            writer.writeImage(renderer.renderColumnMarkers())
+        for first in range(0, renderer.rows, rowsPerStrip):
+            if cancelled and cancelled():
+                isCancelled = True
+                break
+            last = min(renderer.rows, first + rowsPerStrip)
+            writer.writeImage(renderer.renderRows(first, last))
+            if progress:
+                progress(last, renderer.rows)
+        else:
+            writer.close()
+
+    # a cancel that comes once the last strip is written is too late, and keeps the finished file
+    if isCancelled:
+        removeCancelledExport(filename)
+
+    logger.info(f"PNG exported to {filename}.")
+
+def exportSVG(data, filename, beadWidth=12, beadHeight=22, gridLines=True, markers=True, progress=None, cancelled=None):
+    """Exports the pattern to an SVG image, one rect per run of same-colored beads in a row.
+
+    Args:
+        data (list): the pattern as a 2D list of hex colors, in the orientation to draw.
+        filename (str): the file to write.
+        beadWidth (int, optional): Width, in pixels, of a bead. Defaults to 12.
+        beadHeight (int, optional): Height, in pixels, of a bead. Defaults to 22.
+        gridLines (bool, optional): Draw lines between beads. Defaults to True.
+        markers (bool, optional): Draw the center and every-5 markers in a margin. Defaults to True.
+        progress (callable, optional): called with (rows done, total rows) as rows are written. Defaults to None.
+        cancelled (callable, optional): returns True to stop the export. Defaults to None.
+
+    Raises:
+        ExportCancelled: if cancelled returned True.
+    """
+    rows, columns = len(data), len(data[0])
+    margin = markerMargin(beadWidth, beadHeight, markers)
+    extra = 1 if gridLines else 0
+    width = margin + columns * beadWidth + extra
+    height = margin + rows * beadHeight + extra
+    right = margin + columns * beadWidth
+    bottom = margin + rows * beadHeight
+    logger.info(f"Exporting {width}x{height} SVG to {filename}.")
+
+    isCancelled = False
+    with open(filename, 'w') as file:
+        file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n')
+        file.write(f'<rect width="{width}" height="{height}" fill="{BACKGROUND_COLOR}"/>\n')
+
+        file.write('<g shape-rendering="crispEdges">\n')
+        for row in range(rows):
+            y = margin + row * beadHeight
+            file.write(''.join(f'<rect x="{margin + start * beadWidth}" y="{y}" width="{length * beadWidth}" height="{beadHeight}" fill="{color}"/>'
+                               for start, length, color in colorRuns(data[row])) + '\n')
+            if (row + 1) % 100 == 0:
+                if cancelled and cancelled():
+                    isCancelled = True
+                    break
+                if progress:
+                    progress(row + 1, rows)
+        file.write('</g>\n')
+
+        if gridLines:
+            # a single path for the whole grid; offset by half a pixel so 1px lines stay sharp
+            file.write(f'<path fill="none" stroke="{GRID_COLOR}" stroke-width="1" shape-rendering="crispEdges" d="')
+            file.write(''.join(f'M{margin + column * beadWidth + 0.5} {margin}V{bottom + 1}' for column in range(columns + 1)))
+            file.write(''.join(f'M{margin} {margin + row * beadHeight + 0.5}H{right + 1}' for row in range(rows + 1)))
+            file.write('"/>\n')
+
+        if markers:
+            file.write(f'<g font-family="sans-serif" font-size="{max(6, margin * 2 // 3)}" fill="{MARKER_COLOR}" '
+                       f'text-anchor="middle" dominant-baseline="central">\n')
+            for column in range(columns):
+                marker = headerMarker(column, columns)
+                if marker:
+                    file.write(f'<text x="{margin + column * beadWidth + beadWidth / 2}" y="{margin / 2}">{marker}</text>\n')
+            for row in range(rows):
+                marker = headerMarker(row, rows)
+                if marker:
+                    file.write(f'<text x="{margin / 2}" y="{margin + row * beadHeight + beadHeight / 2}">{marker}</text>\n')
+            file.write('</g>\n')
+
+        file.write('</svg>\n')
+
+    if isCancelled:
+        removeCancelledExport(filename)
+    if progress:
+        progress(rows, rows)
+    logger.info(f"SVG exported to {filename}.")
+
+def removeCancelledExport(filename):
+    """Removes the partially written file of a cancelled export.
+
+    Raises:
+        ExportCancelled: always.
+    """
+    os.remove(filename)
+    logger.info(f"Export to {filename} cancelled.")
+    raise ExportCancelled(filename)
+
+########################################
+# PDF CHARTS
+########################################
+
+def legendKeys(count):
+    """Returns short keys for the legend: A-Z, then AA, AB, etc.
+
+    Args:
+        count (int): the number of keys.
+
+    Returns:
+        list[str]: the keys.
+    """
+    keys = []
+    for i in range(count):
+        key = ""
+        i += 1
+        while i:
+            i, remainder = divmod(i - 1, 26)
+            key = chr(ord("A") + remainder) + key
+        keys.append(key)
+    return keys
+
+def tileStarts(count, perPage, overlap):
+    """Returns the first row or column of each page so that every page repeats
+    the last overlap beads of the page before it.
+
+    Args:
+        count (int): the number of rows or columns in the pattern.
+        perPage (int): how many fit on one page.
+        overlap (int): how many are repeated from the previous page.
+
+    Returns:
+        list[int]: the first row or column on each page.
+    """
+    overlap = max(0, min(overlap, perPage - 1))
+    starts = [0]
+    while starts[-1] + perPage < count:
+        starts.append(starts[-1] + perPage - overlap)
+    return starts
+
+def wordChartRow(row, keys):
+    """Describes one row of the pattern as runs, e.g. "3xA, 1xB".
+
+    Args:
+        row (list[str]): a row of hex colors.
+        keys (dict): legend key for each color.
+
+    Returns:
+        list[str]: one entry per run.
+    """
+    return [f"{length}x{keys[color]}" for _, length, color in colorRuns(row)]
+
+class PDFChart:
+    """Draws the pages of a printable chart onto a QPdfWriter: the pattern tiled
+    across pages, a color legend and a word chart."""
+
+    TITLE_HEIGHT = 20
+    LINE_HEIGHT = 14
+
+    def __init__(self, writer, painter, data, beadWidth, beadHeight, horizontal=False, overlap=2):
+        """Initializes the PDFChart.
+
+        Args:
+            writer (QPdfWriter): the writer, with resolution set to 72 so units are points.
+            painter (QPainter): an active painter on the writer.
+            data (list): the pattern as a 2D list of hex colors, as stored (in loom order).
+            beadWidth (float): Width, in points, of a bead when vertical.
+            beadHeight (float): Height, in points, of a bead when vertical.
+            horizontal (bool, optional): Chart the pattern horizontally. Defaults to False.
+            overlap (int, optional): Rows and columns repeated from the previous page. Defaults to 2.
+        """
+        self.writer = writer
+        self.painter = painter
+        self.data = data
+        self.horizontal = horizontal
+
+        # the chart shows the pattern as displayed, the word chart always follows the loom
+        self.chartData = [list(column) for column in zip(*data)] if horizontal else data
+        self.beadWidth, self.beadHeight = (beadHeight, beadWidth) if horizontal else (beadWidth, beadHeight)
+        self.rows = len(self.chartData)
+        self.columns = len(self.chartData[0])
+
+        self.counts = colorCounts(data)
+        self.keys = dict(zip([color for color, _ in self.counts], legendKeys(len(self.counts))))
+
+        self.pageRect = writer.pageLayout().paintRectPixels(72)
+        self.font = QFont()
+        self.font.setPointSizeF(7)
+        self.titleFont = QFont()
+        self.titleFont.setPointSizeF(11)
+        self.titleFont.setBold(True)
+        self.metrics = QFontMetrics(self.font)
+
+        self.numberWidth = self.metrics.horizontalAdvance(str(max(self.rows, self.columns))) + 4
+        self.numberHeight = self.metrics.height() + 2
+        self.chartLeft = self.numberWidth
+        self.chartTop = self.TITLE_HEIGHT + self.numberHeight
+
+        self.columnsPerPage = max(1, int((self.pageRect.width() - self.chartLeft) // self.beadWidth))
+        self.rowsPerPage = max(1, int((self.pageRect.height() - self.chartTop) // self.beadHeight))
+        self.rowStarts = tileStarts(self.rows, self.rowsPerPage, overlap)
+        self.columnStarts = tileStarts(self.columns, self.columnsPerPage, overlap)
+        self.overlap = overlap
+
+        self.pagesDrawn = 0
+        self.colors = {}
+
+    def chartPageCount(self):
+        """Returns how many pages the tiled chart takes."""
+        return len(self.rowStarts) * len(self.columnStarts)
+
+    def color(self, hexColor):
+        color = self.colors.get(hexColor)
+        if color is None:
+            color = self.colors[hexColor] = QColor(hexColor)
+        return color
+
+    def newPage(self):
+        """Starts a new page, except before the very first one."""
+        if self.pagesDrawn:
+            self.writer.newPage()
+        self.pagesDrawn += 1
+
+    def drawTitle(self, text):
+        self.painter.setFont(self.titleFont)
+        self.painter.setPen(QColor(MARKER_COLOR))
+        self.painter.drawText(QRect(0, 0, self.pageRect.width(), self.TITLE_HEIGHT),
+                              Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, text)
+        self.painter.setFont(self.font)
+
+    def drawChartPage(self, firstRow, firstColumn, previousRow, previousColumn):
+        """Draws one tile of the chart on a new page.
+
+        Args:
+            firstRow (int): the first row on this page.
+            firstColumn (int): the first column on this page.
+            previousRow (int): the first row of the tile above, or None.
+            previousColumn (int): the first column of the tile to the left, or None.
+        """
+        lastRow = min(self.rows, firstRow + self.rowsPerPage)
+        lastColumn = min(self.columns, firstColumn + self.columnsPerPage)
+        bw, bh = self.beadWidth, self.beadHeight
+        left, top = self.chartLeft, self.chartTop
+        right = left + (lastColumn - firstColumn) * bw
+        bottom = top + (lastRow - firstRow) * bh
+
+        self.newPage()
+        self.drawTitle(f"Rows {firstRow + 1}-{lastRow}, Columns {firstColumn + 1}-{lastColumn}")
+        painter = self.painter
+
+        for row in range(firstRow, lastRow):
+            y = top + (row - firstRow) * bh
+            for start, length, hexColor in colorRuns(self.chartData[row][firstColumn:lastColumn]):
+                painter.fillRect(QRect(round(left + start * bw), round(y), round(length * bw), round(bh)), self.color(hexColor))
+
+        # thin lines between beads, heavier every 5 beads and around the center
+        thin = QPen(QColor(GRID_COLOR), 0.25)
+        heavy = QPen(QColor(MARKER_COLOR), 0.75)
+        for column in range(firstColumn, lastColumn + 1):
+            x = left + (column - firstColumn) * bw
+            painter.setPen(heavy if column % 5 == 0 or column == self.columns else thin)
+            painter.drawLine(round(x), top, round(x), round(bottom))
+        for row in range(firstRow, lastRow + 1):
+            y = top + (row - firstRow) * bh
+            painter.setPen(heavy if row % 5 == 0 or row == self.rows else thin)
+            painter.drawLine(left, round(y), round(right), round(y))
+
+        # dashed lines show where the beads repeated from the previous page end
+        overlapPen = QPen(QColor("#D00000"), 1, Qt.PenStyle.DashLine)
+        painter.setPen(overlapPen)
+        if previousColumn is not None:
+            x = left + (previousColumn + self.columnsPerPage - firstColumn) * bw
+            painter.drawLine(round(x), top, round(x), round(bottom))
+        if previousRow is not None:
+            y = top + (previousRow + self.rowsPerPage - firstRow) * bh
+            painter.drawLine(left, round(y), round(right), round(y))
+
+        # numbering, every bead if there is room for it, otherwise every 5
+        painter.setPen(QColor(MARKER_COLOR))
+        columnStep = 1 if bw >= self.metrics.horizontalAdvance(str(self.columns)) else 5
+        for column in range(firstColumn, lastColumn):
+            if (column + 1) % columnStep == 0 or column == firstColumn:
+                painter.drawText(QRect(round(left + (column - firstColumn) * bw - bw), self.TITLE_HEIGHT, round(3 * bw), self.numberHeight),
+                                 Qt.AlignmentFlag.AlignCenter, str(column + 1))
+        rowStep = 1 if bh >= self.metrics.height() else 5
+        for row in range(firstRow, lastRow):
+            if (row + 1) % rowStep == 0 or row == firstRow:
+                painter.drawText(QRect(0, round(top + (row - firstRow) * bh), self.numberWidth - 2, round(bh)),
+                                 Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, str(row + 1))
+
+    def drawLegend(self):
+        """Draws the color legend, with the number of beads of each color, on as many pages as needed."""
+        linesPerPage = max(1, (self.pageRect.height() - self.TITLE_HEIGHT) // self.LINE_HEIGHT)
+        total = sum(count for _, count in self.counts)
+        lines = [(color, count) for color, count in self.counts] + [(None, total)]
+        for first in range(0, len(lines), linesPerPage):
+            self.newPage()
+            self.drawTitle("Color Legend")
+            for i, (hexColor, count) in enumerate(lines[first:first+linesPerPage]):
+                y = self.TITLE_HEIGHT + i * self.LINE_HEIGHT
+                if hexColor is None:
+                    self.painter.drawText(QRect(0, y, self.pageRect.width(), self.LINE_HEIGHT),
+                                          Qt.AlignmentFlag.AlignVCenter, f"Total: {total} beads, {len(self.counts)} colors")
+                    continue
+                self.painter.setPen(QColor(GRID_COLOR))
+                self.painter.setBrush(self.color(hexColor))
+                self.painter.drawRect(0, y + 2, self.LINE_HEIGHT - 4, self.LINE_HEIGHT - 4)
+                self.painter.setBrush(Qt.BrushStyle.NoBrush)
+                self.painter.setPen(QColor(MARKER_COLOR))
+                self.painter.drawText(QRect(self.LINE_HEIGHT + 2, y, self.pageRect.width(), self.LINE_HEIGHT),
+                                      Qt.AlignmentFlag.AlignVCenter, f"{self.keys[hexColor]}\t{hexColor}\t{count} beads")
+
+    def wordChartLines(self):
+        """Yields the word chart one printed line at a time, wrapping long rows.
+
+        Yields:
+            tuple[int, str]: (row, line), row only set on the first line of each row.
+        """
+        width = self.pageRect.width()
+        for r, row in enumerate(self.data):
+            line = f"Row {r + 1}: "
+            first = True
+            for entry in wordChartRow(row, self.keys):
+                if self.metrics.horizontalAdvance(line + entry) > width and line.strip():
+                    yield (r if first else None, line.rstrip(", "))
+                    line = "    "
+                    first = False
+                line += entry + ", "
+            yield (r if first else None, line.rstrip(", "))
+
+    def drawWordChart(self, progress=None, cancelled=None, done=0, total=0):
+        """Draws the word chart: each row of the loom, from the first, as runs of legend keys
+        read left to right. Pages are started as they fill up.
+
+        Returns:
+            tuple: the progress count after the word chart, and whether it was cancelled.
+        """
+        linesPerPage = max(1, (self.pageRect.height() - self.TITLE_HEIGHT) // self.LINE_HEIGHT)
+        line = linesPerPage
+        direction = "Horizontal pattern, loom rows are chart columns" if self.horizontal else "Vertical pattern"
+        for row, text in self.wordChartLines():
+            if line == linesPerPage:
+                if cancelled and cancelled():
+                    return done, True
+                self.newPage()
+                self.drawTitle(f"Word Chart ({direction}, read left to right)")
+                line = 0
+            self.painter.drawText(QRect(0, self.TITLE_HEIGHT + line * self.LINE_HEIGHT, self.pageRect.width(), self.LINE_HEIGHT),
+                                  Qt.AlignmentFlag.AlignVCenter, text)
+            line += 1
+            if row is not None:
+                done += 1
+                if progress and done % 100 == 0:
+                    progress(done, total)
+        return done, False
+
+def exportPDF(data, filename, beadWidth=8, beadHeight=14, horizontal=False, overlap=2, pageSize="A4", progress=None, cancelled=None):
+    """Exports a printable, multi-page chart of the pattern to a PDF file: the
+    pattern tiled across pages with overlapping edges and row/column numbers, a
+    color legend with bead counts, and a row by row word chart.
+
+    Args:
+        data (list): the pattern as a 2D list of hex colors, as stored (in loom order).
+        filename (str): the file to write.
+        beadWidth (float, optional): Width, in points, of a bead when vertical. Defaults to 8.
+        beadHeight (float, optional): Height, in points, of a bead when vertical. Defaults to 14.
+        horizontal (bool, optional): Chart the pattern horizontally. Defaults to False.
+        overlap (int, optional): Rows and columns repeated from the previous page. Defaults to 2.
+        pageSize (str, optional): One of PAGE_SIZES. Defaults to "A4".
+        progress (callable, optional): called with (steps done, total steps) as pages are drawn. Defaults to None.
+        cancelled (callable, optional): returns True to stop the export. Defaults to None.
+
+    Raises:
+        ExportCancelled: if cancelled returned True.
+    """
+    writer = QPdfWriter(filename)
+    writer.setResolution(72)
+    writer.setPageSize(QPageSize(PAGE_SIZES[pageSize]))
+    writer.setPageMargins(QMarginsF(36, 36, 36, 36), QPageLayout.Unit.Point)
+    writer.setTitle(os.path.basename(filename))
+    writer.setCreator("Beadwork Designer")
+
+    painter = QPainter(writer)
+    chart = PDFChart(writer, painter, data, beadWidth, beadHeight, horizontal, overlap)
+    total = chart.chartPageCount() + 1 + len(data)
+    done = 0
+    logger.info(f"Exporting PDF to {filename}: {chart.chartPageCount()} chart pages.")
+
+    isCancelled = False
+    previousRow = None
+    for firstRow in chart.rowStarts:
+        previousColumn = None
+        for firstColumn in chart.columnStarts:
+            if cancelled and cancelled():
+                isCancelled = True
+                break
+            chart.drawChartPage(firstRow, firstColumn, previousRow, previousColumn)
+            previousColumn = firstColumn
+            done += 1
+            if progress:
+                progress(done, total)
+        if isCancelled:
+            break
+        previousRow = firstRow
+
+    if not isCancelled:
+        chart.drawLegend()
+        done += 1
+        done, isCancelled = chart.drawWordChart(progress, cancelled, done, total)
+    painter.end()
+    pagesDrawn = chart.pagesDrawn
+
+    if isCancelled:
+        # the file is only closed when the writer is deleted, which needs every reference to it gone
+        chart.writer = chart.painter = None
+        del chart, painter, writer
+        removeCancelledExport(filename)
+    if progress:
+        progress(total, total)
+    logger.info(f"PDF exported to {filename} with {pagesDrawn} pages.")
+
+class ExportWorker(QObject):
+    """Runs one of the export functions on a worker thread, reporting progress and
+    allowing the export to be cancelled.
+
+    Call start() to begin; the export function receives this worker's progress and
+    cancelled callbacks.
+    """
+
+    progress = Signal(int, int)     # (done, total)
+    finished = Signal(str)          # filename
+    failed = Signal(str)            # message
+
+    def __init__(self, function, data, filename, **kwargs):
+        """Initializes the ExportWorker.
+
+        Args:
+            function (callable): the export function, e.g. exportPDF.
+            data (list): the 2D list of hex colors to export. Must not be changed while exporting.
+            filename (str): the file to write.
+            **kwargs: further options for the export function.
+        """
+        super().__init__()
+
+        self.function = function
+        self.data = data
+        self.filename = filename
+        self.kwargs = kwargs
+        self._cancelled = False
+
+        self.workerThread = QThread()
+        self.moveToThread(self.workerThread)
+        self.workerThread.started.connect(self.run)
+
+    def start(self):
+        """Starts the export on the worker thread."""
+        logger.debug(f"Starting {self.function.__name__} to {self.filename} on worker thread.")
+        self.workerThread.start()
+
+    def cancel(self):
+        """Asks the export to stop; it will stop at the next page or strip."""
+        self._cancelled = True
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def wait(self):
+        """Blocks until the worker thread has finished."""
+        self.workerThread.wait()
+
+    def run(self):
+        try:
+            self.function(self.data, self.filename, progress=self.progress.emit, cancelled=self.isCancelled, **self.kwargs)
+            self.finished.emit(self.filename)
+        except ExportCancelled:
+            self.failed.emit("Export cancelled.")
+        except Exception as e:
+            logger.error(f"Export to {self.filename} failed: {e}.")
+            self.failed.emit(f"Export failed: {e}")
+        finally:
+            self.workerThread.quit()
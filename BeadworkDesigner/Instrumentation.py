@@ -0,0 +1,120 @@
+#####################
+# Lightweight performance counters and timings, shown in the performance
+# panel. Nothing is recorded unless enable() has been called; hot paths guard
+# their hooks with `if __debug__ and Instrumentation.enabled:`, and the
+# decorators return the function unchanged, so under `python -O` every hook
+# is compiled away entirely.
+#
+# Qt-free, so it can also be used from the core package and batch commands.
+#####################
+
+import logging
+import sys
+import time
+from collections import Counter, deque
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+RECENT_COMMANDS = 20    # command execution times kept
+
+enabled = False
+counters = Counter()                        # name -> count
+timings = {}                                # name -> [calls, total seconds, last seconds]
+recentCommands = deque(maxlen=RECENT_COMMANDS)  # (description, seconds)
+
+def enable():
+    """Starts recording, from zero."""
+    global enabled
+    reset()
+    enabled = True
+    logger.info("Instrumentation enabled.")
+
+def disable():
+    """Stops recording. The hooks go back to doing nothing."""
+    global enabled
+    enabled = False
+    logger.info("Instrumentation disabled.")
+
+def reset():
+    """Clears everything recorded so far."""
+    counters.clear()
+    timings.clear()
+    recentCommands.clear()
+
+def count(name, n=1):
+    """Adds n to the counter name."""
+    if enabled:
+        counters[name] += n
+
+def record(name, seconds):
+    """Records that name took seconds."""
+    if enabled:
+        timing = timings.setdefault(name, [0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2] = seconds
+
+def timed(name):
+    """Decorator recording how long each call of the function takes under name."""
+    def decorator(func):
+        if not __debug__:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def timedCommand(func):
+    """Decorator for QUndoCommand.redo() and undo(), recording each execution
+    in recentCommands as e.g. ("Change color (undo)", seconds)."""
+    if not __debug__:
+        return func
+
+    @wraps(func)
+    def wrapper(command, *args, **kwargs):
+        if not enabled:
+            return func(command, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(command, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            recentCommands.append((f"{command.text() or type(command).__name__} ({func.__name__})", elapsed))
+            record("command", elapsed)
+    return wrapper
+
+def snapshot():
+    """Returns a copy of the counters and timings, for computing rates between refreshes."""
+    return Counter(counters), {name: list(timing) for name, timing in timings.items()}
+
+def approximateSize(obj, exclude=(), seen=None):
+    """Returns roughly how many bytes obj and everything it contains use.
+
+    Follows dicts, lists, tuples, sets and plain object attributes; strings
+    and numbers are counted once however often they are shared.
+
+    Args:
+        obj: the object to measure.
+        exclude (tuple, optional): attribute names not to follow, e.g. references to the model. Defaults to ().
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approximateSize(k, exclude, seen) + approximateSize(v, exclude, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approximateSize(item, exclude, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += sum(approximateSize(v, exclude, seen) for k, v in vars(obj).items() if k not in exclude)
+    return size
@@ -0,0 +1,89 @@
+#####################
+# Logging setup. Adds a TRACE level below DEBUG for per-bead messages, so that
+# --debug stays readable and cheap, and hands every record to a QueueListener
+# so files and the console are written on a background thread rather than
+# the GUI thread. Log files are rotated by size.
+#
+# Hot paths should use trace(logger, "message %s", value) or %-style
+# arguments rather than f-strings, so nothing is formatted unless the record
+# is actually emitted.
+#####################
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+LOG_FORMAT = ('%(filename)s:\t'
+              '%(levelname)s:\t'
+              '%(funcName)s():\t'
+              '%(lineno)d:\t'
+              '%(message)s')
+LOG_FILE = "BeadworkDesigner.log"
+MAX_BYTES = 1024 * 1024     # size of each log file before it is rotated
+BACKUP_COUNT = 5            # rotated log files kept
+
+_listener = None
+
+def trace(logger, msg, *args):
+    """Logs msg % args at TRACE level. Costs one level check when TRACE is disabled.
+
+    Args:
+        logger (logging.Logger): the logger to log to.
+        msg (str): the message, with %-style placeholders for args.
+    """
+    if logger.isEnabledFor(TRACE):
+        logger.log(TRACE, msg, *args, stacklevel=2)
+
+def setupLogging(level=logging.INFO, logDir=None, logFile=None, console=True):
+    """Configures the root logger to log through a background writer thread.
+
+    Args:
+        level (int, optional): the lowest level to log. Defaults to logging.INFO.
+        logDir (str, optional): directory for the log file; no file is written if None. Defaults to None.
+        logFile (str, optional): name of the log file in logDir. Defaults to LOG_FILE.
+        console (bool, optional): also log to stdout. Defaults to True.
+
+    Returns:
+        logging.handlers.QueueListener: the running listener, stopped by stopLogging().
+    """
+    global _listener
+    stopLogging()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    if logDir is not None:
+        os.makedirs(logDir, exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(os.path.join(logDir, logFile or LOG_FILE),
+                                                             maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stopLogging():
+    """Writes out any queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(stopLogging)
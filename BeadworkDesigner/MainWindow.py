@@ -9,26 +9,50 @@
 import logging
 import os
 from enum import Enum
+from functools import lru_cache
 
 from PySide6.QtCore import QModelIndex, Qt
-from PySide6.QtGui import QAction, QIcon, QUndoStack
-from PySide6.QtWidgets import (QColorDialog, QComboBox, QFileDialog,
+from PySide6.QtGui import QAction, QActionGroup, QIcon, QIntValidator, QUndoStack
+from PySide6.QtWidgets import (QCheckBox, QColorDialog, QComboBox, QFileDialog,
                                QHBoxLayout, QLabel, QLineEdit, QMainWindow,
-                               QPushButton, QStatusBar, QToolBar,
+                               QProgressBar, QProgressDialog, QPushButton, QStatusBar, QToolBar,
                                QVBoxLayout, QWidget)
 
 import BeadworkDesigner.utils as utils
 from BeadworkDesigner.BeadDelegate import BeadDelegate
-from BeadworkDesigner.BeadworkModel import (BeadworkModel, BeadworkTransposeModel)
+from BeadworkDesigner.BeadSprites import BEAD_STYLES
+from BeadworkDesigner.BeadworkModel import BeadworkModel
 from BeadworkDesigner.BeadworkView import BeadworkView
+from BeadworkDesigner.Clipboard import copyBlock, pastedBlock
 from BeadworkDesigner.ColorList import BeadworkToColorListProxyModel, ColorList
 from BeadworkDesigner.Commands import (CommandChangeColor,
                                        CommandChangeMultipleColors,
                                        CommandInsertRow,
                                        CommandRemoveRow,
                                        CommandInsertColumn,
-                                       CommandRemoveColumn)
+                                       CommandRemoveColumn,
+                                       CommandReplaceData,
+                                       CommandResize,
+                                       CommandSetBlock,
+                                       CommandStroke)
+from BeadworkDesigner import Instrumentation
+from BeadworkDesigner.ConfigService import ConfigService
+from BeadworkDesigner.Minimap import MinimapDock
+from BeadworkDesigner.PerformancePanel import PerformancePanel
+from BeadworkDesigner.Profiling import Profiler, projectTags
+from BeadworkDesigner.Session import SessionRecorder, recordedAction
 from BeadworkDesigner.Settings import SettingsWindow
+from BeadworkDesigner.StartupProfiler import profiler
+from BeadworkDesigner.Stroke import Stroke
+from BeadworkDesigner.Tasks import TaskManager
+from BeadworkDesigner.core.Blocks import blockToText, clipBlock, fillBlock, maskColor, rangesBlock
+from BeadworkDesigner.core.Fill import floodFill
+from BeadworkDesigner.core.Grid import ANCHORS, anchorOffset
+from BeadworkDesigner.core.Palette import BLANK_COLOR, normalizePattern
+from BeadworkDesigner.core.Shapes import SHAPES, ShapeDraft, clipSpans, shapeSpans, spansBlock
+
+# Dither and Export pull in NumPy, so they are imported where they are first
+# used rather than here, to keep startup fast.
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +61,17 @@ bin_dir = os.path.join(base_dir, "bin")
 icons_dir = os.path.join(bin_dir, "icons")
 qss_dir = os.path.join(bin_dir, "qss")
 
+@lru_cache(maxsize=None)
+def loadIcon(name):
+    """Returns the icon from the icons directory, loading each one only once."""
+    return QIcon(os.path.join(icons_dir, name))
+
+@lru_cache(maxsize=None)
+def loadStyleSheet(name="style.qss"):
+    """Returns the stylesheet from the qss directory, reading it only once."""
+    with open(os.path.join(qss_dir, name)) as file:
+        return file.read()
+
 class BeadworkOrientation(Enum):
     VERTICAL = 0
     HORIZONTAL = 1
@@ -44,6 +79,21 @@ class BeadworkOrientation(Enum):
 class MainWindow(QMainWindow):
     """The application Main Window. This handles the main GUI elements and interactions."""
 
+    # secondary windows and dialogs are only built the first time one of their
+    # widgets is used, by the setup method they are listed under
+    LAZY_WINDOWS = {
+        "setupColorDialog": ("colorDialog",),
+        "setupDimensionsWindow": ("dimensionsWindow", "dimensionsWindowLayout", "widthEdit", "heightEdit", "anchorComboBox", "changeDimensionsButton"),
+        "setupReduceColorsWindow": ("reduceColorsWindow", "reduceColorsCountEdit", "reduceColorsMethodComboBox", "reduceColorsButton"),
+        "setupImportImageWindow": ("importImageWindow", "importImageWidthEdit", "importImageCountEdit", "importImageMethodComboBox", "importImageButton"),
+        "setupExportImageWindow": ("exportImageWindow", "exportBeadWidthEdit", "exportBeadHeightEdit", "exportGridLinesCheckBox", "exportMarkersCheckBox", "exportImageButton"),
+        "setupExportPDFWindow": ("exportPDFWindow", "exportPDFBeadWidthEdit", "exportPDFBeadHeightEdit", "exportPDFOverlapEdit", "exportPDFPageSizeComboBox", "exportPDFButton"),
+        "setupSettingsWindow": ("settingsWindow",),
+        "setupPerformancePanel": ("performancePanel",),
+        "setupMinimap": ("minimapDock",),
+    }
+    LAZY_ATTRIBUTES = {name: setup for setup, names in LAZY_WINDOWS.items() for name in names}
+
     def __init__(self, debug=False, app_configs=None, project_configs=None, modelData=None):
         """Initialize the MainWindow, all GUI elements, and the BeadworkModel.
 
@@ -57,8 +107,11 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.debug = debug
-        self.app_configs = app_configs
-        self.project_configs = project_configs
+
+        # all config lookups go through the service; the dicts are kept in it and updated in place
+        self.config = ConfigService(app_configs, project_configs)
+        self.app_configs = self.config.app_configs
+        self.project_configs = self.config.project_configs
 
         # set initial orientation dict as we need nice string representations
         # TODO: is this needed if I replace the width x label spinbox?
@@ -70,6 +123,19 @@ class MainWindow(QMainWindow):
         ### CREATE UNDO STACK
         self.undoStack = QUndoStack(self)
 
+        # the SessionRecorder while a session is being recorded
+        self.sessionRecorder = None
+
+        # the brush Stroke while the mouse is dragged in color or clear mode
+        self.stroke = None
+        # the ShapeDraft being drawn in shape mode, shown as a preview until it is finished
+        self.shapeDraft = None
+        # the block being pasted, which follows the mouse until it is placed with a click
+        self.pasteDraft = None
+
+        # cProfile/tracemalloc capture, from the View menu or --profile
+        self.profiler = Profiler()
+
         ### TRACK INITIAL ORIENTATION
         if self.getConfig("defaultOrientation") == "Horizontal":
             self.currentOrientation = BeadworkOrientation.HORIZONTAL
@@ -79,6 +145,7 @@ class MainWindow(QMainWindow):
         ### SETUP MODELS & VIEW
         self.setupModels(self.getConfig("height"), self.getConfig("width"), modelData)
         self.setupView(self.getConfig("beadHeight"), self.getConfig("beadWidth"))
+        profiler.mark("models and view")
 
         ### KEEP TRACK OF INITIAL WIDTH x HEIGHT
         self.modelWidth = self.model.columnCount(QModelIndex())
@@ -95,8 +162,10 @@ class MainWindow(QMainWindow):
         self.setupToolbar()  
         self.setupStatusBar()
         self.setupMenu()
-        self.setupDimensionsWindow()
-        self.setupSettingsWindow()
+        profiler.mark("widgets and actions")
+
+        # the ExportWorker of the export currently running, if any
+        self.exportWorker = None
   
         ### SETUP MAIN LAYOUT & WIDGET
         logger.debug("Setting up main layout and widget.")
@@ -109,31 +178,47 @@ class MainWindow(QMainWindow):
         mainWidget.setLayout(mainLayout)
 
         ### MAIN WINDOW CONFIGS
-        self.setStyleSheet(open(os.path.join(qss_dir, "style.qss")).read())
+        self.setStyleSheet(loadStyleSheet())
         self.setCentralWidget(mainWidget)
         self.setMinimumSize(1200, 600)   
         self.setWindowTitle('Beadwork Designer')
+        profiler.mark("main window layout")
 
         logger.info("MainWindow initialized.")
 
+    def __getattr__(self, name):
+        """Builds a secondary window the first time one of its widgets is used.
+        Only called for attributes that have not been set yet."""
+        setup = MainWindow.LAZY_ATTRIBUTES.get(name)
+        if setup is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        logger.debug(f"Building {name} on first use.")
+        getattr(self, setup)()
+        return self.__dict__[name]
+
+    def isBuilt(self, name):
+        """Checks if a lazily built window or widget has been built yet."""
+        return name in self.__dict__
+
     ########################################
     # SETUP METHODS
     ########################################
 
     def setupModels(self, height, width, modelData):
-        """Sets up the BeadworkModel and BeadworkTransposeModel.
+        """Sets up the BeadworkModel, which shows either orientation.
 
         Args:
             height (int): The height (rows) of the model.
             width (int): The width (columns) of the model. 
             modelData (list): The initial data for the model as a 2D list of hex colors.
         """
-        logger.debug("Setting up BeadworkModel and BeadworkTransposeModel.")
+        logger.debug("Setting up BeadworkModel.")
         self.origModel = BeadworkModel(debug=self.debug, defaultHeight=height, defaultWidth=width, data=modelData)
-        self.transposeModel = BeadworkTransposeModel()
-        self.transposeModel.setSourceModel(self.origModel)
 
-        self.model = self.origModel     # beginning model will be the original model
+        self.model = self.origModel     # the same model in both orientations; changeOrientation transposes it
+
+        # long operations run on worker threads; results are checked against the grid's revision
+        self.tasks = TaskManager(lambda: self.origModel.grid, self)
 
     def setupView(self, beadHeight, beadWidth):
         """Sets up the BeadworkView and BeadDelegate.
@@ -151,6 +236,14 @@ class MainWindow(QMainWindow):
         self.beadworkView.setItemDelegate(self.delegate)
         self.beadworkView.setModel(self.model)
         self.beadworkView.clicked.connect(self.handleViewClicked)
+        self.beadworkView.strokeStarted.connect(self.beginStroke)
+        self.beadworkView.strokeMoved.connect(self.extendStroke)
+        self.beadworkView.strokeFinished.connect(self.endStroke)
+        self.beadworkView.strokeStarted.connect(self.pressShape)
+        self.beadworkView.strokeMoved.connect(self.moveShape)
+        self.beadworkView.strokeFinished.connect(self.releaseShape)
+        self.beadworkView.strokeStarted.connect(self.placePaste)
+        self.beadworkView.beadHovered.connect(self.movePaste)
         self.beadworkView.setObjectName("beadworkView")
 
     def setupOrientationWidget(self):
@@ -180,12 +273,10 @@ class MainWindow(QMainWindow):
         self.currentColor.setFixedWidth(47)
         self.currentColor.setInputMask('HHHHHH')   # only allows hex color input
         self.currentColor.textChanged.connect(self.changeColorFromCurrentColorDialog) 
-        self.colorDialog = QColorDialog()
-        self.colorDialog.colorSelected.connect(lambda c: self.currentColor.setText(c.name().upper()))
         self.colorDialogButton = QPushButton()
         self.colorDialogButton.setFixedWidth(20)
-        self.colorDialogButton.setIcon(QIcon(os.path.join(icons_dir, "palette.png")))
-        self.colorDialogButton.clicked.connect(self.colorDialog.open)
+        self.colorDialogButton.setIcon(loadIcon("palette.png"))
+        self.colorDialogButton.clicked.connect(lambda: self.colorDialog.open())
         self.colorDialogButton.setToolTip("Open color dialog to select a color.")
         colorDialogLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
         colorDialogLayout.addWidget(self.currentColorLabel)
@@ -195,6 +286,12 @@ class MainWindow(QMainWindow):
         self.colorDialogWidget = QWidget()
         self.colorDialogWidget.setLayout(colorDialogLayout)
 
+    def setupColorDialog(self):
+        """Sets up the colorDialog opened from the colorDialogWidget."""
+        logger.debug("Setting up colorDialog.")
+        self.colorDialog = QColorDialog()
+        self.colorDialog.colorSelected.connect(lambda c: self.currentColor.setText(c.name().upper()))
+
     def setupActions(self):
         """Sets up the actions for the toolbar and menus."""
         logger.debug("Setting up actions.")
@@ -203,64 +300,93 @@ class MainWindow(QMainWindow):
 
         self.undoAction = self.undoStack.createUndoAction(self)
         self.undoAction.setShortcut("Ctrl+Z")
-        self.undoAction.setIcon(QIcon(os.path.join(icons_dir, "arrow-return-180-left.png")))
+        self.undoAction.setIcon(loadIcon("arrow-return-180-left.png"))
 
         self.redoAction = self.undoStack.createRedoAction(self)
         self.redoAction.setShortcut("Ctrl+Y")
-        self.redoAction.setIcon(QIcon(os.path.join(icons_dir, "arrow-return.png")))
+        self.redoAction.setIcon(loadIcon("arrow-return.png"))
+
+        self.undoAction.triggered.connect(lambda: self.recordAction("undo"))
+        self.redoAction.triggered.connect(lambda: self.recordAction("redo"))
+        # connected after the stack's own updates, so a stroke keeps them disabled
+        self.undoStack.canUndoChanged.connect(self.updateUndoActions)
+        self.undoStack.canRedoChanged.connect(self.updateUndoActions)
 
         self.zoomInAction = QAction('Zoom In', self)
         self.zoomInAction.triggered.connect(self.zoomIn)
-        self.zoomInAction.setIcon(QIcon(os.path.join(icons_dir, "magnifier-zoom-in.png")))
+        self.zoomInAction.setIcon(loadIcon("magnifier-zoom-in.png"))
         self.zoomInAction.setShortcut("Ctrl++")
 
         self.zoomOutAction = QAction('Zoom Out', self)
         self.zoomOutAction.triggered.connect(self.zoomOut)
-        self.zoomOutAction.setIcon(QIcon(os.path.join(icons_dir, "magnifier-zoom-out.png")))
+        self.zoomOutAction.setIcon(loadIcon("magnifier-zoom-out.png"))
         self.zoomOutAction.setShortcut("Ctrl+-")
 
         self.zoomResetAction = QAction('Reset Zoom', self)
         self.zoomResetAction.triggered.connect(self.zoomReset)
         self.zoomResetAction.setShortcut("Ctrl+0")
 
+        self.beadStyleGroup = QActionGroup(self)    # exclusive, so exactly one style is checked
+        self.beadStyleActions = {}
+        for style in BEAD_STYLES:
+            action = QAction(style, self.beadStyleGroup)
+            action.setCheckable(True)
+            action.triggered.connect(lambda checked, style=style: self.setBeadStyle(style))
+            self.beadStyleActions[style] = action
+        self.beadStyleActions["Flat"].setChecked(True)
+
         self.addColumnAction = QAction('Add Column', self)
         self.addColumnAction.triggered.connect(self.addColumn)
-        self.addColumnAction.setIcon(QIcon(os.path.join(icons_dir, "table-insert-column.png")))
+        self.addColumnAction.setIcon(loadIcon("table-insert-column.png"))
 
         self.removeColumnAction = QAction('Remove Column', self)
         self.removeColumnAction.triggered.connect(self.removeColumn)
-        self.removeColumnAction.setIcon(QIcon(os.path.join(icons_dir, "table-delete-column.png")))
+        self.removeColumnAction.setIcon(loadIcon("table-delete-column.png"))
 
         self.addRowAction = QAction('Add Row', self)
         self.addRowAction.triggered.connect(self.addRow)
-        self.addRowAction.setIcon(QIcon(os.path.join(icons_dir, "table-insert-row.png")))
+        self.addRowAction.setIcon(loadIcon("table-insert-row.png"))
 
         self.removeRowAction = QAction('Remove Row', self)
         self.removeRowAction.triggered.connect(self.removeRow)
-        self.removeRowAction.setIcon(QIcon(os.path.join(icons_dir, "table-delete-row.png")))
+        self.removeRowAction.setIcon(loadIcon("table-delete-row.png"))
 
         ### MODE ACTIONS
 
+        # the lambdas pass checked on; a @recordedAction wrapper's signature alone would get triggered() without it
+
         self.selectionMode = QAction('Selection Mode', self)
         self.selectionMode.setCheckable(True)
-        self.selectionMode.triggered.connect(self.inSelectionMode)
-        self.selectionMode.setIcon(QIcon(os.path.join(icons_dir, "selection.png")))
+        self.selectionMode.triggered.connect(lambda checked: self.inSelectionMode(checked))
+        self.selectionMode.setIcon(loadIcon("selection.png"))
         self.selectionMode.setChecked(True) # default mode
 
         self.colorMode = QAction('Color Mode', self)
         self.colorMode.setCheckable(True)
-        self.colorMode.triggered.connect(self.inColorMode)
-        self.colorMode.setIcon(QIcon(os.path.join(icons_dir, "color.png")))
+        self.colorMode.triggered.connect(lambda checked: self.inColorMode(checked))
+        self.colorMode.setIcon(loadIcon("color.png"))
 
         self.clearMode = QAction('Clear Mode', self)
         self.clearMode.setCheckable(True)
-        self.clearMode.triggered.connect(self.inClearMode)
-        self.clearMode.setIcon(QIcon(os.path.join(icons_dir, "eraser.png")))
+        self.clearMode.triggered.connect(lambda checked: self.inClearMode(checked))
+        self.clearMode.setIcon(loadIcon("eraser.png"))
 
         self.bucketMode = QAction('Bucket Mode', self)
         self.bucketMode.setCheckable(True)
-        self.bucketMode.triggered.connect(self.inBucketMode)
-        self.bucketMode.setIcon(QIcon(os.path.join(icons_dir, "paint-can.png")))
+        self.bucketMode.triggered.connect(lambda checked: self.inBucketMode(checked))
+        self.bucketMode.setIcon(loadIcon("paint-can.png"))
+
+        self.shapeMode = QAction('Shape Mode', self)
+        self.shapeMode.setCheckable(True)
+        self.shapeMode.triggered.connect(lambda checked: self.inShapeMode(checked))
+        self.shapeMode.setToolTip("Drag from corner to corner to draw a shape; click each vertex of a polygon, "
+                                  "then click its first or last vertex again to close it.")
+
+        self.shapeComboBox = QComboBox()
+        self.shapeComboBox.addItems(SHAPES)
+        self.shapeComboBox.setEditable(False)
+        self.shapeComboBox.setToolTip("The shape drawn in Shape Mode.")
+        self.shapeComboBox.currentTextChanged.connect(self.changeShape)
 
         ### FILE MENU ACTIONS
 
@@ -276,14 +402,70 @@ class MainWindow(QMainWindow):
         self.openAction = QAction('Open', self)
         self.openAction.triggered.connect(self.openDialog)
 
+        self.importImageAction = QAction('Import Image', self)
+        self.importImageAction.triggered.connect(lambda x: self.importImageWindow.show())
+
+        self.exportImageAction = QAction('Export Image', self)
+        self.exportImageAction.triggered.connect(self.openExportImageWindow)
+
+        self.exportPDFAction = QAction('Export PDF Chart', self)
+        self.exportPDFAction.triggered.connect(lambda x: self.exportPDFWindow.show())
+
         ### EDIT MENU ACTIONS
 
+        self.copyAction = QAction('Copy', self)
+        self.copyAction.setShortcut("Ctrl+C")
+        self.copyAction.triggered.connect(self.copySelection)
+
+        self.cutAction = QAction('Cut', self)
+        self.cutAction.setShortcut("Ctrl+X")
+        self.cutAction.triggered.connect(self.cutSelection)
+
+        self.pasteAction = QAction('Paste', self)
+        self.pasteAction.setShortcut("Ctrl+V")
+        self.pasteAction.triggered.connect(self.startPaste)
+
+        self.pasteTransparentAction = QAction('Paste Blank Beads as Transparent', self)
+        self.pasteTransparentAction.setCheckable(True)
+        self.pasteTransparentAction.setToolTip("Leave the beads under blank (white) beads of a paste as they are.")
+
+        # Escape drops a paste or shape in progress; added to the window so it works without a menu
+        self.cancelAction = QAction('Cancel', self)
+        self.cancelAction.setShortcut("Escape")
+        self.cancelAction.triggered.connect(self.cancelShape)
+        self.cancelAction.triggered.connect(self.cancelPaste)
+        self.addAction(self.cancelAction)
+
         self.adjustDimensionsAction = QAction('Adjust Dimensions', self)
         self.adjustDimensionsAction.triggered.connect(lambda x: self.dimensionsWindow.show())
 
+        self.reduceColorsAction = QAction('Reduce Colors', self)
+        self.reduceColorsAction.triggered.connect(lambda x: self.reduceColorsWindow.show())
+
         self.settingsWindowAction = QAction('Settings', self)
         self.settingsWindowAction.triggered.connect(self.openSettingsWindow)
 
+        ### VIEW MENU ACTIONS
+
+        self.minimapAction = QAction('Minimap', self)
+        self.minimapAction.setCheckable(True)
+        self.minimapAction.toggled.connect(self.setMinimapVisible)
+
+        self.performancePanelAction = QAction('Performance Panel', self)
+        self.performancePanelAction.setCheckable(True)
+        self.performancePanelAction.toggled.connect(self.setPerformancePanelVisible)
+
+        self.recordSessionAction = QAction('Record Session', self)
+        self.recordSessionAction.setCheckable(True)
+        self.recordSessionAction.triggered.connect(self.recordSessionDialog)
+
+        self.profilingAction = QAction('Start Profiling', self)
+        self.profilingAction.setCheckable(True)
+        self.profilingAction.toggled.connect(self.setProfiling)
+
+        self.profileNextCommandAction = QAction('Profile Next Command', self)
+        self.profileNextCommandAction.triggered.connect(self.profileNextCommand)
+
     def setupToolbar(self):
         """Sets up the toolbar with the orientationWidget and the actions."""
         logger.debug("Setting up self.toolbar.")
@@ -306,6 +488,8 @@ class MainWindow(QMainWindow):
         self.toolbar.addAction(self.colorMode)
         self.toolbar.addAction(self.clearMode)
         self.toolbar.addAction(self.bucketMode)
+        self.toolbar.addAction(self.shapeMode)
+        self.toolbar.addWidget(self.shapeComboBox)
 
     def setupColorList(self):
         """Sets up the ColorList view and the BeadworkToColorListProxyModel."""
@@ -354,6 +538,24 @@ class MainWindow(QMainWindow):
 
         self.statusBar.insertPermanentWidget(0, self.statusBarDimensionsWidget)
 
+        # progress of background tasks, shown while any is running
+        self.taskProgressBar = QProgressBar()
+        self.taskProgressBar.setRange(0, 100)
+        self.taskProgressBar.setMaximumWidth(150)
+        self.taskProgressBar.hide()
+        self.statusBar.addWidget(self.taskProgressBar)
+
+        self.cancelTaskButton = QPushButton("Cancel")
+        self.cancelTaskButton.clicked.connect(self.tasks.cancelAll)
+        self.cancelTaskButton.hide()
+        self.statusBar.addWidget(self.cancelTaskButton)
+
+        self.tasks.progress.connect(self.updateTaskProgress)
+        self.tasks.message.connect(self.writeToStatusBar)
+        self.tasks.busyChanged.connect(self.taskProgressBar.setVisible)
+        self.tasks.busyChanged.connect(self.cancelTaskButton.setVisible)
+        self.tasks.aboutToApply.connect(self.endStroke)    # a result must not land in the middle of a stroke
+
         self.setStatusBar(self.statusBar)
 
     def setupMenu(self):
@@ -364,12 +566,22 @@ class MainWindow(QMainWindow):
         self.fileMenu.addAction(self.newAction)
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.openAction)
+        self.fileMenu.addAction(self.importImageAction)
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.saveAction)
         self.fileMenu.addAction(self.saveAsAction)
+        self.fileMenu.addSeparator()
+        self.fileMenu.addAction(self.exportImageAction)
+        self.fileMenu.addAction(self.exportPDFAction)
 
         self.editMenu = self.menu.addMenu('Edit')
+        self.editMenu.addAction(self.copyAction)
+        self.editMenu.addAction(self.cutAction)
+        self.editMenu.addAction(self.pasteAction)
+        self.editMenu.addAction(self.pasteTransparentAction)
+        self.editMenu.addSeparator()
         self.editMenu.addAction(self.adjustDimensionsAction)
+        self.editMenu.addAction(self.reduceColorsAction)
         self.editMenu.addSeparator()
         self.editMenu.addAction(self.settingsWindowAction)
 
@@ -377,6 +589,14 @@ class MainWindow(QMainWindow):
         self.viewMenu.addAction(self.zoomInAction)
         self.viewMenu.addAction(self.zoomOutAction)
         self.viewMenu.addAction(self.zoomResetAction)
+        self.beadStyleMenu = self.viewMenu.addMenu('Bead Style')
+        self.beadStyleMenu.addActions(self.beadStyleGroup.actions())
+        self.viewMenu.addAction(self.minimapAction)
+        self.viewMenu.addSeparator()
+        self.viewMenu.addAction(self.performancePanelAction)
+        self.viewMenu.addAction(self.recordSessionAction)
+        self.viewMenu.addAction(self.profilingAction)
+        self.viewMenu.addAction(self.profileNextCommandAction)
 
     def setupDimensionsWindow(self):
         """Sets up the dimensionsWindow to allow the user to adjust the 
@@ -384,7 +604,7 @@ class MainWindow(QMainWindow):
         logger.debug("Setting up dimensionsWindow.")
         self.dimensionsWindow = QWidget()
         self.dimensionsWindow.setWindowTitle("Adjust Dimensions")
-        self.dimensionsWindow.setFixedSize(300, 200)
+        self.dimensionsWindow.setFixedSize(300, 250)
         self.dimensionsWindow.setWindowModality(Qt.ApplicationModal)
         self.dimensionsWindowLayout = QVBoxLayout()
         self.dimensionsWindow.setLayout(self.dimensionsWindowLayout)
@@ -407,19 +627,229 @@ class MainWindow(QMainWindow):
         heightLineWidget = QWidget()
         heightLineWidget.setLayout(heightLine)
 
+        self.anchorComboBox = QComboBox()
+        self.anchorComboBox.addItems(list(ANCHORS))
+        self.anchorComboBox.setToolTip("The side or corner kept in place; rows and columns are added or removed on the others.")
+
+        anchorLine = QHBoxLayout()
+        anchorLine.addWidget(QLabel("Anchor:"))
+        anchorLine.addWidget(self.anchorComboBox)
+        anchorLineWidget = QWidget()
+        anchorLineWidget.setLayout(anchorLine)
+
         self.changeDimensionsButton = QPushButton("Change")
         self.changeDimensionsButton.clicked.connect(self.adjustDimensions)
 
         self.dimensionsWindowLayout.addWidget(widthLineWidget)
         self.dimensionsWindowLayout.addWidget(heightLineWidget)
+        self.dimensionsWindowLayout.addWidget(anchorLineWidget)
         self.dimensionsWindowLayout.addWidget(self.changeDimensionsButton)
 
+    def setupReduceColorsWindow(self):
+        """Sets up the reduceColorsWindow to allow the user to reduce the number
+        of colors in the beadwork, optionally dithering the result."""
+        from BeadworkDesigner import Dither
+        logger.debug("Setting up reduceColorsWindow.")
+        self.reduceColorsWindow = QWidget()
+        self.reduceColorsWindow.setWindowTitle("Reduce Colors")
+        self.reduceColorsWindow.setFixedSize(300, 200)
+        self.reduceColorsWindow.setWindowModality(Qt.ApplicationModal)
+        reduceColorsWindowLayout = QVBoxLayout()
+        self.reduceColorsWindow.setLayout(reduceColorsWindowLayout)
+
+        self.reduceColorsCountEdit = QLineEdit()
+        self.reduceColorsCountEdit.setText("8")
+        self.reduceColorsCountEdit.setValidator(QIntValidator(1, 9999))
+
+        countLine = QHBoxLayout()
+        countLine.addWidget(QLabel("Colors:"))
+        countLine.addWidget(self.reduceColorsCountEdit)
+        countLineWidget = QWidget()
+        countLineWidget.setLayout(countLine)
+
+        self.reduceColorsMethodComboBox = QComboBox()
+        self.reduceColorsMethodComboBox.addItems([method.value for method in Dither.DitherMethod])
+        self.reduceColorsMethodComboBox.setCurrentText(Dither.DitherMethod.FLOYD_STEINBERG.value)
+
+        methodLine = QHBoxLayout()
+        methodLine.addWidget(QLabel("Dithering:"))
+        methodLine.addWidget(self.reduceColorsMethodComboBox)
+        methodLineWidget = QWidget()
+        methodLineWidget.setLayout(methodLine)
+
+        self.reduceColorsButton = QPushButton("Reduce")
+        self.reduceColorsButton.clicked.connect(self.reduceColors)
+
+        reduceColorsWindowLayout.addWidget(countLineWidget)
+        reduceColorsWindowLayout.addWidget(methodLineWidget)
+        reduceColorsWindowLayout.addWidget(self.reduceColorsButton)
+
+    def setupImportImageWindow(self):
+        """Sets up the importImageWindow to choose the size, number of colors,
+        and dithering before picking an image to import as the beadwork."""
+        from BeadworkDesigner import Dither
+        logger.debug("Setting up importImageWindow.")
+        self.importImageWindow = QWidget()
+        self.importImageWindow.setWindowTitle("Import Image")
+        self.importImageWindow.setFixedSize(300, 200)
+        self.importImageWindow.setWindowModality(Qt.ApplicationModal)
+        importImageWindowLayout = QVBoxLayout()
+        self.importImageWindow.setLayout(importImageWindowLayout)
+
+        self.importImageWidthEdit = QLineEdit()
+        self.importImageWidthEdit.setText(str(self.modelWidth))
+
+        widthLine = QHBoxLayout()
+        widthLine.addWidget(QLabel("Width:"))
+        widthLine.addWidget(self.importImageWidthEdit)
+        widthLineWidget = QWidget()
+        widthLineWidget.setLayout(widthLine)
+
+        self.importImageCountEdit = QLineEdit()
+        self.importImageCountEdit.setText("16")
+
+        countLine = QHBoxLayout()
+        countLine.addWidget(QLabel("Colors:"))
+        countLine.addWidget(self.importImageCountEdit)
+        countLineWidget = QWidget()
+        countLineWidget.setLayout(countLine)
+
+        self.importImageMethodComboBox = QComboBox()
+        self.importImageMethodComboBox.addItems([method.value for method in Dither.DitherMethod])
+        self.importImageMethodComboBox.setCurrentText(Dither.DitherMethod.FLOYD_STEINBERG.value)
+
+        methodLine = QHBoxLayout()
+        methodLine.addWidget(QLabel("Dithering:"))
+        methodLine.addWidget(self.importImageMethodComboBox)
+        methodLineWidget = QWidget()
+        methodLineWidget.setLayout(methodLine)
+
+        self.importImageButton = QPushButton("Choose Image")
+        self.importImageButton.clicked.connect(self.importImageDialog)
+
+        importImageWindowLayout.addWidget(widthLineWidget)
+        importImageWindowLayout.addWidget(countLineWidget)
+        importImageWindowLayout.addWidget(methodLineWidget)
+        importImageWindowLayout.addWidget(self.importImageButton)
+
+    def setupExportImageWindow(self):
+        """Sets up the exportImageWindow to choose the bead size, grid lines and
+        markers before exporting the beadwork as a PNG or SVG image."""
+        logger.debug("Setting up exportImageWindow.")
+        self.exportImageWindow = QWidget()
+        self.exportImageWindow.setWindowTitle("Export Image")
+        self.exportImageWindow.setFixedSize(300, 250)
+        self.exportImageWindow.setWindowModality(Qt.ApplicationModal)
+        exportImageWindowLayout = QVBoxLayout()
+        self.exportImageWindow.setLayout(exportImageWindowLayout)
+
+        self.exportBeadWidthEdit = QLineEdit()
+
+        widthLine = QHBoxLayout()
+        widthLine.addWidget(QLabel("Bead Width (px):"))
+        widthLine.addWidget(self.exportBeadWidthEdit)
+        widthLineWidget = QWidget()
+        widthLineWidget.setLayout(widthLine)
+
+        self.exportBeadHeightEdit = QLineEdit()
+
+        heightLine = QHBoxLayout()
+        heightLine.addWidget(QLabel("Bead Height (px):"))
+        heightLine.addWidget(self.exportBeadHeightEdit)
+        heightLineWidget = QWidget()
+        heightLineWidget.setLayout(heightLine)
+
+        self.exportGridLinesCheckBox = QCheckBox("Grid Lines")
+        self.exportGridLinesCheckBox.setChecked(True)
+
+        self.exportMarkersCheckBox = QCheckBox("Row and Column Markers")
+        self.exportMarkersCheckBox.setChecked(True)
+
+        self.exportImageButton = QPushButton("Export")
+        self.exportImageButton.clicked.connect(self.exportImageDialog)
+
+        exportImageWindowLayout.addWidget(widthLineWidget)
+        exportImageWindowLayout.addWidget(heightLineWidget)
+        exportImageWindowLayout.addWidget(self.exportGridLinesCheckBox)
+        exportImageWindowLayout.addWidget(self.exportMarkersCheckBox)
+        exportImageWindowLayout.addWidget(self.exportImageButton)
+
+    def setupExportPDFWindow(self):
+        """Sets up the exportPDFWindow to choose the bead size, page overlap and
+        page size before exporting a printable PDF chart."""
+        from BeadworkDesigner import Export
+        logger.debug("Setting up exportPDFWindow.")
+        self.exportPDFWindow = QWidget()
+        self.exportPDFWindow.setWindowTitle("Export PDF Chart")
+        self.exportPDFWindow.setFixedSize(300, 250)
+        self.exportPDFWindow.setWindowModality(Qt.ApplicationModal)
+        exportPDFWindowLayout = QVBoxLayout()
+        self.exportPDFWindow.setLayout(exportPDFWindowLayout)
+
+        self.exportPDFBeadWidthEdit = QLineEdit("8")
+
+        widthLine = QHBoxLayout()
+        widthLine.addWidget(QLabel("Bead Width (pt):"))
+        widthLine.addWidget(self.exportPDFBeadWidthEdit)
+        widthLineWidget = QWidget()
+        widthLineWidget.setLayout(widthLine)
+
+        self.exportPDFBeadHeightEdit = QLineEdit("14")
+
+        heightLine = QHBoxLayout()
+        heightLine.addWidget(QLabel("Bead Height (pt):"))
+        heightLine.addWidget(self.exportPDFBeadHeightEdit)
+        heightLineWidget = QWidget()
+        heightLineWidget.setLayout(heightLine)
+
+        self.exportPDFOverlapEdit = QLineEdit("2")
+
+        overlapLine = QHBoxLayout()
+        overlapLine.addWidget(QLabel("Page Overlap (beads):"))
+        overlapLine.addWidget(self.exportPDFOverlapEdit)
+        overlapLineWidget = QWidget()
+        overlapLineWidget.setLayout(overlapLine)
+
+        self.exportPDFPageSizeComboBox = QComboBox()
+        self.exportPDFPageSizeComboBox.addItems(list(Export.PAGE_SIZES))
+
+        pageSizeLine = QHBoxLayout()
+        pageSizeLine.addWidget(QLabel("Page Size:"))
+        pageSizeLine.addWidget(self.exportPDFPageSizeComboBox)
+        pageSizeLineWidget = QWidget()
+        pageSizeLineWidget.setLayout(pageSizeLine)
+
+        self.exportPDFButton = QPushButton("Export")
+        self.exportPDFButton.clicked.connect(self.exportPDFDialog)
+
+        exportPDFWindowLayout.addWidget(widthLineWidget)
+        exportPDFWindowLayout.addWidget(heightLineWidget)
+        exportPDFWindowLayout.addWidget(overlapLineWidget)
+        exportPDFWindowLayout.addWidget(pageSizeLineWidget)
+        exportPDFWindowLayout.addWidget(self.exportPDFButton)
+
     def setupSettingsWindow(self):
         """Sets up the settingsWindow to allow the user to adjust the 
         settings of the application."""
         logger.debug("Setting up settingsWindow.")
-        self.settingsWindow = SettingsWindow(self.app_configs, self.project_configs)
+        self.settingsWindow = SettingsWindow(self.app_configs, self.project_configs, self.config)
         
+    def setupPerformancePanel(self):
+        """Sets up the performancePanel, a dock showing live performance counters."""
+        logger.debug("Setting up performancePanel.")
+        self.performancePanel = PerformancePanel(self)
+        self.performancePanel.closed.connect(lambda: self.performancePanelAction.setChecked(False))
+        self.addDockWidget(Qt.RightDockWidgetArea, self.performancePanel)
+        self.performancePanel.hide()
+
+    def setupMinimap(self):
+        """Sets up the minimapDock, a dock showing the whole pattern."""
+        logger.debug("Setting up minimapDock.")
+        self.minimapDock = MinimapDock(self)
+        self.minimapDock.closed.connect(lambda: self.minimapAction.setChecked(False))
+        self.addDockWidget(Qt.RightDockWidgetArea, self.minimapDock)
+        self.minimapDock.hide()
+
     # This is currently the workaround as I cannot figure out how to
     # get the rows and columns to size properly without explicitly
     # calling repaint()
@@ -428,6 +858,15 @@ class MainWindow(QMainWindow):
         super().show()
         self.beadworkView.repaint()
 
+    def closeEvent(self, event):
+        """Stops recording the session, profiling and background tasks, if running, when the window is closed.
+        Pending saves are not cancelled, they are waited for."""
+        self.stopSessionRecording()
+        self.profilingAction.setChecked(False)
+        self.tasks.cancelAll()
+        self.tasks.waitForDone()
+        super().closeEvent(event)
+
     ########################################
     # SLOTS
     ########################################
@@ -444,6 +883,7 @@ class MainWindow(QMainWindow):
 
     # TODO: refactor to set an enum instead of checking the button values each time
     # TODO: how to handle multiple selections -- selecting without changing color in ColorMode does not change their color?
+    @recordedAction("click", lambda self, index: {"row": index.row(), "column": index.column()})
     def handleViewClicked(self, index):
         """Handles different behavior types for clicking on the BeadworkView
         depending on the mode selected:
@@ -466,12 +906,241 @@ class MainWindow(QMainWindow):
             command = CommandChangeColor(self.model, index, "FFFFFF", f"Change color to #FFFFFF")
             self.undoStack.push(command)
         elif self.bucketMode.isChecked():       # TODO: unit tests
-            if self.currentColor.text() != "":  # TODO: this only does multiple beads selected, but not if there is only one
-                selected = self.model.nearbyIndicesThatMatch(index)
-                command = CommandChangeMultipleColors(self.model, selected, self.currentColor.text(), f"Change color to {self.currentColor.text()}")
-                self.undoStack.push(command)
+            if self.currentColor.text() != "":
+                self.bucketFill(index, self.currentColor.text())
+
+    def strokeColor(self):
+        """Returns the hex color a stroke paints in the current mode, or None if strokes do not paint."""
+        if self.colorMode.isChecked() and self.currentColor.text() != "":
+            return f"#{self.currentColor.text()}"
+        if self.clearMode.isChecked():
+            return BLANK_COLOR
+        return None
+
+    def beginStroke(self, index):
+        """Starts a brush stroke at index, in color or clear mode. Slot for BeadworkView.strokeStarted.
+
+        Args:
+            index (QIndex): the bead pressed.
+        """
+        color = self.strokeColor()
+        if color is None or self.pasteDraft is not None:
+            return
+        logger.debug(f"Starting a stroke in {color} at {index.row()}, {index.column()}.")
+        self.stroke = Stroke(self.model.editTarget(), color, self)
+        self.colorListModel.setUpdatesDeferred(True)    # rebuilt once, when the stroke ends
+        self.updateUndoActions()                        # the stroke is not on the undo stack until it ends
+        self.stroke.addPoint(index.row(), index.column())
+
+    def extendStroke(self, index):
+        """Extends the brush stroke to index. Slot for BeadworkView.strokeMoved.
+
+        Args:
+            index (QIndex): the bead the mouse moved onto.
+        """
+        if self.stroke is not None:
+            self.stroke.addPoint(index.row(), index.column())
+
+    def endStroke(self):
+        """Finishes the brush stroke, pushing it as one command. Slot for BeadworkView.strokeFinished."""
+        stroke, self.stroke = self.stroke, None
+        if stroke is None:
+            return
+        cells = stroke.finish()
+        stroke.deleteLater()
+        self.colorListModel.setUpdatesDeferred(False)
+        logger.debug(f"Stroke finished: {len(stroke.points)} samples, {len(cells)} bead(s) changed.")
+        self.recordAction("stroke", points=[list(point) for point in stroke.points])
+        if cells:
+            self.undoStack.push(CommandStroke(self.model, cells, stroke.oldCells, f"Paint stroke in {stroke.color}"))
+        self.updateUndoActions()
+
+    def updateUndoActions(self):
+        """Enables undo and redo when the stack allows them and no stroke is being drawn."""
+        self.undoAction.setEnabled(self.undoStack.canUndo() and self.stroke is None)
+        self.redoAction.setEnabled(self.undoStack.canRedo() and self.stroke is None)
+
+    @recordedAction("stroke", lambda self, points: {"points": [list(point) for point in points]})
+    def paintStroke(self, points):
+        """Paints a whole stroke through the beads at points, as if dragged, e.g. when replaying a session.
+
+        Args:
+            points (list): the (row, column) of each sample of the stroke.
+        """
+        if not points:
+            return
+        self.beginStroke(self.model.index(*points[0]))
+        for row, column in points[1:]:
+            self.extendStroke(self.model.index(row, column))
+        self.endStroke()
+
+    def pressShape(self, index):
+        """Starts a shape, or a polygon's next vertex, in shape mode. Slot for BeadworkView.strokeStarted.
+
+        Args:
+            index (QIndex): the bead pressed.
+        """
+        if not self.shapeMode.isChecked() or self.currentColor.text() == "" or self.pasteDraft is not None:
+            return
+        if self.shapeDraft is None:
+            self.shapeDraft = ShapeDraft(self.shapeComboBox.currentText())
+        self.shapeDraft.press(index.row(), index.column())
+        self.beadworkView.setPreview(self.shapeDraft.spans(), f"#{self.currentColor.text()}")
+
+    def moveShape(self, index):
+        """Drags the shape's corner, or vertex, to index. Slot for BeadworkView.strokeMoved.
+
+        Args:
+            index (QIndex): the bead the mouse moved onto.
+        """
+        if self.shapeDraft is not None:
+            self.shapeDraft.move(index.row(), index.column())
+            self.beadworkView.setPreview(self.shapeDraft.spans(), f"#{self.currentColor.text()}")
+
+    def releaseShape(self):
+        """Draws the shape on the pattern once it is finished. Slot for BeadworkView.strokeFinished."""
+        if self.shapeDraft is not None and self.shapeDraft.release():
+            shape, points = self.shapeDraft.shape, self.shapeDraft.points
+            self.cancelShape()
+            self.drawShape(shape, points)
+
+    def cancelShape(self):
+        """Drops the shape being drawn, if any, and its preview."""
+        self.shapeDraft = None
+        self.beadworkView.clearPreview()
+
+    @recordedAction("shape", lambda self, shape, points: {"shape": shape, "points": [list(point) for point in points]})
+    def drawShape(self, shape, points):
+        """Draws a shape on the pattern in the current color, as one command that writes its beads as a block.
+
+        Args:
+            shape (str): one of core.Shapes.SHAPES.
+            points (list): the (row, column) of its two corners, or of each vertex of a polygon.
+        """
+        if self.currentColor.text() == "" or not points:
+            return
+        color = f"#{self.currentColor.text()}"
+        # points may be off the pattern, e.g. replayed from a session recorded on a larger one
+        spans = clipSpans(shapeSpans(shape, [tuple(point) for point in points]), self.model.rowCount(), self.model.columnCount())
+        if not spans:
+            return
+        # a filled shape is drawn over the beads it covers, so the whole block is written with row slices;
+        # an outline leaves the rest of its bounding box as None, so only its own beads are read and written
+        blockAt = self.model.block if shape.startswith("Filled") else None
+        row, column, block = spansBlock(spans, color, blockAt)
+        logger.debug(f"Drawing {shape.lower()} through {len(points)} point(s), a {len(block[0])}x{len(block)} block.")
+        self.undoStack.push(CommandSetBlock(self.model, row, column, block, f"Draw {shape.lower()} in {color}"))
+
+    def selectedBlock(self):
+        """Returns the selected beads as a block, with None for the beads around them that are not
+        selected, and where it is: (row, column, block), or None if nothing is selected."""
+        ranges = [(r.top(), r.left(), r.bottom(), r.right()) for r in self.beadworkView.selectionModel().selection()]
+        return rangesBlock(ranges, self.model.block)
+
+    def copySelection(self):
+        """Copies the selected beads to the clipboard. Slot for copyAction."""
+        selected = self.selectedBlock()
+        if selected is None:
+            self.writeToStatusBar("Select beads to copy.")
+            return
+        _, _, block = selected
+        copyBlock(block)
+        self.writeToStatusBar(f"Copied {len(block[0])}x{len(block)} beads.")
+
+    def cutSelection(self):
+        """Copies the selected beads to the clipboard and clears them, as one command. Slot for cutAction."""
+        selected = self.selectedBlock()
+        if selected is None:
+            self.writeToStatusBar("Select beads to cut.")
+            return
+        row, column, block = selected
+        copyBlock(block)
+        self.pasteBlock(row, column, fillBlock(block, BLANK_COLOR), "Cut")
+
+    def startPaste(self):
+        """Shows the block on the clipboard over the pattern, following the mouse, until a click places it
+        or Escape cancels it. Slot for pasteAction."""
+        block = pastedBlock(self.model.rowCount(None), self.model.columnCount(None))
+        if not block or not block[0]:
+            self.writeToStatusBar("Nothing to paste.")
+            return
+        if self.pasteTransparentAction.isChecked():
+            block = maskColor(block, BLANK_COLOR)
+        self.cancelShape()
+        self.pasteDraft = block
+        self.beadworkView.setMouseTracking(True)
+        self.beadworkView.strokeMode = True     # the click placing it does not select
+        current = self.beadworkView.currentIndex()
+        self.beadworkView.setPreviewBlock(max(current.row(), 0), max(current.column(), 0), block)
+        self.writeToStatusBar(f"Click to paste {len(block[0])}x{len(block)} beads, Escape to cancel.")
+
+    def movePaste(self, index):
+        """Moves the block being pasted so its top left corner is at index. Slot for BeadworkView.beadHovered.
+
+        Args:
+            index (QIndex): the bead under the mouse.
+        """
+        if self.pasteDraft is not None:
+            self.beadworkView.setPreviewBlock(index.row(), index.column(), self.pasteDraft)
+
+    def placePaste(self, index):
+        """Pastes the block being pasted with its top left corner at index. Slot for BeadworkView.strokeStarted.
+
+        Args:
+            index (QIndex): the bead clicked.
+        """
+        if self.pasteDraft is None:
+            return
+        block = self.pasteDraft
+        self.cancelPaste()
+        self.pasteBlock(index.row(), index.column(), block)
+
+    def cancelPaste(self):
+        """Drops the block being pasted, if any, and its preview."""
+        if self.pasteDraft is None:
+            return
+        self.pasteDraft = None
+        self.beadworkView.setMouseTracking(False)
+        self.beadworkView.clearPreview()
+        self.beadworkView.strokeMode = self.colorMode.isChecked() or self.clearMode.isChecked() or self.shapeMode.isChecked()
+
+    @recordedAction("paste", lambda self, row, column, block, description="Paste": {"row": row, "column": column, "text": blockToText(block), "description": description})
+    def pasteBlock(self, row, column, block, description="Paste"):
+        """Writes a block onto the pattern, as one command, cropped to the pattern. None in the block leaves the bead under it as it is.
+
+        Args:
+            row (int): the row of the top of the block.
+            column (int): the column of its left side.
+            block (list): a 2D list of hex colors, with None for transparent beads.
+            description (str, optional): the description of the command. Defaults to "Paste".
+        """
+        row, column, block = clipBlock(row, column, block, self.model.rowCount(None), self.model.columnCount(None))
+        if not block:
+            return
+        logger.debug(f"{description}: a {len(block[0])}x{len(block)} block at {row}, {column}.")
+        self.undoStack.push(CommandSetBlock(self.model, row, column, block, f"{description} {len(block[0])}x{len(block)} beads"))
+
+    def bucketFill(self, index, color):
+        """Changes the color of every bead connected to index with the same color,
+        finding them on a worker thread for large patterns.
+
+        Args:
+            index (QIndex): the bead clicked.
+            color (str): the new hex color, without the leading '#'.
+        """
+        # the flood fill works on the grid, which is always stored vertically
+        row, column = self.model.gridCell(index.row(), index.column())
+        self.tasks.submit("Bucket fill", lambda progress, rows: floodFill(rows, row, column, progress), (self.origModel.grid.snapshot(),),
+                          apply=lambda cells: self.applyBucketFill(cells, color))
+
+    def applyBucketFill(self, cells, color):
+        """Pushes the bucket fill of cells, in grid coordinates, as one command."""
+        selected = [self.model.indexForCell(row, column) for row, column in cells]
+        command = CommandChangeMultipleColors(self.model, selected, color, f"Change color to {color}")
+        self.undoStack.push(command)
 
     # TODO: build unit tests
+    @recordedAction("colorListClick", lambda self, index: {"color": self.colorListModel.data(index, Qt.ItemDataRole.DisplayRole)})
     def handleColorListClicked(self, index):
         """Handles different behavior types for clicking on the ColorList
         depending on the mode selected:
@@ -491,6 +1160,7 @@ class MainWindow(QMainWindow):
             self.currentColor.setText((self.colorListModel.data(index, Qt.ItemDataRole.DisplayRole)).upper())
             # Sets all selected beads after changing the color in the colorList
 
+    @recordedAction("addColumn")
     def addColumn(self):
         """Adds a single column to the original beadwork model."""
         logger.debug("Adding column.")
@@ -498,6 +1168,7 @@ class MainWindow(QMainWindow):
         self.undoStack.push(command)
         self.updateWidthXHeight()
 
+    @recordedAction("removeColumn")
     def removeColumn(self):
         """Removes a single column from the original beadwork model."""
         logger.debug("Removing column.")
@@ -505,6 +1176,7 @@ class MainWindow(QMainWindow):
         self.undoStack.push(command)
         self.updateWidthXHeight()
 
+    @recordedAction("addRow")
     def addRow(self):
         """Adds a single row to the original beadwork model."""
         logger.debug("Adding row.")
@@ -512,6 +1184,7 @@ class MainWindow(QMainWindow):
         self.undoStack.push(command)
         self.updateWidthXHeight()           
 
+    @recordedAction("removeRow")
     def removeRow(self):
         """Removes a row from the original beadwork model."""
         logger.debug("Removing row.")
@@ -519,6 +1192,7 @@ class MainWindow(QMainWindow):
         self.undoStack.push(command)
         self.updateWidthXHeight()
 
+    @recordedAction("width", lambda self, value: {"value": value})
     def changeWidthTo(self, value):
         """Changes the width (columns) of the beadwork model to the specified value.
         
@@ -527,14 +1201,9 @@ class MainWindow(QMainWindow):
         """
         logger.debug(f"Width changing to {value}.")
         self.beadworkView.setCurrentIndex(self.model.index(0, self.modelWidth-1))
-        if value > self.modelWidth:
-            command = CommandInsertColumn(self.model, self.beadworkView, self.model.columnCount(), value - self.modelWidth, f"Add column at index {self.model.columnCount()}")
-            self.undoStack.push(command)     
-        else:
-            command = CommandRemoveColumn(self.model, self.beadworkView, self.model.columnCount(), self.modelWidth - value, f"Remove column at index {self.model.columnCount()}")
-            self.undoStack.push(command)
-        self.updateWidthXHeight()
+        self.resizeTo(value, self.model.rowCount())
 
+    @recordedAction("height", lambda self, value: {"value": value})
     def changeHeightTo(self, value):
         """Changes the height (rows) of the beadwork model to the specified value.
 
@@ -543,12 +1212,27 @@ class MainWindow(QMainWindow):
         """
         logger.debug(f"Height changing to {value}.")
         self.beadworkView.setCurrentIndex(self.model.index(self.modelHeight-1, 0))
-        if value > self.modelHeight:
-            command = CommandInsertRow(self.model, self.beadworkView, self.model.rowCount(), value - self.modelHeight, f"Add row at index {self.model.rowCount()}")
-            self.undoStack.push(command)
-        else:
-            command = CommandRemoveRow(self.model, self.beadworkView, self.model.rowCount(), self.modelHeight - value, f"Remove row at index {self.model.rowCount()}")
-            self.undoStack.push(command)
+        self.resizeTo(self.model.columnCount(), value)
+
+    @recordedAction("resize", lambda self, width, height, anchor="Top left": {"width": width, "height": height, "anchor": anchor})
+    def resizeTo(self, width, height, anchor="Top left"):
+        """Crops or pads the beadwork to width x height, on any side, as a single undoable command.
+
+        Args:
+            width (int): The new width (columns) of the beadwork model.
+            height (int): The new height (rows) of the beadwork model.
+            anchor (str, optional): The side or corner kept in place, a key of ANCHORS. Defaults to "Top left",
+                                    which adds or removes rows at the bottom and columns on the right.
+        """
+        rows, columns = self.model.rowCount(), self.model.columnCount()
+        if (width, height) == (columns, rows):
+            return
+        vertical, horizontal = ANCHORS[anchor]
+        rowOffset = anchorOffset(rows, height, vertical)
+        columnOffset = anchorOffset(columns, width, horizontal)
+        logger.debug(f"Resizing to {width}x{height}, anchored {anchor}.")
+        command = CommandResize(self.model, self.beadworkView, height, width, rowOffset, columnOffset, f"Resize to {width}x{height}")
+        self.undoStack.push(command)
         self.updateWidthXHeight()
 
     def adjustDimensions(self):
@@ -560,14 +1244,38 @@ class MainWindow(QMainWindow):
         newHeight = int(self.heightEdit.text())
         logger.debug(f"Adjusting dimensions to {newWidth}, {newHeight}.")
 
-        if newWidth != self.modelWidth:
-            self.changeWidthTo(newWidth)
-
-        if newHeight != self.modelHeight:
-            self.changeHeightTo(newHeight)
+        # both dimensions, and any side, in one command
+        self.resizeTo(newWidth, newHeight, self.anchorComboBox.currentText())
 
         logger.info(f"New width: {newWidth}, New height: {newHeight}.")
 
+    @recordedAction("reduceColors", lambda self: {"count": self.reduceColorsCountEdit.text(), "method": self.reduceColorsMethodComboBox.currentText()})
+    def reduceColors(self):
+        """Reduces the beadwork to the number of colors and dithering method
+        chosen in the reduceColorsWindow, as a single undoable command."""
+        from BeadworkDesigner import Dither
+        self.reduceColorsWindow.close()
+
+        try:
+            count = int(self.reduceColorsCountEdit.text())
+        except ValueError:
+            count = 0
+        if count < 1:
+            self.writeToStatusBar(f"Cannot reduce to {self.reduceColorsCountEdit.text()!r} colors, enter a whole number of at least 1.")
+            return
+        method = Dither.DitherMethod(self.reduceColorsMethodComboBox.currentText())
+        logger.debug(f"Reducing colors to {count} with {method.value}.")
+
+        def reduce(progress, rows):
+            return [list(row) for row in Dither.reduceColors(rows, count, method, progress)]
+
+        def apply(data):
+            command = CommandReplaceData(self.origModel, self.beadworkView, data, f"Reduce colors to {count}")
+            self.undoStack.push(command)
+
+        self.tasks.submit(f"Reduce colors to {count}", reduce, (self.origModel.grid.snapshot(),), apply=apply)
+
+    @recordedAction("orientation", lambda self, spinboxValue: {"orientation": spinboxValue})
     def changeOrientation(self, spinboxValue): # does not use spinboxValue yet, may implement later if there are more orientation options
         """Changes the orientation of the beadwork from horizontal to vertical or vice versa.
 
@@ -578,23 +1286,21 @@ class MainWindow(QMainWindow):
 
         self.currentOrientation = BeadworkOrientation.VERTICAL if self.currentOrientation == BeadworkOrientation.HORIZONTAL else BeadworkOrientation.HORIZONTAL
 
-        # swap models
-        if self.model == self.origModel:
-            self.model = self.transposeModel
-        else:
-            self.model = self.origModel
-        self.beadworkView.setModel(self.model)
-        self.colorListModel.setSourceModel(self.model)
+        # the model transposes itself in place, so the view keeps its selection
+        # and the color list its positions, which are kept in grid coordinates
+        self.model.setTransposed(not self.model.transposed)
 
         # change internal orientations of delegate and view
         self.delegate.changeOrientation()
         self.beadworkView.changeOrientation()
-        logger.debug(f"self.beadworkView.model() changed to {self.model}.")
 
         self.updateWidthXHeight()
 
         logger.info(f"Orientation changed to {self.orientationOptions[self.currentOrientation]}.")
 
+    @recordedAction("colorDialog", lambda self, colorString: {"color": colorString,
+                                                              "current": [self.beadworkView.currentIndex().row(), self.beadworkView.currentIndex().column()],
+                                                              "selected": [[i.row(), i.column()] for i in self.beadworkView.selectedIndexes()]})
     def changeColorFromCurrentColorDialog(self, colorString):
         """Changes the color of a selected bead when the colorDialog is updated.
 
@@ -615,6 +1321,7 @@ class MainWindow(QMainWindow):
         # the user can also select multiple beads by clicking and dragging
         # the currentColor dialog populates with the color of the selected bead(s)
         # if checked, should disconnect the relevant methods from the other modes
+    @recordedAction("mode", lambda self, checked: {"mode": "selection"})
     def inSelectionMode(self, checked):
         """Changes the mode to Selection Mode. Slot for the triggered selectionMode action.
 
@@ -625,8 +1332,12 @@ class MainWindow(QMainWindow):
             self.colorMode.setChecked(False)
             self.clearMode.setChecked(False)
             self.bucketMode.setChecked(False)
+            self.shapeMode.setChecked(False)
         else:   # if not checked but clicked, revert back to checked
             self.selectionMode.setChecked(True)
+        self.cancelShape()
+        self.cancelPaste()
+        self.beadworkView.strokeMode = False
 
         self.writeToStatusBar("Selection Mode")
 
@@ -637,6 +1348,7 @@ class MainWindow(QMainWindow):
         # every bead the user clicks on will change to the color in the currentColor dialog
         # if checked, should disconnect the relevant methods from the other modes
         # and enable the currentColor dialog to change the color of the "painter"
+    @recordedAction("mode", lambda self, checked: {"mode": "color"})
     def inColorMode(self, checked):
         """Changes the mode to Color Mode. Slot for the triggered colorMode action.
 
@@ -647,8 +1359,12 @@ class MainWindow(QMainWindow):
             self.selectionMode.setChecked(False)
             self.clearMode.setChecked(False)
             self.bucketMode.setChecked(False)
+            self.shapeMode.setChecked(False)
         else:   # if not checked but clicked, revert back to checked
             self.colorMode.setChecked(True)
+        self.cancelShape()
+        self.cancelPaste()
+        self.beadworkView.strokeMode = True     # click and drag to paint
 
         self.writeToStatusBar("Color Mode")
 
@@ -659,6 +1375,7 @@ class MainWindow(QMainWindow):
         # every bead clicked/selected will change to white/transparent
         # if selecting multiple beads, hint to the user that they will all clear when finished selecting
         # if checked, should disconnect the relevant methods from the other modes
+    @recordedAction("mode", lambda self, checked: {"mode": "clear"})
     def inClearMode(self, checked):
         """Changes the mode to Clear Mode. Slot for the triggered clearMode action.
 
@@ -669,8 +1386,12 @@ class MainWindow(QMainWindow):
             self.selectionMode.setChecked(False)
             self.colorMode.setChecked(False)
             self.bucketMode.setChecked(False)
+            self.shapeMode.setChecked(False)
         else:   # if not checked but clicked, revert back to checked
             self.clearMode.setChecked(True)
+        self.cancelShape()
+        self.cancelPaste()
+        self.beadworkView.strokeMode = True     # click and drag to clear
 
         self.writeToStatusBar("Clear Mode")
 
@@ -678,6 +1399,7 @@ class MainWindow(QMainWindow):
 
         logger.debug("Entered clear mode.")
 
+    @recordedAction("mode", lambda self, checked: {"mode": "bucket"})
     def inBucketMode(self, checked):
         """Changes the mode to Bucket Mode. Slot for the triggered bucketMode action.
 
@@ -688,40 +1410,87 @@ class MainWindow(QMainWindow):
             self.selectionMode.setChecked(False)
             self.colorMode.setChecked(False)
             self.clearMode.setChecked(False)
+            self.shapeMode.setChecked(False)
         else:
             self.bucketMode.setChecked(True)
+        self.cancelShape()
+        self.cancelPaste()
+        self.beadworkView.strokeMode = False
 
         self.writeToStatusBar("Bucket Mode")
 
         logger.debug("Entered bucket mode.")
 
+    @recordedAction("mode", lambda self, checked: {"mode": "shape"})
+    def inShapeMode(self, checked):
+        """Changes the mode to Shape Mode, drawing the shape chosen in shapeComboBox.
+        Slot for the triggered shapeMode action.
+
+        Args:
+            checked (bool): flag for if the shapeMode action/button is checked.
+        """
+        if checked:
+            self.selectionMode.setChecked(False)
+            self.colorMode.setChecked(False)
+            self.clearMode.setChecked(False)
+            self.bucketMode.setChecked(False)
+        else:
+            self.shapeMode.setChecked(True)
+        self.cancelPaste()
+        self.beadworkView.strokeMode = True     # drag from corner to corner
+
+        self.writeToStatusBar(f"Shape Mode: {self.shapeComboBox.currentText()}")
+
+        logger.debug("Entered shape mode.")
+
+    def changeShape(self, shape):
+        """Switches to drawing another shape. Slot for shapeComboBox.currentTextChanged.
+
+        Args:
+            shape (str): one of core.Shapes.SHAPES.
+        """
+        self.cancelShape()
+        if not self.shapeMode.isChecked():
+            self.shapeMode.trigger()
+        else:
+            self.writeToStatusBar(f"Shape Mode: {shape}")
+
+    @recordedAction("zoomIn")
     def zoomIn(self):
         """Zooms in on the beadwork by increasing the size of the beads."""
         self.beadworkView.increaseSize()
         logger.debug(f"Zooming in to {self.beadworkView.beadHeight + 1} x {self.beadworkView.beadWidth + 1}.")
 
+    @recordedAction("zoomOut")
     def zoomOut(self):
         """Zooms out on the beadwork by decreasing the size of the beads."""
         self.beadworkView.decreaseSize()
         logger.debug(f"Zooming out to {self.beadworkView.beadHeight - 1} x {self.beadworkView.beadWidth - 1}.")
 
+    @recordedAction("zoomReset")
     def zoomReset(self):
         """Resets the zoom of the beadwork to the default size."""
         self.beadworkView.setBeadSize(self.getConfig("beadHeight"), self.getConfig("beadWidth"))
         logger.debug(f"Resetting zoom to {self.getConfig('beadHeight')} x {self.getConfig('beadWidth')}.")
 
+    @recordedAction("beadStyle", lambda self, style: {"style": style})
+    def setBeadStyle(self, style):
+        """Draws the beads as flat rectangles or as shaded, realistic beads.
+
+        Args:
+            style (str): one of BEAD_STYLES.
+        """
+        self.delegate.setBeadStyle(style)
+        self.beadStyleActions[style].setChecked(True)
+        self.beadworkView.viewport().update()
+
     def saveAsDialog(self):
         """Opens a file dialog to save the project to a JSON file."""
         logger.info("Saving project.")
         filename = QFileDialog.getSaveFileName(self, 'Save Project', os.path.expanduser("~"), 'Beadwork Designer Project (*.json)')[0]
         logger.debug(f"Selected filename: {filename}.")
         if filename:
-            try:
-                self.exportProject(filename)
-                self.writeToStatusBar("Saved")
-            except Exception as e:
-                logger.error(f"Failed to save project to {filename}: {e}.")
-                self.writeToStatusBar("Failed to save project.")
+            self.exportProject(filename)    # the save task reports whether it succeeded
 
     # TODO: unit tests
     def saveDialog(self):
@@ -734,12 +1503,7 @@ class MainWindow(QMainWindow):
             filename = QFileDialog.getSaveFileName(self, 'Save Project', os.path.expanduser("~"), 'Beadwork Designer Project (*.json)')[0]
         logger.debug(f"Selected filename: {filename}.")
         if filename:
-            try:
-                self.exportProject(filename)
-                self.writeToStatusBar("Saved")
-            except Exception as e:
-                logger.error(f"Failed to save project to {filename}: {e}.")
-                self.writeToStatusBar("Failed to save project.")
+            self.exportProject(filename)    # the save task reports whether it succeeded
             
     def openDialog(self):
         """Opens a file dialog to open a project from a JSON file."""
@@ -749,6 +1513,71 @@ class MainWindow(QMainWindow):
         if filename:
             self.importProject(filename)
 
+    def importImageDialog(self):
+        """Opens a file dialog to import an image as the beadwork, using the
+        options chosen in the importImageWindow."""
+        from BeadworkDesigner import Dither
+        logger.info("Importing image.")
+        filename = QFileDialog.getOpenFileName(self, 'Import Image', os.path.expanduser("~"), 'Images (*.png *.jpg *.jpeg *.bmp *.gif)')[0]
+        logger.debug(f"Selected filename: {filename}.")
+        if filename:
+            self.importImageWindow.close()
+            try:
+                self.importImage(filename,
+                                 int(self.importImageWidthEdit.text()),
+                                 int(self.importImageCountEdit.text()),
+                                 Dither.DitherMethod(self.importImageMethodComboBox.currentText()))
+            except Exception as e:
+                logger.error(f"Failed to import image {filename}: {e}.")
+                self.writeToStatusBar("Failed to import image.")
+
+    def openExportImageWindow(self):
+        """Opens the exportImageWindow, starting from the bead size currently displayed."""
+        self.exportBeadWidthEdit.setText(str(self.beadworkView.beadWidth))
+        self.exportBeadHeightEdit.setText(str(self.beadworkView.beadHeight))
+        self.exportImageWindow.show()
+
+    def exportImageDialog(self):
+        """Opens a file dialog to export the beadwork as a PNG or SVG image, using
+        the options chosen in the exportImageWindow."""
+        logger.info("Exporting image.")
+        filename, selectedFilter = QFileDialog.getSaveFileName(self, 'Export Image', os.path.expanduser("~"), 'PNG Image (*.png);;SVG Image (*.svg)')
+        logger.debug(f"Selected filename: {filename}.")
+        if filename:
+            if not os.path.splitext(filename)[1]:
+                filename += ".svg" if "svg" in selectedFilter else ".png"
+            self.exportImageWindow.close()
+            try:
+                self.exportImage(filename,
+                                 int(self.exportBeadWidthEdit.text()),
+                                 int(self.exportBeadHeightEdit.text()),
+                                 self.exportGridLinesCheckBox.isChecked(),
+                                 self.exportMarkersCheckBox.isChecked())
+                self.writeToStatusBar("Exported")
+            except Exception as e:
+                logger.error(f"Failed to export image to {filename}: {e}.")
+                self.writeToStatusBar("Failed to export image.")
+
+    def exportPDFDialog(self):
+        """Opens a file dialog to export a PDF chart of the beadwork, using the
+        options chosen in the exportPDFWindow."""
+        logger.info("Exporting PDF chart.")
+        filename, _ = QFileDialog.getSaveFileName(self, 'Export PDF Chart', os.path.expanduser("~"), 'PDF (*.pdf)')
+        logger.debug(f"Selected filename: {filename}.")
+        if filename:
+            if not os.path.splitext(filename)[1]:
+                filename += ".pdf"
+            self.exportPDFWindow.close()
+            try:
+                self.exportPDF(filename,
+                               float(self.exportPDFBeadWidthEdit.text()),
+                               float(self.exportPDFBeadHeightEdit.text()),
+                               int(self.exportPDFOverlapEdit.text()),
+                               self.exportPDFPageSizeComboBox.currentText())
+            except ValueError as e:
+                logger.error(f"Invalid PDF export options: {e}.")
+                self.writeToStatusBar("Invalid export options.")
+
     def openSettingsWindow(self):
         """Opens a settings window."""
         logger.info("Opening settings window.")
@@ -756,6 +1585,110 @@ class MainWindow(QMainWindow):
         self.settingsWindow.show()
         # TODO: check for and update any changes to the app after closing the settings window - esp. for graphics changes, i.e. font or color changes
 
+    def setPerformancePanelVisible(self, visible):
+        """Shows or hides the performance panel. Instrumentation is only
+        recorded while the panel is shown.
+
+        Args:
+            visible (bool): whether to show the panel.
+        """
+        if visible:
+            Instrumentation.enable()
+            self.performancePanel.show()
+        else:
+            Instrumentation.disable()
+            if self.isBuilt("performancePanel"):
+                self.performancePanel.hide()
+
+    def setMinimapVisible(self, visible):
+        """Shows or hides the minimap.
+
+        Args:
+            visible (bool): whether to show the minimap.
+        """
+        if visible:
+            self.minimapDock.show()
+        elif self.isBuilt("minimapDock"):
+            self.minimapDock.hide()
+
+    def recordSessionDialog(self, checked):
+        """Starts recording the session to a file chosen by the user, or stops recording.
+
+        Args:
+            checked (bool): whether the recordSessionAction was checked.
+        """
+        if not checked:
+            self.stopSessionRecording()
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Record Session", "", "Session Files (*.jsonl)")
+        if filename:
+            self.startSessionRecording(filename)
+        else:
+            self.recordSessionAction.setChecked(False)
+
+    def startSessionRecording(self, filename):
+        """Records every following action to a session file, to be replayed with
+        'BeadworkDesigner.py replay'.
+
+        Args:
+            filename (str): the session file to write.
+        """
+        self.stopSessionRecording()
+        self.sessionRecorder = SessionRecorder(self, filename)
+        self.recordSessionAction.setChecked(True)
+        self.writeToStatusBar(f"Recording session to {filename}")
+
+    def stopSessionRecording(self):
+        """Stops recording the session, if one is being recorded."""
+        if self.sessionRecorder is not None:
+            self.sessionRecorder.stop()
+            self.sessionRecorder = None
+            self.recordSessionAction.setChecked(False)
+            self.writeToStatusBar("Session recording stopped")
+
+    def setProfiling(self, profiling):
+        """Starts or stops profiling; on stop, the reports are written to the profile directory.
+
+        Args:
+            profiling (bool): whether the profilingAction was checked.
+        """
+        if profiling == self.profiler.isRunning():
+            return
+        if profiling:
+            self.profiler.start()
+            self.profilingAction.setText('Stop Profiling')
+            self.profileNextCommandAction.setEnabled(False)
+            self.writeToStatusBar("Profiling")
+        else:
+            files = self.profiler.stop(projectTags(self))
+            self.profilingAction.setText('Start Profiling')
+            self.profileNextCommandAction.setEnabled(True)
+            self.writeToStatusBar(f"Profile written to {files[0]}")
+
+    def profileNextCommand(self):
+        """Profiles from now until the next command is pushed onto the undo stack,
+        e.g. one bucket fill or one orientation change."""
+        if self.profiler.isRunning():
+            return
+        self.profiler.profileNextCommand(self.undoStack, tags=lambda: projectTags(self))
+        self.profilingAction.setEnabled(False)
+        self.undoStack.indexChanged.connect(self.nextCommandProfiled, Qt.SingleShotConnection)
+        self.writeToStatusBar("Profiling the next command")
+
+    def nextCommandProfiled(self):
+        self.profilingAction.setEnabled(True)
+        self.writeToStatusBar(f"Profile of the next command written to {self.profiler.directory}")
+
+    def updateTaskProgress(self, name, fraction):
+        """Shows the progress of a background task in the status bar."""
+        self.taskProgressBar.setValue(int(fraction * 100))
+        self.writeToStatusBar(f"{name}...")
+
+    def recordAction(self, action, **args):
+        """Records an action that is not a MainWindow method, e.g. undo, if a session is being recorded."""
+        if self.sessionRecorder is not None and not self.sessionRecorder.depth:
+            self.sessionRecorder.record(action, args)
+
     ########################################
     # UTILITY METHODS
     ########################################
@@ -779,20 +1712,100 @@ class MainWindow(QMainWindow):
         self.statusBarWidthLabel.setText(f"{self.modelWidth}")
         self.statusBarHeightLabel.setText(f"{self.modelHeight}")
 
-        self.widthEdit.setText(str(self.modelWidth))
-        self.heightEdit.setText(str(self.modelHeight))
+        if self.isBuilt("dimensionsWindow"):    # otherwise it picks up the dimensions when built
+            self.widthEdit.setText(str(self.modelWidth))
+            self.heightEdit.setText(str(self.modelHeight))
 
         self.setConfig("width", self.modelWidth if self.currentOrientation == BeadworkOrientation.VERTICAL else self.modelHeight)
         self.setConfig("height", self.modelHeight if self.currentOrientation == BeadworkOrientation.VERTICAL else self.modelWidth)
         
+    def displayedData(self):
+        """Returns the beadwork in the orientation it is currently displayed.
+
+        Returns:
+            list: a 2D list of hex colors.
+        """
+        data = self.origModel.exportData()
+        if self.currentOrientation == BeadworkOrientation.HORIZONTAL:
+            return [list(column) for column in zip(*data)]
+        return data
+
+    def exportImage(self, filename, beadWidth, beadHeight, gridLines=True, markers=True):
+        """Exports the beadwork, as currently displayed, to a PNG or SVG image.
+        The format is chosen from the file extension.
+
+        Args:
+            filename (str): The filename to export to.
+            beadWidth (int): Width, in pixels, of each bead.
+            beadHeight (int): Height, in pixels, of each bead.
+            gridLines (bool, optional): Draw lines between beads. Defaults to True.
+            markers (bool, optional): Draw the center and every-5 markers. Defaults to True.
+        """
+        from BeadworkDesigner import Export
+        if filename.lower().endswith(".svg"):
+            Export.exportSVG(self.displayedData(), filename, beadWidth, beadHeight, gridLines, markers)
+        else:
+            Export.exportPNG(self.displayedData(), filename, beadWidth, beadHeight, gridLines, markers)
+
+    def exportPDF(self, filename, beadWidth=8, beadHeight=14, overlap=2, pageSize="A4"):
+        """Exports a multi-page PDF chart of the beadwork on a worker thread,
+        showing a progress dialog that can cancel the export.
+
+        Args:
+            filename (str): The filename to export to.
+            beadWidth (float, optional): Width, in points, of a bead when vertical. Defaults to 8.
+            beadHeight (float, optional): Height, in points, of a bead when vertical. Defaults to 14.
+            overlap (int, optional): Rows and columns repeated from the previous page. Defaults to 2.
+            pageSize (str, optional): One of Export.PAGE_SIZES. Defaults to "A4".
+
+        Returns:
+            ExportWorker: the running export.
+        """
+        from BeadworkDesigner import Export
+        if self.exportWorker is not None:
+            logger.warning("An export is already running.")
+            return self.exportWorker
+
+        # a snapshot, so that editing while exporting is safe
+        data = self.origModel.exportData()
+        self.exportWorker = Export.ExportWorker(Export.exportPDF, data, filename,
+                                                beadWidth=beadWidth, beadHeight=beadHeight,
+                                                horizontal=self.currentOrientation == BeadworkOrientation.HORIZONTAL,
+                                                overlap=overlap, pageSize=pageSize)
+
+        self.exportProgressDialog = QProgressDialog("Exporting PDF chart...", "Cancel", 0, 100, self)
+        self.exportProgressDialog.setWindowModality(Qt.WindowModal)
+        self.exportProgressDialog.setMinimumDuration(500)
+        self.exportProgressDialog.canceled.connect(self.exportWorker.cancel)
+
+        self.exportWorker.progress.connect(lambda done, total: self.exportProgressDialog.setValue(int(100 * done / max(total, 1))))
+        self.exportWorker.finished.connect(self.exportFinished)
+        self.exportWorker.failed.connect(self.exportFailed)
+        self.exportWorker.start()
+        return self.exportWorker
+
+    def exportFinished(self, filename):
+        logger.info(f"Exported {filename}.")
+        self.clearExportWorker()
+        self.writeToStatusBar("Exported")
+
+    def exportFailed(self, message):
+        self.clearExportWorker()
+        self.writeToStatusBar(message)
+
+    def clearExportWorker(self):
+        self.exportProgressDialog.reset()
+        self.exportWorker.wait()
+        self.exportWorker = None
+
+    @recordedAction("save", lambda self, filename: {"filename": filename})
     def exportProject(self, filename):
-        """Exports the project to a JSON file.
+        """Exports the project to a JSON file. The window title changes to it once it
+        has been written; the status bar says whether it was.
 
         Args:
             filename (str): The filename to save the project to.
         """
-        self.setWindowTitle(f'Beadwork Designer - {filename}')
-
         # these ifs are necessary as a horizontal model is only changing the orientation,
         # not the underlying structure
         self.setConfig("width", self.modelWidth if self.currentOrientation == BeadworkOrientation.VERTICAL else self.modelHeight)
@@ -804,30 +1817,60 @@ class MainWindow(QMainWindow):
             "info": {
                         "version": 0.1
                     },
-            "configs": self.project_configs,
-            "project": self.origModel.exportData()
+            "configs": dict(self.project_configs),
+            "project": list(self.origModel.exportData())  # a snapshot, written on a worker thread for large patterns
         }
-        utils.saveProject(project, filename)
+        self.tasks.submit(f"Save {os.path.basename(filename)}", lambda progress: utils.saveProject(project, filename, progress),
+                          apply=lambda result: self.setWindowTitle(f'Beadwork Designer - {filename}'),
+                          editsPattern=False, cancellable=False)
 
     # TODO: this is a bit of a mess, but it works for now
     # TODO: handle failure to load project
     # TODO: add version checking
-    def importProject(self, filename):
-        """Imports a project from a JSON file.
+    def importProject(self, filename, background=None):
+        """Imports a project from a JSON file. It is recorded in a session as it is applied.
+
+        Large files are loaded on a worker thread, so the project may not be applied
+        yet when this returns; callers that need it, such as a session replay, pass
+        background=False.
 
         Args:
             filename (str): The filename to load the project from.
+            background (bool, optional): load on a worker thread. Defaults to whether the file is large.
+
+        Returns:
+            Task: the load.
         """
         self.setWindowTitle(f'Beadwork Designer - {filename}')
 
-        json = utils.loadProject(filename)
+        if background is None:
+            # about 10 bytes per bead, e.g. "#FFFFFF",
+            background = self.tasks.inBackground(os.path.getsize(filename) // 10)
+
+        def load(progress):
+            project = utils.loadProject(filename, progress)
+            project['project'] = normalizePattern(project['project'])  # checked here, off the GUI thread for large files
+            return project
+
+        return self.tasks.submit(f"Load {os.path.basename(filename)}", load,
+                          apply=lambda project: self.applyProject(project, filename), editsPattern=False, background=background)
+
+    # recorded once the load has succeeded, with the project as loaded, so replaying does not need the file
+    @recordedAction("load", lambda self, json, filename=None: {"filename": filename, "project": json})
+    def applyProject(self, json, filename=None):
+        """Replaces the current project with a loaded one.
+
+        Args:
+            json (dict): the project, as read by utils.loadProject, with its pattern normalized by normalizePattern.
+            filename (str, optional): the file it was loaded from, for the session. Defaults to None.
+        """
         for key in json['configs'].keys():
             self.setConfig(key, json['configs'][key])           # replace any config with the loaded one
         
         self.currentOrientation = BeadworkOrientation.VERTICAL     # if this does not match the config, it will be changed in the if statement
 
         ### LOAD DATA
-        self.origModel.importData(json['project'], debug=self.getConfig('debug'))
+        self.origModel.importData(json['project'], debug=self.getConfig('debug'), validate=False)
 
         ### UPDATE ELEMENTS & CHANGE ORIENTATION IF NECESSARY
         if json['configs']["defaultOrientation"] == "Horizontal":
@@ -839,6 +1882,39 @@ class MainWindow(QMainWindow):
 
         self.updateWidthXHeight()
 
+    def importImage(self, filename, width, colorCount, method=None):
+        """Imports an image as the beadwork, scaled to one bead per pixel and
+        quantized to a limited number of colors. Can be undone.
+
+        Args:
+            filename (str): The filename of the image.
+            width (int): The width of the beadwork, in beads, as currently displayed.
+            colorCount (int): The maximum number of colors to use.
+            method (Dither.DitherMethod, optional): The dithering method. Defaults to Floyd-Steinberg.
+        """
+        from BeadworkDesigner import Dither
+        method = method or Dither.DitherMethod.FLOYD_STEINBERG
+        # use the displayed bead shape so the image does not look stretched
+        ratio = self.beadworkView.beadWidth / self.beadworkView.beadHeight
+        horizontal = self.currentOrientation == BeadworkOrientation.HORIZONTAL
+
+        def quantize(progress):
+            data = Dither.quantizeImage(utils.loadImage(filename, width, ratio), colorCount, method, progress)
+            # the original model is always stored vertically
+            if horizontal:
+                data = [list(column) for column in zip(*data)]
+            return data
+
+        def apply(data):
+            command = CommandReplaceData(self.origModel, self.beadworkView, data, f"Import image {os.path.basename(filename)}")
+            self.undoStack.push(command)
+            self.updateWidthXHeight()
+
+        # decided by the size of the imported pattern, not of the current one
+        background = self.tasks.inBackground(width * utils.imageHeight(filename, width, ratio))
+        self.tasks.submit(f"Import image {os.path.basename(filename)}", quantize, apply=apply, background=background)
+
+    @recordedAction("new")
     def loadNewProject(self):
         """Loads a new project, replacing the current project with a blank one."""
         logger.info("Loading new project")
@@ -864,53 +1940,22 @@ class MainWindow(QMainWindow):
 
         self.updateWidthXHeight()
 
-    # retrieveConfig method: and if no config is available, log it to prevent errors (and use default config instead)
     # NOTE: this still fails with a KeyError if the key is not in any config
     def getConfig(self, key, config=None):
-        """Retrieves a configuration value from the project or app configs.
+        """Retrieves a configuration value from the project or app configs,
+        falling back to the default config.
 
         Args:
             key (str): The key to retrieve from the configs.
             config (dict, optional): The config to retrieve from. Defaults to None.
         """
-        if config and config is self.project_configs:
-            value = self.project_configs[key]
-        elif config and config is self.app_configs:
-            value = self.app_configs[key]
-        else:
-            try:
-                try:
-                    value = self.project_configs[key]
-                    logger.debug(f"Config {key} found in project configs.")
-                except (TypeError, KeyError, AttributeError) as e:
-                    value = self.app_configs[key]
-                    logger.debug(f"Config {key} not found in project configs but in app configs, returning app config. Message: {e}.")
-            except (TypeError, KeyError, AttributeError) as e:
-
-                # just in case neither of these exist
-                if not self.project_configs:
-                    self.project_configs = {}
-                if not self.app_configs:
-                    self.app_configs = {}
-
-                logger.error(f"Config {key} not found, returning default. Message: {e}.")
-                default_config = utils.loadProject(bin_dir + "/default_config.json")
-                try:
-                    self.project_configs[key] = default_config["project_configs"][key]
-                    value = self.project_configs[key]
-                except (TypeError, KeyError, AttributeError) as e:
-                    self.app_configs[key] = default_config["app_configs"][key]
-                    value = self.app_configs[key]
-                finally:
-                    del default_config  # clean up
-        
-        logger.debug(f"Returning {value} for {key}.")
-        return value
-    
+        return self.config.get(key, config)
+
     def setConfig(self, key, value):
-        if key in self.project_configs:
-            self.project_configs[key] = value
-        elif key in self.app_configs:
-            self.app_configs[key] = value
-        else:
-            logger.error(f"Config {key} not found in project or app configs.")
\ No newline at end of file
+        """Changes a configuration value in the project or app configs.
+
+        Args:
+            key (str): The key to change.
+            value: The new value.
+        """
+        self.config.set(key, value)
\ No newline at end of file
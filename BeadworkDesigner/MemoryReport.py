@@ -0,0 +1,99 @@
+#####################
+# Where the bytes go: an approximate memory report per subsystem of a
+# MainWindow, shown in the performance panel and printed by the 'memory'
+# batch command.
+#
+# Subsystems are measured in order with one set of seen objects, so an
+# object shared between them (e.g. a color string held by both the model and
+# an undo command) is counted once, under the first subsystem holding it, and
+# the total is not inflated.
+#####################
+
+import logging
+
+from BeadworkDesigner import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+# a QItemSelectionRange holds two QPersistentModelIndex, each pointing to
+# shared data of about 40 bytes; Qt does not expose the exact size
+SELECTION_RANGE_BYTES = 2 * (8 + 40)
+
+def modelStorage(window, seen):
+    rows = window.origModel.grid.rows
+    beads = sum(len(row) for row in rows)
+    return Instrumentation.approximateSize(rows, seen=seen), f"{beads} beads"
+
+def colorList(window, seen):
+    size, colors, coordinates = window.colorListModel.memoryUsage(seen)
+    return size, f"{colors} colors, {coordinates} coordinates"
+
+def undoStack(window, seen):
+    stack = window.undoStack
+    # the commands' own data (old colors, removed rows and columns, replaced
+    # data), not the model and view they refer to
+    size = sum(Instrumentation.approximateSize(stack.command(i), exclude=("model", "view", "target"), seen=seen)
+               for i in range(stack.count()))
+    return size, f"{stack.count()} commands"
+
+def selection(window, seen):
+    ranges = window.beadworkView.selectionModel().selection()
+    beads = sum(r.width() * r.height() for r in ranges)
+    return len(ranges) * SELECTION_RANGE_BYTES, f"{len(ranges)} ranges, {beads} beads"
+
+def renderCaches(window, seen):
+    from BeadworkDesigner.MainWindow import loadIcon, loadStyleSheet
+    from BeadworkDesigner.BeadSprites import spriteAtlas
+    from BeadworkDesigner.ColorPool import colorPool
+    size = Instrumentation.approximateSize(loadStyleSheet(), seen=seen) if loadStyleSheet.cache_info().currsize else 0
+    # a QColor is 16 bytes and a QBrush points to about 64 bytes of brush data,
+    # plus their Python wrappers
+    size += Instrumentation.approximateSize(colorPool.entries, seen=seen) + len(colorPool) * (16 + 64)
+    # the sprites' pixels, which the atlas counts as it renders them
+    size += Instrumentation.approximateSize(spriteAtlas.sprites, seen=seen) + spriteAtlas.bytes
+    minimap = window.minimapDock.minimap.image if window.isBuilt("minimapDock") else None
+    if minimap is not None:
+        size += minimap.sizeInBytes()
+    return size, (f"stylesheet, {loadIcon.cache_info().currsize} icons (pixmaps held by Qt), {len(colorPool)} pooled colors, "
+                  f"{len(spriteAtlas)} bead sprites" + (f", {minimap.width()}x{minimap.height()} minimap" if minimap is not None else ""))
+
+# name -> function(window, seen) returning (bytes, detail), in measuring order
+SUBSYSTEMS = {
+    "Model storage": modelStorage,
+    "Color list": colorList,
+    "Undo stack": undoStack,
+    "Selection": selection,
+    "Render caches": renderCaches,
+}
+
+def memoryReport(window):
+    """Measures the memory held by each subsystem of window.
+
+    Returns:
+        dict: subsystem name mapped to {"bytes": int, "detail": str}, and "Total" to {"bytes": int}.
+    """
+    seen = set()
+    report = {}
+    for name, measure in SUBSYSTEMS.items():
+        size, detail = measure(window, seen)
+        report[name] = {"bytes": size, "detail": detail}
+    report["Total"] = {"bytes": sum(entry["bytes"] for entry in report.values())}
+    logger.debug(f"Memory report: {report['Total']['bytes']} bytes in total.")
+    return report
+
+def formatBytes(size):
+    """Formats a byte count, e.g. 1536 -> "1.5 KiB"."""
+    for unit in ("bytes", "KiB", "MiB"):
+        if size < 1024 or unit == "MiB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def formatMemoryReport(report):
+    """Formats a memoryReport as a table."""
+    lines = []
+    for name, entry in report.items():
+        line = f"{name:<16}{formatBytes(entry['bytes']):>12}"
+        if entry.get("detail"):
+            line += f"  {entry['detail']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,195 @@
+#####################
+# A dock showing the whole pattern, for finding a spot on a large one. The
+# beads are drawn into an image at one pixel per bead, or one pixel per
+# step x step beads for patterns over MAX_SIDE beads across, and the part
+# shown in the BeadworkView is outlined. Clicking or dragging centers the
+# view on that spot. Toggled from View > Minimap.
+#
+# The image is kept in the grid's own orientation, so flipping the
+# orientation only changes how it is drawn. It is updated pixel by pixel
+# from each dataChanged range; only a change of the pattern's size or a
+# model reset renders it again from the whole pattern, when next painted.
+#####################
+
+import logging
+from math import ceil
+
+import numpy as np
+
+from PySide6.QtCore import QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QTransform
+from PySide6.QtWidgets import QAbstractItemView, QDockWidget, QWidget
+
+from BeadworkDesigner.ColorPool import colorPool
+
+logger = logging.getLogger(__name__)
+
+MAX_SIDE = 1024     # pixels; larger patterns are downsampled to fit
+OPAQUE = 0xFF000000
+VIEWPORT_COLOR = "#E00000"
+
+def sampleStep(rows, columns, maxSide=MAX_SIDE):
+    """Returns how many beads across and down one pixel of the minimap stands for."""
+    return max(1, ceil(max(rows, columns) / maxSide))
+
+class Minimap(QWidget):
+    """Draws the pattern of a BeadworkModel, outlining what a BeadworkView shows, and scrolls the view when clicked."""
+
+    def __init__(self, model, view, parent=None):
+        """Initializes the Minimap.
+
+        Args:
+            model (BeadworkModel): the pattern to show.
+            view (BeadworkView): the view to outline and scroll.
+        """
+        super().__init__(parent)
+        self.model = model
+        self.view = view
+
+        self.image = None   # built when first painted
+        self.maxSide = MAX_SIDE
+        self.step = 1
+        self.shape = (0, 0) # the grid's (rows, columns) the image was built for
+
+        model.dataChanged.connect(self.sourceDataChanged)
+        for signal in (model.rowsInserted, model.rowsRemoved, model.columnsInserted, model.columnsRemoved, model.modelReset):
+            signal.connect(self.invalidate)
+        model.layoutChanged.connect(self.sourceLayoutChanged)
+        for scrollBar in (view.horizontalScrollBar(), view.verticalScrollBar()):
+            scrollBar.valueChanged.connect(self.update)
+            scrollBar.rangeChanged.connect(self.update)
+
+        self.setMinimumSize(120, 120)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        logger.info("Minimap initialized.")
+
+    ### IMAGE
+
+    def rebuild(self):
+        """Renders the whole pattern into a new image."""
+        rows = self.model.grid.rows
+        self.shape = (len(rows), len(rows[0]) if rows else 0)
+        self.step = sampleStep(*self.shape, self.maxSide)
+        self.image = QImage(max(1, ceil(self.shape[1] / self.step)), max(1, ceil(self.shape[0] / self.step)), QImage.Format.Format_RGB32)
+        self.image.fill(QColor("#FFFFFF"))
+        if rows:
+            self.updateCells(0, 0, self.shape[0] - 1, self.shape[1] - 1)
+        logger.debug(f"Minimap rendered at {self.image.width()}x{self.image.height()}, {self.step} beads per pixel.")
+
+    def updateCells(self, top, left, bottom, right):
+        """Renders the pixels sampling the grid's beads from top, left to bottom, right, inclusive."""
+        step = self.step
+        # the first sampled row and column in the range
+        firstRow, firstColumn = ceil(top / step) * step, ceil(left / step) * step
+        if firstRow > bottom or firstColumn > right:
+            return
+        pixels = np.frombuffer(self.image.bits(), dtype=np.uint32).reshape(self.image.height(), self.image.bytesPerLine() // 4)
+        value = colorPool.value
+        x = firstColumn // step
+        for r in range(firstRow, bottom + 1, step):
+            row = self.model.grid.rows[r][firstColumn:right + 1:step]
+            pixels[r // step, x:x + len(row)] = np.fromiter(map(value, row), dtype=np.uint32, count=len(row)) | OPAQUE
+
+    def invalidate(self, *args):
+        """Renders the image again when it is next painted, after the pattern changed size or was replaced."""
+        self.image = None
+        self.update()
+
+    def sourceDataChanged(self, topLeft, bottomRight, roles=()):
+        if self.image is None:
+            return
+        # the range is in displayed rows and columns; the image is in the grid's
+        top, left = self.model.gridCell(topLeft.row(), topLeft.column())
+        bottom, right = self.model.gridCell(bottomRight.row(), bottomRight.column())
+        self.updateCells(min(top, bottom), min(left, right), max(top, bottom), max(left, right))
+        self.update()
+
+    def sourceLayoutChanged(self, *args):
+        # a resize changes the grid's size; flipping the orientation does not
+        rows = self.model.grid.rows
+        if (len(rows), len(rows[0]) if rows else 0) != self.shape:
+            self.invalidate()
+        else:
+            self.update()
+
+    ### GEOMETRY
+
+    def beadScale(self):
+        """Returns the size of one bead in the widget, in pixels, and the top left corner of the pattern."""
+        rows, columns = self.model.rowCount(None), self.model.columnCount(None)
+        scale = min(self.width() / max(columns, 1), self.height() / max(rows, 1))
+        return scale, (self.width() - columns * scale) / 2, (self.height() - rows * scale) / 2
+
+    def cellAt(self, position):
+        """Returns the displayed (row, column) under a point in the widget, clamped to the pattern."""
+        scale, x, y = self.beadScale()
+        row = int((position.y() - y) / scale)
+        column = int((position.x() - x) / scale)
+        return (min(max(row, 0), self.model.rowCount(None) - 1), min(max(column, 0), self.model.columnCount(None) - 1))
+
+    def visibleCells(self):
+        """Returns the displayed (top, left, bottom, right) beads visible in the view."""
+        viewport = self.view.viewport()
+        top, left = max(self.view.rowAt(0), 0), max(self.view.columnAt(0), 0)
+        bottom, right = self.view.rowAt(viewport.height() - 1), self.view.columnAt(viewport.width() - 1)
+        return (top, left,
+                bottom if bottom >= 0 else self.model.rowCount(None) - 1,
+                right if right >= 0 else self.model.columnCount(None) - 1)
+
+    ### EVENTS
+
+    def paintEvent(self, event):
+        if self.image is None:
+            self.rebuild()
+        if not self.model.rowCount(None) or not self.model.columnCount(None):
+            return
+        scale, x, y = self.beadScale()
+        beadsDown, beadsAcross = self.image.height() * self.step, self.image.width() * self.step
+
+        painter = QPainter(self)
+        painter.save()
+        painter.translate(x, y)
+        if self.model.transposed:
+            painter.setTransform(QTransform(0, 1, 1, 0, 0, 0), True)   # swaps x and y
+        painter.drawImage(QRectF(0, 0, beadsAcross * scale, beadsDown * scale), self.image)
+        painter.restore()
+
+        top, left, bottom, right = self.visibleCells()
+        painter.setPen(QPen(QColor(VIEWPORT_COLOR), 1))
+        painter.drawRect(QRectF(x + left * scale, y + top * scale, (right - left + 1) * scale, (bottom - top + 1) * scale))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.centerViewAt(event.position())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self.centerViewAt(event.position())
+
+    def centerViewAt(self, position):
+        """Scrolls the view so the bead under position is in the middle of it."""
+        row, column = self.cellAt(position)
+        self.view.scrollTo(self.model.index(row, column), QAbstractItemView.ScrollHint.PositionAtCenter)
+
+class MinimapDock(QDockWidget):
+    """A dock holding a Minimap of a MainWindow's pattern."""
+
+    closed = Signal()
+
+    def __init__(self, mainWindow):
+        """Initializes the MinimapDock.
+
+        Args:
+            mainWindow (MainWindow): the window whose pattern and view are shown.
+        """
+        super().__init__("Minimap", mainWindow)
+        self.setObjectName("minimapDock")
+        self.minimap = Minimap(mainWindow.origModel, mainWindow.beadworkView)
+        self.setWidget(self.minimap)
+
+    def closeEvent(self, event):
+        """Emits closed so the menu action can be unchecked."""
+        super().closeEvent(event)
+        self.closed.emit()
@@ -0,0 +1,147 @@
+#####################
+# A dock showing live counters and timings from BeadworkDesigner.Instrumentation.
+# Toggled from View > Performance Panel, or shown at startup with --debug.
+# Rates are computed from the difference between two refreshes. Memory,
+# including the undo stack's, is only measured on request, as walking a large
+# pattern or a large undo command takes a while.
+#####################
+
+import logging
+import time
+
+from PySide6.QtCore import QTimer, Signal, SIGNAL
+from PySide6.QtWidgets import (QDockWidget,
+                               QFormLayout,
+                               QLabel,
+                               QListWidget,
+                               QPushButton,
+                               QVBoxLayout,
+                               QWidget)
+
+from BeadworkDesigner import Instrumentation
+from BeadworkDesigner.MemoryReport import SUBSYSTEMS, formatBytes, memoryReport
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 1000     # ms
+
+DATA_CHANGED = SIGNAL("dataChanged(QModelIndex,QModelIndex,QList<int>)")
+
+class PerformancePanel(QDockWidget):
+    """Shows dataChanged, paint, color list and undo stack statistics for a MainWindow."""
+
+    closed = Signal()
+
+    def __init__(self, mainWindow):
+        """Initializes the PerformancePanel.
+
+        Args:
+            mainWindow (MainWindow): the window whose model and undo stack are shown.
+        """
+        super().__init__("Performance", mainWindow)
+        self.setObjectName("performancePanel")
+
+        self.mainWindow = mainWindow
+
+        layout = QVBoxLayout()
+        form = QFormLayout()
+        self.labels = {}
+        for key, text in (("dataChanged", "dataChanged / s:"),
+                          ("cells", "Beads per dataChanged:"),
+                          ("receivers", "dataChanged receivers:"),
+                          ("frames", "Frames / s:"),
+                          ("paints", "Bead paints / frame:"),
+                          ("paintTime", "Paint ms / frame:"),
+                          ("colors", "Color list update ms:"),
+                          ("undoDepth", "Undo stack depth:")):
+            self.labels[key] = QLabel("-")
+            form.addRow(text, self.labels[key])
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel(f"Last {Instrumentation.RECENT_COMMANDS} commands:"))
+        self.commandList = QListWidget()
+        layout.addWidget(self.commandList)
+
+        memoryForm = QFormLayout()
+        self.memoryLabels = {}
+        for name in [*SUBSYSTEMS, "Total"]:
+            self.memoryLabels[name] = QLabel("-")
+            memoryForm.addRow(f"{name}:", self.memoryLabels[name])
+        layout.addLayout(memoryForm)
+        self.measureMemoryButton = QPushButton("Measure Memory")
+        self.measureMemoryButton.clicked.connect(self.measureMemory)
+        layout.addWidget(self.measureMemoryButton)
+
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+        self.previous = Instrumentation.snapshot()
+        self.previousTime = time.perf_counter()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+        logger.info("PerformancePanel initialized.")
+
+    def refresh(self):
+        """Updates every statistic from what was recorded since the last refresh."""
+        now = time.perf_counter()
+        elapsed = max(now - self.previousTime, 1e-9)
+        counters, timings = Instrumentation.snapshot()
+        previousCounters, previousTimings = self.previous
+
+        def delta(name):
+            return counters[name] - previousCounters[name]
+
+        def timingDelta(name):
+            calls, total, _ = timings.get(name, (0, 0.0, 0.0))
+            previousCalls, previousTotal, _ = previousTimings.get(name, (0, 0.0, 0.0))
+            return calls - previousCalls, total - previousTotal
+
+        emissions = delta("dataChanged")
+        frames = delta("frames")
+        paints, paintTime = timingDelta("paint")
+
+        self.labels["dataChanged"].setText(f"{emissions / elapsed:.1f}")
+        self.labels["cells"].setText(f"{delta('dataChanged cells') / emissions:.1f}" if emissions else "-")
+        self.labels["receivers"].setText(str(self.mainWindow.model.receivers(DATA_CHANGED)))
+        self.labels["frames"].setText(f"{frames / elapsed:.1f}")
+        self.labels["paints"].setText(f"{paints / frames:.0f}" if frames else "-")
+        self.labels["paintTime"].setText(f"{paintTime * 1000 / frames:.2f}" if frames else "-")
+        if "evaluateModelForUniqueColors" in timings:
+            self.labels["colors"].setText(f"{timings['evaluateModelForUniqueColors'][2] * 1000:.2f}")
+
+        undoStack = self.mainWindow.undoStack
+        self.labels["undoDepth"].setText(f"{undoStack.index()} of {undoStack.count()}")
+
+        self.commandList.clear()
+        self.commandList.addItems([f"{seconds * 1000:8.2f} ms  {description}" for description, seconds in reversed(Instrumentation.recentCommands)])
+
+        self.previous = (counters, timings)
+        self.previousTime = now
+
+    def measureMemory(self):
+        """Fills in the memory held by each subsystem."""
+        for name, entry in memoryReport(self.mainWindow).items():
+            self.memoryLabels[name].setText(formatBytes(entry["bytes"]))
+            if entry.get("detail"):
+                self.memoryLabels[name].setToolTip(entry["detail"])
+
+    def showEvent(self, event):
+        """Starts refreshing while the panel is visible."""
+        self.previous = Instrumentation.snapshot()
+        self.previousTime = time.perf_counter()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        """Stops refreshing while the panel is hidden."""
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        """Emits closed so the menu action can be unchecked."""
+        super().closeEvent(event)
+        self.closed.emit()
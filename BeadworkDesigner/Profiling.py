@@ -0,0 +1,170 @@
+#####################
+# cProfile and tracemalloc capture, started and stopped from the UI
+# (View > Start Profiling) or for the whole run with --profile.
+#
+# On stop, two files are written to the profile directory: a .prof file, for
+# pstats or snakeviz, and a text report of the top allocations made while
+# profiling. Both are named after the project's dimensions and color count,
+# e.g. 20241019-153000-bucket-fill-120x80-14colors.prof, so runs on
+# different patterns can be told apart.
+#
+# Profiling can also be scoped to the next command: it starts when armed and
+# stops as soon as the undo stack changes, e.g. after one bucket fill or one
+# orientation change, including the work that built the command.
+#####################
+
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import re
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+# next to the logs directory
+profileDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+
+TOP_ALLOCATIONS = 25    # lines in the allocation report
+TOP_FUNCTIONS = 25      # functions by cumulative time in the allocation report's summary
+TRACEBACK_FRAMES = 1    # frames kept by tracemalloc; more is slower but groups allocations by caller
+
+def projectTags(window):
+    """Returns the tags describing window's project: width, height and color count."""
+    return {"width": window.origModel.columnCount(None),
+            "height": window.origModel.rowCount(None),
+            "colors": window.colorListModel.rowCount(None)}
+
+def slug(text):
+    """Returns text as a file name part, e.g. "Bucket fill" -> "bucket-fill"."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+class Profiler:
+    """Captures a cProfile profile and tracemalloc allocations between start() and stop()."""
+
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str, optional): where reports are written. Defaults to profileDir.
+        """
+        self.directory = directory or profileDir
+        self.profile = None
+        self.startSnapshot = None
+        self.label = None
+        self.tracingStarted = False     # whether we started tracemalloc, so we only stop it then
+        self.undoStack = None           # while scoped to the next command
+        self.tags = None
+
+    def isRunning(self):
+        return self.profile is not None
+
+    def start(self, label="session"):
+        """Starts profiling the main thread and tracing allocations.
+
+        Args:
+            label (str, optional): names the reports. Defaults to "session".
+
+        Raises:
+            RuntimeError: if already profiling.
+        """
+        if self.isRunning():
+            raise RuntimeError("already profiling")
+        self.label = label
+        self.tracingStarted = not tracemalloc.is_tracing()
+        if self.tracingStarted:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        self.startSnapshot = tracemalloc.take_snapshot()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        logger.info(f"Profiling started ({label}).")
+
+    def stop(self, tags=None):
+        """Stops profiling and writes the reports.
+
+        Args:
+            tags (dict, optional): describe the project, as returned by projectTags. Defaults to None.
+
+        Returns:
+            tuple[str, str]: the .prof file and the allocation report, or None if not profiling.
+        """
+        if not self.isRunning():
+            return None
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self.tracingStarted:
+            tracemalloc.stop()
+        profile, self.profile = self.profile, None
+        self.stopWatchingUndoStack()
+
+        tags = tags or {}
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.baseName(tags))
+        profile.dump_stats(base + ".prof")
+        with open(base + ".allocations.txt", "w") as file:
+            file.write(self.report(profile, snapshot, tags))
+        logger.info(f"Profiling stopped, wrote {base}.prof and {base}.allocations.txt.")
+        return base + ".prof", base + ".allocations.txt"
+
+    def baseName(self, tags):
+        name = datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + slug(self.label)
+        if "width" in tags and "height" in tags:
+            name += f"-{tags['width']}x{tags['height']}"
+        if "colors" in tags:
+            name += f"-{tags['colors']}colors"
+        return name
+
+    def report(self, profile, snapshot, tags):
+        """Returns the text report: the tags, the top allocations made since start()
+        and the top functions by cumulative time."""
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        differences = snapshot.filter_traces(filters).compare_to(self.startSnapshot.filter_traces(filters), "lineno")
+        grown = [stat for stat in differences if stat.size_diff > 0]
+
+        lines = [f"# {self.label}"]
+        lines += [f"# {key}: {value}" for key, value in tags.items()]
+        lines.append(f"# allocated since start: {sum(stat.size_diff for stat in grown) / 1024:.1f} KiB")
+        lines.append("")
+        lines.append(f"Top {TOP_ALLOCATIONS} allocations:")
+        for stat in grown[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>8} blocks  {frame.filename}:{frame.lineno}")
+        lines.append("")
+
+        functions = io.StringIO()
+        pstats.Stats(profile, stream=functions).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        lines.append(functions.getvalue())
+        return "\n".join(lines)
+
+    ########################################
+    # SCOPED TO ONE COMMAND
+    ########################################
+
+    def profileNextCommand(self, undoStack, label="command", tags=None):
+        """Starts profiling now and stops when undoStack next changes, i.e. once the next
+        command has been pushed (or undone or redone).
+
+        Args:
+            undoStack (QUndoStack): the stack to watch.
+            label (str, optional): names the reports. Defaults to "command".
+            tags (function, optional): called with no arguments when profiling stops, returns the tags.
+                                       Defaults to None.
+        """
+        self.start(label)
+        self.undoStack = undoStack
+        self.tags = tags
+        undoStack.indexChanged.connect(self.commandFinished)
+
+    def commandFinished(self, index):
+        command = self.undoStack.command(index - 1) if index > 0 else None
+        if command is not None and self.label == "command":
+            self.label = f"command-{command.text()}"
+        tags = self.tags() if self.tags else None
+        self.stop(tags)
+
+    def stopWatchingUndoStack(self):
+        if self.undoStack is not None:
+            self.undoStack.indexChanged.disconnect(self.commandFinished)
+            self.undoStack = None
+            self.tags = None
@@ -0,0 +1,277 @@
+#####################
+# Recording and replaying editing sessions, to turn sessions that feel slow
+# into reproducible performance tests.
+#
+# A session file is JSON lines: a header with the project as it was when
+# recording started, then one line per action with its time in seconds since
+# the start, e.g. {"t": 1.25, "action": "click", "args": {"row": 3, "column": 4}}.
+# MainWindow methods are marked with @recordedAction; only the outermost
+# action is recorded, so e.g. a load that changes orientation is one action.
+#
+# Replaying runs every action against a MainWindow, as fast as possible or at
+# the recorded pace, and reports the latency percentiles of each action type.
+#####################
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+import time
+from functools import wraps
+
+from PySide6.QtCore import Qt
+
+from BeadworkDesigner.core.Blocks import blockFromText
+
+logger = logging.getLogger(__name__)
+
+SESSION_VERSION = 1
+
+# mode name -> the MainWindow action that selects it
+MODE_ACTIONS = {"selection": "selectionMode", "color": "colorMode", "clear": "clearMode", "bucket": "bucketMode", "shape": "shapeMode"}
+
+PERCENTILES = (50, 90, 99)
+
+def recordedAction(name, describe=None):
+    """Decorator for MainWindow methods that are user actions. While a session
+    is being recorded, each outermost call is written to it.
+
+    Args:
+        name (str): the action name in the session file.
+        describe (function, optional): called with the same arguments as the method, returns the
+                                       action's arguments as a JSON-serializable dict. Defaults to None.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(window, *args, **kwargs):
+            recorder = window.sessionRecorder
+            if recorder is None or recorder.depth:
+                return func(window, *args, **kwargs)
+            recorder.record(name, describe(window, *args, **kwargs) if describe else {})
+            recorder.depth += 1
+            try:
+                return func(window, *args, **kwargs)
+            finally:
+                recorder.depth -= 1
+        return wrapper
+    return decorator
+
+def currentProject(window):
+    """Returns the window's project as saved, with its orientation as currently displayed."""
+    configs = dict(window.project_configs)
+    configs["defaultOrientation"] = window.orientationOptions[window.currentOrientation]
+    return {"configs": configs, "project": list(window.origModel.exportData())}
+
+class SessionRecorder:
+    """Writes the actions of a MainWindow to a session file as they happen."""
+
+    def __init__(self, window, filename):
+        """Starts recording window to filename.
+
+        Args:
+            window (MainWindow): the window to record.
+            filename (str): the session file to write, replaced if it exists.
+        """
+        self.filename = filename
+        self.depth = 0          # > 0 while an action is running, so the actions it calls are not recorded
+        self.actions = 0
+        self.started = time.perf_counter()
+        self.file = open(filename, "w", buffering=1)    # line buffered, so a hang or crash keeps what was recorded
+        header = {"session": SESSION_VERSION, "started": datetime.datetime.now().isoformat(timespec="seconds")}
+        header.update(currentProject(window))
+        self.file.write(json.dumps(header) + "\n")
+        logger.info(f"Recording session to {filename}.")
+
+    def record(self, action, args=None):
+        """Writes one action, timestamped now."""
+        if self.file is None:
+            return
+        self.file.write(json.dumps({"t": round(time.perf_counter() - self.started, 4), "action": action, "args": args or {}}) + "\n")
+        self.actions += 1
+
+    def stop(self):
+        """Stops recording and closes the session file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            logger.info(f"Recorded {self.actions} action(s) to {self.filename}.")
+
+def readSession(filename):
+    """Reads a session file.
+
+    Returns:
+        tuple[dict, list[dict]]: the header and the actions.
+
+    Raises:
+        ValueError: if the file is not a session.
+    """
+    with open(filename) as file:
+        lines = [json.loads(line) for line in file if line.strip()]
+    if not lines or lines[0].get("session") != SESSION_VERSION:
+        raise ValueError("not a session file")
+    return lines[0], lines[1:]
+
+########################################
+# REPLAY
+########################################
+
+def replayClick(window, args, directory):
+    index = window.model.index(args["row"], args["column"])
+    window.beadworkView.setCurrentIndex(index)      # as a mouse press would
+    window.handleViewClicked(index)
+
+def replayColorListClick(window, args, directory):
+    proxy = window.colorListModel
+    for row in range(proxy.rowCount(None)):
+        index = proxy.index(row, 0)
+        if proxy.data(index, Qt.ItemDataRole.DisplayRole) == args["color"]:
+            window.handleColorListClicked(index)
+            return
+    logger.warning(f"Color {args['color']} is not in the color list, skipped.")
+
+def replayColorDialog(window, args, directory):
+    if args.get("current"):
+        window.beadworkView.setCurrentIndex(window.model.index(*args["current"]))
+    if args.get("selected") is not None:
+        window.beadworkView.selectListOfBeads([window.model.index(row, column) for row, column in args["selected"]])
+    if window.currentColor.text() != args["color"]:
+        window.currentColor.setText(args["color"])  # calls changeColorFromCurrentColorDialog, as typing did
+    else:
+        window.changeColorFromCurrentColorDialog(args["color"])
+
+def replayReduceColors(window, args, directory):
+    window.reduceColorsCountEdit.setText(str(args["count"]))
+    window.reduceColorsMethodComboBox.setCurrentText(args["method"])
+    window.reduceColors()
+
+def replaySave(window, args, directory):
+    window.exportProject(os.path.join(directory, os.path.basename(args["filename"]) or "session.json"))
+
+def replayLoad(window, args, directory):
+    filename = os.path.join(directory, "loaded-" + (os.path.basename(args["filename"]) or "session.json"))
+    with open(filename, "w") as file:
+        json.dump(args["project"], file)
+    window.importProject(filename, background=False)   # applied before the next action replays
+
+REPLAYERS = {
+    "click": replayClick,
+    "colorListClick": replayColorListClick,
+    "colorDialog": replayColorDialog,
+    "mode": lambda window, args, directory: getattr(window, MODE_ACTIONS[args["mode"]]).trigger(),
+    "orientation": lambda window, args, directory: window.orientationComboBox.setCurrentText(args["orientation"]),
+    "width": lambda window, args, directory: window.changeWidthTo(args["value"]),
+    "height": lambda window, args, directory: window.changeHeightTo(args["value"]),
+    "resize": lambda window, args, directory: window.resizeTo(args["width"], args["height"], args["anchor"]),
+    "addColumn": lambda window, args, directory: window.addColumn(),
+    "removeColumn": lambda window, args, directory: window.removeColumn(),
+    "addRow": lambda window, args, directory: window.addRow(),
+    "removeRow": lambda window, args, directory: window.removeRow(),
+    "reduceColors": replayReduceColors,
+    "undo": lambda window, args, directory: window.undoStack.undo(),
+    "redo": lambda window, args, directory: window.undoStack.redo(),
+    "zoomIn": lambda window, args, directory: window.zoomIn(),
+    "zoomOut": lambda window, args, directory: window.zoomOut(),
+    "zoomReset": lambda window, args, directory: window.zoomReset(),
+    "beadStyle": lambda window, args, directory: window.setBeadStyle(args["style"]),
+    "stroke": lambda window, args, directory: window.paintStroke(args["points"]),
+    "shape": lambda window, args, directory: window.drawShape(args["shape"], args["points"]),
+    "paste": lambda window, args, directory: window.pasteBlock(args["row"], args["column"], blockFromText(args["text"]), args["description"]),
+    "save": replaySave,
+    "load": replayLoad,
+    "new": lambda window, args, directory: window.loadNewProject(),
+}
+
+def replayWindow(project_configs=None):
+    """Returns a new MainWindow to replay in, with the user's app configs, or
+    the defaults, but debug off, so new beads are blank rather than random and
+    a replay gives the same pattern every time.
+
+    Args:
+        project_configs (dict, optional): the project configs. Defaults to those saved with the app configs.
+    """
+    from BeadworkDesigner.ConfigService import readConfigs
+    from BeadworkDesigner.MainWindow import MainWindow
+
+    saved_project_configs, app_configs = readConfigs()
+    app_configs["debug"] = False
+    return MainWindow(app_configs=app_configs, project_configs=project_configs if project_configs is not None else saved_project_configs)
+
+def replaySession(filename, realTime=False, window=None):
+    """Replays a session file against a MainWindow. A QApplication must exist.
+
+    Args:
+        filename (str): the session file.
+        realTime (bool, optional): wait until each action's recorded time before running it. Defaults to False.
+        window (MainWindow, optional): the window to replay in. Defaults to a new, shown one, closed afterwards.
+
+    Returns:
+        dict: action name mapped to the list of latencies, in seconds, of each time it ran.
+    """
+    from PySide6.QtWidgets import QApplication
+
+    header, actions = readSession(filename)
+    app = QApplication.instance()
+    ownWindow = window is None
+    if ownWindow:
+        window = replayWindow(dict(header["configs"]))
+        window.show()
+
+    latencies = {}
+    with tempfile.TemporaryDirectory(prefix="beadwork-replay-") as directory:
+        # start from the project as it was when recording started
+        replayLoad(window, {"filename": "start.json", "project": {"configs": header["configs"], "project": header["project"]}}, directory)
+        window.tasks.waitForDone()
+        app.processEvents()
+        window.undoStack.clear()
+        app.processEvents()
+
+        started = time.perf_counter()
+        for entry in actions:
+            replayer = REPLAYERS.get(entry["action"])
+            if replayer is None:
+                logger.warning(f"Unknown action {entry['action']}, skipped.")
+                continue
+            if realTime:
+                while time.perf_counter() - started < entry["t"]:
+                    app.processEvents()
+                    time.sleep(0.001)
+            actionStarted = time.perf_counter()
+            replayer(window, entry["args"], directory)
+            window.tasks.waitForDone()  # include any work the action started on a worker thread,
+            app.processEvents()         # applying its result, and the repaints the action caused
+            latencies.setdefault(entry["action"], []).append(time.perf_counter() - actionStarted)
+    if ownWindow:
+        window.close()
+        window.deleteLater()
+    return latencies
+
+def percentile(values, p):
+    """Returns the p-th percentile of values, interpolating between the nearest ranks."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def latencyReport(latencies):
+    """Summarizes replay latencies.
+
+    Returns:
+        dict: action name mapped to {"count", "p50", "p90", "p99", "max"}, in milliseconds.
+    """
+    report = {}
+    for action, values in sorted(latencies.items()):
+        summary = {"count": len(values)}
+        for p in PERCENTILES:
+            summary[f"p{p}"] = round(percentile(values, p) * 1000, 3)
+        summary["max"] = round(max(values) * 1000, 3)
+        report[action] = summary
+    return report
+
+def formatLatencyReport(report):
+    """Formats a latencyReport as a table."""
+    lines = [f"{'action':<18}{'count':>7}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES) + f"{'max ms':>10}"]
+    for action, summary in report.items():
+        lines.append(f"{action:<18}{summary['count']:>7}" + "".join(f"{summary[f'p{p}']:>10.2f}" for p in PERCENTILES) + f"{summary['max']:>10.2f}")
+    return "\n".join(lines)
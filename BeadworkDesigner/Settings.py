@@ -1,5 +1,4 @@
 import logging
-import os
 
 from PySide6.QtWidgets import (QPushButton,
                                QFormLayout,
@@ -8,25 +7,22 @@ from PySide6.QtWidgets import (QPushButton,
                                QVBoxLayout,
                                QWidget)
 
-from BeadworkDesigner import utils
+from BeadworkDesigner.ConfigService import ConfigService, coerceConfig, configFile
 
 logger = logging.getLogger(__name__)
 
-base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
-bin_dir = os.path.join(base_dir, "bin")
-configFile = os.path.join(bin_dir, "config.json")
-
 # TODO: add capability to return config to default_config.py
 
 class SettingsWindow(QWidget):
     """A window for changing the application and project configurations."""
 
-    def __init__(self, app_configs, project_configs):
+    def __init__(self, app_configs, project_configs, config=None):
         """Initializes the settings window.
 
         Args:
             app_configs (dict): The application configurations.
             project_configs (dict): The project configurations.
+            config (ConfigService, optional): The service that saves the configs. Defaults to a new one for bin/config.json.
         """
         super().__init__()
 
@@ -35,6 +31,7 @@ class SettingsWindow(QWidget):
 
         self.app_configs = app_configs
         self.project_configs = project_configs
+        self.config = config if config is not None else ConfigService(app_configs, project_configs, configFile, watch=False)
 
         mainlayout = QVBoxLayout()
 
@@ -104,17 +101,30 @@ class SettingsWindow(QWidget):
         for key in self.project_configs.keys():
             self.projectConfigForm.addRow(key, QLineEdit(str(self.project_configs[key])))   
 
-    # TODO: does not work because I just re-wrote the config file with the same data
+    def readForm(self, form, configs):
+        """Copies the values typed into form back into configs, keeping the type of each config.
+
+        Args:
+            form (QFormLayout): The form to read.
+            configs (dict): The configs shown in the form.
+        """
+        for row in range(form.rowCount()):
+            key = form.itemAt(row, QFormLayout.ItemRole.LabelRole).widget().text()
+            text = form.itemAt(row, QFormLayout.ItemRole.FieldRole).widget().text()
+            if key in configs:
+                configs[key] = coerceConfig(text, configs[key])
+
     def saveAppConfig(self):
         """Saves the app configurations to the config file."""
-        default_project_configs, _ = utils.readConfigFile(configFile) # not overwriting project configs, just app configs
-        utils.saveConfigFile({"app_configs": self.app_configs, "project_configs": default_project_configs}, configFile)
+        self.readForm(self.appConfigForm, self.app_configs)
+        self.config.setLayers(app_configs=self.app_configs)
+        self.config.save()  # the saved default project configs are kept, without re-reading the file
 
-    # TODO: does not work because I just re-wrote the config file with the same data
     def saveDefaultProjectConfig(self):
         """Saves the default project configurations to the config file."""
-        _, default_app_configs = utils.readConfigFile(configFile) # not overwriting project configs, just app configs
-        utils.saveConfigFile({"app_configs": default_app_configs, "project_configs": self.project_configs}, configFile)
+        defaults = dict(self.project_configs)   # the defaults for new projects, the open project is left as it is
+        self.readForm(self.projectConfigForm, defaults)
+        self.config.saveDefaultProjectConfigs(defaults)
 
     def closeEvent(self, event):
         """Logs that the settings window was closed."""
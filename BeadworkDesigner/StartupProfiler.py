@@ -0,0 +1,96 @@
+#####################
+# Records how long each phase of startup takes, from process start to the
+# first paint of the main window. Enabled with --profile-startup; when
+# disabled, mark() does nothing so the calls can stay in place.
+#####################
+
+import logging
+import os
+import sys
+import time
+
+from PySide6.QtCore import QEvent, QObject
+
+logger = logging.getLogger(__name__)
+
+def processAge():
+    """Returns how long ago, in seconds, the process started, or None if this
+    cannot be read (only supported on Linux, to the nearest clock tick)."""
+    try:
+        with open("/proc/self/stat") as file:
+            startTicks = int(file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+        return max(0.0, uptime - startTicks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class StartupProfiler(QObject):
+    """Records named phases of startup and prints a breakdown after the first paint."""
+
+    def __init__(self):
+        super().__init__()
+
+        self.enabled = False
+        self.phases = []        # (name, perf_counter at the end of the phase)
+        self.started = time.perf_counter()
+        self.interpreterStartup = None
+        self.watched = None
+
+    def start(self, started=None):
+        """Enables the profiler.
+
+        Args:
+            started (float, optional): perf_counter() taken as early as possible in the
+                                       script. Defaults to now.
+        """
+        self.enabled = True
+        self.started = started if started is not None else time.perf_counter()
+        age = processAge()
+        if age is not None:
+            # time spent before the script's first line: interpreter startup and site imports
+            self.interpreterStartup = max(0.0, age - (time.perf_counter() - self.started))
+
+    def mark(self, phase):
+        """Records that phase has just finished."""
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter()))
+
+    def watchFirstPaint(self, widget, out=None):
+        """Marks "first paint" and prints the report when widget is first painted.
+
+        Args:
+            widget (QWidget): the widget to watch, usually the beadwork view's viewport.
+            out (file, optional): where to print the report. Defaults to sys.stderr.
+        """
+        if not self.enabled:
+            return
+        self.out = out or sys.stderr
+        self.watched = widget
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if watched is self.watched and event.type() == QEvent.Type.Paint:
+            self.watched.removeEventFilter(self)
+            self.watched = None
+            self.mark("first paint")
+            print(self.report(), file=self.out)
+        return False
+
+    def report(self):
+        """Returns the breakdown of the recorded phases as a table, in milliseconds."""
+        lines = [f"{'phase':<28}{'ms':>9}{'total ms':>11}"]
+        total = 0.0
+        if self.interpreterStartup is not None:
+            total = self.interpreterStartup * 1000
+            lines.append(f"{'interpreter startup':<28}{total:>9.1f}{total:>11.1f}")
+        previous = self.started
+        for phase, end in self.phases:
+            elapsed = (end - previous) * 1000
+            total += elapsed
+            lines.append(f"{phase:<28}{elapsed:>9.1f}{total:>11.1f}")
+            previous = end
+        return "\n".join(lines)
+
+# shared by BeadworkDesigner.py and MainWindow
+profiler = StartupProfiler()
@@ -0,0 +1,74 @@
+#####################
+# Brush strokes: click and drag painting in color and clear mode.
+#
+# Mouse moves arrive far apart on a fast stroke, and Qt merges them when the
+# GUI thread is busy, so each sample is joined to the previous one with a
+# straight line of beads and none are skipped. The beads are painted on the
+# model at most once per frame, as one setCells, and the whole stroke is
+# pushed as one undo command when the mouse is released.
+#####################
+
+import logging
+
+from PySide6.QtCore import QObject, QTimer
+
+from BeadworkDesigner.core.Shapes import lineCells
+
+logger = logging.getLogger(__name__)
+
+FRAME_INTERVAL = 16     # ms
+
+class Stroke(QObject):
+    """A brush stroke being drawn."""
+
+    def __init__(self, target, color, parent=None):
+        """Initializes the Stroke.
+
+        Args:
+            target (FixedOrientation): the model's editing methods in the orientation the stroke is drawn in.
+            color (str): the hex color painted.
+        """
+        super().__init__(parent)
+
+        self.target = target
+        self.color = color
+        self.oldCells = {}  # (row, column) -> color before the stroke, for every bead it crossed
+        self.pending = {}   # (row, column) -> color, not painted on the model yet
+        self.points = []    # the (row, column) of every sample, to record the stroke
+        self.last = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    def addPoint(self, row, column):
+        """Extends the stroke to the bead at row, column, through every bead on the way."""
+        self.points.append((row, column))
+        cells = [(row, column)] if self.last is None else lineCells(*self.last, row, column)
+        self.last = (row, column)
+
+        oldCells, pending, color, cellColor = self.oldCells, self.pending, self.color, self.target.cellColor
+        for cell in cells:
+            if cell not in oldCells:
+                old = oldCells[cell] = cellColor(*cell)
+                if old != color:
+                    pending[cell] = color
+        if pending and not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Paints the beads added since the last frame."""
+        if self.pending:
+            self.target.setCells(self.pending)
+            self.pending = {}
+
+    def finish(self):
+        """Paints what is left and returns the beads the stroke changed.
+
+        Returns:
+            dict: (row, column) mapped to the new color, for each bead that changed color.
+        """
+        self.timer.stop()
+        self.flush()
+        return {cell: self.color for cell, old in self.oldCells.items() if old != self.color}
@@ -0,0 +1,201 @@
+#####################
+# Long operations (bucket fills, color reduction, image imports, saving and
+# loading) on a QThreadPool, so the window keeps responding.
+#
+# A task's work function runs on a worker thread with an immutable snapshot
+# of the pattern and must not touch any widget or model. It reports progress
+# through the function it is given, which also raises TaskCancelled once the
+# task has been cancelled, so cancellation is cooperative. Its result is
+# applied on the GUI thread, usually by pushing one undoable command.
+#
+# The grid's revision is recorded when a task starts; if the pattern was
+# edited while the task ran, its result would overwrite that edit, so it is
+# rejected instead of applied.
+#
+# Saves are not cancellable: cancelling one part way, e.g. when the window
+# closes right after Save, would lose the file the user asked for.
+#
+# Patterns smaller than BACKGROUND_BEADS are processed synchronously, through
+# the same path, as a worker thread would only add latency.
+#####################
+
+import logging
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_BEADS = 250_000  # patterns with at least this many beads are processed on a worker thread
+
+class TaskCancelled(Exception):
+    """Raised by a task's progress function once the task has been cancelled."""
+
+class TaskSignals(QObject):
+    """The signals of a Task; QRunnable is not a QObject, so cannot have its own."""
+
+    progress = Signal(object, float)    # task, fraction done
+    finished = Signal(object, object)   # task, result
+    failed = Signal(object, str)        # task, error message
+    cancelled = Signal(object)          # task
+
+class Task(QRunnable):
+    """One unit of background work.
+
+    Attributes:
+        name (str): shown in the status bar, e.g. "Reduce colors".
+        revision (int): the grid revision when the task was submitted, or None if it does not edit the pattern.
+        cancellable (bool): whether cancel() stops the task.
+    """
+
+    def __init__(self, name, work, args=(), apply=None, revision=None, cancellable=True):
+        """
+        Args:
+            name (str): shown in the status bar.
+            work (function): called on the worker thread as work(progress, *args); progress(fraction)
+                             reports progress and raises TaskCancelled if the task was cancelled.
+            args (tuple, optional): the arguments of work; must not be modified by either thread. Defaults to ().
+            apply (function, optional): called on the GUI thread with the result. Defaults to None.
+            revision (int, optional): the grid revision the work is based on. Defaults to None.
+            cancellable (bool, optional): whether cancel() stops the task. Defaults to True.
+        """
+        super().__init__()
+        self.setAutoDelete(False)   # kept by the TaskManager until it has finished
+
+        self.name = name
+        self.work = work
+        self.args = args
+        self.apply = apply
+        self.revision = revision
+        self.cancellable = cancellable
+        self.cancelRequested = False
+        self.signals = TaskSignals()
+
+    def cancel(self):
+        """Asks the task to stop at its next progress report, unless it is not cancellable."""
+        if self.cancellable:
+            self.cancelRequested = True
+
+    def progress(self, fraction):
+        if self.cancelRequested:
+            raise TaskCancelled()
+        self.signals.progress.emit(self, fraction)
+
+    def run(self):
+        """Runs the work; never raises, the outcome is emitted instead."""
+        try:
+            self.progress(0.0)
+            result = self.work(self.progress, *self.args)
+            self.progress(1.0)
+        except TaskCancelled:
+            self.signals.cancelled.emit(self)
+        except Exception as e:
+            logger.exception(f"Task {self.name} failed.")
+            self.signals.failed.emit(self, str(e) or type(e).__name__)
+        else:
+            self.signals.finished.emit(self, result)
+
+class TaskManager(QObject):
+    """Runs Tasks for a MainWindow and applies their results on the GUI thread."""
+
+    progress = Signal(str, float)   # task name, fraction done
+    message = Signal(str)           # for the status bar
+    busyChanged = Signal(bool)      # whether any task is running
+    aboutToApply = Signal()         # before a result is checked and applied, e.g. to finish an edit in progress
+
+    def __init__(self, grid, parent=None, threadPool=None):
+        """
+        Args:
+            grid (function): returns the current core Grid, whose revision detects conflicting edits.
+            parent (QObject, optional): Defaults to None.
+            threadPool (QThreadPool, optional): Defaults to the global thread pool.
+        """
+        super().__init__(parent)
+        self.grid = grid
+        self.threadPool = threadPool or QThreadPool.globalInstance()
+        self.tasks = []
+        self.backgroundBeads = BACKGROUND_BEADS     # None to always run synchronously
+
+    def isBusy(self):
+        return bool(self.tasks)
+
+    def inBackground(self, beads):
+        """Returns whether work on a pattern of this many beads should run on a worker thread."""
+        return self.backgroundBeads is not None and beads >= self.backgroundBeads
+
+    def submit(self, name, work, args=(), apply=None, editsPattern=True, background=None, cancellable=True):
+        """Starts a task.
+
+        Args:
+            name (str): shown in the status bar.
+            work (function): see Task.
+            args (tuple, optional): see Task. Defaults to ().
+            apply (function, optional): called on the GUI thread with the result. Defaults to None.
+            editsPattern (bool, optional): reject the result if the pattern changes meanwhile. Defaults to True.
+            background (bool, optional): run on a worker thread. Defaults to whether the pattern is large.
+            cancellable (bool, optional): whether cancelAll stops it; False for saves. Defaults to True.
+
+        Returns:
+            Task: the task, e.g. to cancel it.
+        """
+        grid = self.grid()
+        task = Task(name, work, args, apply, grid.revision if editsPattern else None, cancellable)
+        task.signals.progress.connect(self.taskProgress)
+        task.signals.finished.connect(self.taskFinished)
+        task.signals.failed.connect(self.taskFailed)
+        task.signals.cancelled.connect(self.taskCancelled)
+
+        self.tasks.append(task)
+        if len(self.tasks) == 1:
+            self.busyChanged.emit(True)
+
+        if background is None:
+            background = self.inBackground(grid.rowCount() * grid.columnCount())
+        logger.debug(f"Starting task {name} {'in the background' if background else 'synchronously'}.")
+        if background:
+            self.threadPool.start(task)
+        else:
+            task.run()
+        return task
+
+    def cancelAll(self):
+        """Asks every running task to stop. Tasks that are not cancellable, such as saves, still finish."""
+        for task in self.tasks:
+            task.cancel()
+
+    def waitForDone(self, msecs=-1):
+        """Waits for the worker threads, e.g. before closing. Results are applied when events are next processed."""
+        return self.threadPool.waitForDone(msecs)
+
+    ########################################
+    # SLOTS, on the GUI thread
+    ########################################
+
+    def taskProgress(self, task, fraction):
+        self.progress.emit(task.name, fraction)
+
+    def taskFinished(self, task, result):
+        self.remove(task)
+        if not task.cancelRequested:
+            self.aboutToApply.emit()
+        if task.cancelRequested:
+            self.message.emit(f"{task.name} cancelled")
+        elif task.revision is not None and task.revision != self.grid().revision:
+            logger.info(f"Task {task.name} rejected: the pattern was edited while it ran.")
+            self.message.emit(f"{task.name} discarded: the pattern was edited while it ran")
+        else:
+            if task.apply is not None:
+                task.apply(result)
+            self.message.emit(f"{task.name} done")
+
+    def taskFailed(self, task, error):
+        self.remove(task)
+        self.message.emit(f"{task.name} failed: {error}")
+
+    def taskCancelled(self, task):
+        self.remove(task)
+        self.message.emit(f"{task.name} cancelled")
+
+    def remove(self, task):
+        self.tasks.remove(task)
+        if not self.tasks:
+            self.busyChanged.emit(False)
@@ -0,0 +1,311 @@
+#####################
+# Headless batch mode: runs commands on many project files without creating
+# any widgets. Files are spread across a ProcessPoolExecutor; commands that
+# render (images and PDFs) create an offscreen QGuiApplication in each worker.
+#
+# Usage: python BeadworkDesigner.py <command> [options] files...
+#####################
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# commands that need a QGuiApplication to draw or load images
+RENDER_COMMANDS = {"convert", "export-png", "export-pdf"}
+# commands that need a QApplication, to create a MainWindow
+WIDGET_COMMANDS = {"replay", "memory"}
+COMMANDS = RENDER_COMMANDS | WIDGET_COMMANDS | {"stats", "reduce-colors", "validate"}
+
+def isCommand(argv):
+    """Checks if the command line asks for batch mode rather than the GUI.
+
+    Args:
+        argv (list): the command line arguments, without the program name.
+
+    Returns:
+        bool: True if the first argument is a batch command.
+    """
+    return bool(argv) and argv[0] in COMMANDS
+
+########################################
+# WORKER SETUP
+########################################
+
+_app = None
+
+def initRendering():
+    """Creates an offscreen QGuiApplication, once per process, so QImage,
+    QPainter and QPdfWriter can be used without a display."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+
+def initWidgets():
+    """Creates an offscreen QApplication, once per process, so a MainWindow
+    can be created without a display."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([sys.argv[0]])
+
+def ditherMethod(name):
+    """Converts a command line name, e.g. "floyd-steinberg", to a DitherMethod."""
+    from BeadworkDesigner.Dither import DitherMethod
+    return DitherMethod[name.upper().replace("-", "_")]
+
+def outputFilename(filename, options, extension):
+    """Returns where to write the result for filename: next to it, or in the
+    output directory if one was given."""
+    base = os.path.splitext(os.path.basename(filename))[0] + extension
+    directory = options.get("output_dir") or os.path.dirname(filename)
+    return os.path.join(directory, base)
+
+def loadPattern(filename):
+    """Loads a project file.
+
+    Returns:
+        tuple[dict, list, bool]: the project, its data in loom order, and whether it is displayed horizontally.
+    """
+    from BeadworkDesigner.core.Serialization import loadProject
+    project = loadProject(filename)
+    if not isinstance(project, dict) or "project" not in project:
+        raise ValueError("not a project file")
+    horizontal = project.get("configs", {}).get("defaultOrientation") == "Horizontal"
+    return project, project["project"], horizontal
+
+########################################
+# COMMANDS
+########################################
+
+def convert(filename, options):
+    """Converts an image into a project file."""
+    from BeadworkDesigner import Dither
+    from BeadworkDesigner.core.Serialization import newProject, saveProject
+    from BeadworkDesigner.utils import loadImage
+
+    ratio = options["bead_width"] / options["bead_height"]
+    data = Dither.quantizeImage(loadImage(filename, options["width"], ratio), options["colors"], ditherMethod(options["dither"]))
+    project = newProject(data, {"width": len(data[0]), "height": len(data), "defaultOrientation": "Vertical"})
+    output = outputFilename(filename, options, ".json")
+    saveProject(project, output)
+    return f"{len(data[0])}x{len(data)} -> {output}"
+
+def exportPNG(filename, options):
+    """Exports a project file to a PNG image, as it is displayed."""
+    from BeadworkDesigner import Export
+    _, data, horizontal = loadPattern(filename)
+    if horizontal:
+        data = [list(column) for column in zip(*data)]
+    output = outputFilename(filename, options, ".png")
+    Export.exportPNG(data, output, options["bead_width"], options["bead_height"], not options["no_grid"], not options["no_markers"])
+    return output
+
+def exportPDF(filename, options):
+    """Exports a project file to a PDF chart."""
+    from BeadworkDesigner import Export
+    _, data, horizontal = loadPattern(filename)
+    output = outputFilename(filename, options, ".pdf")
+    Export.exportPDF(data, output, options["bead_width"], options["bead_height"], horizontal, options["overlap"], options["page_size"])
+    return output
+
+def stats(filename, options):
+    """Counts the beads and colors of a project file."""
+    from BeadworkDesigner.core.Statistics import patternStats
+    _, data, horizontal = loadPattern(filename)
+    result = patternStats(data)
+    result["orientation"] = "Horizontal" if horizontal else "Vertical"
+    if options["json"]:
+        return result
+    top = ", ".join(f"{color} {count}" for color, count in list(result["colors"].items())[:options["top"]])
+    return f"{result['width']}x{result['height']} {result['orientation']}, {result['beads']} beads, {len(result['colors'])} colors ({top})"
+
+def reduceColors(filename, options):
+    """Reduces a project file to fewer of its own colors."""
+    from BeadworkDesigner import Dither
+    from BeadworkDesigner.core.Serialization import saveProject
+    project, data, _ = loadPattern(filename)
+    project["project"] = Dither.reduceColors(data, options["colors"], ditherMethod(options["dither"]))
+    output = filename if options["in_place"] else outputFilename(filename, options, ".json")
+    if output == filename and not options["in_place"]:
+        raise ValueError("refusing to overwrite the input, use --in-place or --output-dir")
+    saveProject(project, output)
+    return output
+
+def validate(filename, options):
+    """Checks that a project file is well formed."""
+    from BeadworkDesigner.core.Serialization import loadProject, projectProblems
+    problems = projectProblems(loadProject(filename))
+    if problems:
+        raise ValueError("; ".join(problems))
+    return "valid"
+
+def replay(filename, options):
+    """Replays a recorded session and reports the latency of each action type."""
+    from BeadworkDesigner.Session import formatLatencyReport, latencyReport, replaySession
+    report = latencyReport(replaySession(filename, realTime=options["real_time"]))
+    if options["json"]:
+        return {"actions": report}
+    return "\n" + formatLatencyReport(report)
+
+def memory(filename, options):
+    """Reports the memory each subsystem holds for a project file, or after replaying a session file."""
+    from BeadworkDesigner.MemoryReport import formatMemoryReport, memoryReport
+    from BeadworkDesigner.Session import replaySession, replayWindow
+    window = replayWindow()
+    if filename.endswith(".jsonl"):
+        replaySession(filename, window=window)     # so the undo stack and selection are as recorded
+    else:
+        window.importProject(filename, background=False)
+        window.undoStack.clear()
+    report = memoryReport(window)
+    window.close()
+    window.deleteLater()
+    if options["json"]:
+        return {"memory": {name: entry["bytes"] for name, entry in report.items()}}
+    return "\n" + formatMemoryReport(report)
+
+COMMAND_FUNCTIONS = {
+    "convert": convert,
+    "export-png": exportPNG,
+    "export-pdf": exportPDF,
+    "stats": stats,
+    "reduce-colors": reduceColors,
+    "validate": validate,
+    "replay": replay,
+    "memory": memory,
+}
+
+def runTask(command, filename, options):
+    """Runs one command on one file. This runs in the worker processes, so it never raises.
+
+    Returns:
+        tuple[str, bool, str | dict]: the filename, whether it succeeded, and the result, a
+                                      message or a dict for --json, or the error message.
+    """
+    try:
+        if command in WIDGET_COMMANDS:
+            initWidgets()
+        elif command in RENDER_COMMANDS:
+            initRendering()
+        return filename, True, COMMAND_FUNCTIONS[command](filename, options)
+    except Exception as e:
+        logger.debug(f"{command} failed on {filename}: {e}.")
+        return filename, False, str(e) or type(e).__name__
+
+########################################
+# ARGUMENT PARSING
+########################################
+
+def buildParser():
+    """Builds the argument parser for all batch commands."""
+    parser = argparse.ArgumentParser(prog="BeadworkDesigner.py", description="Run Beadwork Designer commands on many files without opening the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("files", nargs="+", help="Files or glob patterns to process")
+    common.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of worker processes (default: number of CPUs)")
+    common.add_argument("-o", "--output-dir", default=None, help="Directory to write results to (default: next to each input)")
+    common.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    dither = argparse.ArgumentParser(add_help=False)
+    dither.add_argument("--colors", type=int, default=16, help="Maximum number of colors (default: 16)")
+    dither.add_argument("--dither", default="floyd-steinberg", choices=["none", "floyd-steinberg", "atkinson", "bayer"], help="Dithering method")
+
+    convertParser = subparsers.add_parser("convert", parents=[common, dither], help="Convert images into project files")
+    convertParser.add_argument("--width", type=int, default=40, help="Width of the pattern, in beads (default: 40)")
+    convertParser.add_argument("--bead-width", type=float, default=12, help="Bead width, used for the aspect ratio (default: 12)")
+    convertParser.add_argument("--bead-height", type=float, default=22, help="Bead height, used for the aspect ratio (default: 22)")
+
+    pngParser = subparsers.add_parser("export-png", parents=[common], help="Export project files to PNG images")
+    pngParser.add_argument("--bead-width", type=int, default=12, help="Bead width, in pixels (default: 12)")
+    pngParser.add_argument("--bead-height", type=int, default=22, help="Bead height, in pixels (default: 22)")
+    pngParser.add_argument("--no-grid", action="store_true", help="Do not draw grid lines")
+    pngParser.add_argument("--no-markers", action="store_true", help="Do not draw row and column markers")
+
+    from BeadworkDesigner.core.Pages import PAGE_SIZES
+    pdfParser = subparsers.add_parser("export-pdf", parents=[common], help="Export project files to PDF charts")
+    pdfParser.add_argument("--bead-width", type=float, default=8, help="Bead width, in points (default: 8)")
+    pdfParser.add_argument("--bead-height", type=float, default=14, help="Bead height, in points (default: 14)")
+    pdfParser.add_argument("--overlap", type=int, default=2, help="Rows and columns repeated between pages (default: 2)")
+    pdfParser.add_argument("--page-size", default="A4", choices=list(PAGE_SIZES), help="Page size (default: A4)")
+
+    statsParser = subparsers.add_parser("stats", parents=[common], help="Print bead and color counts")
+    statsParser.add_argument("--json", action="store_true", help="Print one JSON object per file")
+    statsParser.add_argument("--top", type=int, default=5, help="Number of colors to list (default: 5)")
+
+    reduceParser = subparsers.add_parser("reduce-colors", parents=[common, dither], help="Reduce project files to fewer colors")
+    reduceParser.add_argument("--in-place", action="store_true", help="Overwrite the input files")
+
+    subparsers.add_parser("validate", parents=[common], help="Check that project files are well formed")
+
+    replayParser = subparsers.add_parser("replay", parents=[common], help="Replay recorded sessions and report action latencies (use -j 1 for stable timings)")
+    replayParser.add_argument("--real-time", action="store_true", help="Replay at the recorded pace rather than as fast as possible")
+    replayParser.add_argument("--json", action="store_true", help="Print one JSON object per file")
+
+    memoryParser = subparsers.add_parser("memory", parents=[common], help="Report the memory held by the model, color list, undo stack, selection and caches for projects or recorded sessions")
+    memoryParser.add_argument("--json", action="store_true", help="Print one JSON object per file")
+
+    return parser
+
+def expandFiles(patterns):
+    """Expands glob patterns, keeping the order given and dropping duplicates."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(f for f in matches if f not in files)
+    return files
+
+def main(argv=None, out=None):
+    """Runs a batch command.
+
+    Args:
+        argv (list, optional): the command line arguments, without the program name. Defaults to sys.argv[1:].
+        out (file, optional): where to print results. Defaults to sys.stdout.
+
+    Returns:
+        int: the exit code, 0 if every file succeeded, 1 otherwise.
+    """
+    out = out or sys.stdout
+    args = buildParser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING, format='%(levelname)s:\t%(message)s')
+
+    options = vars(args).copy()
+    command = options.pop("command")
+    files = expandFiles(options.pop("files"))
+    jobs = max(1, min(options.pop("jobs"), len(files)))
+    if options["output_dir"]:
+        os.makedirs(options["output_dir"], exist_ok=True)
+
+    logger.info(f"Running {command} on {len(files)} file(s) with {jobs} job(s).")
+    if jobs == 1:
+        results = (runTask(command, filename, options) for filename in files)
+        failures = report(results, out)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(runTask, [command] * len(files), files, [options] * len(files))
+            failures = report(results, out)
+
+    if failures:
+        print(f"{failures} of {len(files)} file(s) failed.", file=sys.stderr)
+    return 1 if failures else 0
+
+def report(results, out):
+    """Prints each result as it arrives, a dict as one JSON object, and counts the failures."""
+    failures = 0
+    for filename, ok, message in results:
+        if ok and isinstance(message, dict):
+            print(json.dumps({"file": filename, **message}), file=out)
+        else:
+            print(f"{filename}: {message if ok else 'ERROR: ' + message}", file=out)
+        failures += not ok
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(main())
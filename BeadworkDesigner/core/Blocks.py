@@ -0,0 +1,136 @@
+#####################
+# Blocks: rectangles of beads, as 2D lists of hex colors, with None for a
+# bead that is not part of the block (transparent), e.g. outside a selection
+# that is not a rectangle. They are read with Grid.block and written with
+# Grid.setBlock, a row slice at a time wherever a row has no None.
+#
+# The text format, for the clipboard, is a header, a palette and one line
+# per row of palette indexes, run-length encoded, with - for transparent:
+#
+#     beadwork 4x2
+#     FF0000 00FF00
+#     0*3 1
+#     -*2 1*2
+#####################
+
+import logging
+from itertools import groupby
+
+from BeadworkDesigner.core.Palette import isHexColor
+
+logger = logging.getLogger(__name__)
+
+TEXT_HEADER = "beadwork"
+TRANSPARENT = "-"
+
+def rangesBlock(ranges, blockAt):
+    """Returns the beads in ranges, e.g. a view's selection, as one block.
+
+    Args:
+        ranges (list): (top, left, bottom, right) rectangles of beads, inclusive.
+        blockAt (function): called as blockAt(row, column, rowCount, columnCount), e.g.
+                            Grid.block, for a copy of the beads around all of them.
+
+    Returns:
+        tuple: the top row and left column of the block, and the block, with None for
+               the beads outside the ranges, or None if there are no ranges.
+    """
+    if not ranges:
+        return None
+    top, left = min(r[0] for r in ranges), min(r[1] for r in ranges)
+    bottom, right = max(r[2] for r in ranges), max(r[3] for r in ranges)
+    block = blockAt(top, left, bottom - top + 1, right - left + 1)
+    if len(ranges) == 1:
+        return top, left, block
+
+    width = right - left + 1
+    mask = [[False] * width for _ in block]
+    for rangeTop, rangeLeft, rangeBottom, rangeRight in ranges:
+        covered = [True] * (rangeRight - rangeLeft + 1)
+        for row in range(rangeTop - top, rangeBottom - top + 1):
+            mask[row][rangeLeft - left:rangeRight - left + 1] = covered
+    for blockRow, maskRow in zip(block, mask):
+        if False in maskRow:
+            for column, selected in enumerate(maskRow):
+                if not selected:
+                    blockRow[column] = None
+    return top, left, block
+
+def maskColor(block, color):
+    """Returns a copy of block with the beads of color made transparent (None)."""
+    return [[None if bead == color else bead for bead in row] if color in row else row[:] for row in block]
+
+def fillBlock(block, color):
+    """Returns a block of the same shape as block, of color where block has a bead and None elsewhere."""
+    full = [color] * (len(block[0]) if block else 0)
+    return [full[:] if None not in row else [None if bead is None else color for bead in row] for row in block]
+
+def clipBlock(row, column, block, rowCount, columnCount):
+    """Crops a block placed at row, column to a pattern of rowCount x columnCount.
+
+    Returns:
+        tuple: the row and column of what is left of the block, and that block,
+               which is empty if none of it is on the pattern.
+    """
+    height, width = len(block), len(block[0]) if block else 0
+    top, left = max(row, 0), max(column, 0)
+    bottom, right = min(row + height, rowCount), min(column + width, columnCount)
+    if top >= bottom or left >= right:
+        return top, left, []
+    if (top, left, bottom, right) == (row, column, row + height, column + width):
+        return row, column, block
+    return top, left, [blockRow[left - column:right - column] for blockRow in block[top - row:bottom - row]]
+
+def blockColors(block):
+    """Returns the distinct hex colors in a block, in no particular order, without None."""
+    colors = set().union(*map(set, block))
+    colors.discard(None)
+    return colors
+
+def blockToText(block):
+    """Writes a block in the compact text format."""
+    palette = sorted(blockColors(block))
+    names = {color: str(i) for i, color in enumerate(palette)}
+    names[None] = TRANSPARENT
+    lines = [f"{TEXT_HEADER} {len(block[0]) if block else 0}x{len(block)}", " ".join(color[1:] for color in palette)]
+    for row in block:
+        tokens = []
+        for name, run in groupby(map(names.__getitem__, row)):
+            count = len(list(run))
+            tokens.append(name if count == 1 else f"{name}*{count}")
+        lines.append(" ".join(tokens))
+    return "\n".join(lines) + "\n"
+
+def blockFromText(text):
+    """Reads a block from the compact text format.
+
+    Raises:
+        ValueError: if text is not a block in that format.
+    """
+    lines = text.strip().splitlines()
+    if len(lines) < 2 or not lines[0].startswith(TEXT_HEADER + " "):
+        raise ValueError("Not a beadwork block.")
+    try:
+        width, height = (int(n) for n in lines[0][len(TEXT_HEADER) + 1:].split("x"))
+    except ValueError:
+        raise ValueError(f"Bad block size {lines[0]!r}.") from None
+    palette = [f"#{color.upper()}" for color in lines[1].split()]
+    if not all(isHexColor(color) for color in palette):
+        raise ValueError("Bad block palette.")
+    if len(lines) - 2 != height:
+        raise ValueError(f"Expected {height} rows, found {len(lines) - 2}.")
+
+    block = []
+    for line in lines[2:]:
+        row = []
+        for token in line.split():
+            index, _, count = token.partition("*")
+            try:
+                bead = None if index == TRANSPARENT else palette[int(index)]
+                row += [bead] * (int(count) if count else 1)
+            except (ValueError, IndexError):
+                raise ValueError(f"Bad block bead {token!r}.") from None
+        if len(row) != width:
+            raise ValueError(f"Expected {width} beads in a row, found {len(row)}.")
+        block.append(row)
+    return block
@@ -0,0 +1,242 @@
+#####################
+# Undo records for edits to the pattern. Each record is bound to a target
+# when it is created and applies itself with redo() and reverts with undo().
+#
+# A target is anything with the Grid editing methods: cellColor, setCells,
+# block, setBlock, rowCount, columnCount, insertRows, removeRows, insertColumns,
+# removeColumns, resize, replaceData and exportData, with removeRows and
+# removeColumns returning the removed beads for insertRows and insertColumns
+# to put back. That is a core Grid or one of a BeadworkModel's
+# FixedOrientations. The QUndoCommands in Commands.py
+# wrap these records for the GUI; UndoHistory is a minimal stack for
+# headless use.
+#####################
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Edit:
+    """Base class of the undo records."""
+
+    def __init__(self, target, description=None):
+        """Initializes the Edit.
+
+        Args:
+            target (Grid, BeadworkModel or FixedOrientation): what the edit applies to.
+            description (str, optional): The description of the edit. Defaults to None.
+        """
+        self.target = target
+        self.description = description
+
+    def redo(self):
+        raise NotImplementedError
+
+    def undo(self):
+        raise NotImplementedError
+
+class SetCells(Edit):
+    """Changes the color of one or more beads."""
+
+    def __init__(self, target, cells, description=None, oldCells=None):
+        """Initializes the SetCells edit. The current colors are recorded now, unless given.
+
+        Args:
+            target (Grid, BeadworkModel or FixedOrientation): what the edit applies to.
+            cells (dict): (row, column) mapped to the new hex color.
+            description (str, optional): The description of the edit. Defaults to None.
+            oldCells (dict, optional): the colors before the edit, for an edit that has already
+                                       been applied, e.g. a brush stroke painted as it was drawn. Defaults to None.
+        """
+        super().__init__(target, description)
+
+        self.newCells = dict(cells)
+        if oldCells is None:
+            self.oldCells = {(row, column): target.cellColor(row, column) for row, column in self.newCells}
+        else:
+            self.oldCells = {cell: oldCells[cell] for cell in self.newCells}
+
+    def redo(self):
+        logger.debug("Setting %d bead(s).", len(self.newCells))
+        self.target.setCells(self.newCells)
+
+    def undo(self):
+        logger.debug("Restoring %d bead(s).", len(self.oldCells))
+        self.target.setCells(self.oldCells)
+
+class SetBlock(Edit):
+    """Changes the colors of a rectangle of beads, such as a shape, as a block."""
+
+    def __init__(self, target, row, column, block, description=None):
+        """Initializes the SetBlock edit. The current colors of the rectangle are recorded now,
+        only where block has a color, so undo also leaves the other beads as they are.
+
+        Args:
+            target (Grid, BeadworkModel or FixedOrientation): what the edit applies to.
+            row (int): the top row of the rectangle.
+            column (int): its left column.
+            block (list): a 2D list of hex colors, with None for beads left as they are.
+            description (str, optional): The description of the edit. Defaults to None.
+        """
+        super().__init__(target, description)
+
+        self.row = row
+        self.column = column
+        self.newBlock = block
+        self.oldBlock = [old if None not in new else [color if newColor is not None else None for color, newColor in zip(old, new)]
+                         for old, new in zip(target.block(row, column, len(block), len(block[0]) if block else 0), block)]
+
+    def redo(self):
+        logger.debug("Setting a %dx%d block of beads.", len(self.newBlock[0]) if self.newBlock else 0, len(self.newBlock))
+        self.target.setBlock(self.row, self.column, self.newBlock)
+
+    def undo(self):
+        logger.debug("Restoring a %dx%d block of beads.", len(self.oldBlock[0]) if self.oldBlock else 0, len(self.oldBlock))
+        self.target.setBlock(self.row, self.column, self.oldBlock)
+
+class InsertRows(Edit):
+    """Inserts new rows before a row. If row is rowCount(), the rows are appended."""
+
+    def __init__(self, target, row, count=1, description=None):
+        super().__init__(target, description)
+
+        self.row = row
+        self.count = count
+
+    def redo(self):
+        self.target.insertRows(self.row, self.count)
+
+    def undo(self):
+        self.target.removeRows(self.row, self.count)
+
+class RemoveRows(Edit):
+    """Removes rows, keeping the removed rows themselves so undo puts them back
+    as they were. If there are not count rows from row on, the last count rows
+    are removed instead."""
+
+    def __init__(self, target, row, count=1, description=None):
+        super().__init__(target, description)
+
+        self.row = max(0, min(row, target.rowCount() - count))
+        self.count = count
+        self.removed = []
+
+    def redo(self):
+        self.removed = self.target.removeRows(self.row, self.count)
+
+    def undo(self):
+        self.target.insertRows(self.row, self.count, self.removed)
+        self.removed = []   # handed back to the target
+
+class InsertColumns(Edit):
+    """Inserts new columns before a column. If column is columnCount(), the columns are appended."""
+
+    def __init__(self, target, column, count=1, description=None):
+        super().__init__(target, description)
+
+        self.column = column
+        self.count = count
+
+    def redo(self):
+        self.target.insertColumns(self.column, self.count)
+
+    def undo(self):
+        self.target.removeColumns(self.column, self.count)
+
+class RemoveColumns(Edit):
+    """Removes columns, keeping the slices removed from each row so undo puts
+    them back. If there are not count columns from column on, the last count
+    columns are removed instead."""
+
+    def __init__(self, target, column, count=1, description=None):
+        super().__init__(target, description)
+
+        self.column = max(0, min(column, target.columnCount() - count))
+        self.count = count
+        self.removed = []
+
+    def redo(self):
+        self.removed = self.target.removeColumns(self.column, self.count)
+
+    def undo(self):
+        self.target.insertColumns(self.column, self.count, self.removed)
+        self.removed = []
+
+class Resize(Edit):
+    """Crops or pads the pattern on any side, as one structural change. The
+    pattern before it is kept as a snapshot, which shares its rows with the
+    grid, so the record stays small and undo restores the cropped beads."""
+
+    def __init__(self, target, rowCount, columnCount, rowOffset=0, columnOffset=0, description=None):
+        """
+        Args:
+            target: see Edit.
+            rowCount (int): the new number of rows.
+            columnCount (int): the new number of columns.
+            rowOffset (int, optional): how far the existing rows move down. Defaults to 0.
+            columnOffset (int, optional): how far the existing columns move right. Defaults to 0.
+            description (str, optional): The description of the edit. Defaults to None.
+        """
+        super().__init__(target, description)
+
+        self.rowCount = rowCount
+        self.columnCount = columnCount
+        self.rowOffset = rowOffset
+        self.columnOffset = columnOffset
+        self.oldSize = None
+        self.oldData = None
+
+    def redo(self):
+        self.oldSize = (self.target.rowCount(), self.target.columnCount())
+        self.oldData = self.target.exportData()
+        self.target.resize(self.rowCount, self.columnCount, self.rowOffset, self.columnOffset)
+
+    def undo(self):
+        self.target.resize(*self.oldSize, -self.rowOffset, -self.columnOffset, fill=self.oldData)
+        self.oldData = None
+
+class ReplaceData(Edit):
+    """Replaces the whole pattern, such as after reducing colors or importing an image."""
+
+    def __init__(self, target, data, description=None):
+        super().__init__(target, description)
+
+        self.oldData = target.exportData()
+        self.newData = data
+
+    # the grid shares both states copy-on-write, so later edits do not change them
+    def redo(self):
+        self.target.replaceData(self.newData)
+
+    def undo(self):
+        self.target.replaceData(self.oldData)
+
+class UndoHistory:
+    """A minimal undo stack for editing a Grid without Qt."""
+
+    def __init__(self):
+        self.edits = []
+        self.index = 0      # number of edits currently applied
+
+    def push(self, edit):
+        """Applies edit and records it, dropping anything that was undone."""
+        edit.redo()
+        del self.edits[self.index:]
+        self.edits.append(edit)
+        self.index += 1
+
+    def canUndo(self):
+        return self.index > 0
+
+    def canRedo(self):
+        return self.index < len(self.edits)
+
+    def undo(self):
+        if self.canUndo():
+            self.index -= 1
+            self.edits[self.index].undo()
+
+    def redo(self):
+        if self.canRedo():
+            self.edits[self.index].redo()
+            self.index += 1
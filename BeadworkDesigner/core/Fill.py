@@ -0,0 +1,59 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# up, left, right, down
+NEIGHBORS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+PROGRESS_STEP = 65536   # beads found between progress reports
+
+def floodFill(data, row, column, progress=None):
+    """Finds all beads connected to (row, column), through their top, bottom,
+    left or right neighbors, that have the same color.
+
+    Uses an explicit stack rather than recursion, so large areas cannot hit
+    Python's recursion limit. Beads are returned in depth first order.
+
+    Args:
+        data (list): a 2D list of hex colors.
+        row (int): the row of the starting bead.
+        column (int): the column of the starting bead.
+        progress (function, optional): called with the fraction of the pattern found so far, which can
+                                       stop the fill by raising. Defaults to None.
+
+    Returns:
+        list[tuple[int, int]]: the (row, column) of each matching bead. The starting
+                               bead is always included.
+    """
+    rows = len(data)
+    columns = len(data[0])
+    color = data[row][column]
+
+    found = []
+    seen = set()
+    nextReport = PROGRESS_STEP
+    stack = [iter(NEIGHBORS)]
+    positions = [(row, column)]
+    while stack:
+        r, c = positions[-1]
+        for i, j in stack[-1]:
+            newRow, newColumn = r + i, c + j
+            if (0 <= newRow < rows and 0 <= newColumn < columns
+                    and (newRow, newColumn) not in seen and data[newRow][newColumn] == color):
+                seen.add((newRow, newColumn))
+                found.append((newRow, newColumn))
+                stack.append(iter(NEIGHBORS))
+                positions.append((newRow, newColumn))
+                if progress is not None and len(found) >= nextReport:
+                    progress(len(found) / (rows * columns))
+                    nextReport += PROGRESS_STEP
+                break
+        else:
+            stack.pop()
+            positions.pop()
+
+    # a bead with no matching neighbors is only found from itself
+    if not found:
+        found.append((row, column))
+    logger.debug("Flood fill from %d, %d found %d beads.", row, column, len(found))
+    return found
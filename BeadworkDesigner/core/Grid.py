@@ -0,0 +1,318 @@
+import logging
+from collections.abc import Sequence
+
+from BeadworkDesigner.core.Palette import BLANK_COLOR, randomColor
+
+logger = logging.getLogger(__name__)
+
+# where the existing beads stay when a pattern is resized: the side of each
+# dimension that is kept in place, or "center" to crop or pad both sides evenly
+ANCHORS = {
+    "Top left": ("start", "start"), "Top": ("start", "center"), "Top right": ("start", "end"),
+    "Left": ("center", "start"), "Center": ("center", "center"), "Right": ("center", "end"),
+    "Bottom left": ("end", "start"), "Bottom": ("end", "center"), "Bottom right": ("end", "end"),
+}
+
+def anchorOffset(oldCount, newCount, anchor):
+    """Returns how far the existing rows (or columns) move when resizing from
+    oldCount to newCount, keeping anchor ("start", "center" or "end") in place."""
+    return (newCount - oldCount) * {"start": 0, "center": 1, "end": 2}[anchor] // 2
+
+class GridSnapshot(Sequence):
+    """An immutable view of a Grid's rows at one moment, indexed as snapshot[row][column].
+
+    It shares its storage with the grid: the grid copies a row before its
+    first change after a snapshot (copy-on-write), so the snapshot never
+    changes and can be read from other threads. Its rows are lists for fast
+    indexing, but must not be modified; use toList() for a mutable copy.
+    """
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, row):
+        return self._rows[row]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(list(a) == list(b) for a, b in zip(self._rows, other))
+
+    __hash__ = None
+
+    def rowCount(self):
+        return len(self._rows)
+
+    def columnCount(self):
+        return len(self._rows[0]) if self._rows else 0
+
+    def cellColor(self, row, column):
+        return self._rows[row][column]
+
+    def toList(self):
+        """Returns a mutable copy, as a 2D list of hex colors."""
+        return [row[:] for row in self._rows]
+
+class Grid:
+    """The beadwork pattern, stored as a 2D list of hex colors in loom order
+    (rows, then columns).
+
+    Grid, BeadworkModel and its FixedOrientations share the same editing
+    methods (cellColor, setCells, block, setBlock, insertRows, removeRows,
+    insertColumns, removeColumns, resize, replaceData and exportData), so the
+    undo records in core.Edits work on a Grid or a FixedOrientation. The
+    model's own removeRows and removeColumns return a bool, for Qt, rather
+    than the removed beads.
+
+    Every edit increments revision, so work done on a snapshot can tell
+    whether the pattern has changed since.
+
+    Storage is copy-on-write at row granularity: snapshot() is O(1) and
+    shares the rows, and the list of rows, with the GridSnapshot it returns.
+    Once shared, the list is copied before rows are inserted or removed, and
+    each row is copied before its first change, so snapshots, undo records
+    and lists passed in by callers are never modified.
+    """
+
+    def __init__(self, data=None, width=5, height=7, debug=False):
+        """Initializes the Grid. If no data is given, creates a blank grid, or a
+        grid of random colors if debug is True.
+
+        Args:
+            data (list, optional): a 2D list of hex colors, or a GridSnapshot. Shared, not copied;
+                                   it is never modified. Defaults to None.
+            width (int, optional): The width (columns) of a new grid. Defaults to 5.
+            height (int, optional): The height (rows) of a new grid. Defaults to 7.
+            debug (bool, optional): Fill new beads with random colors. Defaults to False.
+        """
+        self.debug = debug
+        self.revision = 0
+        self.sharedList = False     # whether self.rows itself may be referenced elsewhere
+        self.ownedRows = None       # ids of the rows only this grid holds; None while nothing is shared
+        if data:
+            self.adopt(data)
+        else:
+            self.rows = [self.newBeads(width) for _ in range(height)]
+
+    def newColor(self):
+        """Returns the color for a newly added bead."""
+        return randomColor() if self.debug else BLANK_COLOR
+
+    def newBeads(self, count):
+        """Returns the colors for count newly added beads."""
+        if self.debug:
+            return [randomColor() for _ in range(count)]
+        return [BLANK_COLOR] * count
+
+    def rowCount(self):
+        return len(self.rows)
+
+    def columnCount(self):
+        # only works if all rows are an equal length
+        return len(self.rows[0]) if self.rows else 0
+
+    def cellColor(self, row, column):
+        return self.rows[row][column]
+
+    ### COPY-ON-WRITE
+
+    def adopt(self, data):
+        """Uses data, a 2D list or a GridSnapshot, as the rows, sharing them with whoever else holds them."""
+        self.rows = data._rows if isinstance(data, GridSnapshot) else data
+        self.share()
+
+    def share(self):
+        """Marks every row, and the list of rows, as referenced elsewhere."""
+        self.sharedList = True
+        self.ownedRows = set()
+
+    def ownList(self):
+        """Copies the list of rows, if shared, before it is changed."""
+        if self.sharedList:
+            self.rows = list(self.rows)
+            self.sharedList = False
+
+    def ownRow(self, row):
+        """Returns row, copied first if it may be shared, ready to be changed."""
+        rowList = self.rows[row]
+        if self.ownedRows is not None and id(rowList) not in self.ownedRows:
+            self.ownList()
+            rowList = self.rows[row] = rowList[:]
+            self.ownedRows.add(id(rowList))
+        return rowList
+
+    def snapshot(self):
+        """Returns an immutable view of the pattern as it is now, in O(1)."""
+        snapshot = GridSnapshot(self.rows)
+        self.share()
+        return snapshot
+
+    ### EDITING
+
+    def setCells(self, cells):
+        """Sets the color of many beads at once.
+
+        Args:
+            cells (dict): (row, column) mapped to the new hex color.
+        """
+        rows = self.rows
+        if self.ownedRows is None:
+            for (row, column), color in cells.items():
+                rows[row][column] = color
+        else:
+            lastRow = None
+            for (row, column), color in cells.items():
+                if row != lastRow:
+                    rowList = self.ownRow(row)
+                    lastRow = row
+                rowList[column] = color
+        self.revision += 1
+
+    def block(self, row, column, rowCount, columnCount):
+        """Returns a copy of the rowCount x columnCount beads from (row, column), as a 2D list of hex colors."""
+        return [rowList[column:column+columnCount] for rowList in self.rows[row:row+rowCount]]
+
+    def setBlock(self, row, column, block):
+        """Sets the colors of a rectangle of beads at once, a row slice at a time.
+
+        Args:
+            row (int): the top row of the rectangle.
+            column (int): its left column.
+            block (list): a 2D list of hex colors, with None for beads left as they are.
+        """
+        for i, blockRow in enumerate(block):
+            rowList = self.ownRow(row + i)
+            if None in blockRow:
+                for j, color in enumerate(blockRow):
+                    if color is not None:
+                        rowList[column + j] = color
+            else:
+                rowList[column:column+len(blockRow)] = blockRow
+        self.revision += 1
+
+    def insertRows(self, row, count=1, beads=None):
+        """Inserts count new rows before row.
+
+        Args:
+            row (int): the row to insert before.
+            count (int, optional): the number of rows. Defaults to 1.
+            beads (list, optional): the rows to insert, e.g. those returned by an earlier removeRows.
+                                    Taken over, not copied, so they must not be used afterwards.
+                                    Defaults to new beads.
+        """
+        width = self.columnCount()
+        newRows = beads if beads is not None else [self.newBeads(width) for _ in range(count)]
+        self.ownList()
+        self.rows[row:row] = newRows
+        if self.ownedRows is not None:
+            self.ownedRows.update(map(id, newRows))
+        self.revision += 1
+
+    def removeRows(self, row, count=1):
+        """Removes count rows starting at row.
+
+        Returns:
+            list: the removed rows.
+        """
+        self.ownList()
+        removed = self.rows[row:row+count]
+        del self.rows[row:row+count]
+        if self.ownedRows is not None:
+            self.ownedRows.difference_update(map(id, removed))
+        self.revision += 1
+        return removed
+
+    def insertColumns(self, column, count=1, beads=None):
+        """Inserts count new columns before column.
+
+        Args:
+            column (int): the column to insert before.
+            count (int, optional): the number of columns. Defaults to 1.
+            beads (list, optional): the beads to insert in each row, e.g. those returned by an
+                                    earlier removeColumns. Defaults to new beads.
+        """
+        for row in range(self.rowCount()):
+            self.ownRow(row)[column:column] = beads[row] if beads is not None else self.newBeads(count)
+        self.revision += 1
+
+    def removeColumns(self, column, count=1):
+        """Removes count columns starting at column.
+
+        Returns:
+            list: the removed beads of each row.
+        """
+        removed = []
+        for row in range(self.rowCount()):
+            rowList = self.ownRow(row)
+            removed.append(rowList[column:column+count])
+            del rowList[column:column+count]
+        self.revision += 1
+        return removed
+
+    def resize(self, rowCount, columnCount, rowOffset=0, columnOffset=0, fill=None):
+        """Crops or pads the pattern, on any side, to rowCount x columnCount in one operation.
+
+        The bead at (row, column) moves to (row + rowOffset, column + columnOffset);
+        beads moved outside the new size are dropped. Rows that are kept whole are
+        shared, not copied, and the others are built with slices.
+
+        Args:
+            rowCount (int): the new number of rows.
+            columnCount (int): the new number of columns.
+            rowOffset (int, optional): how far the rows move down. Defaults to 0.
+            columnOffset (int, optional): how far the columns move right. Defaults to 0.
+            fill (list, optional): a 2D list or GridSnapshot of the new size, giving the
+                                   new beads, e.g. the beads cropped by an earlier resize.
+                                   Shared, not copied. Defaults to new beads.
+        """
+        oldRows, oldColumns = self.rows, self.columnCount()
+        first, last = max(0, -columnOffset), min(oldColumns, columnCount - columnOffset)   # the old columns kept
+        left = max(0, columnOffset) if last > first else columnCount
+        right = columnCount - left - max(0, last - first)
+        wholeRows = (first, last, left, right) == (0, oldColumns, 0, 0)
+
+        def newBeads(row, start, stop):
+            return fill[row][start:stop] if fill is not None else self.newBeads(stop - start)
+
+        owned = self.ownedRows
+        newOwned = set()
+        rows = []
+        for r in range(rowCount):
+            old = r - rowOffset
+            if 0 <= old < len(oldRows) and last > first:
+                if wholeRows:
+                    row = oldRows[old]
+                    if owned is not None and id(row) not in owned:
+                        rows.append(row)
+                        continue
+                else:
+                    row = newBeads(r, 0, left) + oldRows[old][first:last] + newBeads(r, columnCount - right, columnCount)
+            elif fill is not None:
+                rows.append(fill[r])    # shared with fill
+                continue
+            else:
+                row = self.newBeads(columnCount)
+            newOwned.add(id(row))
+            rows.append(row)
+
+        self.rows = rows
+        self.sharedList = False
+        if owned is not None or fill is not None:
+            self.ownedRows = newOwned
+        self.revision += 1
+
+
+    def replaceData(self, data):
+        """Replaces the whole pattern with data, a 2D list or a GridSnapshot. Shared, not copied."""
+        self.adopt(data)
+        self.revision += 1
+
+    def exportData(self):
+        """Returns the pattern as a GridSnapshot, which later edits do not change."""
+        return self.snapshot()
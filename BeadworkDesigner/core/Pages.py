@@ -0,0 +1,14 @@
+#####################
+# Page sizes for printed charts. They are kept here, without Qt, so the
+# command line can list them without importing the PDF export.
+#####################
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height) in millimetres, portrait; each name is also a QPageSize.PageSizeId
+PAGE_SIZES = {"A4": (210, 297),
+              "A3": (297, 420),
+              "Letter": (215.9, 279.4),
+              "Legal": (215.9, 355.6)}
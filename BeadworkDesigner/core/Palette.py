@@ -0,0 +1,147 @@
+import logging
+import random
+from collections.abc import Sequence
+from itertools import chain
+
+logger = logging.getLogger(__name__)
+
+BLANK_COLOR = "#FFFFFF"
+
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+def randomColor():
+    """Returns a random hex color, used to fill debug patterns.
+
+    Returns:
+        str: an upper case hex color, e.g. "#1A2B3C".
+    """
+    return '#{:06X}'.format(random.randint(0, 0xFFFFFF))
+
+def isHexColor(color):
+    """Checks that color is a "#RRGGBB" string.
+
+    Args:
+        color: the value to check.
+
+    Returns:
+        bool: True if color is a hex color.
+    """
+    return isinstance(color, str) and len(color) == 7 and color[0] == "#" and HEX_DIGITS.issuperset(color[1:])
+
+def colorValue(color):
+    """Returns a hex color as an integer, e.g. "#1A2B3C" -> 0x1A2B3C.
+
+    Args:
+        color (str): a "#RRGGBB" hex color.
+
+    Returns:
+        int: the color as 0xRRGGBB.
+    """
+    return int(color[1:], 16)
+
+def hexColor(value):
+    """Returns an integer color as an upper case hex color, e.g. 0x1A2B3C -> "#1A2B3C".
+
+    Args:
+        value (int): the color as 0xRRGGBB.
+
+    Returns:
+        str: the hex color.
+    """
+    return '#{:06X}'.format(value)
+
+def colorPositions(data, transposed=False):
+    """Finds where each color is used in a pattern.
+
+    Args:
+        data (list): a 2D list of hex colors.
+        transposed (bool, optional): Return positions as if the pattern were transposed,
+                                     i.e. (column, row), ordered column by column. Defaults to False.
+
+    Returns:
+        dict: each color mapped to the list of (row, column) positions it is used at.
+    """
+    positions = {}
+    if transposed:
+        cells = ((c, r, row[c]) for c in range(len(data[0]) if data else 0) for r, row in enumerate(data))
+    else:
+        cells = ((r, c, color) for r, row in enumerate(data) for c, color in enumerate(row))
+    for r, c, color in cells:
+        found = positions.get(color)
+        if found is None:
+            positions[color] = [(r, c)]
+        else:
+            found.append((r, c))
+    return positions
+
+def distinctColors(data):
+    """Returns the set of distinct beads in a pattern, visiting every bead once at
+    C speed, or None if data is not a non-empty, rectangular 2D list or a bead
+    cannot be hashed."""
+    if not isinstance(data, Sequence) or isinstance(data, str) or not data:
+        return None
+    if any(not isinstance(row, list) for row in data):
+        return None
+    width = len(data[0])
+    if not width or any(len(row) != width for row in data):
+        return None
+    try:
+        return set(chain.from_iterable(data))
+    except TypeError:
+        return None
+
+def patternProblems(data):
+    """Checks that a pattern is a non-empty, rectangular 2D list of hex colors.
+
+    Only the distinct colors are checked, so a valid pattern costs one pass
+    over its beads; a pattern with problems is then checked row by row, to
+    describe them.
+
+    Args:
+        data: the pattern, as loaded.
+
+    Returns:
+        list[str]: a description of each problem found, empty if valid.
+    """
+    colors = distinctColors(data)
+    if colors is not None and all(isHexColor(color) for color in colors):
+        return []
+
+    if not isinstance(data, Sequence) or isinstance(data, str) or not data:
+        return ["no pattern data"]
+    if any(not isinstance(row, list) for row in data):
+        return ["pattern rows are not lists"]
+    problems = []
+    width = len(data[0])
+    if width == 0:
+        problems.append("pattern rows are empty")
+    for r, row in enumerate(data):
+        if len(row) != width:
+            problems.append(f"row {r + 1} has {len(row)} beads, expected {width}")
+        bad = [c for c, color in enumerate(row) if not isHexColor(color)]
+        if bad:
+            problems.append(f"row {r + 1} has invalid colors at column(s) {', '.join(str(c + 1) for c in bad[:5])}")
+    return problems
+
+def normalizePattern(data):
+    """Checks a pattern and returns it as a Grid stores it: new lists of upper
+    case hex colors, where equal colors are one shared string.
+
+    Args:
+        data: the pattern, as loaded, e.g. from a project file.
+
+    Returns:
+        list: the normalized pattern; data is not modified.
+
+    Raises:
+        ValueError: if data is not a non-empty, rectangular 2D list of hex colors.
+    """
+    colors = distinctColors(data)
+    if colors is None or not all(isHexColor(color) for color in colors):
+        raise ValueError("; ".join(patternProblems(data)))
+    shared = {}
+    canonical = {}
+    for color in colors:
+        upper = color.upper()
+        canonical[color] = shared.setdefault(upper, upper)
+    return [list(map(canonical.__getitem__, row)) for row in data]
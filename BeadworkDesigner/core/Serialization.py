@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+
+from BeadworkDesigner.core.Palette import patternProblems
+
+logger = logging.getLogger(__name__)
+
+PROJECT_VERSION = 0.1
+
+PROGRESS_REPORTS = 100      # progress reports while saving or loading a project
+
+def readConfigFile(filename):
+    """Reads a configuration file in JSON format.
+
+    Args:
+        filename (str): The filename of the configuration file.
+
+    Returns:
+        dict: The configuration file as a dictionary.
+    """
+    with open(filename, 'r') as file:
+        config = json.load(file)
+    logger.info(f"Config file {filename} read.")
+    return config["project_configs"], config["app_configs"]
+
+def saveConfigFile(configs, filename):
+    """Saves a configuration file in JSON format.
+
+    Args:
+        configs (dict): The configuration file to save.
+        filename (str): The filename to save the configuration file to.
+    """
+    with open(filename, 'w') as file:
+        json.dump(configs, file)
+    logger.info(f"Config file saved to {filename}.")
+
+def saveProject(project, filename, progress=None):
+    """Saves a project to a file in JSON format.
+
+    The pattern is written row by row, after the other keys, so progress can
+    be reported while it is written.
+
+    Args:
+        project (dict): The project to save. Includes project_configs and the model data.
+        filename (str): The filename to save the project to.
+        progress (function, optional): called with the fraction written so far, which can stop the
+                                       save by raising. Defaults to None.
+    """
+    rows = project.get("project", [])
+    head = json.dumps({key: value for key, value in project.items() if key != "project"})
+    step = max(1, len(rows) // PROGRESS_REPORTS)
+    with open(filename, 'w') as file:
+        file.write(head[:-1] + (", " if len(head) > 2 else "") + '"project": [')
+        for i, row in enumerate(rows):
+            if progress is not None and i % step == 0:
+                progress(i / len(rows))
+            file.write((", " if i else "") + json.dumps(row))
+        file.write("]}")
+    logger.info(f"Project saved to {filename}.")
+
+def loadProject(filename, progress=None):
+    """Loads a project from a file in JSON format.
+
+    Args:
+        filename (str): The filename to load the project from.
+        progress (function, optional): called with the fraction read so far, which can stop the
+                                       load by raising. Parsing is reported as the last half. Defaults to None.
+
+    Returns:
+        dict: The project loaded from the file. Includes project_configs and the model data.
+    """
+    with open(filename, 'r') as file:
+        if progress is None:
+            project = json.load(file)
+        else:
+            size = max(1, os.fstat(file.fileno()).st_size)
+            chunks, read = [], 0
+            for chunk in iter(lambda: file.read(max(65536, size // PROGRESS_REPORTS)), ""):
+                chunks.append(chunk)
+                read += len(chunk)     # characters, which are bytes for a plain JSON project
+                progress(min(read / size, 1.0) / 2)
+            project = json.loads("".join(chunks))
+            progress(1.0)
+    logger.info(f"Project loaded from {filename}.")
+    return project
+
+def newProject(data, configs):
+    """Builds a project to save.
+
+    Args:
+        data (list): the pattern as a 2D list of hex colors, in loom order.
+        configs (dict): the project configs.
+
+    Returns:
+        dict: the project.
+    """
+    return {
+        "info": {
+                    "version": PROJECT_VERSION
+                },
+        "configs": configs,
+        "project": data
+    }
+
+def projectProblems(project):
+    """Checks that a loaded project is well formed.
+
+    Args:
+        project (dict): the project, as loaded from JSON.
+
+    Returns:
+        list[str]: a description of each problem found, empty if valid.
+    """
+    if not isinstance(project, dict):
+        return ["not a project object"]
+    problems = [f"missing '{key}'" for key in ("info", "configs", "project") if key not in project]
+    data = project.get("project")
+    problems += patternProblems(data)
+    if not isinstance(data, list) or not data or not isinstance(data[0], list):
+        return problems
+
+    width = len(data[0])
+    configs = project.get("configs", {})
+    if configs.get("width") not in (None, width) or configs.get("height") not in (None, len(data)):
+        problems.append(f"configs say {configs.get('width')}x{configs.get('height')}, pattern is {width}x{len(data)}")
+    return problems
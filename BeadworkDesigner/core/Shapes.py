@@ -0,0 +1,268 @@
+#####################
+# Rasterizing shapes into beads.
+#
+# Shapes are rasterized into spans, (row, firstColumn, lastColumn) with
+# both columns included, sorted by row then column, rather than into single
+# beads, so a filled 1000x1000 rectangle is 1000 spans and spansBlock turns
+# them into one block for Grid.setBlock, written a row slice at a time.
+#####################
+
+import logging
+from math import ceil, floor
+
+logger = logging.getLogger(__name__)
+
+# the shape tools, each drawn from two corners but Polygon, drawn through any number of vertices
+SHAPES = ("Line", "Rectangle", "Filled Rectangle", "Ellipse", "Filled Ellipse", "Polygon", "Filled Polygon")
+
+def lineCells(row0, column0, row1, column1):
+    """Finds the beads on the straight line between two beads, with Bresenham's
+    algorithm, so that consecutive beads touch at least at a corner.
+
+    Args:
+        row0 (int): the row of the first bead.
+        column0 (int): the column of the first bead.
+        row1 (int): the row of the last bead.
+        column1 (int): the column of the last bead.
+
+    Returns:
+        list[tuple[int, int]]: the (row, column) of each bead, from the first to the last, both included.
+    """
+    rowSteps, columnSteps = abs(row1 - row0), abs(column1 - column0)
+    rowStep = 1 if row1 >= row0 else -1
+    columnStep = 1 if column1 >= column0 else -1
+
+    cells = []
+    error = columnSteps - rowSteps
+    row, column = row0, column0
+    while True:
+        cells.append((row, column))
+        if row == row1 and column == column1:
+            return cells
+        doubled = 2 * error
+        if doubled > -rowSteps:
+            error -= rowSteps
+            column += columnStep
+        if doubled < columnSteps:
+            error += columnSteps
+            row += rowStep
+
+def mergeSpans(spans):
+    """Merges overlapping and touching spans.
+
+    Args:
+        spans (iterable): (row, firstColumn, lastColumn) spans, in any order.
+
+    Returns:
+        list[tuple[int, int, int]]: the merged spans, sorted by row then column.
+    """
+    merged = []
+    for row, first, last in sorted(spans):
+        if merged and merged[-1][0] == row and first <= merged[-1][2] + 1:
+            if last > merged[-1][2]:
+                merged[-1] = (row, merged[-1][1], last)
+        else:
+            merged.append((row, first, last))
+    return merged
+
+def cellSpans(cells):
+    """Returns the spans covering cells, an iterable of (row, column)."""
+    return mergeSpans((row, column, column) for row, column in cells)
+
+def spanCells(spans):
+    """Returns the (row, column) of every bead in spans."""
+    return [(row, column) for row, first, last in spans for column in range(first, last + 1)]
+
+def clipSpans(spans, rowCount, columnCount):
+    """Crops spans to a pattern of rowCount x columnCount, dropping those entirely off it."""
+    return [(row, max(first, 0), min(last, columnCount - 1)) for row, first, last in spans
+            if 0 <= row < rowCount and first < columnCount and last >= 0]
+
+def lineSpans(row0, column0, row1, column1):
+    """Returns the spans of the straight line between two beads, both included."""
+    return cellSpans(lineCells(row0, column0, row1, column1))
+
+def rectangleSpans(row0, column0, row1, column1, filled=False):
+    """Returns the spans of the rectangle with corners at two beads.
+
+    Args:
+        row0, column0 (int): one corner.
+        row1, column1 (int): the opposite corner.
+        filled (bool, optional): fill it, rather than only its outline. Defaults to False.
+    """
+    top, bottom = sorted((row0, row1))
+    left, right = sorted((column0, column1))
+    if filled or bottom - top < 2 or right - left < 2:
+        return [(row, left, right) for row in range(top, bottom + 1)]
+    sides = [span for row in range(top + 1, bottom) for span in ((row, left, left), (row, right, right))]
+    return [(top, left, right)] + sides + [(bottom, left, right)]
+
+def ellipseCells(row0, column0, row1, column1):
+    """Finds the beads on the outline of the ellipse that fits the rectangle with
+    corners at two beads, with the midpoint (Bresenham) algorithm for ellipses
+    in a rectangle, which also handles even widths and heights.
+
+    Returns:
+        list[tuple[int, int]]: the (row, column) of each bead, in no particular order, possibly repeated.
+    """
+    top, bottom = sorted((row0, row1))
+    left, right = sorted((column0, column1))
+    a, b = right - left, bottom - top
+    b1 = b & 1
+    dx, dy = 4 * (1 - a) * b * b, 4 * (b1 + 1) * a * a
+    error = dx + dy + b1 * a * a
+    y0 = top + (b + 1) // 2
+    y1 = y0 - b1
+    aa, bb = 8 * a * a, 8 * b * b
+    x0, x1 = left, right
+
+    cells = []
+    while x0 <= x1:
+        cells += ((y0, x1), (y0, x0), (y1, x0), (y1, x1))
+        doubled = 2 * error
+        if doubled <= dy:
+            y0 += 1
+            y1 -= 1
+            dy += aa
+            error += dy
+        if doubled >= dx or 2 * error > dy:
+            x0 += 1
+            x1 -= 1
+            dx += bb
+            error += dx
+    while y0 - y1 <= b:     # the tips of very flat ellipses
+        cells += ((y0, x0 - 1), (y0, x1 + 1), (y1, x0 - 1), (y1, x1 + 1))
+        y0 += 1
+        y1 -= 1
+    return [(row, column) for row, column in cells if top <= row <= bottom and left <= column <= right]
+
+def ellipseSpans(row0, column0, row1, column1, filled=False):
+    """Returns the spans of the ellipse that fits the rectangle with corners at
+    two beads, filled or only its outline."""
+    spans = cellSpans(ellipseCells(row0, column0, row1, column1))
+    if not filled:
+        return spans
+    rows = {}
+    for row, first, last in spans:
+        bounds = rows.get(row)
+        rows[row] = (first, last) if bounds is None else (min(first, bounds[0]), max(last, bounds[1]))
+    return [(row, first, last) for row, (first, last) in sorted(rows.items())]
+
+def polygonSpans(points, filled=False):
+    """Returns the spans of the closed polygon through points.
+
+    The outline is drawn with lineCells. A filled polygon also includes every
+    bead whose center is inside it, by the even-odd rule, found a row at a
+    time from where the row crosses the edges.
+
+    Args:
+        points (list): the (row, column) of each vertex, in order.
+        filled (bool, optional): fill it, rather than only its outline. Defaults to False.
+    """
+    if not points:
+        return []
+    edges = list(zip(points, points[1:] + points[:1]))
+    spans = [span for start, end in edges for span in lineSpans(*start, *end)]
+    if filled and len(points) > 2:
+        for row in range(min(r for r, _ in points), max(r for r, _ in points) + 1):
+            crossings = sorted(c0 + (row - r0) * (c1 - c0) / (r1 - r0)
+                               for (r0, c0), (r1, c1) in edges
+                               if min(r0, r1) <= row < max(r0, r1))    # half open, so vertices count once
+            for enter, leave in zip(crossings[::2], crossings[1::2]):
+                if ceil(enter) <= floor(leave):
+                    spans.append((row, ceil(enter), floor(leave)))
+    return mergeSpans(spans)
+
+def shapeSpans(shape, points):
+    """Returns the spans of one of SHAPES drawn through points, two corners or the polygon's vertices."""
+    if shape == "Line":
+        return lineSpans(*points[0], *points[-1])
+    if shape in ("Rectangle", "Filled Rectangle"):
+        return rectangleSpans(*points[0], *points[-1], filled=shape.startswith("Filled"))
+    if shape in ("Ellipse", "Filled Ellipse"):
+        return ellipseSpans(*points[0], *points[-1], filled=shape.startswith("Filled"))
+    if shape in ("Polygon", "Filled Polygon"):
+        return polygonSpans(list(points), filled=shape.startswith("Filled"))
+    raise ValueError(f"Unknown shape {shape}.")
+
+def spansBlock(spans, color, blockAt=None):
+    """Turns spans into a block for Grid.setBlock.
+
+    Args:
+        spans (list): (row, firstColumn, lastColumn) spans.
+        color (str): the hex color of the beads in them.
+        blockAt (function, optional): called as blockAt(row, column, rowCount, columnCount), e.g.
+                                      Grid.block, for the beads the block covers. The spans are
+                                      drawn over a copy of them, so the block has no None and is
+                                      written a whole row slice at a time; worth it for filled
+                                      shapes, not outlines, which would copy their whole bounding
+                                      box. Defaults to None.
+
+    Returns:
+        tuple: the top row and left column of the block, and the block, a 2D list
+               of color where the spans are and, elsewhere, the beads from blockAt
+               or None, for beads left as they are.
+    """
+    if not spans:
+        return 0, 0, []
+    top, bottom = min(span[0] for span in spans), max(span[0] for span in spans)
+    left, right = min(span[1] for span in spans), max(span[2] for span in spans)
+    width = right - left + 1
+    if blockAt is not None:
+        block = blockAt(top, left, bottom - top + 1, width)    # already a copy
+    else:
+        block = [[None] * width for _ in range(bottom - top + 1)]
+    full = [color] * width
+    for row, first, last in spans:
+        if first == left and last == right:
+            block[row - top] = full[:]
+        else:
+            block[row - top][first - left:last - left + 1] = full[:last - first + 1]
+    return top, left, block
+
+class ShapeDraft:
+    """A shape being drawn with the mouse, before it is added to the pattern.
+
+    Two corner shapes are drawn by dragging from one corner to the other. A
+    polygon is drawn an edge at a time: each press adds a vertex, which
+    follows the mouse until it is released, and pressing the first vertex
+    or the last one again (a double click) closes it.
+    """
+
+    def __init__(self, shape):
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown shape {shape}.")
+        self.shape = shape
+        self.points = []
+        self.finished = False
+
+    @property
+    def polygon(self):
+        return self.shape in ("Polygon", "Filled Polygon")
+
+    def press(self, row, column):
+        """Starts the shape, or a polygon's next vertex, at a bead."""
+        if not self.points:
+            self.points = [(row, column), (row, column)]
+        elif self.polygon:
+            self.points.append((row, column))
+
+    def move(self, row, column):
+        """Moves the corner, or vertex, being dragged to a bead."""
+        if self.points:
+            self.points[-1] = (row, column)
+
+    def release(self):
+        """Ends a drag. Returns whether the shape is finished."""
+        if not self.polygon:
+            self.finished = bool(self.points)
+        elif len(self.points) > 2 and self.points[-1] in (self.points[0], self.points[-2]):
+            self.points.pop()
+            self.finished = True
+        elif len(self.points) == 2 and self.points[0] == self.points[1]:
+            self.points.pop()   # the first press, without a drag, is only the first vertex
+        return self.finished
+
+    def spans(self):
+        """Returns the spans of the shape as it is now."""
+        return shapeSpans(self.shape, self.points) if self.points else []
@@ -0,0 +1,35 @@
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+def colorCounts(data):
+    """Counts the beads of each color.
+
+    Args:
+        data (list): a 2D list of hex colors.
+
+    Returns:
+        list[tuple[str, int]]: (color, count), most used first.
+    """
+    counts = Counter()
+    for row in data:
+        counts.update(row)
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+def patternStats(data):
+    """Summarizes a pattern.
+
+    Args:
+        data (list): a 2D list of hex colors, in loom order.
+
+    Returns:
+        dict: the width, height, number of beads and the count of each color, most used first.
+    """
+    counts = colorCounts(data)
+    return {
+        "width": len(data[0]) if data else 0,
+        "height": len(data),
+        "beads": sum(count for _, count in counts),
+        "colors": dict(counts)
+    }
@@ -0,0 +1,35 @@
+#####################
+# The Qt-free core of Beadwork Designer: grid storage, palette, edit
+# operations and undo records, blocks, flood fill, shapes, page sizes,
+# statistics and serialization.
+#
+# Nothing in this package imports PySide6, so headless tools, tests and
+# worker processes can use it without loading Qt. The Qt models and
+# commands are thin adapters around it.
+#####################
+
+from BeadworkDesigner.core.Blocks import (blockColors, blockFromText,
+                                          blockToText, clipBlock, fillBlock,
+                                          maskColor, rangesBlock)
+from BeadworkDesigner.core.Edits import (Edit, InsertColumns, InsertRows,
+                                         RemoveColumns, RemoveRows,
+                                         ReplaceData, Resize, SetBlock,
+                                         SetCells, UndoHistory)
+from BeadworkDesigner.core.Fill import floodFill
+from BeadworkDesigner.core.Grid import (ANCHORS, Grid, GridSnapshot,
+                                        anchorOffset)
+from BeadworkDesigner.core.Pages import PAGE_SIZES
+from BeadworkDesigner.core.Palette import (BLANK_COLOR, colorPositions,
+                                           colorValue, hexColor, isHexColor,
+                                           normalizePattern, patternProblems,
+                                           randomColor)
+from BeadworkDesigner.core.Serialization import (loadProject, newProject,
+                                                 projectProblems,
+                                                 readConfigFile,
+                                                 saveConfigFile, saveProject)
+from BeadworkDesigner.core.Shapes import (SHAPES, ShapeDraft, cellSpans,
+                                          clipSpans, ellipseSpans, lineCells,
+                                          lineSpans, mergeSpans, polygonSpans,
+                                          rectangleSpans, shapeSpans,
+                                          spanCells, spansBlock)
+from BeadworkDesigner.core.Statistics import colorCounts, patternStats
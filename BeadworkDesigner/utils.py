@@ -1,54 +1,50 @@
-import json
 import logging
 
-logger = logging.getLogger(__name__)
-
-def readConfigFile(filename):
-    """Reads a configuration file in JSON format.
-
-    Args:
-        filename (str): The filename of the configuration file.
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader
 
-    Returns:
-        dict: The configuration file as a dictionary.
-    """
-    with open(filename, 'r') as file:
-        config = json.load(file)
-    logger.info(f"Config file {filename} read.")
-    return config["project_configs"], config["app_configs"]
+# serialization lives in the Qt-free core, re-exported here for existing callers
+from BeadworkDesigner.core.Serialization import (loadProject, readConfigFile,
+                                                 saveConfigFile, saveProject)
 
-def saveConfigFile(configs, filename):
-    """Saves a configuration file in JSON format.
+logger = logging.getLogger(__name__)
 
-    Args:
-        configs (dict): The configuration file to save.
-        filename (str): The filename to save the configuration file to.
-    """
-    with open(filename, 'w') as file:
-        json.dump(configs, file)
-    logger.info(f"Config file saved to {filename}.")
+def scaledHeight(width, imageWidth, imageHeight, beadRatio=1.0):
+    """Returns the height, in beads, of an image scaled to width beads, keeping its aspect ratio."""
+    return max(1, round(width * imageHeight / imageWidth * beadRatio))
 
-def saveProject(project, filename):
-    """Saves a project to a file in JSON format.
+def imageHeight(filename, width, beadRatio=1.0):
+    """Returns the height, in beads, that loadImage would scale an image to, reading only its header.
 
-    Args:
-        project (dict): The project to save. Includes project_configs and the model data.
-        filename (str): The filename to save the project to.
+    Returns:
+        int: the height, or 0 if the image cannot be read.
     """
-    with open(filename, 'w') as file:
-        json.dump(project, file)
-    logger.info(f"Project saved to {filename}.")
+    size = QImageReader(filename).size()
+    if not size.isValid() or size.width() == 0:
+        return 0
+    return scaledHeight(width, size.width(), size.height(), beadRatio)
 
-def loadProject(filename):
-    """Loads a project from a file in JSON format.
+def loadImage(filename, width, beadRatio=1.0):
+    """Loads an image and scales it down to one pixel per bead.
 
     Args:
-        filename (str): The filename to load the project from.
+        filename (str): The filename of the image.
+        width (int): The width, in beads, to scale the image to.
+        beadRatio (float, optional): Bead width divided by bead height, used to keep the image's aspect ratio
+                                     when beads are not square. Defaults to 1.0.
 
     Returns:
-        dict: The project loaded from the file. Includes project_configs and the model data.
+        np.ndarray: a (rows, columns, 3) array of uint8 RGB values.
     """
-    with open(filename, 'r') as file:
-        project = json.load(file)
-    logger.info(f"Project loaded from {filename}.")
-    return project
\ No newline at end of file
+    import numpy as np     # imported here so that importing utils stays fast at startup
+
+    image = QImage(filename)
+    if image.isNull():
+        raise ValueError(f"Could not read image {filename}.")
+    height = scaledHeight(width, image.width(), image.height(), beadRatio)
+    image = image.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+    pixels = pixels.reshape(height, image.bytesPerLine())[:, :width*3].reshape(height, width, 3)
+    logger.info(f"Image loaded from {filename} at {width}x{height}.")
+    return pixels.copy()
@@ -0,0 +1,8 @@
+#####################
+# Performance benchmarks for the model, color list proxy, undo commands,
+# project files and rendering, run on synthetic patterns of several sizes.
+#
+# Usage:
+#   python -m benchmarks run [--quick] [-o results.json] [--save-baseline NAME]
+#   python -m benchmarks compare results.json NAME|baseline.json [--threshold 0.25]
+#####################
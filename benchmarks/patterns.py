@@ -0,0 +1,44 @@
+#####################
+# Deterministic synthetic patterns for the benchmarks. Patterns are made of
+# runs of color that often repeat the row above, so they have connected
+# regions like real designs rather than pure noise.
+#####################
+
+import random
+
+def syntheticPalette(colors, seed=0):
+    """Returns colors distinct hex colors.
+
+    Args:
+        colors (int): the number of colors.
+        seed (int, optional): the random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    return [f"#{value:06X}" for value in rng.sample(range(0x1000000), colors)]
+
+def syntheticPattern(width, height, colors, seed=0):
+    """Returns a width x height pattern, as rows of hex colors, using up to colors colors.
+
+    Args:
+        width (int): the number of columns.
+        height (int): the number of rows.
+        colors (int): the number of colors to choose from.
+        seed (int, optional): the random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    palette = syntheticPalette(colors, seed)
+    rows = []
+    for r in range(height):
+        if rows and rng.random() < 0.6:
+            rows.append(rows[-1][:])    # repeat the row above, so regions span several rows
+            continue
+        row = []
+        while len(row) < width:
+            row.extend([rng.choice(palette)] * rng.randint(1, 12))
+        rows.append(row[:width])
+    return rows
+
+def parseSize(text):
+    """Converts "100x40" to (width, height)."""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
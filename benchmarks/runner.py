@@ -0,0 +1,201 @@
+#####################
+# Runs the benchmarks, writes the results as JSON, and compares results
+# with a stored baseline, flagging anything slower by more than a threshold.
+#####################
+
+import argparse
+import datetime
+import fnmatch
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+baselines_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+FULL_SIZES = ["10x10", "100x100", "1000x1000", "4000x4000"]
+FULL_COLORS = [2, 40, 1000]
+QUICK_SIZES = ["10x10", "100x100"]
+QUICK_COLORS = [2, 40]
+
+REPEATS = 7             # timed runs per benchmark, at most
+MIN_RUN_TIME = 0.01     # s; fast functions are called in loops of at least this long
+MAX_TIME = 2.0          # s; stop repeating a benchmark after this long
+THRESHOLD = 0.25        # slower than the baseline by more than this is a regression
+
+def measure(run, reset=None, repeats=REPEATS, minRunTime=MIN_RUN_TIME, maxTime=MAX_TIME):
+    """Times run.
+
+    Without reset, run is called in a loop, doubling the number of calls
+    until a loop takes minRunTime, and each of the repeats times that loop.
+    With reset, which undoes run, run is called once per repeat and reset
+    after it, untimed.
+
+    Returns:
+        dict: seconds per call ("min", "median", "mean"), calls per repeat ("number") and "repeats".
+    """
+    number = 1
+    if reset is None:
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                run()
+            if time.perf_counter() - started >= minRunTime or number >= 1 << 20:
+                break
+            number *= 2
+
+    times = []
+    budget = time.perf_counter() + maxTime
+    while len(times) < repeats:
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - started) / number)
+        if reset is not None:
+            reset()
+        if time.perf_counter() > budget:
+            break
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times), "number": number, "repeats": len(times)}
+
+def resultKey(name, width, height, colors):
+    """The key of one result, e.g. "model.setData@100x100/40"."""
+    return f"{name}@{width}x{height}/{colors}"
+
+def run(sizes, colorCounts, patterns=None, out=None, **measureOptions):
+    """Runs the benchmarks matching patterns (fnmatch, e.g. "commands.*") for every size and color count.
+
+    Returns:
+        dict: the results, as written by writeResults.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+
+    from benchmarks.patterns import parseSize
+    from benchmarks.suite import BENCHMARKS, Workbench
+
+    names = [name for name in BENCHMARKS if not patterns or any(fnmatch.fnmatch(name, p) for p in patterns)]
+    results = {}
+    for size in sizes:
+        width, height = parseSize(size)
+        for colors in colorCounts:
+            for name in names:
+                # a fresh pattern for each benchmark, so earlier edits do not affect it
+                bench = Workbench(width, height, colors)
+                try:
+                    timing = measure(*BENCHMARKS[name](bench), **measureOptions)
+                finally:
+                    bench.close()
+                    app.processEvents()
+                key = resultKey(name, width, height, colors)
+                results[key] = timing
+                if out is not None:
+                    print(f"{key:<60}{timing['min'] * 1e6:>14.1f} us", file=out, flush=True)
+
+    return {
+        "version": 1,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "processor": platform.processor()},
+        "results": results,
+    }
+
+def baselineFilename(name):
+    """Returns the file of a stored baseline; name may also be a path to a JSON file."""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(baselines_dir, f"{name}.json")
+
+def writeResults(results, filename):
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, "w") as file:
+        json.dump(results, file, indent=1, sort_keys=True)
+
+def readResults(filename):
+    with open(filename) as file:
+        return json.load(file)
+
+def compare(current, baseline, threshold=THRESHOLD, statistic="min"):
+    """Compares two sets of results.
+
+    Args:
+        current (dict): the new results.
+        baseline (dict): the results to compare against.
+        threshold (float, optional): a ratio above 1 + threshold is a regression, below 1 - threshold an improvement.
+        statistic (str, optional): which timing to compare. Defaults to "min", the least noisy.
+
+    Returns:
+        list[tuple[str, float, float, float, str]]: key, baseline and current seconds, ratio, and
+            "regression", "improvement" or "ok", for every key in both.
+    """
+    rows = []
+    for key in sorted(set(current["results"]) & set(baseline["results"])):
+        before = baseline["results"][key][statistic]
+        after = current["results"][key][statistic]
+        ratio = after / before if before > 0 else float("inf")
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "ok"
+        rows.append((key, before, after, ratio, status))
+    return rows
+
+def printComparison(rows, out):
+    print(f"{'benchmark':<60}{'baseline us':>14}{'current us':>14}{'ratio':>8}", file=out)
+    for key, before, after, ratio, status in rows:
+        flag = "  REGRESSION" if status == "regression" else "  faster" if status == "improvement" else ""
+        print(f"{key:<60}{before * 1e6:>14.1f}{after * 1e6:>14.1f}{ratio:>8.2f}{flag}", file=out)
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Beadwork Designer performance benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runParser = subparsers.add_parser("run", help="Run the benchmarks")
+    runParser.add_argument("--quick", action="store_true", help=f"Only {', '.join(QUICK_SIZES)} with {', '.join(map(str, QUICK_COLORS))} colors")
+    runParser.add_argument("--sizes", default=None, help=f"Comma separated sizes (default: {','.join(FULL_SIZES)})")
+    runParser.add_argument("--colors", default=None, help=f"Comma separated color counts (default: {','.join(map(str, FULL_COLORS))})")
+    runParser.add_argument("-k", "--filter", action="append", default=None, help="Only run benchmarks matching this pattern, e.g. 'commands.*' (repeatable)")
+    runParser.add_argument("-o", "--output", default=None, help="Write the results to this JSON file")
+    runParser.add_argument("--save-baseline", default=None, metavar="NAME", help="Also store the results as baseline NAME")
+    runParser.add_argument("--compare", default=None, metavar="BASELINE", help="Compare the results with a baseline name or file")
+    runParser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"Regression threshold, as a fraction (default: {THRESHOLD})")
+
+    compareParser = subparsers.add_parser("compare", help="Compare results with a baseline")
+    compareParser.add_argument("results", help="Results JSON file")
+    compareParser.add_argument("baseline", help="Baseline name (in benchmarks/baselines) or JSON file")
+    compareParser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"Regression threshold, as a fraction (default: {THRESHOLD})")
+
+    return parser
+
+def main(argv=None, out=None):
+    """Runs the benchmark command line.
+
+    Returns:
+        int: the exit code, 1 if a comparison found regressions.
+    """
+    out = out or sys.stdout
+    args = buildParser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == "run":
+        sizes = args.sizes.split(",") if args.sizes else QUICK_SIZES if args.quick else FULL_SIZES
+        colorCounts = [int(c) for c in args.colors.split(",")] if args.colors else QUICK_COLORS if args.quick else FULL_COLORS
+        current = run(sizes, colorCounts, args.filter, out)
+        if args.output:
+            writeResults(current, args.output)
+        if args.save_baseline:
+            writeResults(current, baselineFilename(args.save_baseline))
+        if not args.compare:
+            return 0
+        baseline = readResults(baselineFilename(args.compare))
+    else:
+        current = readResults(args.results)
+        baseline = readResults(baselineFilename(args.baseline))
+
+    rows = compare(current, baseline, args.threshold)
+    printComparison(rows, out)
+    regressions = sum(status == "regression" for *_, status in rows)
+    if regressions:
+        print(f"{regressions} regression(s) over {args.threshold:.0%}.", file=out)
+    return 1 if regressions else 0
@@ -0,0 +1,263 @@
+#####################
+# The benchmarks. Each one is registered with @benchmark and is given a
+# Workbench: a MainWindow, on the offscreen platform, holding a synthetic pattern.
+# It returns the function to time and, for benchmarks that change the
+# pattern, a reset function that puts it back between runs (not timed).
+#####################
+
+import os
+import tempfile
+
+from PySide6.QtCore import Qt
+
+from BeadworkDesigner.Clipboard import copyBlock, pastedBlock
+from BeadworkDesigner.Commands import (CommandChangeColor,
+                                       CommandChangeMultipleColors,
+                                       CommandInsertRow,
+                                       CommandRemoveRow,
+                                       CommandInsertColumn,
+                                       CommandRemoveColumn,
+                                       CommandReplaceData,
+                                       CommandResize,
+                                       CommandSetBlock)
+from BeadworkDesigner.core.Shapes import ellipseSpans, spansBlock
+from benchmarks.patterns import syntheticPattern
+
+BENCHMARKS = {}     # name -> function(workbench) returning (run, reset)
+
+VIEW_SIZE = (1000, 700)     # size of the window for the paint benchmarks
+# fixed, rather than the user's bin/config.json, so timings compare across machines and with the baselines
+APP_CONFIGS = {"debug": False, "beadHeight": 22, "beadWidth": 12}
+PAINT_BEADS = 2500          # beads painted by delegate.paint, about one screen at the default size
+
+def benchmark(name):
+    """Registers a benchmark under name."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+class Workbench:
+    """A MainWindow holding a synthetic pattern. Each benchmark gets a fresh one."""
+
+    def __init__(self, width, height, colors, seed=0):
+        from BeadworkDesigner.MainWindow import MainWindow
+
+        self.width = width
+        self.height = height
+        self.colors = colors
+        self.data = syntheticPattern(width, height, colors, seed)
+
+        self.window = MainWindow(debug=False,
+                                 app_configs=dict(APP_CONFIGS),
+                                 project_configs={"width": width, "height": height, "defaultOrientation": "Vertical"},
+                                 modelData=[row[:] for row in self.data])
+        self.window.tasks.backgroundBeads = None    # time the work itself, not a hand-off to a worker thread
+        self.window.resize(*VIEW_SIZE)
+        self.window.show()
+
+        self.model = self.window.origModel
+        self.proxy = self.window.colorListModel
+        self.view = self.window.beadworkView
+        self.directory = tempfile.TemporaryDirectory(prefix="beadwork-benchmarks-")
+
+    def middle(self):
+        """Returns the index of the bead in the middle of the pattern."""
+        return self.model.index(self.height // 2, self.width // 2)
+
+    def close(self):
+        self.window.undoStack.clear()
+        self.window.close()
+        self.window.deleteLater()
+        self.directory.cleanup()
+
+def otherColor(color):
+    """Returns a color different from color, without the leading '#', as the commands take."""
+    return "000001" if color != "#000001" else "000002"
+
+########################################
+# MODEL
+########################################
+
+@benchmark("model.setData")
+def modelSetData(bench):
+    index = bench.middle()
+    colors = [bench.model.cellColor(index.row(), index.column()), "#" + otherColor(bench.model.cellColor(index.row(), index.column()))]
+    state = {"next": 1}
+
+    def run():
+        bench.model.setData(index, colors[state["next"]], Qt.ItemDataRole.EditRole)
+        state["next"] ^= 1
+    return run, None
+
+@benchmark("model.insertRows")
+def modelInsertRows(bench):
+    row = bench.height // 2
+    return (lambda: bench.model.insertRows(row, 1)), (lambda: bench.model.removeRows(row, 1))
+
+@benchmark("model.removeRows")
+def modelRemoveRows(bench):
+    row = bench.height // 2
+    return (lambda: bench.model.removeRows(row, 1)), (lambda: bench.model.insertRows(row, 1))
+
+@benchmark("model.insertColumns")
+def modelInsertColumns(bench):
+    column = bench.width // 2
+    return (lambda: bench.model.insertColumns(column, 1)), (lambda: bench.model.removeColumns(column, 1))
+
+@benchmark("model.removeColumns")
+def modelRemoveColumns(bench):
+    column = bench.width // 2
+    return (lambda: bench.model.removeColumns(column, 1)), (lambda: bench.model.insertColumns(column, 1))
+
+@benchmark("model.nearbyIndicesThatMatch")
+def modelNearbyIndicesThatMatch(bench):
+    index = bench.middle()
+    return (lambda: bench.model.nearbyIndicesThatMatch(index)), None
+
+########################################
+# COLOR LIST PROXY
+########################################
+
+@benchmark("proxy.evaluateModelForUniqueColors")
+def proxyEvaluate(bench):
+    return bench.proxy.evaluateModelForUniqueColors, None
+
+@benchmark("proxy.mapFromSource")
+def proxyMapFromSource(bench):
+    index = bench.middle()
+    return (lambda: bench.proxy.mapFromSource(index)), None
+
+########################################
+# COMMANDS
+########################################
+
+def commandFactories(bench):
+    """Returns a function creating each command, keyed by its short name."""
+    window = bench.window
+    index = bench.middle()
+    color = otherColor(bench.model.cellColor(index.row(), index.column()))
+    rowIndexes = [bench.model.index(index.row(), column) for column in range(bench.width)]
+    replacement = [row[::-1] for row in bench.data]
+    # a filled ellipse over the whole pattern, as the shape tools draw it
+    top, left, ellipse = spansBlock(ellipseSpans(0, 0, bench.height - 1, bench.width - 1, filled=True), "#" + color, bench.model.block)
+    return {
+        "ChangeColor": lambda: CommandChangeColor(bench.model, index, color, "Change color"),
+        "ChangeMultipleColors": lambda: CommandChangeMultipleColors(bench.model, rowIndexes, color, "Change row"),
+        "InsertRow": lambda: CommandInsertRow(bench.model, window.beadworkView, index.row(), description="Insert row"),
+        "RemoveRow": lambda: CommandRemoveRow(bench.model, window.beadworkView, index.row(), description="Remove row"),
+        "InsertColumn": lambda: CommandInsertColumn(bench.model, window.beadworkView, index.column(), description="Insert column"),
+        "RemoveColumn": lambda: CommandRemoveColumn(bench.model, window.beadworkView, index.column(), description="Remove column"),
+        "ReplaceData": lambda: CommandReplaceData(bench.model, window.beadworkView, replacement, "Replace data"),
+        "SetBlock": lambda: CommandSetBlock(bench.model, top, left, ellipse, "Draw filled ellipse"),
+        # pads every side by a tenth, as adjusting the dimensions anchored at the center does
+        "Resize": lambda: CommandResize(bench.model, window.beadworkView, bench.height + 2 * (bench.height // 10 or 1),
+                                        bench.width + 2 * (bench.width // 10 or 1), bench.height // 10 or 1, bench.width // 10 or 1, "Resize"),
+    }
+
+def registerCommand(name):
+    def redo(bench):
+        command = commandFactories(bench)[name]()
+        return command.redo, command.undo
+
+    def undo(bench):
+        command = commandFactories(bench)[name]()
+        command.redo()
+        return command.undo, command.redo
+
+    benchmark(f"commands.{name}.redo")(redo)
+    benchmark(f"commands.{name}.undo")(undo)
+
+for name in ("ChangeColor", "ChangeMultipleColors", "InsertRow", "RemoveRow", "InsertColumn", "RemoveColumn", "ReplaceData", "SetBlock", "Resize"):
+    registerCommand(name)
+
+########################################
+# CLIPBOARD
+########################################
+
+CLIPBOARD_SIDE = 500    # beads across and down copied by the clipboard benchmarks
+
+def clipboardBlock(bench):
+    return bench.model.block(0, 0, min(CLIPBOARD_SIDE, bench.height), min(CLIPBOARD_SIDE, bench.width))
+
+@benchmark("clipboard.copy")
+def clipboardCopy(bench):
+    block = clipboardBlock(bench)
+    return (lambda: copyBlock(block)), None
+
+@benchmark("clipboard.paste")
+def clipboardPaste(bench):
+    copyBlock(clipboardBlock(bench))
+    return (lambda: pastedBlock(bench.height, bench.width)), None
+
+########################################
+# PROJECT FILES
+########################################
+
+@benchmark("project.export")
+def projectExport(bench):
+    filename = os.path.join(bench.directory.name, "export.json")
+    return (lambda: bench.window.exportProject(filename)), None
+
+@benchmark("project.import")
+def projectImport(bench):
+    filename = os.path.join(bench.directory.name, "import.json")
+    bench.window.exportProject(filename)
+    bench.window.tasks.waitForDone()   # large patterns are saved on a worker thread
+    return (lambda: bench.window.importProject(filename, background=False)), None
+
+########################################
+# VIEW
+########################################
+
+@benchmark("view.selectListOfBeads")
+def viewSelectListOfBeads(bench):
+    index = bench.middle()
+    selection = bench.proxy.allIndexesForColor(bench.model.cellColor(index.row(), index.column()))
+    return (lambda: bench.view.selectListOfBeads(selection)), (lambda: bench.view.clearSelection())
+
+@benchmark("view.paint")
+def viewPaint(bench):
+    # grab() paints the visible beads into a pixmap, without a display
+    return bench.view.viewport().grab, None
+
+def delegatePainter(bench, style):
+    # the delegate alone, without the view's own painting: PAINT_BEADS beads
+    # (about one screen) painted into an image, half of them selected
+    from PySide6.QtCore import QRect
+    from PySide6.QtGui import QImage, QPainter
+    from PySide6.QtWidgets import QStyle, QStyleOptionViewItem
+
+    view, delegate = bench.view, bench.window.delegate
+    delegate.setBeadStyle(style)
+    side = min(int(PAINT_BEADS ** 0.5), bench.width, bench.height)
+    image = QImage(side * view.beadWidth, side * view.beadHeight, QImage.Format.Format_RGB32)
+    beads = []
+    for row in range(side):
+        for column in range(side):
+            option = QStyleOptionViewItem()
+            option.rect = QRect(column * view.beadWidth, row * view.beadHeight, view.beadWidth, view.beadHeight)
+            if (row + column) % 2:
+                option.state |= QStyle.StateFlag.State_Selected
+            beads.append((option, bench.model.index(row, column)))
+
+    def run():
+        painter = QPainter(image)
+        for option, index in beads:
+            delegate.paint(painter, option, index)
+        painter.end()
+    return run, None
+
+@benchmark("delegate.paint")
+def delegatePaint(bench):
+    return delegatePainter(bench, "Flat")
+
+@benchmark("delegate.paintSprites")
+def delegatePaintSprites(bench):
+    # the sprites are rendered by the first run, and blitted by every other
+    return delegatePainter(bench, "Delica")
+
+@benchmark("view.changeOrientation")
+def viewChangeOrientation(bench):
+    # each run flips the orientation, so runs alternate between the two
+    return (lambda: bench.window.changeOrientation(None)), None
@@ -0,0 +1,26 @@
+import pytest
+
+# fixed app configs, so tests do not depend on bin/config.json; debug off, so new beads are blank
+APP_CONFIGS = {"debug": False, "beadHeight": 22, "beadWidth": 12}
+
+@pytest.fixture
+def newWindow(qtbot):
+    """Returns a function that creates a MainWindow with fixed app configs.
+
+    It is called as newWindow(width, height, data=None, shown=False): data is
+    the pattern, in which case width and height must match it, and a shown
+    window is resized to 800x600 first, for tests that paint or use the mouse.
+    """
+    from BeadworkDesigner.MainWindow import MainWindow
+
+    def newWindow(width=6, height=8, data=None, shown=False):
+        window = MainWindow(debug=False,
+                            app_configs=dict(APP_CONFIGS),
+                            project_configs={"width": width, "height": height, "defaultOrientation": "Vertical"},
+                            modelData=data)
+        qtbot.addWidget(window)
+        if shown:
+            window.resize(800, 600)
+            window.show()
+        return window
+    return newWindow
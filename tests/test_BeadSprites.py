@@ -0,0 +1,35 @@
+import pytest
+
+from PySide6.QtGui import QColor
+
+from BeadworkDesigner.BeadSprites import SpriteAtlas, renderBead, spriteBytes
+
+@pytest.mark.parametrize("style", ["Delica", "Seed"])
+def test_BeadSprites_renderBead(qapp, style):
+    sprite = renderBead("#3060C0", style, 11, 21, True, 2.0)
+    assert((sprite.width(), sprite.height()) == (22, 42))     # device pixels
+    assert(sprite.devicePixelRatio() == 2.0)
+
+    image = sprite.toImage()
+    assert(image.pixelColor(0, 0).alpha() == 0)               # rounded corners are transparent
+    middle = [image.pixelColor(x, 21) for x in range(22)]
+    assert(len({color.rgb() for color in middle}) > 2)         # shaded, not flat
+    assert(all(abs(color.hue() - QColor("#3060C0").hue()) < 10 for color in middle if color.alpha() == 255 and color.saturation() > 50))
+
+def test_BeadSprites_SpriteAtlas(qapp):
+    atlas = SpriteAtlas(maxBytes=3 * 11 * 21 * 4)
+    first = atlas.sprite("#FF0000", "Delica", 11, 21, True, 1.0)
+    assert(atlas.sprite("#FF0000", "Delica", 11, 21, True, 1.0) is first)     # rendered once, then reused
+    assert(atlas.sprite("#FF0000", "Seed", 11, 21, True, 1.0) is not first)
+    assert(atlas.bytes == 2 * spriteBytes(first))
+
+    atlas.sprite("#00FF00", "Delica", 11, 21, True, 1.0)
+    atlas.sprite("#FF0000", "Delica", 11, 21, True, 1.0)        # most recently used again
+    atlas.sprite("#0000FF", "Delica", 11, 21, True, 1.0)        # over the budget: drops the least recently used
+    assert(len(atlas) == 3)
+    assert(atlas.bytes <= atlas.maxBytes)
+    assert(("#FF0000", "Seed", 11, 21, True, 1.0) not in atlas.sprites)
+    assert(atlas.sprite("#FF0000", "Delica", 11, 21, True, 1.0) is first)
+
+    atlas.clear()
+    assert(len(atlas) == 0 and atlas.bytes == 0)
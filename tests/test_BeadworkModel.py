@@ -2,10 +2,12 @@ from math import ceil
 import re
 import pytest
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QPersistentModelIndex, Qt
 from PySide6.QtGui import QColor
 
-from BeadworkDesigner.BeadworkModel import BeadworkModel, BeadworkTransposeModel
+from BeadworkDesigner.BeadworkModel import BeadworkModel
+from BeadworkDesigner.ColorPool import COLOR_VALUE_ROLE, ColorPool
+from BeadworkDesigner.core import Edits
 
 def is_hex_color(s):
     return bool(re.fullmatch(r'#[0-9a-fA-F]{6}', s))
@@ -75,6 +77,24 @@ def test_BeadworkModel_data(testingModel):
             assert(testingModel.data(testingModel.index(row, column), Qt.ItemDataRole.BackgroundRole) == QColor(testingModel.data(testingModel.index(row, column), Qt.ItemDataRole.DisplayRole)))
             assert(testingModel.data(testingModel.index(row, column), Qt.ItemDataRole.DecorationRole) == QColor(testingModel.data(testingModel.index(row, column), Qt.ItemDataRole.DisplayRole)))
 
+def test_BeadworkModel_colorValueRole(testingModel):
+    for row in range(testingModel.rowCount(None)):
+        for column in range(testingModel.columnCount(None)):
+            index = testingModel.index(row, column)
+            assert(testingModel.data(index, COLOR_VALUE_ROLE) == int(testingModel.data(index, Qt.ItemDataRole.DisplayRole)[1:], 16))
+
+def test_ColorPool():
+    pool = ColorPool(maxColors=2)
+    assert(pool.color("#1A2B3C") is pool.color("#1A2B3C"))     # built once, then shared
+    assert(pool.color("#1A2B3C") == QColor("#1A2B3C"))
+    assert(pool.brush("#1A2B3C").color() == QColor("#1A2B3C"))
+    assert(pool.value("#1A2B3C") == 0x1A2B3C)
+
+    pool.color("#000000")
+    pool.color("#FFFFFF")                                       # drops the oldest color
+    assert(len(pool) == 2)
+    assert("#1A2B3C" not in pool.entries)
+
 def test_BeadworkModel_setData(testingModel):
     for row in range(testingModel.rowCount(None)):
         for column in range(testingModel.columnCount(None)):
@@ -152,6 +172,22 @@ def test_BeadworkModel_importData(testingModel):
     testModel.importData(testDict)
     assert(testModel._data == testingModel._data)
 
+def test_BeadworkModel_importDataResetsModel(qtbot):
+    testModel = BeadworkModel()
+    changed = []
+    testModel.dataChanged.connect(lambda *args: changed.append(args))
+    with qtbot.waitSignal(testModel.modelReset):
+        testModel.importData([["#ff0000", "#00FF00"]] * 3)
+    assert(changed == [])
+    assert((testModel.rowCount(), testModel.columnCount()) == (3, 2))
+    assert(testModel.cellColor(2, 0) == "#FF0000")
+
+def test_BeadworkModel_importDataInvalid(testingModel):
+    before = testingModel.exportData()
+    with pytest.raises(ValueError):
+        testingModel.importData([["#FF0000"], ["#FF0000", "not a color"]])
+    assert(testingModel.exportData() == before)
+
 def test_BeadworkModel_nearbyIndicesThatMatch():
     testData = [
         [
@@ -187,18 +223,19 @@ def test_BeadworkModel_nearbyIndicesThatMatch():
     
 
 
-### TESTING BEADWORKTRANSPOSEMODEL ###
+### TESTING TRANSPOSED BEADWORKMODEL ###
 
 @pytest.fixture
 def testingTransposeModels():
     testModel = BeadworkModel(debug=True)
-    testTransposeModel = BeadworkTransposeModel()
-    testTransposeModel.setSourceModel(testModel)
+    testTransposeModel = BeadworkModel(data=testModel.exportData(), debug=True)
+    testTransposeModel.setTransposed(True)
     return (testModel, testTransposeModel)
 
 def test_BeadworkTransposeModel_init(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
-    assert(testTransposeModel.sourceModel() == testModel)
+    assert(testTransposeModel.transposed)
+    assert(testTransposeModel.grid.rows is testModel.grid.rows)   # same storage, not copied
 
 def test_BeadworkTransposeModel_rowCount(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
@@ -222,34 +259,77 @@ def test_BeadworkTransposeModel_setData(testingTransposeModels):
         for column in range(testModel.columnCount(None)):
             testTransposeModel.setData(testTransposeModel.index(column, row), "#000000", Qt.ItemDataRole.EditRole)
             assert(testTransposeModel.data(testTransposeModel.index(column, row), Qt.ItemDataRole.DisplayRole) == "#000000")
-            assert(testModel.data(testModel.index(row, column), Qt.ItemDataRole.DisplayRole) == "#000000")
+            assert(testTransposeModel.grid.rows[row][column] == "#000000")
 
 def test_BeadworkTransposeModel_insertRow(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
     rowCountBefore = testTransposeModel.rowCount(None)
-    index = testTransposeModel.index(0, 0)
     testTransposeModel.insertRow(rowCountBefore, count=1)
     assert(testTransposeModel.rowCount(None) == rowCountBefore + 1)
-    assert(testModel.columnCount(None) == rowCountBefore + 1)
+    assert(testTransposeModel.grid.columnCount() == rowCountBefore + 1)
 
 def test_BeadworkTransposeModel_insertColumn(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
     columnCountBefore = testTransposeModel.columnCount(None)
     testTransposeModel.insertColumn(columnCountBefore, count=1)
     assert(testTransposeModel.columnCount(None) == columnCountBefore + 1)
-    assert(testModel.rowCount(None) == columnCountBefore + 1)
+    assert(testTransposeModel.grid.rowCount() == columnCountBefore + 1)
 
 def test_BeadworkTransposeModel_removeRow(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
     rowCountBefore = testTransposeModel.rowCount(None)
-    index = testTransposeModel.index(0, 0)
-    testTransposeModel.removeRow(0, count=1)
+    removed = testTransposeModel.removeRow(0, count=1)
+    assert(removed == [[row[0] for row in testModel.grid.rows]])
     assert(testTransposeModel.rowCount(None) == rowCountBefore - 1)
-    assert(testModel.columnCount(None) == rowCountBefore - 1)
+    assert(testTransposeModel.grid.columnCount() == rowCountBefore - 1)
 
 def test_BeadworkTransposeModel_removeColumn(testingTransposeModels):
     testModel, testTransposeModel = testingTransposeModels
     columnCountBefore = testTransposeModel.columnCount(None)
     testTransposeModel.removeColumn(0, count=1)
     assert(testTransposeModel.columnCount(None) == columnCountBefore - 1)
-    assert(testModel.rowCount(None) == columnCountBefore - 1)
\ No newline at end of file
+    assert(testTransposeModel.grid.rowCount() == columnCountBefore - 1)
+
+def test_BeadworkTransposeModel_nearbyIndicesThatMatch():
+    testModel = BeadworkModel(data=[["#000000", "#000000"],
+                                    ["#FFFFFF", "#000000"],
+                                    ["#FFFFFF", "#FFFFFF"]])
+    testModel.setTransposed(True)
+    matches = testModel.nearbyIndicesThatMatch(testModel.index(1, 1))
+    assert(sorted((index.row(), index.column()) for index in matches) == [(0, 0), (1, 0), (1, 1)])
+
+def test_BeadworkModel_setTransposed_movesPersistentIndexes():
+    testModel = BeadworkModel(debug=True, defaultHeight=7, defaultWidth=5)
+    persistent = QPersistentModelIndex(testModel.index(6, 2))
+    color = testModel.data(testModel.index(6, 2), Qt.ItemDataRole.DisplayRole)
+    testModel.setTransposed(True)
+    assert((persistent.row(), persistent.column()) == (2, 6))
+    assert(testModel.data(testModel.index(persistent.row(), persistent.column()), Qt.ItemDataRole.DisplayRole) == color)
+    testModel.setTransposed(False)
+    assert((persistent.row(), persistent.column()) == (6, 2))
+
+def test_BeadworkModel_editTarget_keepsOrientation():
+    testModel = BeadworkModel(data=[["#000000", "#111111"],
+                                    ["#222222", "#333333"],
+                                    ["#444444", "#555555"]])
+    testModel.setTransposed(True)
+    edit = Edits.SetCells(testModel.editTarget(), {(0, 2): "#ABCDEF"})   # row 0, column 2 transposed
+    edit.redo()
+    testModel.setTransposed(False)
+    assert(testModel.grid.rows[2][0] == "#ABCDEF")
+    edit.undo()
+    assert(testModel.grid.rows[2][0] == "#444444")
+
+def test_BeadworkModel_setBlock(qtbot):
+    testModel = BeadworkModel(data=[["#000000", "#111111"],
+                                    ["#222222", "#333333"],
+                                    ["#444444", "#555555"]])
+    testModel.setTransposed(True)    # shown 2 rows x 3 columns
+    assert(testModel.block(0, 1, 2, 2) == [["#222222", "#444444"], ["#333333", "#555555"]])
+
+    with qtbot.waitSignal(testModel.dataChanged) as blocker:
+        testModel.setBlock(0, 1, [["#ABCDEF", None], ["#ABCDEF", "#ABCDEF"]])
+    assert((blocker.args[0].row(), blocker.args[0].column(), blocker.args[1].row(), blocker.args[1].column()) == (0, 1, 1, 2))
+    assert(testModel.grid.rows == [["#000000", "#111111"],
+                                   ["#ABCDEF", "#ABCDEF"],
+                                   ["#444444", "#ABCDEF"]])
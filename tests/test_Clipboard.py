@@ -0,0 +1,106 @@
+import pytest
+
+from PySide6.QtCore import QItemSelection, QItemSelectionModel, QMimeData, Qt
+from PySide6.QtGui import QColor, QGuiApplication, QImage
+
+from BeadworkDesigner import Clipboard
+
+@pytest.fixture
+def mainWindow(newWindow):
+    data = [[f"#{(r * 20 + c) * 0x10101 & 0xFFFFFF:06X}" for c in range(20)] for r in range(15)]
+    yield newWindow(20, 15, data, shown=True)
+    QGuiApplication.clipboard().clear()
+
+def select(window, top, left, bottom, right, command=QItemSelectionModel.SelectionFlag.ClearAndSelect):
+    model = window.model
+    window.beadworkView.selectionModel().select(QItemSelection(model.index(top, left), model.index(bottom, right)), command)
+
+def test_Clipboard_image(qapp):
+    block = [["#FF0000", None], ["#00FF00", "#0000FF"]]
+    image = Clipboard.blockToImage(block)
+    assert((image.width(), image.height()) == (2, 2))
+    assert(image.pixelColor(0, 0) == QColor("#FF0000"))
+    assert(image.pixelColor(1, 0).alpha() == 0)
+    assert(Clipboard.blockFromImage(image) == block)
+    assert(Clipboard.blockFromImage(image, maxRows=1, maxColumns=1) == [["#FF0000"]])
+
+def test_Clipboard_formats(qapp):
+    block = [["#FF0000", "#FF0000", None]]
+    Clipboard.copyBlock(block)
+    mimeData = QGuiApplication.clipboard().mimeData()
+    assert(mimeData.hasFormat(Clipboard.BLOCK_MIME_TYPE) and mimeData.hasText() and mimeData.hasImage())
+    assert(Clipboard.pastedBlock() == block)
+
+    # an image copied from another application
+    image = QImage(3, 2, QImage.Format.Format_RGB32)
+    image.fill(QColor("#123456"))
+    mimeData = QMimeData()
+    mimeData.setImageData(image)
+    QGuiApplication.clipboard().setMimeData(mimeData)
+    assert(Clipboard.pastedBlock() == [["#123456"] * 3] * 2)
+
+    QGuiApplication.clipboard().setText("not beads")
+    assert(Clipboard.pastedBlock() is None)
+
+def test_Clipboard_copyPaste(qtbot, mainWindow):
+    model, view = mainWindow.model, mainWindow.beadworkView
+    copied = model.block(1, 2, 3, 4)
+    select(mainWindow, 1, 2, 3, 5)
+    mainWindow.copySelection()
+    commands = mainWindow.undoStack.count()
+
+    mainWindow.startPaste()
+    assert(view.previewBlock is not None and view.hasMouseTracking())
+    qtbot.mouseMove(view.viewport(), view.visualRect(model.index(8, 10)).center())
+    assert(view.previewBlock[:2] == (8, 10))    # follows the mouse
+    view.viewport().repaint()
+
+    with qtbot.waitSignal(model.dataChanged):
+        qtbot.mouseClick(view.viewport(), Qt.MouseButton.LeftButton, pos=view.visualRect(model.index(8, 10)).center())
+    assert(model.block(8, 10, 3, 4) == copied)
+    assert(mainWindow.undoStack.count() == commands + 1)
+    assert(view.previewBlock is None and not view.hasMouseTracking())
+
+    mainWindow.undoStack.undo()
+    assert(model.block(8, 10, 3, 4) != copied)
+
+def test_Clipboard_pasteClippedAndMasked(mainWindow):
+    model = mainWindow.model
+    select(mainWindow, 0, 0, 0, 1)
+    select(mainWindow, 2, 1, 2, 1, QItemSelectionModel.SelectionFlag.Select)    # not a rectangle
+    mainWindow.copySelection()
+    before = model.exportData().toList()
+
+    mainWindow.startPaste()
+    mainWindow.placePaste(model.index(13, 19))     # only the top left of it fits
+    after = model.exportData().toList()
+    assert(after[13][19] == before[0][0])
+    assert(after[14][19] == before[14][19])           # not selected, so transparent
+    assert(sum(a != b for rowA, rowB in zip(after, before) for a, b in zip(rowA, rowB)) == 1)
+
+def test_Clipboard_pasteTransparentBlank(mainWindow):
+    Clipboard.copyBlock([["#FFFFFF", "#FF0000"]])
+    mainWindow.pasteTransparentAction.setChecked(True)
+    before = mainWindow.model.cellColor(0, 0)
+    mainWindow.startPaste()
+    mainWindow.placePaste(mainWindow.model.index(0, 0))
+    assert(mainWindow.model.cellColor(0, 0) == before)
+    assert(mainWindow.model.cellColor(0, 1) == "#FF0000")
+
+def test_Clipboard_cut(mainWindow):
+    model = mainWindow.model
+    copied = model.block(4, 4, 2, 2)
+    select(mainWindow, 4, 4, 5, 5)
+    commands = mainWindow.undoStack.count()
+    mainWindow.cutSelection()
+    assert(model.block(4, 4, 2, 2) == [["#FFFFFF"] * 2] * 2)
+    assert(mainWindow.undoStack.count() == commands + 1)
+    assert(Clipboard.pastedBlock() == copied)
+
+def test_Clipboard_cancelPaste(mainWindow):
+    Clipboard.copyBlock([["#FF0000"]])
+    mainWindow.colorMode.trigger()
+    mainWindow.startPaste()
+    mainWindow.cancelAction.trigger()
+    assert(mainWindow.pasteDraft is None and mainWindow.beadworkView.previewBlock is None)
+    assert(mainWindow.beadworkView.strokeMode)    # back to painting
@@ -0,0 +1,107 @@
+import json
+import os
+import stat
+
+import pytest
+
+from BeadworkDesigner.ConfigService import ConfigService, coerceConfig, readConfigs, writeJSONAtomically
+from BeadworkDesigner.utils import readConfigFile
+
+@pytest.fixture
+def configFilePath(tmp_path):
+    filename = str(tmp_path / "config.json")
+    with open(filename, "w") as file:
+        json.dump({"app_configs": {"debug": False, "beadHeight": 10, "beadWidth": 8},
+                   "project_configs": {"width": 10, "height": 13, "defaultOrientation": "Vertical"}}, file)
+    return filename
+
+@pytest.fixture
+def config(qapp, configFilePath):
+    project_configs, app_configs = readConfigFile(configFilePath)
+    return ConfigService(app_configs, project_configs, configFilePath)
+
+def test_ConfigService_get(qapp, configFilePath):
+    app_configs = {"beadHeight": 10}
+    service = ConfigService(app_configs, None, configFilePath, watch=False)
+    assert(service.get("beadHeight") == 10)                 # app configs
+    assert(service.get("beadWidth") == 12)                  # default config
+    assert(service.get("height") == 12)
+    assert(app_configs["beadWidth"] == 12)                  # defaults are adopted by their layer
+    assert(service.project_configs["height"] == 12)
+    assert(service.get("beadHeight", app_configs) == 10)
+
+    with pytest.raises(KeyError):
+        service.get("should_fail")
+
+def test_ConfigService_projectWinsOverApp(qapp, configFilePath):
+    service = ConfigService({"width": 1}, {"width": 2}, configFilePath, watch=False)
+    assert(service.get("width") == 2)
+
+def test_ConfigService_set(qtbot, config, configFilePath):
+    config.set("height", 20)                                # project configs are not saved
+    assert(config.get("height") == 20)
+    assert(not config.saveTimer.isActive())
+
+    config.set("beadHeight", 15)
+    config.set("beadHeight", 16)
+    assert(config.get("beadHeight") == 16)
+    assert(readConfigFile(configFilePath)[1]["beadHeight"] == 10)  # not yet written
+
+    qtbot.waitUntil(lambda: readConfigFile(configFilePath)[1]["beadHeight"] == 16)
+    project_configs, _ = readConfigFile(configFilePath)
+    assert(project_configs["height"] == 13)
+
+    config.set("should_fail", 1)                            # logged, not added
+    with pytest.raises(KeyError):
+        config.get("should_fail")
+
+def test_ConfigService_save(config, configFilePath):
+    config.set("beadWidth", 9)
+    config.save()
+    assert(not config.saveTimer.isActive())
+    assert(readConfigFile(configFilePath)[1]["beadWidth"] == 9)
+    assert(not [f for f in os.listdir(os.path.dirname(configFilePath)) if f.startswith(".config-")])
+
+    config.saveDefaultProjectConfigs({"width": 4, "height": 5, "defaultOrientation": "Horizontal"})
+    project_configs, app_configs = readConfigFile(configFilePath)
+    assert(project_configs["width"] == 4)
+    assert(app_configs["beadWidth"] == 9)
+    assert(config.get("width") == 10)                       # the open project is unchanged
+
+def test_ConfigService_writeKeepsPermissions(tmp_path, configFilePath):
+    os.chmod(configFilePath, 0o664)
+    writeJSONAtomically({"app_configs": {}, "project_configs": {}}, configFilePath)
+    assert(stat.S_IMODE(os.stat(configFilePath).st_mode) == 0o664)
+
+    newFile = str(tmp_path / "new.json")
+    writeJSONAtomically({}, newFile)
+    assert(stat.S_IMODE(os.stat(newFile).st_mode) == 0o644)
+
+@pytest.mark.parametrize("contents", [None, "{not json", '{"app_configs": {}}'])
+def test_ConfigService_unreadableFiles(qapp, tmp_path, configFilePath, contents):
+    broken = str(tmp_path / "broken.json")
+    if contents is not None:
+        with open(broken, "w") as file:
+            file.write(contents)
+    assert(readConfigs(broken, configFilePath) == readConfigFile(configFilePath))   # falls back to the defaults
+
+    service = ConfigService({}, {}, broken, defaultFilename=broken, watch=False)
+    with pytest.raises(KeyError):
+        service.get("beadWidth")
+
+def test_ConfigService_reload(qtbot, config, configFilePath):
+    with qtbot.waitSignal(config.reloaded, timeout=5000):
+        with open(configFilePath, "w") as file:
+            json.dump({"app_configs": {"debug": False, "beadHeight": 30, "beadWidth": 8},
+                       "project_configs": {"width": 10, "height": 13, "defaultOrientation": "Vertical"}}, file)
+    assert(config.get("beadHeight") == 30)
+    assert(config.app_configs["beadHeight"] == 30)
+
+def test_coerceConfig():
+    assert(coerceConfig("15", 10) == 15)
+    assert(coerceConfig("False", True) is False)
+    assert(coerceConfig("true", False) is True)
+    assert(coerceConfig("1.5", 2.0) == 1.5)
+    assert(coerceConfig("Horizontal", "Vertical") == "Horizontal")
+    assert(coerceConfig("abc", 10) == "abc")
+    assert(coerceConfig(7, 10) == 7)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from BeadworkDesigner import Dither
+from BeadworkDesigner.Dither import DitherMethod
+
+BLACK_WHITE = Dither.rgbToLab(np.array([[0, 0, 0], [255, 255, 255]]))
+
+def test_Dither_hexToRgb_roundTrip():
+    colors = ["#000000", "#FFFFFF", "#F0000F", "#12AB9C"]
+    assert(Dither.rgbToHex(Dither.hexToRgb(colors)) == colors)
+
+def test_Dither_gridToRgb():
+    rgb = Dither.gridToRgb([["#FF0000", "#00FF00"], ["#0000FF", "#FF0000"]])
+    assert(rgb.shape == (2, 2, 3))
+    assert(rgb[0, 0].tolist() == [255, 0, 0])
+    assert(rgb[1, 0].tolist() == [0, 0, 255])
+    assert(rgb[1, 1].tolist() == [255, 0, 0])
+
+def test_Dither_labRoundTrip():
+    rgb = np.array([[0, 0, 0], [255, 255, 255], [12, 200, 99], [240, 0, 15]])
+    lab = Dither.rgbToLab(rgb)
+    assert(np.allclose(lab[1], [100, 0, 0], atol=1e-3))
+    assert(np.allclose(Dither.labToRgb(lab), rgb, atol=0.5))
+
+def test_Dither_nearestColor():
+    lab = Dither.rgbToLab(np.array([[[10, 10, 10], [250, 240, 245]]]))
+    assert(Dither.nearestColor(lab, BLACK_WHITE).tolist() == [[0, 1]])
+
+@pytest.mark.parametrize("method", [DitherMethod.FLOYD_STEINBERG, DitherMethod.ATKINSON, DitherMethod.BAYER])
+def test_Dither_quantize_mixesMidGray(method):
+    lab = Dither.rgbToLab(np.full((32, 32, 3), 118))  # roughly 50% lightness
+    indexes = Dither.quantize(lab, BLACK_WHITE, method)
+    assert(indexes.shape == (32, 32))
+    assert(set(np.unique(indexes).tolist()) == {0, 1})
+    assert(0.3 < indexes.mean() < 0.7)
+
+def test_Dither_quantize_noDithering():
+    lab = Dither.rgbToLab(np.full((4, 4, 3), 118))
+    assert(len(np.unique(Dither.quantize(lab, BLACK_WHITE, DitherMethod.NONE))) == 1)
+
+def test_Dither_medianCutPalette():
+    lab = Dither.rgbToLab(np.array([[0, 0, 0], [10, 10, 10], [250, 250, 250], [255, 255, 255]]))
+    palette = Dither.medianCutPalette(lab, np.ones(4), 2)
+    assert(len(palette) == 2)
+    assert(sorted(np.round(palette[:, 0]).tolist())[0] < 10)
+    assert(sorted(np.round(palette[:, 0]).tolist())[1] > 90)
+
+@pytest.mark.parametrize("method", list(DitherMethod))
+def test_Dither_quantizeImage(method):
+    rgb = np.random.default_rng(0).integers(0, 256, (20, 15, 3)).astype(np.uint8)
+    data = Dither.quantizeImage(rgb, 6, method)
+    assert(len(data) == 20 and len(data[0]) == 15)
+    assert(len({color for row in data for color in row}) <= 6)
+
+@pytest.mark.parametrize("method", list(DitherMethod))
+def test_Dither_reduceColors(method):
+    colors = ["#000000", "#202020", "#FF0000", "#EE1111", "#FFFFFF", "#0000FF"]
+    data = [[colors[(r * 7 + c) % len(colors)] for c in range(9)] for r in range(8)]
+    reduced = Dither.reduceColors(data, 3, method)
+    usedColors = {color for row in reduced for color in row}
+    assert(len(usedColors) <= 3)
+    assert(usedColors <= set(colors))   # only colors that were already in the pattern
+    assert(data[0][0] == "#000000")     # original is left untouched
+
+@pytest.mark.parametrize("method", list(DitherMethod))
+def test_Dither_quantizeImage_progressStops(method):
+    rgb = np.random.default_rng(0).integers(0, 256, (20, 15, 3)).astype(np.uint8)
+    reported = []
+
+    def progress(fraction):
+        reported.append(fraction)
+        raise InterruptedError()
+
+    with pytest.raises(InterruptedError):
+        Dither.quantizeImage(rgb, 6, method, progress)
+    assert(len(reported) == 1)
+
+def test_Dither_reduceColors_fewerThanCount():
+    data = [["#000000", "#FFFFFF"], ["#FFFFFF", "#000000"]]
+    reduced = Dither.reduceColors(data, 4)
+    assert(reduced == data)
+    assert(reduced is not data)
@@ -0,0 +1,145 @@
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from PySide6.QtGui import QImage
+
+from BeadworkDesigner import Export
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+@pytest.fixture
+def testData():
+    return [["#FF0000" if (r + c) % 3 else "#0000FF" for c in range(11)] for r in range(7)]
+
+def test_Export_colorRuns():
+    assert(Export.colorRuns(["#000000", "#000000", "#FFFFFF", "#000000"]) == [(0, 2, "#000000"), (2, 1, "#FFFFFF"), (3, 1, "#000000")])
+    assert(Export.colorRuns(["#000000"] * 5) == [(0, 5, "#000000")])
+
+def test_Export_exportPNG(qapp, tmp_path, testData):
+    filename = str(tmp_path / "pattern.png")
+    Export.exportPNG(testData, filename, beadWidth=10, beadHeight=20)
+
+    image = QImage(filename)
+    margin = Export.markerMargin(10, 20)
+    assert(image.width() == margin + 11 * 10 + 1)
+    assert(image.height() == margin + 7 * 20 + 1)
+    for r in range(7):
+        for c in range(11):
+            assert(image.pixelColor(margin + c * 10 + 5, margin + r * 20 + 10).name().upper() == testData[r][c])
+    assert(image.pixelColor(margin, margin + 10).name().upper() == Export.GRID_COLOR)
+    assert(image.pixelColor(margin + 5, image.height() - 1).name().upper() == Export.GRID_COLOR)
+
+def test_Export_exportPNG_noGridNoMarkers(qapp, tmp_path, testData):
+    filename = str(tmp_path / "pattern.png")
+    Export.exportPNG(testData, filename, beadWidth=3, beadHeight=4, gridLines=False, markers=False)
+
+    image = QImage(filename)
+    assert(image.width() == 11 * 3)
+    assert(image.height() == 7 * 4)
+    assert(image.pixelColor(0, 0).name().upper() == testData[0][0])
+
+def test_Export_exportPNG_strips(qapp, tmp_path, testData, monkeypatch):
+    whole = str(tmp_path / "whole.png")
+    Export.exportPNG(testData, whole, beadWidth=10, beadHeight=20)
+
+    # force one row of beads per strip
+    monkeypatch.setattr(Export, "STRIP_BYTES", 1)
+    progress = []
+    strips = str(tmp_path / "strips.png")
+    Export.exportPNG(testData, strips, beadWidth=10, beadHeight=20, progress=lambda done, total: progress.append(done))
+
+    assert(progress == list(range(1, 8)))
+    assert(QImage(whole) == QImage(strips))
+
+def test_Export_exportPNG_lateCancel(qapp, tmp_path, testData):
+    filename = str(tmp_path / "pattern.png")
+    cancel = []
+    Export.exportPNG(testData, filename, progress=lambda done, total: cancel.append(done == total), cancelled=lambda: any(cancel))
+    assert(not QImage(filename).isNull())      # cancelled once it was all written, so kept
+
+def test_Export_exportSVG(tmp_path, testData):
+    filename = str(tmp_path / "pattern.svg")
+    Export.exportSVG(testData, filename, beadWidth=10, beadHeight=20)
+
+    root = ElementTree.parse(filename).getroot()
+    rects = root.findall(f".//{SVG}rect")
+    runs = sum(len(Export.colorRuns(row)) for row in testData)
+    assert(len(rects) == runs + 1)     # plus the background
+    assert(len(root.findall(f".//{SVG}path")) == 1)
+    markers = [text.text for text in root.findall(f".//{SVG}text")]
+    assert(markers.count("||") == 2)   # center of 11 columns and of 7 rows
+    assert(markers.count("|") == 3)    # columns 5 and 10, row 5
+
+def test_Export_exportSVG_mergesRuns(tmp_path):
+    filename = str(tmp_path / "pattern.svg")
+    Export.exportSVG([["#000000"] * 100] * 3, filename, gridLines=False, markers=False)
+    rects = ElementTree.parse(filename).getroot().findall(f".//{SVG}rect")
+    assert(len(rects) == 4)
+    assert(rects[1].get("width") == str(100 * 12))
+
+def pdfPageCount(filename):
+    return len(re.findall(rb"/Type\s*/Page\b", open(filename, "rb").read()))
+
+def test_Export_tileStarts():
+    assert(Export.tileStarts(10, 40, 2) == [0])
+    assert(Export.tileStarts(100, 40, 2) == [0, 38, 76])
+    assert(Export.tileStarts(80, 40, 0) == [0, 40])
+
+def test_Export_legendKeys():
+    keys = Export.legendKeys(28)
+    assert(keys[:3] == ["A", "B", "C"])
+    assert(keys[25:] == ["Z", "AA", "AB"])
+
+def test_Export_wordChartRow():
+    keys = {"#FF0000": "A", "#0000FF": "B"}
+    assert(Export.wordChartRow(["#FF0000", "#FF0000", "#0000FF", "#FF0000"], keys) == ["2xA", "1xB", "1xA"])
+
+def test_Export_exportPDF(qapp, tmp_path):
+    data = [["#FF0000" if (r // 5 + c // 5) % 2 else "#0000FF" for c in range(80)] for r in range(120)]
+    filename = str(tmp_path / "chart.pdf")
+    steps = []
+    Export.exportPDF(data, filename, beadWidth=8, beadHeight=14, progress=lambda done, total: steps.append((done, total)))
+
+    # A4 with 36pt margins fits 61 beads across and 53 down, so 2 x 3 chart pages, a legend and the word chart
+    assert(pdfPageCount(filename) >= 2 * 3 + 2)
+    assert(steps[-1][0] == steps[-1][1])
+
+    horizontalFilename = str(tmp_path / "horizontal.pdf")
+    Export.exportPDF(data, horizontalFilename, horizontal=True)
+    assert(pdfPageCount(horizontalFilename) > 0)
+
+def test_Export_exportPDF_cancelled(qapp, tmp_path):
+    data = [["#FF0000"] * 200 for _ in range(200)]
+    filename = str(tmp_path / "chart.pdf")
+    with pytest.raises(Export.ExportCancelled):
+        Export.exportPDF(data, filename, cancelled=lambda: True)
+    assert(not os.path.exists(filename))
+
+def test_Export_exportPDF_cancelledInWordChart(qapp, tmp_path):
+    data = [["#FF0000", "#0000FF"] * 30 for _ in range(300)]
+    filename = str(tmp_path / "chart.pdf")
+    checks = []
+    with pytest.raises(Export.ExportCancelled):
+        Export.exportPDF(data, filename, cancelled=lambda: checks.append(1) or len(checks) > 8)
+    assert(not os.path.exists(filename))
+
+def test_Export_ExportWorker(qtbot, tmp_path, testData):
+    filename = str(tmp_path / "chart.pdf")
+    worker = Export.ExportWorker(Export.exportPDF, testData, filename, pageSize="Letter")
+    with qtbot.waitSignal(worker.finished, timeout=10000) as blocker:
+        worker.start()
+    worker.wait()
+    assert(blocker.args == [filename])
+    assert(pdfPageCount(filename) == 3)
+
+def test_Export_ExportWorker_cancel(qtbot, tmp_path, testData):
+    filename = str(tmp_path / "pattern.png")
+    worker = Export.ExportWorker(Export.exportPNG, testData, filename)
+    worker.cancel()
+    with qtbot.waitSignal(worker.failed, timeout=10000):
+        worker.start()
+    worker.wait()
+    assert(not os.path.exists(filename))
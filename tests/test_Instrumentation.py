@@ -0,0 +1,76 @@
+import pytest
+
+from BeadworkDesigner import Instrumentation
+
+@pytest.fixture
+def instrumentation():
+    Instrumentation.enable()
+    yield Instrumentation
+    Instrumentation.disable()
+    Instrumentation.reset()
+
+class Command:
+    def __init__(self, text):
+        self._text = text
+
+    def text(self):
+        return self._text
+
+    @Instrumentation.timedCommand
+    def redo(self):
+        return "done"
+
+@Instrumentation.timed("work")
+def work(x):
+    return x * 2
+
+def test_Instrumentation_disabled():
+    assert(not Instrumentation.enabled)
+    Instrumentation.count("something")
+    Instrumentation.record("something", 1.0)
+    assert(work(2) == 4)
+    assert(Command("Change").redo() == "done")
+    assert(not Instrumentation.counters)
+    assert(not Instrumentation.timings)
+    assert(not Instrumentation.recentCommands)
+
+def test_Instrumentation_count(instrumentation):
+    instrumentation.count("dataChanged")
+    instrumentation.count("dataChanged cells", 12)
+    assert(instrumentation.counters["dataChanged"] == 1)
+    assert(instrumentation.counters["dataChanged cells"] == 12)
+
+    counters, _ = instrumentation.snapshot()
+    instrumentation.count("dataChanged")
+    assert(counters["dataChanged"] == 1)    # a copy
+
+def test_Instrumentation_timed(instrumentation):
+    assert(work(3) == 6)
+    assert(work(4) == 8)
+    calls, total, last = instrumentation.timings["work"]
+    assert(calls == 2)
+    assert(total >= last >= 0)
+
+def test_Instrumentation_timedCommand(instrumentation):
+    for i in range(Instrumentation.RECENT_COMMANDS + 5):
+        Command(f"Change {i}").redo()
+    assert(len(instrumentation.recentCommands) == Instrumentation.RECENT_COMMANDS)
+    assert(instrumentation.recentCommands[-1][0] == f"Change {Instrumentation.RECENT_COMMANDS + 4} (redo)")
+    assert(instrumentation.timings["command"][0] == Instrumentation.RECENT_COMMANDS + 5)
+
+def test_Instrumentation_enableResets(instrumentation):
+    instrumentation.count("frames")
+    instrumentation.enable()
+    assert(not instrumentation.counters)
+
+def test_Instrumentation_approximateSize():
+    class Record:
+        def __init__(self):
+            self.target = ["x" * 10000]
+            self.cells = {(0, 0): "#FFFFFF", (0, 1): "#000000"}
+
+    small = Instrumentation.approximateSize(Record(), exclude=("target",))
+    assert(0 < small < 10000)
+    assert(Instrumentation.approximateSize(Record()) > 10000)
+    shared = [1, 2, 3]
+    assert(Instrumentation.approximateSize([shared, shared]) < 2 * Instrumentation.approximateSize(shared) + 100)
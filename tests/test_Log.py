@@ -0,0 +1,73 @@
+import logging
+import os
+
+import pytest
+
+from BeadworkDesigner import Log
+
+class CountingArgument:
+    """Counts how many times it is formatted into a message."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "argument"
+
+@pytest.fixture
+def rootLogger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    Log.stopLogging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def test_Log_traceLevel():
+    assert(Log.TRACE < logging.DEBUG)
+    assert(logging.getLevelName(Log.TRACE) == "TRACE")
+
+def test_Log_traceIsLazy(rootLogger, tmp_path):
+    logger = logging.getLogger("BeadworkDesigner.test")
+    argument = CountingArgument()
+
+    Log.setupLogging(level=logging.DEBUG, logDir=str(tmp_path), console=False)
+    Log.trace(logger, "not formatted: %s", argument)
+    logger.debug("formatted: %s", argument)
+    Log.stopLogging()
+    assert(argument.formatted == 1)
+
+    with open(tmp_path / Log.LOG_FILE) as file:
+        text = file.read()
+    assert("formatted: argument" in text)
+    assert("not formatted" not in text)
+
+def test_Log_setupLogging(rootLogger, tmp_path):
+    logger = logging.getLogger("BeadworkDesigner.test")
+    Log.setupLogging(level=Log.TRACE, logDir=str(tmp_path), logFile="custom.log", console=False)
+    assert(any(isinstance(handler, logging.handlers.QueueHandler) for handler in rootLogger.handlers))
+
+    Log.trace(logger, "bead %d", 3)
+    Log.stopLogging()
+
+    with open(tmp_path / "custom.log") as file:
+        line = file.read()
+    assert("TRACE" in line)
+    assert("bead 3" in line)
+    assert("test_Log_setupLogging" in line)     # the caller, not trace(), is recorded
+
+def test_Log_rotation(rootLogger, tmp_path, monkeypatch):
+    monkeypatch.setattr(Log, "MAX_BYTES", 1000)
+    logger = logging.getLogger("BeadworkDesigner.test")
+    Log.setupLogging(level=logging.INFO, logDir=str(tmp_path), console=False)
+    for i in range(200):
+        logger.info("message %d", i)
+    Log.stopLogging()
+
+    files = sorted(os.listdir(tmp_path))
+    assert(len(files) == Log.BACKUP_COUNT + 1)
+    assert(all(os.path.getsize(tmp_path / f) <= 1000 for f in files))
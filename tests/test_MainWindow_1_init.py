@@ -82,6 +82,40 @@ def test_MainWindow_init_toolbar(mainWindow):
     assert(mainWindow.toolbar.actions()[14] == mainWindow.colorMode)
     assert(mainWindow.toolbar.actions()[15] == mainWindow.clearMode)
 
+def test_MainWindow_init_lazyWindows(mainWindow):
+    # secondary windows are only built when first used
+    for names in MainWindow.LAZY_WINDOWS.values():
+        for name in names:
+            assert(not mainWindow.isBuilt(name))
+
+    mainWindow.changeHeightTo(mainWindow.modelHeight + 1)
+    assert(not mainWindow.isBuilt("dimensionsWindow"))
+
+    # building the window picks up the current dimensions
+    assert(mainWindow.widthEdit.text() == str(mainWindow.modelWidth))
+    assert(mainWindow.heightEdit.text() == str(mainWindow.modelHeight))
+    assert(mainWindow.isBuilt("dimensionsWindow"))
+    assert(not mainWindow.isBuilt("settingsWindow"))
+
+    with pytest.raises(AttributeError):
+        mainWindow.notAWidget
+
+def test_MainWindow_init_startupProfiler(mainWindow, qtbot):
+    import io
+    from BeadworkDesigner.StartupProfiler import StartupProfiler
+
+    profiler = StartupProfiler()
+    profiler.mark("not recorded while disabled")
+    profiler.start()
+    profiler.mark("setup")
+    out = io.StringIO()
+    profiler.watchFirstPaint(mainWindow.beadworkView.viewport(), out)
+    mainWindow.show()
+    qtbot.waitUntil(lambda: "first paint" in out.getvalue())
+
+    phases = [name for name, _ in profiler.phases]
+    assert(phases == ["setup", "first paint"])
+
 def test_MainWindow_close(mainWindow):
     mainWindow.close()
     assert(not mainWindow.isVisible())
@@ -1,8 +1,9 @@
 import os
 import pytest
 
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QColor, QImage, QPainter
+from PySide6.QtWidgets import QStyle, QStyleOptionViewItem
 
 from BeadworkDesigner.MainWindow import MainWindow
 from BeadworkDesigner.utils import readConfigFile
@@ -123,6 +124,60 @@ def test_beadworkView_setBeadSize(qtbot):
     for i in range(view.model().columnCount(None)):
         assert(view.columnWidth(i) == 40)
 
+@pytest.mark.parametrize("selected", [False, True])
+def test_beadworkView_delegatePaintsInsideCell(qtbot, selected):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    view, index = mainWindow.beadworkView, mainWindow.model.index(0, 0)
+    view.setBeadSize()
+    width, height = view.beadWidth, view.beadHeight
+
+    image = QImage(3 * width, 3 * height, QImage.Format.Format_RGB32)
+    image.fill(QColor("#00FF00"))
+    option = QStyleOptionViewItem()
+    option.rect = QRect(width, height, width, height)
+    if selected:
+        option.state |= QStyle.StateFlag.State_Selected
+    painter = QPainter(image)
+    for _ in range(2):      # painting must not change the option
+        mainWindow.delegate.paint(painter, option, index)
+    painter.end()
+
+    assert(option.rect == QRect(width, height, width, height))
+    assert(image.pixelColor(width, height) == QColor("#000000" if selected else "#FFFFFF"))
+    assert(image.pixelColor(width + 1, height + 1) == QColor(mainWindow.model.cellColor(0, 0)))
+    assert(image.pixelColor(2 * width - 1, 2 * height - 1) == QColor(mainWindow.model.cellColor(0, 0)))
+    for x, y in ((width - 1, height), (2 * width, height), (width, 2 * height), (2 * width, 2 * height)):
+        assert(image.pixelColor(x, y) == QColor("#00FF00"))     # nothing drawn outside the cell
+
+def test_beadworkView_beadStyle(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    view, index = mainWindow.beadworkView, mainWindow.model.index(0, 0)
+    view.setBeadSize()
+    width, height = view.beadWidth, view.beadHeight
+    assert(mainWindow.beadStyleActions["Flat"].isChecked())
+
+    mainWindow.beadStyleActions["Delica"].trigger()
+    assert(mainWindow.delegate.beadStyle == "Delica")
+    assert(not mainWindow.beadStyleActions["Flat"].isChecked())
+
+    image = QImage(3 * width, 3 * height, QImage.Format.Format_RGB32)
+    image.fill(QColor("#00FF00"))
+    option = QStyleOptionViewItem()
+    option.rect = QRect(width, height, width, height)
+    painter = QPainter(image)
+    mainWindow.delegate.paint(painter, option, index)
+    painter.end()
+    beadRow = [image.pixelColor(x, height + height // 2) for x in range(width + 1, 2 * width)]
+    assert(len(set(color.rgb() for color in beadRow)) > 1)     # shaded
+    assert(image.pixelColor(2 * width, height + height // 2) == QColor("#00FF00"))     # nothing drawn outside the cell
+
+    with pytest.raises(ValueError):
+        mainWindow.delegate.setBeadStyle("Pearl")
+    mainWindow.setBeadStyle("Flat")
+    assert(mainWindow.beadStyleActions["Flat"].isChecked())
+
 def test_beadworkView_changeOrientationOnce(qtbot):
     mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
     qtbot.addWidget(mainWindow)
@@ -172,6 +227,31 @@ def test_beadworkView_changeOrientationOTwice(qtbot):
     for i in range(view.model().columnCount(None)):
         assert(view.columnWidth(i) == view.beadWidth)
 
+def test_beadworkView_changeOrientationKeepsSelection(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    view = mainWindow.beadworkView
+    model = view.model()
+    rows, columns = model.rowCount(None), model.columnCount(None)
+    colors = mainWindow.colorListModel._colors
+
+    view.selectListOfBeads([model.index(1, 2), model.index(3, 0)])
+    selectedColors = {(i.row(), i.column()): i.data() for i in view.selectedIndexes()}
+    mainWindow.changeOrientation("Horizontal")
+
+    # the same model, transposed in place: no new model, selection or color list scan
+    assert(view.model() is model)
+    assert(mainWindow.colorListModel._colors is colors)
+    assert((model.rowCount(None), model.columnCount(None)) == (columns, rows))
+    assert(view.verticalHeader().count() == columns)
+    assert(view.horizontalHeader().count() == rows)
+    assert({(i.row(), i.column()): i.data() for i in view.selectedIndexes()} == {(c, r): color for (r, c), color in selectedColors.items()})
+
+    # the color list maps its positions to the transposed indexes
+    color = model.index(2, 1).data()
+    assert(all(index.data() == color for index in mainWindow.colorListModel.allIndexesForColor(color)))
+
 def test_beadworkView_changeHeight(qtbot):
     mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
     qtbot.addWidget(mainWindow)
@@ -401,4 +481,173 @@ def test_beadworkView_zoomOut(qtbot):
     mainWindow.zoomOut()
 
     assert(view.beadHeight == beadHeightBefore - 2)
-    assert(view.beadWidth == beadWidthBefore - 2)
\ No newline at end of file
+    assert(view.beadWidth == beadWidthBefore - 2)
+def test_beadworkView_strokePaintsEveryBead(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    model = mainWindow.beadworkView.model()
+    before = [[model.data(model.index(r, c), Qt.ItemDataRole.DisplayRole) for c in range(4)] for r in range(4)]
+
+    mainWindow.colorMode.trigger()
+    mainWindow.currentColor.setText("FF0000")
+    commands = mainWindow.undoStack.count()
+    mainWindow.paintStroke([(0, 0), (0, 3), (3, 3)])    # beads between the samples are painted too
+
+    painted = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 3), (2, 3), (3, 3)]
+    for r in range(4):
+        for c in range(4):
+            expected = "#FF0000" if (r, c) in painted else before[r][c]
+            assert(model.data(model.index(r, c), Qt.ItemDataRole.DisplayRole) == expected)
+
+    assert(mainWindow.undoStack.count() == commands + 1)     # the whole stroke is one command
+    mainWindow.undoStack.undo()
+    assert([[model.data(model.index(r, c), Qt.ItemDataRole.DisplayRole) for c in range(4)] for r in range(4)] == before)
+    mainWindow.undoStack.redo()
+    assert(all(model.data(model.index(r, c), Qt.ItemDataRole.DisplayRole) == "#FF0000" for r, c in painted))
+
+def test_beadworkView_strokeWithMouse(qtbot):
+    mainWindow = MainWindow(debug=False, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    view = mainWindow.beadworkView
+    model = view.model()
+
+    mainWindow.clearMode.trigger()
+    mainWindow.currentColor.setText("FF0000")
+    mainWindow.colorMode.trigger()
+    commands = mainWindow.undoStack.count()
+    start, end = view.visualRect(model.index(1, 0)).center(), view.visualRect(model.index(1, 4)).center()
+
+    with qtbot.assertNotEmitted(view.clicked):
+        qtbot.mousePress(view.viewport(), Qt.MouseButton.LeftButton, pos=start)
+        qtbot.mouseMove(view.viewport(), end)
+        with qtbot.waitSignal(model.dataChanged):   # painted within a frame, before the mouse is released
+            pass
+        qtbot.mouseRelease(view.viewport(), Qt.MouseButton.LeftButton, pos=end)
+
+    assert(all(model.data(model.index(1, c), Qt.ItemDataRole.DisplayRole) == "#FF0000" for c in range(5)))
+    assert(mainWindow.undoStack.count() == commands + 1)
+    assert(not view.selectionModel().hasSelection())    # strokes do not select
+    assert("#FF0000" in [mainWindow.colorListModel.data(mainWindow.colorListModel.index(r, 0), Qt.ItemDataRole.DisplayRole)
+                        for r in range(mainWindow.colorListModel.rowCount(None))])
+
+def test_beadworkView_strokeCoalescesUpdates(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    model = mainWindow.beadworkView.model()
+
+    mainWindow.colorMode.trigger()
+    mainWindow.currentColor.setText("00FF00")
+    commands = mainWindow.undoStack.count()
+    changes = []
+    model.dataChanged.connect(lambda topLeft, bottomRight, roles=(): changes.append((topLeft.row(), bottomRight.row())))
+
+    mainWindow.beginStroke(model.index(0, 0))
+    for row in range(1, 8):
+        mainWindow.extendStroke(model.index(row, 0))
+    assert(changes == [])                           # nothing painted until the next frame
+    qtbot.waitUntil(lambda: len(changes) > 0)
+    assert(changes == [(0, 7)])                     # all the moves in one update
+    mainWindow.endStroke()
+    assert(mainWindow.undoStack.count() == commands + 1)
+
+def test_beadworkView_noUndoDuringStroke(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    model = mainWindow.beadworkView.model()
+
+    mainWindow.colorMode.trigger()
+    mainWindow.currentColor.setText("00FF00")
+    mainWindow.paintStroke([(0, 0), (0, 1)])
+    assert(mainWindow.undoAction.isEnabled())
+
+    before = model.data(model.index(2, 0), Qt.ItemDataRole.DisplayRole)
+    mainWindow.beginStroke(model.index(2, 0))
+    mainWindow.extendStroke(model.index(2, 1))
+    assert(not mainWindow.undoAction.isEnabled())
+    mainWindow.undoAction.trigger()                 # ignored until the stroke is on the undo stack
+    assert(model.data(model.index(0, 0), Qt.ItemDataRole.DisplayRole) == "#00FF00")
+
+    mainWindow.tasks.aboutToApply.emit()            # a task's result finishes the stroke first
+    assert(mainWindow.stroke is None and mainWindow.undoAction.isEnabled())
+    mainWindow.undoAction.trigger()
+    assert(model.data(model.index(2, 0), Qt.ItemDataRole.DisplayRole) == before)
+    assert(model.data(model.index(0, 0), Qt.ItemDataRole.DisplayRole) == "#00FF00")
+
+def test_beadworkView_shapePreviewThenCommit(qtbot):
+    mainWindow = MainWindow(debug=False, app_configs=app_configs, project_configs=project_configs)
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    view = mainWindow.beadworkView
+    model = view.model()
+
+    mainWindow.currentColor.setText("0000FF")
+    mainWindow.shapeComboBox.setCurrentText("Rectangle")   # switches to shape mode
+    assert(mainWindow.shapeMode.isChecked() and not mainWindow.selectionMode.isChecked())
+    commands = mainWindow.undoStack.count()
+    before = model.exportData().toList()
+
+    with qtbot.assertNotEmitted(model.dataChanged):
+        qtbot.mousePress(view.viewport(), Qt.MouseButton.LeftButton, pos=view.visualRect(model.index(0, 0)).center())
+        qtbot.mouseMove(view.viewport(), view.visualRect(model.index(3, 2)).center())
+        assert(view.preview[0] == [(0, 0, 2), (1, 0, 0), (1, 2, 2), (2, 0, 0), (2, 2, 2), (3, 0, 2)])
+        view.viewport().repaint()
+    assert(model.exportData() == before)   # previewed only
+
+    with qtbot.waitSignal(model.dataChanged):
+        qtbot.mouseRelease(view.viewport(), Qt.MouseButton.LeftButton, pos=view.visualRect(model.index(3, 2)).center())
+    assert(view.preview is None)
+    assert(mainWindow.undoStack.count() == commands + 1)
+    assert(model.cellColor(1, 2) == "#0000FF" and model.cellColor(1, 1) == before[1][1])
+
+    mainWindow.undoStack.undo()
+    assert(model.exportData() == before)
+
+def test_beadworkView_filledShapeIsOneBlockWrite(qtbot):
+    data = [["#FFFFFF"] * 1000 for _ in range(1000)]
+    mainWindow = MainWindow(debug=False, app_configs=app_configs,
+                            project_configs={**project_configs, "width": 1000, "height": 1000}, modelData=data)
+    qtbot.addWidget(mainWindow)
+    model = mainWindow.model
+    mainWindow.currentColor.setText("FF0000")
+    before = model.exportData()
+
+    changes = []
+    model.dataChanged.connect(lambda topLeft, bottomRight, roles=(): changes.append((topLeft.row(), topLeft.column(), bottomRight.row(), bottomRight.column())))
+    mainWindow.drawShape("Filled Rectangle", [(0, 0), (999, 999)])
+    assert(changes == [(0, 0, 999, 999)])
+    assert(all(row.count("#FF0000") == 1000 for row in model.grid.rows))
+
+    mainWindow.undoStack.undo()
+    assert(model.exportData() == before)
+
+def test_beadworkView_drawOutlineOffPattern(qtbot):
+    mainWindow = MainWindow(debug=True, app_configs=app_configs, project_configs={**project_configs, "width": 12, "height": 12})
+    qtbot.addWidget(mainWindow)
+    model = mainWindow.model
+    mainWindow.currentColor.setText("00FF00")
+    before = model.exportData()
+
+    mainWindow.drawShape("Ellipse", [(-4, 2), (15, 9)])        # e.g. replayed from a longer pattern
+    command = mainWindow.undoStack.command(mainWindow.undoStack.count() - 1)
+    assert(None in command.edit.newBlock[5] and None in command.edit.oldBlock[5])  # only the outline is kept
+    assert(model.cellColor(5, 5) == before[5][5])
+
+    mainWindow.undoStack.undo()
+    assert(model.exportData() == before)
+    mainWindow.drawShape("Rectangle", [(30, 30), (40, 40)])    # entirely off the pattern
+    assert(model.exportData() == before)
+
+def test_beadworkView_drawPolygonTransposed(qtbot):
+    mainWindow = MainWindow(debug=False, app_configs=app_configs, project_configs={**project_configs, "width": 12, "height": 12})
+    qtbot.addWidget(mainWindow)
+    mainWindow.show()
+    model = mainWindow.beadworkView.model()
+    mainWindow.changeOrientation(None)
+
+    mainWindow.currentColor.setText("00FF00")
+    mainWindow.drawShape("Filled Polygon", [(0, 0), (0, 10), (10, 0)])
+    assert(model.cellColor(0, 10) == model.cellColor(10, 0) == model.cellColor(3, 3) == "#00FF00")
+    assert(model.cellColor(10, 10) == "#FFFFFF")
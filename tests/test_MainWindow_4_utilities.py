@@ -1,6 +1,10 @@
 import os
 import pytest
 
+from PySide6.QtWidgets import QFileDialog, QFormLayout
+
+from BeadworkDesigner import Instrumentation
+from BeadworkDesigner.Commands import CommandChangeColor
 from BeadworkDesigner.MainWindow import BeadworkOrientation, MainWindow
 from BeadworkDesigner.utils import loadProject, readConfigFile
 
@@ -56,6 +60,19 @@ def test_mainWindow_exportProject(mainWindow, filename):
     })
     assert(loadProject(testSavedProject) == loadProject(filename))
 
+def test_mainWindow_saveAsDialogFails(mainWindow, monkeypatch, tmp_path):
+    filename = str(tmp_path / "missing" / "x.json")
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", lambda *args: (filename, ""))
+    title = mainWindow.windowTitle()
+    mainWindow.saveAsDialog()
+    assert(mainWindow.statusBarTextLabel.text().startswith("Save x.json failed"))
+    assert(mainWindow.windowTitle() == title)     # still the file that was last written
+
+    filename = str(tmp_path / "x.json")
+    mainWindow.saveAsDialog()
+    assert(mainWindow.statusBarTextLabel.text().startswith("Save x.json done"))
+    assert(mainWindow.windowTitle() == f'Beadwork Designer - {filename}')
+
 def test_MainWindow_addColumn(mainWindow):
     width = mainWindow.modelWidth
     mainWindow.addColumn()
@@ -221,4 +238,100 @@ def test_MainWindow_saveDefaultProjectConfig(mainWindow):
     mainWindow.settingsWindow.saveDefaultProjectConfig()
 
     newConfig = readConfigFile(configFilePath)
-    assert(newConfig[0] == mainWindow.project_configs)
\ No newline at end of file
+    assert(newConfig[0] == mainWindow.project_configs)
+
+def test_MainWindow_importImage(mainWindow, tmp_path):
+    from PySide6.QtGui import QColor, QImage
+
+    image = QImage(40, 20, QImage.Format.Format_RGB32)
+    image.fill(QColor("#FF0000"))
+    for x in range(20, 40):
+        for y in range(20):
+            image.setPixelColor(x, y, QColor("#0000FF"))
+    filename = str(tmp_path / "image.png")
+    image.save(filename)
+
+    dataBefore = [row[:] for row in mainWindow.origModel.exportData()]
+    mainWindow.importImage(filename, 8, 4)
+
+    assert(mainWindow.modelWidth == 8)
+    colors = {color for row in mainWindow.origModel.exportData() for color in row}
+    assert(len(colors) <= 4)
+    assert(mainWindow.origModel.exportData()[0][0] == "#FF0000")
+    assert(mainWindow.origModel.exportData()[0][-1] == "#0000FF")
+
+    mainWindow.undoStack.undo()
+    assert(mainWindow.origModel.exportData() == dataBefore)
+
+@pytest.mark.parametrize("extension", ["png", "svg"])
+def test_MainWindow_exportImage(mainWindow, tmp_path, extension):
+    filename = str(tmp_path / f"pattern.{extension}")
+    mainWindow.exportImage(filename, 10, 10)
+    assert(os.path.getsize(filename) > 0)
+    if extension == "png":
+        from PySide6.QtGui import QImage
+        image = QImage(filename)
+        assert(image.width() > mainWindow.modelWidth * 10)
+        assert(image.height() > mainWindow.modelHeight * 10)
+
+def test_MainWindow_exportPDF(mainWindow, qtbot, tmp_path):
+    filename = str(tmp_path / "chart.pdf")
+    mainWindow.exportPDF(filename)
+    qtbot.waitUntil(lambda: mainWindow.exportWorker is None, timeout=10000)
+    assert(os.path.getsize(filename) > 0)
+
+def test_MainWindow_saveAppConfigFromForm(mainWindow):
+    form = mainWindow.settingsWindow.appConfigForm
+    fields = {form.itemAt(row, QFormLayout.ItemRole.LabelRole).widget().text(): form.itemAt(row, QFormLayout.ItemRole.FieldRole).widget()
+              for row in range(form.rowCount())}
+    original = mainWindow.getConfig("beadWidth")
+    fields["beadWidth"].setText(str(original + 3))
+    mainWindow.settingsWindow.saveAppConfig()
+
+    _, newConfig = readConfigFile(configFilePath)
+    assert(newConfig["beadWidth"] == original + 3)      # saved as a number, not text
+    assert(mainWindow.getConfig("beadWidth") == original + 3)
+
+    fields["beadWidth"].setText(str(original))
+    mainWindow.settingsWindow.saveAppConfig()
+
+def test_MainWindow_performancePanel(mainWindow, qtbot):
+    assert(not mainWindow.isBuilt("performancePanel"))
+    mainWindow.performancePanelAction.setChecked(True)
+    try:
+        assert(Instrumentation.enabled)
+        assert(not mainWindow.performancePanel.isHidden())
+
+        mainWindow.undoStack.push(CommandChangeColor(mainWindow.model, mainWindow.model.index(1, 1), "654321", "Change color"))
+        mainWindow.performancePanel.refresh()
+
+        assert(Instrumentation.counters["dataChanged"] >= 1)
+        assert(mainWindow.performancePanel.labels["undoDepth"].text() == f"{mainWindow.undoStack.index()} of {mainWindow.undoStack.count()}")
+        assert(mainWindow.performancePanel.memoryLabels["Undo stack"].text() == "-")     # not measured every refresh
+        mainWindow.performancePanel.measureMemoryButton.click()
+        assert(mainWindow.performancePanel.memoryLabels["Undo stack"].text() != "-")
+        assert(int(mainWindow.performancePanel.labels["receivers"].text()) >= 1)
+        assert("Change color (redo)" in mainWindow.performancePanel.commandList.item(0).text())
+    finally:
+        mainWindow.performancePanelAction.setChecked(False)
+    assert(not Instrumentation.enabled)
+    assert(mainWindow.performancePanel.isHidden())
+
+def test_MainWindow_importLargeImageInBackground(mainWindow, qtbot, tmp_path):
+    from PySide6.QtGui import QColor, QImage
+
+    from BeadworkDesigner.utils import imageHeight
+
+    image = QImage(40, 20, QImage.Format.Format_RGB32)
+    image.fill(QColor("#FF0000"))
+    filename = str(tmp_path / "image.png")
+    image.save(filename)
+    assert(imageHeight(filename, 40) == 20)
+    assert(imageHeight(str(tmp_path / "missing.png"), 40) == 0)
+
+    # larger than the current pattern, but not than the imported one
+    mainWindow.tasks.backgroundBeads = mainWindow.modelWidth * mainWindow.modelHeight + 1
+    mainWindow.importImage(filename, 40, 4)
+    assert(mainWindow.tasks.isBusy())
+    qtbot.waitUntil(lambda: not mainWindow.tasks.isBusy())
+    assert(mainWindow.modelWidth == 40)
@@ -248,3 +248,76 @@ def test_UndoRedo_CommandRemoveColumn(mainWindow):
 
     mainWindow.redoAction.trigger()
     assert(mainWindow.beadworkView.model().columnCount(None) == columnCountBefore - 3)
+
+def test_UndoRedo_CommandReplaceData_reduceColors(mainWindow):
+    dataBefore = [row[:] for row in mainWindow.origModel.exportData()]
+    countBefore = mainWindow.undoStack.count()
+
+    mainWindow.reduceColorsCountEdit.setText("2")
+    mainWindow.reduceColorsButton.click()
+
+    assert(mainWindow.undoStack.count() == countBefore + 1)    # one command for the whole pattern
+    assert(len({color for row in mainWindow.origModel.exportData() for color in row}) <= 2)
+    assert(mainWindow.colorListModel.rowCount(None) <= 2)
+
+    mainWindow.undoAction.trigger()
+    assert(mainWindow.origModel.exportData() == dataBefore)
+
+    mainWindow.redoAction.trigger()
+    assert(len({color for row in mainWindow.origModel.exportData() for color in row}) <= 2)
+
+@pytest.mark.parametrize("count", ["", "abc", "0"])
+def test_UndoRedo_CommandReplaceData_reduceColorsInvalidCount(mainWindow, count):
+    countBefore = mainWindow.undoStack.count()
+    mainWindow.reduceColorsCountEdit.setText(count)
+    mainWindow.reduceColorsButton.click()
+    assert(mainWindow.undoStack.count() == countBefore)
+    assert("at least 1" in mainWindow.statusBarTextLabel.text())
+
+@pytest.mark.parametrize("transposed", [False, True])
+def test_UndoRedo_CommandResize_adjustDimensions(mainWindow, transposed):
+    if transposed:
+        mainWindow.changeOrientation("Horizontal")
+    model = mainWindow.model
+    dataBefore = [row[:] for row in model.exportData()]
+    rows, columns = model.rowCount(None), model.columnCount(None)
+    countBefore = mainWindow.undoStack.count()
+    kept = model.index(rows - 1, columns - 1)   # the bottom right bead stays in place
+    color = kept.data()
+    mainWindow.beadworkView.selectListOfBeads([kept])
+
+    mainWindow.widthEdit.setText(str(columns + 3))
+    mainWindow.heightEdit.setText(str(rows - 2))
+    mainWindow.anchorComboBox.setCurrentText("Bottom right")
+    mainWindow.changeDimensionsButton.click()
+
+    assert(mainWindow.undoStack.count() == countBefore + 1)    # one command for both dimensions
+    assert((model.rowCount(None), model.columnCount(None)) == (rows - 2, columns + 3))
+    assert((mainWindow.beadworkView.verticalHeader().count(), mainWindow.beadworkView.horizontalHeader().count()) == (rows - 2, columns + 3))
+    assert(model.index(rows - 3, columns + 2).data() == color)
+    selected = mainWindow.beadworkView.selectedIndexes()
+    assert([(i.row(), i.column()) for i in selected] == [(rows - 3, columns + 2)])   # the selection moved with its bead
+
+    mainWindow.undoAction.trigger()
+    assert((model.rowCount(None), model.columnCount(None)) == (rows, columns))
+    assert(model.exportData() == dataBefore)
+
+    mainWindow.redoAction.trigger()
+    assert((model.rowCount(None), model.columnCount(None)) == (rows - 2, columns + 3))
+
+@pytest.mark.parametrize("remove", ["removeRow", "removeColumn"])
+def test_UndoRedo_undoRemoveRestoresColorList(newWindow, remove):
+    data = [["#FFFFFF"] * 4 for _ in range(5)]
+    data[4][3] = "#123456"      # only in the last row and column
+    window = newWindow(4, 5, data)
+
+    window.colorMode.trigger()
+    window.currentColor.setText("00FF00")
+    commands = window.undoStack.count()
+    getattr(window, remove)()
+    window.paintStroke([(0, 0)])    # another edit on top, which rescans the colors
+    while window.undoStack.index() > commands:
+        window.undoStack.undo()
+
+    assert(sorted(window.colorListModel._colors_index) == ["#123456", "#FFFFFF"])
+    window.colorList.updateSelected(window.model.index(4, 3))   # the bead's color must be in the list
@@ -0,0 +1,49 @@
+import pytest
+
+from BeadworkDesigner.MemoryReport import SUBSYSTEMS, formatBytes, formatMemoryReport, memoryReport
+
+@pytest.fixture
+def mainWindow(newWindow):
+    return newWindow(20, 30)
+
+def test_MemoryReport_subsystems(mainWindow):
+    report = memoryReport(mainWindow)
+    assert(list(report) == [*SUBSYSTEMS, "Total"])
+    assert(report["Model storage"]["bytes"] > 0)
+    assert(report["Model storage"]["detail"] == "600 beads")
+    assert(report["Undo stack"]["bytes"] == 0)
+    assert(report["Total"]["bytes"] == sum(entry["bytes"] for name, entry in report.items() if name != "Total"))
+
+def test_MemoryReport_grows(mainWindow):
+    before = memoryReport(mainWindow)
+
+    mainWindow.bucketMode.trigger()
+    mainWindow.currentColor.setText("FF0000")
+    mainWindow.handleViewClicked(mainWindow.model.index(0, 0))     # fills the whole pattern
+    mainWindow.beadworkView.selectListOfBeads([mainWindow.model.index(0, 0), mainWindow.model.index(5, 5)])
+    after = memoryReport(mainWindow)
+
+    assert(after["Undo stack"]["bytes"] > 600 * 8)     # the old color of every bead
+    assert(after["Undo stack"]["detail"] == "1 commands")
+    assert(after["Selection"]["bytes"] > before["Selection"]["bytes"])
+    assert(after["Selection"]["detail"] == "2 ranges, 2 beads")
+
+def test_MemoryReport_format(mainWindow):
+    assert(formatBytes(512) == "512 bytes")
+    assert(formatBytes(1536) == "1.5 KiB")
+    assert(formatBytes(3 * 1024 * 1024) == "3.0 MiB")
+
+    lines = formatMemoryReport(memoryReport(mainWindow)).splitlines()
+    assert(len(lines) == len(SUBSYSTEMS) + 1)
+    assert(lines[0].startswith("Model storage"))
+    assert("600 beads" in lines[0])
+
+def test_MemoryReport_panel(mainWindow):
+    mainWindow.performancePanelAction.setChecked(True)
+    try:
+        assert(mainWindow.performancePanel.memoryLabels["Total"].text() == "-")
+        mainWindow.performancePanel.measureMemoryButton.click()
+        assert(mainWindow.performancePanel.memoryLabels["Total"].text().endswith("KiB"))
+        assert(mainWindow.performancePanel.memoryLabels["Model storage"].toolTip() == "600 beads")
+    finally:
+        mainWindow.performancePanelAction.setChecked(False)
@@ -0,0 +1,83 @@
+import pytest
+
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtGui import QColor
+
+from BeadworkDesigner import Minimap
+
+@pytest.fixture
+def mainWindow(newWindow):
+    data = [["#FF0000" if (r + c) % 3 else "#0000FF" for c in range(150)] for r in range(120)]
+    window = newWindow(150, 120, data, shown=True)
+    window.minimapAction.setChecked(True)
+    window.minimapDock.minimap.resize(300, 300)
+    window.minimapDock.minimap.rebuild()
+    return window
+
+def pixel(minimap, row, column):
+    return minimap.image.pixelColor(column // minimap.step, row // minimap.step)
+
+def test_Minimap_image(mainWindow):
+    minimap = mainWindow.minimapDock.minimap
+    assert((minimap.image.width(), minimap.image.height()) == (150, 120))
+    for row, column in ((0, 0), (0, 1), (119, 149), (60, 75)):
+        assert(pixel(minimap, row, column) == QColor(mainWindow.origModel.cellColor(row, column)))
+
+def test_Minimap_updatesChangedBeads(mainWindow):
+    minimap = mainWindow.minimapDock.minimap
+    image = minimap.image
+    mainWindow.origModel.setData(mainWindow.origModel.index(5, 7), "#00FF00", Qt.ItemDataRole.EditRole)
+    assert(minimap.image is image)      # updated in place, not rendered again
+    assert(pixel(minimap, 5, 7) == QColor("#00FF00"))
+    assert(pixel(minimap, 5, 8) == QColor(mainWindow.origModel.cellColor(5, 8)))
+
+def test_Minimap_transposed(mainWindow):
+    minimap = mainWindow.minimapDock.minimap
+    image = minimap.image
+    mainWindow.changeOrientation(None)
+    assert(minimap.image is image)      # drawn transposed, not rendered again
+
+    mainWindow.origModel.setData(mainWindow.origModel.index(7, 5), "#00FF00", Qt.ItemDataRole.EditRole)
+    assert(pixel(minimap, 5, 7) == QColor("#00FF00"))    # grid row 5, column 7
+    minimap.repaint()
+
+def test_Minimap_sizeChange(mainWindow):
+    minimap = mainWindow.minimapDock.minimap
+    image = minimap.image
+    mainWindow.addColumn()
+    minimap.repaint()
+    assert(minimap.image is not image)  # rendered again for the new size
+    assert(minimap.image.width() == 151)
+
+def test_Minimap_downsampled(mainWindow):
+    minimap = mainWindow.minimapDock.minimap
+    minimap.maxSide = 50
+    minimap.rebuild()
+    assert(minimap.step == 3)
+    assert((minimap.image.width(), minimap.image.height()) == (50, 40))
+    assert(pixel(minimap, 3, 6) == QColor(mainWindow.origModel.cellColor(3, 6)))
+
+    mainWindow.origModel.setData(mainWindow.origModel.index(4, 4), "#00FF00", Qt.ItemDataRole.EditRole)
+    assert(pixel(minimap, 4, 4) == QColor(mainWindow.origModel.cellColor(3, 3)))    # not sampled
+    mainWindow.origModel.setData(mainWindow.origModel.index(6, 3), "#00FF00", Qt.ItemDataRole.EditRole)
+    assert(pixel(minimap, 6, 3) == QColor("#00FF00"))
+    minimap.repaint()
+
+def test_Minimap_sampleStep():
+    assert(Minimap.sampleStep(120, 150) == 1)
+    assert(Minimap.sampleStep(4000, 1000, 1024) == 4)
+    assert(Minimap.sampleStep(1024, 1024, 1024) == 1)
+
+def test_Minimap_clickScrollsView(mainWindow):
+    minimap, view = mainWindow.minimapDock.minimap, mainWindow.beadworkView
+    scale, x, y = minimap.beadScale()
+    assert(minimap.visibleCells()[:2] == (0, 0))
+
+    minimap.centerViewAt(QPointF(x + 140 * scale, y + 110 * scale))
+    top, left, bottom, right = minimap.visibleCells()
+    assert(top <= 110 <= bottom and left <= 140 <= right)
+    assert(top > 0 and left > 0)
+
+def test_Minimap_closeUnchecksAction(mainWindow):
+    mainWindow.minimapDock.close()
+    assert(not mainWindow.minimapAction.isChecked())
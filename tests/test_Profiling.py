@@ -0,0 +1,69 @@
+import os
+import pstats
+
+import pytest
+
+from BeadworkDesigner.Profiling import Profiler, slug
+
+@pytest.fixture
+def mainWindow(newWindow, tmp_path):
+    window = newWindow(6, 8)
+    window.profiler = Profiler(str(tmp_path))
+    return window
+
+def test_Profiling_slug():
+    assert(slug("Change color to #FF0000") == "change-color-to-ff0000")
+
+def test_Profiling_startStop(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    assert(profiler.stop() is None)
+
+    profiler.start("bucket fill")
+    assert(profiler.isRunning())
+    with pytest.raises(RuntimeError):
+        profiler.start()
+    data = [[0] * 1000 for _ in range(100)]
+    prof, allocations = profiler.stop({"width": 120, "height": 80, "colors": 14})
+
+    assert(not profiler.isRunning())
+    assert(os.path.basename(prof).endswith("-bucket-fill-120x80-14colors.prof"))
+    pstats.Stats(prof)      # a valid profile
+    with open(allocations) as file:
+        report = file.read()
+    assert("# width: 120" in report)
+    assert("# colors: 14" in report)
+    assert("test_Profiling.py" in report)   # the allocation of data above
+    assert(len(data) == 100)
+
+def test_Profiling_action(mainWindow, tmp_path):
+    mainWindow.profilingAction.setChecked(True)
+    assert(mainWindow.profiler.isRunning())
+    assert(mainWindow.profilingAction.text() == "Stop Profiling")
+    assert(not mainWindow.profileNextCommandAction.isEnabled())
+
+    mainWindow.addRow()
+    mainWindow.profilingAction.setChecked(False)
+    assert(not mainWindow.profiler.isRunning())
+    assert(mainWindow.profileNextCommandAction.isEnabled())
+    files = os.listdir(tmp_path)
+    assert(len(files) == 2)
+    assert(all("-session-6x9-" in name for name in files))
+
+def test_Profiling_nextCommand(mainWindow, tmp_path):
+    mainWindow.colorMode.trigger()
+    mainWindow.currentColor.setText("FF0000")
+    mainWindow.profileNextCommandAction.trigger()
+    assert(mainWindow.profiler.isRunning())
+    assert(not mainWindow.profilingAction.isEnabled())
+
+    mainWindow.handleViewClicked(mainWindow.model.index(1, 1))
+    assert(not mainWindow.profiler.isRunning())
+    assert(mainWindow.profilingAction.isEnabled())
+    assert(sorted(name.split("-", 2)[2] for name in os.listdir(tmp_path)) ==
+           ["command-change-color-to-ff0000-6x8-2colors.allocations.txt", "command-change-color-to-ff0000-6x8-2colors.prof"])
+
+    stats = pstats.Stats(os.path.join(tmp_path, [name for name in os.listdir(tmp_path) if name.endswith(".prof")][0]))
+    assert(any(function == "redo" for _, _, function in stats.stats))
+
+    mainWindow.addRow()     # profiling stopped after the first command
+    assert(len(os.listdir(tmp_path)) == 2)
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from BeadworkDesigner.Session import (latencyReport, percentile, readSession,
+                                      replayLoad, replaySession)
+
+@pytest.fixture
+def recordedSession(newWindow, tmp_path):
+    """Records a session with one of each kind of edit, returning the session file and the final pattern."""
+    window = newWindow()
+    filename = str(tmp_path / "session.jsonl")
+    window.startSessionRecording(filename)
+
+    window.colorMode.trigger()
+    window.currentColor.setText("FF0000")
+    window.beadworkView.setCurrentIndex(window.model.index(1, 2))
+    window.handleViewClicked(window.model.index(1, 2))
+    window.handleViewClicked(window.model.index(3, 3))
+    window.paintStroke([(4, 0), (6, 5)])
+    window.bucketMode.trigger()
+    window.currentColor.setText("00FF00")
+    window.handleViewClicked(window.model.index(0, 0))
+    window.undoAction.trigger()
+    window.redoAction.trigger()
+    window.addColumn()
+    window.orientationComboBox.setCurrentText("Horizontal")
+    window.addRow()
+    window.handleViewClicked(window.model.index(2, 5))
+    window.changeWidthTo(10)
+    window.exportProject(str(tmp_path / "saved.json"))
+
+    window.stopSessionRecording()
+    return filename, window.origModel.exportData(), window.currentOrientation
+
+def test_Session_record(recordedSession):
+    filename, _, _ = recordedSession
+    header, actions = readSession(filename)
+    assert(len(header["project"]) == 8)
+    assert(header["configs"]["defaultOrientation"] == "Vertical")
+
+    names = [action["action"] for action in actions]
+    assert(names == ["mode", "colorDialog", "click", "click", "stroke", "mode", "colorDialog", "click", "undo", "redo",
+                     "addColumn", "orientation", "addRow", "click", "width", "save"])
+    assert(actions[2]["args"] == {"row": 1, "column": 2})
+    assert(actions[1]["args"]["color"] == "FF0000")
+    assert(actions[4]["args"] == {"points": [[4, 0], [6, 5]]})
+    assert(actions[11]["args"] == {"orientation": "Horizontal"})
+    assert(all(a["t"] <= b["t"] for a, b in zip(actions, actions[1:])))
+
+def test_Session_replay(newWindow, recordedSession):
+    filename, data, orientation = recordedSession
+    window = newWindow()
+    latencies = replaySession(filename, window=window)
+
+    assert(window.origModel.exportData() == data)
+    assert(window.currentOrientation == orientation)
+    assert(len(latencies["click"]) == 4)
+    assert(set(latencies) == {"mode", "colorDialog", "click", "stroke", "undo", "redo", "addColumn", "orientation", "addRow", "width", "save"})
+
+def test_Session_notRecording(newWindow):
+    window = newWindow()
+    window.handleViewClicked(window.model.index(0, 0))     # no recorder, no error
+    assert(window.sessionRecorder is None)
+
+def test_Session_readSession(tmp_path):
+    filename = tmp_path / "bad.jsonl"
+    filename.write_text(json.dumps({"project": []}) + "\n")
+    with pytest.raises(ValueError):
+        readSession(str(filename))
+
+def test_Session_latencyReport():
+    assert(percentile([1, 2, 3, 4, 5], 50) == 3)
+    assert(percentile([1, 2], 50) == 1.5)
+    assert(percentile([7], 99) == 7)
+
+    report = latencyReport({"click": [0.001, 0.002, 0.003, 0.004], "undo": [0.010]})
+    assert(report["click"]["count"] == 4)
+    assert(report["click"]["p50"] == 2.5)
+    assert(report["click"]["max"] == 4.0)
+    assert(report["undo"]["p99"] == 10.0)
+
+def test_Session_replayShapes(newWindow, tmp_path):
+    window = newWindow()
+    filename = str(tmp_path / "shapes.jsonl")
+    window.startSessionRecording(filename)
+    window.currentColor.setText("0000FF")
+    window.drawShape("Ellipse", [(0, 0), (7, 5)])
+    window.drawShape("Filled Polygon", [(1, 1), (1, 4), (6, 2)])
+    window.stopSessionRecording()
+
+    _, actions = readSession(filename)
+    assert([action["action"] for action in actions] == ["colorDialog", "shape", "shape"])
+    assert(actions[2]["args"] == {"shape": "Filled Polygon", "points": [[1, 1], [1, 4], [6, 2]]})
+
+    replayed = newWindow()
+    replaySession(filename, window=replayed)
+    assert(replayed.origModel.exportData() == window.origModel.exportData())
+
+def test_Session_replayPaste(newWindow, tmp_path):
+    window = newWindow()
+    filename = str(tmp_path / "paste.jsonl")
+    window.startSessionRecording(filename)
+    window.pasteBlock(2, 1, [["#FF0000", None], ["#00FF00", "#0000FF"]])
+    window.pasteBlock(7, 5, [["#123456"] * 3])     # cropped to the pattern
+    window.stopSessionRecording()
+
+    _, actions = readSession(filename)
+    assert([action["action"] for action in actions] == ["paste", "paste"])
+
+    replayed = newWindow()
+    replaySession(filename, window=replayed)
+    assert(replayed.origModel.exportData() == window.origModel.exportData())
+    assert(replayed.undoStack.count() == 2)
+
+def test_Session_recordLoad(newWindow, tmp_path):
+    window = newWindow()
+    filename = str(tmp_path / "load.jsonl")
+    window.startSessionRecording(filename)
+    window.importProject("tests/testProjectFiles/5x7_Horizontal.json")     # changes orientation too
+    window.stopSessionRecording()
+
+    _, actions = readSession(filename)
+    assert([action["action"] for action in actions] == ["load"])   # recorded once it was applied
+    assert(actions[0]["args"]["filename"].endswith("5x7_Horizontal.json"))
+    assert(actions[0]["args"]["project"]["project"] == window.origModel.exportData())
+
+    replayed = newWindow()
+    replaySession(filename, window=replayed)
+    assert(replayed.origModel.exportData() == window.origModel.exportData())
+    assert(replayed.currentOrientation == window.currentOrientation)
+
+def test_Session_replayLoadIsApplied(newWindow, tmp_path):
+    window = newWindow()
+    window.tasks.backgroundBeads = 1    # a large file would otherwise be loaded on a worker thread
+    data = [["#00FF00"] * 3 for _ in range(4)]
+    replayLoad(window, {"filename": "big.json", "project": {"configs": {"width": 3, "height": 4, "defaultOrientation": "Vertical"},
+                                                            "project": data}}, str(tmp_path))
+    assert(window.origModel.exportData() == data)   # without waiting for the tasks
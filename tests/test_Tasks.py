@@ -0,0 +1,112 @@
+import json
+import threading
+
+import pytest
+
+from BeadworkDesigner.Tasks import TaskManager
+from BeadworkDesigner.core.Grid import Grid
+
+@pytest.fixture
+def manager(qtbot):
+    grid = Grid(width=4, height=3)
+    manager = TaskManager(lambda: grid)
+    manager.testGrid = grid
+    manager.messages = []
+    manager.message.connect(manager.messages.append)
+    yield manager
+    manager.cancelAll()
+    manager.waitForDone()
+
+def test_Tasks_synchronous(manager):
+    results, progress = [], []
+    manager.progress.connect(lambda name, fraction: progress.append(fraction))
+    manager.submit("Sum", lambda report, values: sum(values), ([1, 2, 3],), apply=results.append)
+
+    assert(results == [6])
+    assert(progress == [0.0, 1.0])
+    assert(manager.messages == ["Sum done"])
+    assert(not manager.isBusy())
+
+def test_Tasks_background(manager, qtbot):
+    results = []
+    busy = []
+    manager.busyChanged.connect(busy.append)
+    ran = []
+    manager.submit("Thread", lambda report: ran.append(threading.current_thread() is threading.main_thread()) or 42,
+                   apply=results.append, background=True)
+    qtbot.waitUntil(lambda: results == [42])
+    assert(ran == [False])
+    assert(busy == [True, False])
+
+def test_Tasks_conflictRejected(manager, qtbot):
+    release = threading.Event()
+    results = []
+    manager.submit("Slow", lambda report: release.wait(5) and "result", apply=results.append, background=True)
+    manager.testGrid.setCells({(0, 0): "#000000"})     # an edit while the task runs
+    release.set()
+    qtbot.waitUntil(lambda: not manager.isBusy())
+
+    assert(results == [])
+    assert(manager.messages == ["Slow discarded: the pattern was edited while it ran"])
+
+def test_Tasks_notEditingPatternIsNotRejected(manager, qtbot):
+    results = []
+    release = threading.Event()
+    manager.submit("Save", lambda report: release.wait(5), apply=results.append, editsPattern=False, background=True)
+    manager.testGrid.setCells({(0, 0): "#000000"})
+    release.set()
+    qtbot.waitUntil(lambda: not manager.isBusy())
+    assert(results == [True])
+
+def test_Tasks_cancel(manager, qtbot):
+    started = threading.Event()
+    results = []
+
+    def work(report):
+        started.set()
+        while True:
+            report(0.5)
+
+    manager.submit("Forever", work, apply=results.append, background=True)
+    started.wait(5)
+    manager.cancelAll()
+    qtbot.waitUntil(lambda: not manager.isBusy())
+    assert(results == [])
+    assert(manager.messages == ["Forever cancelled"])
+
+def test_Tasks_notCancellableFinishes(manager, qtbot):
+    release = threading.Event()
+    results = []
+    manager.submit("Save", lambda report: release.wait(5) and report(0.5) or "saved", apply=results.append,
+                   editsPattern=False, background=True, cancellable=False)
+    manager.cancelAll()
+    release.set()
+    qtbot.waitUntil(lambda: not manager.isBusy())
+    assert(results == ["saved"])
+
+def test_Tasks_closeKeepsPendingSave(newWindow, tmp_path):
+    window = newWindow(6, 8)
+    window.tasks.backgroundBeads = 1
+    filename = str(tmp_path / "saved.json")
+    window.exportProject(filename)
+    window.close()
+    with open(filename) as file:
+        assert(len(json.load(file)["project"]) == 8)
+
+def test_Tasks_failed(manager):
+    manager.submit("Broken", lambda report: 1 / 0, apply=pytest.fail)
+    assert(manager.messages == ["Broken failed: division by zero"])
+    assert(not manager.isBusy())
+
+def test_Tasks_bucketFillInBackground(qtbot, newWindow):
+    window = newWindow(6, 8)
+    window.tasks.backgroundBeads = 1
+
+    window.bucketMode.trigger()
+    window.currentColor.setText("00FF00")
+    window.handleViewClicked(window.model.index(0, 0))
+    qtbot.waitUntil(lambda: not window.tasks.isBusy())
+
+    assert(all(color == "#00FF00" for row in window.origModel.exportData() for color in row))
+    assert(window.undoStack.count() == 1)
+    assert(window.statusBarTextLabel.text().startswith("Bucket fill done"))
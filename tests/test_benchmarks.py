@@ -0,0 +1,64 @@
+import io
+import json
+
+from benchmarks import runner
+from benchmarks.patterns import parseSize, syntheticPalette, syntheticPattern
+
+def test_benchmarks_syntheticPattern():
+    pattern = syntheticPattern(30, 20, 5)
+    assert(len(pattern) == 20)
+    assert(all(len(row) == 30 for row in pattern))
+    assert(set(color for row in pattern for color in row) <= set(syntheticPalette(5)))
+    assert(syntheticPattern(30, 20, 5) == pattern)     # deterministic
+    assert(len(set(syntheticPalette(1000))) == 1000)
+    assert(parseSize("100x40") == (100, 40))
+    assert(parseSize("10") == (10, 10))
+
+def test_benchmarks_measure():
+    calls = []
+    timing = runner.measure(lambda: calls.append(1), minRunTime=0.001, repeats=3)
+    assert(timing["repeats"] == 3)
+    assert(timing["number"] >= 1)
+    assert(0 <= timing["min"] <= timing["median"])
+
+    state = {"value": 0}
+    def run():
+        state["value"] += 1
+    def reset():
+        state["value"] -= 1
+    timing = runner.measure(run, reset, repeats=4)
+    assert(timing["number"] == 1)
+    assert(timing["repeats"] == 4)
+    assert(state["value"] == 0)
+
+def test_benchmarks_compare():
+    baseline = {"results": {"a@1x1/2": {"min": 1.0}, "b@1x1/2": {"min": 1.0}, "c@1x1/2": {"min": 1.0}, "old@1x1/2": {"min": 1.0}}}
+    current = {"results": {"a@1x1/2": {"min": 1.1}, "b@1x1/2": {"min": 2.0}, "c@1x1/2": {"min": 0.5}, "new@1x1/2": {"min": 1.0}}}
+    rows = runner.compare(current, baseline, threshold=0.25)
+    assert([(key, status) for key, *_, status in rows] == [("a@1x1/2", "ok"), ("b@1x1/2", "regression"), ("c@1x1/2", "improvement")])
+
+def test_benchmarks_main(qapp, tmp_path):
+    output = str(tmp_path / "results.json")
+    out = io.StringIO()
+    assert(runner.main(["run", "--sizes", "6x4", "--colors", "2", "-k", "model.*", "-k", "commands.ChangeColor.*", "-o", output], out) == 0)
+
+    with open(output) as file:
+        results = json.load(file)["results"]
+    assert("model.setData@6x4/2" in results)
+    assert("commands.ChangeColor.undo@6x4/2" in results)
+    assert(not any(key.startswith("view.") for key in results))
+
+    out = io.StringIO()
+    assert(runner.main(["compare", output, output], out) == 0)
+    assert("REGRESSION" not in out.getvalue())
+
+    with open(output) as file:
+        slower = json.load(file)
+    for timing in slower["results"].values():
+        timing["min"] *= 3
+    slowerFile = str(tmp_path / "slower.json")
+    with open(slowerFile, "w") as file:
+        json.dump(slower, file)
+    out = io.StringIO()
+    assert(runner.main(["compare", slowerFile, output], out) == 1)
+    assert("REGRESSION" in out.getvalue())
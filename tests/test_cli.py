@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from PySide6.QtGui import QImage
+
+from BeadworkDesigner import cli
+
+testFiles = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testProjectFiles")
+
+@pytest.fixture
+def projects(tmp_path):
+    for name in ("5x7_Vertical.json", "5x7_Horizontal.json"):
+        shutil.copy(os.path.join(testFiles, name), tmp_path / name)
+    return tmp_path
+
+def run(*argv):
+    out = io.StringIO()
+    code = cli.main(list(argv), out=out)
+    return code, out.getvalue().splitlines()
+
+def test_cli_isCommand():
+    assert(cli.isCommand(["stats", "a.json"]))
+    assert(not cli.isCommand(["--load", "a.json"]))
+    assert(not cli.isCommand([]))
+
+def test_cli_parserIsQtFree():
+    # listing the commands and their options must not load Qt or NumPy
+    script = "import sys; from BeadworkDesigner import cli; cli.buildParser(); print('PySide6' in sys.modules or 'numpy' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert(output.strip() == "False")
+
+def test_cli_stats(projects):
+    code, lines = run("stats", "--json", "-j", "1", str(projects / "*.json"))
+    assert(code == 0)
+    stats = {os.path.basename(line["file"]): line for line in map(json.loads, lines)}
+    assert(stats["5x7_Vertical.json"]["beads"] == 35)
+    assert(stats["5x7_Vertical.json"]["colors"] == {"#FFFFFF": 34, "#CCCCCC": 1})
+    assert(stats["5x7_Horizontal.json"]["orientation"] == "Horizontal")
+
+def test_cli_validate(projects):
+    with open(projects / "bad.json", "w") as file:
+        json.dump({"info": {}, "configs": {}, "project": [["#FFFFFF", "#FFFFFF"], ["#FFFFFF", "red"], ["#FFFFFF"]]}, file)
+
+    code, lines = run("validate", "-j", "1", str(projects / "*.json"))
+    assert(code == 1)
+    results = dict(line.split(": ", 1) for line in lines)
+    assert(results[str(projects / "5x7_Vertical.json")] == "valid")
+    assert("row 2 has invalid colors" in results[str(projects / "bad.json")])
+    assert("row 3 has 1 beads" in results[str(projects / "bad.json")])
+
+def test_cli_reduceColors(projects):
+    code, _ = run("reduce-colors", "--colors", "1", "--dither", "none", "-j", "1", "-o", str(projects / "out"), str(projects / "5x7_Vertical.json"))
+    assert(code == 0)
+    with open(projects / "out" / "5x7_Vertical.json") as file:
+        data = json.load(file)["project"]
+    assert({color for row in data for color in row} == {"#FFFFFF"})
+
+    # never overwrites the input unless asked to
+    code, _ = run("reduce-colors", "-j", "1", str(projects / "5x7_Vertical.json"))
+    assert(code == 1)
+
+def test_cli_exportPNG(projects):
+    code, _ = run("export-png", "--no-grid", "--no-markers", "--bead-width", "2", "--bead-height", "3", "-j", "1", str(projects / "*.json"))
+    assert(code == 0)
+    # horizontal projects are exported as displayed
+    assert(QImage(str(projects / "5x7_Vertical.png")).size().toTuple() == (5 * 2, 7 * 3))
+    assert(QImage(str(projects / "5x7_Horizontal.png")).size().toTuple() == (7 * 2, 5 * 3))
+
+def test_cli_exportPDF_processPool(projects):
+    code, lines = run("export-pdf", "-j", "2", "-o", str(projects / "pdf"), str(projects / "*.json"))
+    assert(code == 0)
+    assert(len(lines) == 2)
+    assert(sorted(os.listdir(projects / "pdf")) == ["5x7_Horizontal.pdf", "5x7_Vertical.pdf"])
+
+def test_cli_convert(projects):
+    image = QImage(20, 10, QImage.Format.Format_RGB32)
+    image.fill(0xFF0000)
+    image.save(str(projects / "image.png"))
+
+    code, _ = run("convert", "--width", "10", "--bead-width", "1", "--bead-height", "1", "-j", "1", str(projects / "image.png"))
+    assert(code == 0)
+    with open(projects / "image.json") as file:
+        project = json.load(file)
+    assert(project["configs"]["width"] == 10 and project["configs"]["height"] == 5)
+    assert(project["project"][0][0] == "#FF0000")
+
+def test_cli_replay(newWindow, tmp_path):
+    window = newWindow(5, 5)
+    window.startSessionRecording(str(tmp_path / "session.jsonl"))
+    window.colorMode.trigger()
+    window.currentColor.setText("0000FF")
+    window.handleViewClicked(window.model.index(2, 2))
+    window.addRow()
+    window.stopSessionRecording()
+
+    code, lines = run("replay", "--json", "-j", "1", str(tmp_path / "session.jsonl"))
+    assert(code == 0)
+    report = json.loads(lines[0])
+    assert(report["actions"]["click"]["count"] == 1)
+    assert(set(report["actions"]["click"]) == {"count", "p50", "p90", "p99", "max"})
+
+    code, lines = run("replay", "-j", "1", str(tmp_path / "session.jsonl"))
+    assert(code == 0)
+    assert(any(line.startswith("click") for line in lines))
+
+def test_cli_memory(projects):
+    code, lines = run("memory", "--json", "-j", "1", str(projects / "5x7_Vertical.json"))
+    assert(code == 0)
+    memory = json.loads(lines[0])["memory"]
+    assert(memory["Model storage"] > 0)
+    assert(memory["Undo stack"] == 0)
+    assert(memory["Total"] == sum(size for name, size in memory.items() if name != "Total"))
+
+    code, lines = run("memory", "-j", "1", str(projects / "5x7_Horizontal.json"))
+    assert(code == 0)
+    assert(any(line.startswith("Model storage") and "35 beads" in line for line in lines))
@@ -0,0 +1,395 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from BeadworkDesigner import core
+from BeadworkDesigner.core import Edits
+
+@pytest.fixture
+def testGrid():
+    return core.Grid([["#FF0000" if (r + c) % 3 else "#0000FF" for c in range(5)] for r in range(7)])
+
+def test_core_importsWithoutQt():
+    code = "import sys, BeadworkDesigner.core; print(any(name.startswith('PySide6') for name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert(result.stdout.strip() == "False")
+
+def test_core_Grid_init():
+    grid = core.Grid(width=4, height=3)
+    assert(grid.rowCount() == 3)
+    assert(grid.columnCount() == 4)
+    assert(all(color == core.BLANK_COLOR for row in grid.rows for color in row))
+
+    debugGrid = core.Grid(width=4, height=3, debug=True)
+    assert(all(core.isHexColor(color) for row in debugGrid.rows for color in row))
+
+def test_core_Grid_rowsAndColumns(testGrid):
+    before = [row[:] for row in testGrid.rows]
+
+    testGrid.insertRows(2, 2)
+    assert(testGrid.rowCount() == 9)
+    assert(testGrid.rows[2] == [core.BLANK_COLOR] * 5)
+    assert(testGrid.removeRows(2, 2) == [[core.BLANK_COLOR] * 5] * 2)
+
+    testGrid.insertColumns(5, 1)
+    assert(testGrid.columnCount() == 6)
+    assert(testGrid.removeColumns(0, 1) == [[row[0]] for row in before])
+    assert(testGrid.rows == [row[1:] + [core.BLANK_COLOR] for row in before])
+
+def test_core_Grid_revisionAndSnapshot(testGrid):
+    snapshot = testGrid.snapshot()
+    assert(snapshot == tuple(map(tuple, testGrid.rows)))
+
+    revisions = [testGrid.revision]
+    for edit in (lambda: testGrid.setCells({(0, 0): "#000000"}), lambda: testGrid.insertRows(0), lambda: testGrid.removeRows(0),
+                 lambda: testGrid.insertColumns(0), lambda: testGrid.removeColumns(0), lambda: testGrid.replaceData([["#000000"]])):
+        edit()
+        revisions.append(testGrid.revision)
+    assert(revisions == sorted(set(revisions)))     # every edit is a new revision
+    assert(snapshot[0][0] != "#000000")             # the snapshot is unaffected
+
+@pytest.mark.parametrize("edit", [
+    lambda grid: grid.setCells({(0, 0): "#000000", (6, 4): "#000000"}),
+    lambda grid: grid.insertRows(3, 2),
+    lambda grid: grid.removeRows(0, 2),
+    lambda grid: grid.insertColumns(1, 2),
+    lambda grid: grid.removeColumns(0, 2),
+    lambda grid: grid.resize(9, 4, 1, -1),
+])
+def test_core_Grid_copyOnWrite(testGrid, edit):
+    before = [row[:] for row in testGrid.rows]
+    snapshot = testGrid.snapshot()
+    assert(snapshot[0] is testGrid.rows[0])     # shared, not copied
+
+    edit(testGrid)
+    assert(snapshot == before)
+    edit(testGrid)                              # rows copied by the first edit are changed in place
+    assert(snapshot == before)
+    assert(testGrid.rows != before)
+
+def test_core_Grid_copyOnWriteUnchangedRowsShared(testGrid):
+    snapshot = testGrid.snapshot()
+    testGrid.setCells({(2, 2): "#000000"})
+    assert(testGrid.rows[2] is not snapshot[2])
+    assert(all(testGrid.rows[r] is snapshot[r] for r in range(7) if r != 2))
+
+def test_core_Grid_adoptedDataNotModified():
+    data = [["#FF0000"] * 3 for _ in range(2)]
+    grid = core.Grid([row[:] for row in data])
+    adopted = grid.rows
+    grid.setCells({(0, 0): "#000000"})
+    grid.replaceData(adopted)
+    grid.insertColumns(0)
+    assert(adopted == data)
+
+def test_core_GridSnapshot(testGrid):
+    snapshot = testGrid.snapshot()
+    assert(isinstance(snapshot, core.GridSnapshot))
+    assert(len(snapshot) == snapshot.rowCount() == 7)
+    assert(snapshot.columnCount() == 5)
+    assert(snapshot.cellColor(0, 0) == testGrid.cellColor(0, 0))
+    assert(snapshot == testGrid.rows)
+    assert(snapshot != testGrid.rows[1:])
+
+    copy = snapshot.toList()
+    copy[0][0] = "#000000"
+    assert(snapshot[0][0] != "#000000")
+
+@pytest.mark.parametrize("edit", [
+    lambda grid: Edits.SetCells(grid, {(0, 0): "#000000", (6, 4): "#000000"}),
+    lambda grid: Edits.SetBlock(grid, 2, 1, [["#000000", None, "#000000"], ["#000000"] * 3]),
+    lambda grid: Edits.InsertRows(grid, 3, 2),
+    lambda grid: Edits.RemoveRows(grid, 7, 2),
+    lambda grid: Edits.InsertColumns(grid, 0, 3),
+    lambda grid: Edits.RemoveColumns(grid, 1, 2),
+    lambda grid: Edits.ReplaceData(grid, [["#000000"]]),
+    lambda grid: Edits.Resize(grid, 4, 9, -2, 2),
+    lambda grid: Edits.Resize(grid, 10, 3, 3, -1),
+])
+def test_core_Edits_undoRedo(testGrid, edit):
+    before = [row[:] for row in testGrid.rows]
+    history = core.UndoHistory()
+
+    history.push(edit(testGrid))
+    after = [row[:] for row in testGrid.rows]
+    assert(after != before)
+
+    history.undo()
+    assert(testGrid.rows == before)
+    assert(not history.canUndo())
+
+    history.redo()
+    assert(testGrid.rows == after)
+    assert(not history.canRedo())
+
+@pytest.mark.parametrize("anchor, offsets", [
+    ("Top left", (0, 0)),
+    ("Center", (1, -1)),
+    ("Bottom right", (3, -2)),
+])
+def test_core_Grid_resizeAnchored(testGrid, anchor, offsets):
+    before = [row[:] for row in testGrid.rows]
+    vertical, horizontal = core.ANCHORS[anchor]
+    rowOffset, columnOffset = core.anchorOffset(7, 10, vertical), core.anchorOffset(5, 3, horizontal)
+    assert((rowOffset, columnOffset) == offsets)
+
+    testGrid.resize(10, 3, rowOffset, columnOffset)
+    assert((testGrid.rowCount(), testGrid.columnCount()) == (10, 3))
+    for r in range(10):
+        for c in range(3):
+            old = (r - rowOffset, c - columnOffset)
+            expected = before[old[0]][old[1]] if 0 <= old[0] < 7 else core.BLANK_COLOR
+            assert(testGrid.cellColor(r, c) == expected)
+
+def test_core_Grid_resizeSharesWholeRows(testGrid):
+    snapshot = testGrid.snapshot()
+    testGrid.resize(9, 5, 2, 0)     # only rows change, so the kept rows are not copied
+    assert(all(testGrid.rows[r + 2] is snapshot[r] for r in range(7)))
+    testGrid.setCells({(2, 0): "#000000"})
+    assert(snapshot[0][0] != "#000000")
+
+def test_core_Edits_removeRowsAtEnd(testGrid):
+    last = [row[:] for row in testGrid.rows[-2:]]
+    edit = Edits.RemoveRows(testGrid, testGrid.rowCount(), 2)
+    edit.redo()
+    assert(edit.removed == last)
+    assert(testGrid.rowCount() == 5)
+
+def test_core_Edits_removeKeepsRows(testGrid):
+    removedRows = testGrid.rows[2:4]
+    history = core.UndoHistory()
+    history.push(Edits.RemoveRows(testGrid, 2, 2))
+    history.undo()
+    assert(testGrid.rows[2] is removedRows[0] and testGrid.rows[3] is removedRows[1])    # put back, not copied
+
+    before = [row[:] for row in testGrid.rows]
+    history.push(Edits.RemoveColumns(testGrid, 1, 3))
+    testGrid.setCells({(0, 0): "#000000"})
+    history.undo()      # undoes the column removal, after the later edit
+    assert([row[1:4] for row in testGrid.rows] == [row[1:4] for row in before])
+
+def test_core_Edits_setCellsWithOldCells(testGrid):
+    before = [row[:] for row in testGrid.rows]
+    old = {(0, 0): testGrid.cellColor(0, 0), (1, 1): testGrid.cellColor(1, 1)}
+    testGrid.setCells({(0, 0): "#000000", (1, 1): "#000000"})     # already painted, e.g. during a stroke
+    edit = Edits.SetCells(testGrid, {(0, 0): "#000000", (1, 1): "#000000"}, oldCells=old)
+    edit.undo()
+    assert(testGrid.rows == before)
+    edit.redo()
+    assert(testGrid.cellColor(1, 1) == "#000000")
+
+@pytest.mark.parametrize("start, end", [
+    ((0, 0), (0, 9)),
+    ((3, 3), (3, 3)),
+    ((0, 0), (5, 5)),
+    ((9, 2), (0, 4)),
+    ((2, 8), (4, 0)),
+])
+def test_core_lineCells(start, end):
+    cells = core.lineCells(*start, *end)
+    assert(cells[0] == start and cells[-1] == end)
+    assert(len(cells) == max(abs(end[0] - start[0]), abs(end[1] - start[1])) + 1)
+    # consecutive beads touch, at least at a corner, so none are skipped
+    assert(all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(cells, cells[1:])))
+
+def test_core_lineCells_straight():
+    assert(core.lineCells(2, 0, 2, 3) == [(2, 0), (2, 1), (2, 2), (2, 3)])
+    assert(core.lineCells(3, 1, 0, 1) == [(3, 1), (2, 1), (1, 1), (0, 1)])
+    assert(core.lineCells(0, 0, 2, 2) == [(0, 0), (1, 1), (2, 2)])
+
+def test_core_Grid_block(testGrid):
+    snapshot = testGrid.snapshot()
+    block = testGrid.block(1, 2, 2, 3)
+    assert(block == [row[2:5] for row in testGrid.rows[1:3]])
+
+    testGrid.setBlock(1, 2, [["#000000", None, "#000000"], ["#000000"] * 3])
+    assert(testGrid.rows[1][2:5] == ["#000000", block[0][1], "#000000"])
+    assert(testGrid.rows[2][2:5] == ["#000000"] * 3)
+    assert(snapshot[1][2:5] == block[0])     # copied on write
+    assert(block[1] != testGrid.rows[2][2:5])
+
+def test_core_rectangleSpans():
+    assert(core.rectangleSpans(3, 4, 1, 1) == [(1, 1, 4), (2, 1, 1), (2, 4, 4), (3, 1, 4)])
+    assert(core.rectangleSpans(1, 1, 3, 4, filled=True) == [(1, 1, 4), (2, 1, 4), (3, 1, 4)])
+
+@pytest.mark.parametrize("height, width", [(7, 11), (8, 10), (1, 5), (6, 1), (1, 1), (40, 3)])
+def test_core_ellipseSpans(height, width):
+    outline = core.spanCells(core.ellipseSpans(2, 3, 2 + height - 1, 3 + width - 1))
+    filled = core.ellipseSpans(2, 3, 2 + height - 1, 3 + width - 1, filled=True)
+    cells = set(outline)
+    # touches each side of its rectangle, and no further
+    assert({row for row, _ in cells} == set(range(2, 2 + height)))
+    assert(min(column for _, column in cells) == 3 and max(column for _, column in cells) == 3 + width - 1)
+    # symmetric
+    assert(cells == {(2 + height - 1 - (row - 2), column) for row, column in cells})
+    assert(cells == {(row, 3 + width - 1 - (column - 3)) for row, column in cells})
+    # a filled ellipse is one span per row, covering its outline
+    assert(len(filled) == height and cells <= set(core.spanCells(filled)))
+
+def test_core_polygonSpans():
+    triangle = core.polygonSpans([(0, 5), (8, 1), (8, 9)], filled=True)
+    assert(triangle[0] == (0, 5, 5) and triangle[-1] == (8, 1, 9))
+    assert(all(len([span for span in triangle if span[0] == row]) == 1 for row in range(9)))
+    outline = set(core.spanCells(core.polygonSpans([(0, 5), (8, 1), (8, 9)])))
+    assert(outline <= set(core.spanCells(triangle)))
+    assert((4, 5) not in outline and (4, 5) in core.spanCells(triangle))
+
+    # a concave polygon leaves the notch unfilled
+    notched = core.spanCells(core.polygonSpans([(0, 0), (0, 9), (9, 9), (5, 5), (9, 0)], filled=True))
+    assert((8, 5) not in notched and (4, 5) in notched)
+
+def test_core_spansBlock():
+    top, left, block = core.spansBlock(core.rectangleSpans(1, 2, 3, 4), "#000000")
+    assert((top, left) == (1, 2))
+    assert(block == [["#000000"] * 3, ["#000000", None, "#000000"], ["#000000"] * 3])
+    assert(block[0] is not block[2])
+
+    top, left, block = core.spansBlock(core.rectangleSpans(0, 0, 999, 999, filled=True), "#000000")
+    assert(len(block) == 1000 and all(None not in row for row in block))
+
+def test_core_clipSpans():
+    spans = [(-1, 0, 3), (0, -2, 1), (1, 2, 9), (2, 5, 7), (3, 0, 0)]
+    assert(core.clipSpans(spans, 3, 5) == [(0, 0, 1), (1, 2, 4)])
+
+def test_core_ShapeDraft():
+    draft = core.ShapeDraft("Rectangle")
+    draft.press(1, 1)
+    draft.move(3, 4)
+    assert(draft.spans() == core.rectangleSpans(1, 1, 3, 4))
+    assert(draft.release())
+
+    polygon = core.ShapeDraft("Polygon")
+    polygon.press(0, 0)
+    assert(not polygon.release())      # a click is the first vertex
+    polygon.press(0, 6)
+    assert(not polygon.release())
+    polygon.press(5, 2)
+    polygon.move(6, 3)                 # the vertex follows the drag
+    assert(not polygon.release())
+    polygon.press(6, 3)                # the last vertex again, as a double click, closes it
+    assert(polygon.release())
+    assert(polygon.points == [(0, 0), (0, 6), (6, 3)])
+
+    with pytest.raises(ValueError):
+        core.ShapeDraft("Star")
+
+def test_core_rangesBlock(testGrid):
+    row, column, block = core.rangesBlock([(1, 1, 2, 3)], testGrid.block)
+    assert((row, column) == (1, 1) and block == testGrid.block(1, 1, 2, 3))
+
+    row, column, block = core.rangesBlock([(0, 0, 0, 1), (2, 1, 2, 1)], testGrid.block)   # not a rectangle
+    assert((row, column) == (0, 0))
+    assert(block == [[testGrid.cellColor(0, 0), testGrid.cellColor(0, 1)],
+                     [None, None],
+                     [None, testGrid.cellColor(2, 1)]])
+    assert(core.rangesBlock([], testGrid.block) is None)
+
+def test_core_blockMasks():
+    block = [["#FFFFFF", "#FF0000"], [None, "#FFFFFF"]]
+    assert(core.maskColor(block, "#FFFFFF") == [[None, "#FF0000"], [None, None]])
+    assert(core.fillBlock(block, "#000000") == [["#000000", "#000000"], [None, "#000000"]])
+    assert(block == [["#FFFFFF", "#FF0000"], [None, "#FFFFFF"]])   # not modified
+
+def test_core_clipBlock():
+    block = [["#000000", "#111111", "#222222"], ["#333333", "#444444", "#555555"]]
+    assert(core.clipBlock(1, 1, block, 5, 5) == (1, 1, block))
+    assert(core.clipBlock(4, 3, block, 5, 5) == (4, 3, [["#000000", "#111111"]]))
+    assert(core.clipBlock(-1, -2, block, 5, 5) == (0, 0, [["#555555"]]))
+    assert(core.clipBlock(5, 0, block, 5, 5)[2] == [])
+
+def test_core_blockText():
+    block = [["#FF0000"] * 3 + ["#00FF00"], [None, None, "#00FF00", "#00FF00"]]
+    text = core.blockToText(block)
+    assert(text.splitlines()[0] == "beadwork 4x2")
+    assert(len(text.splitlines()[2].split()) == 2)    # run-length encoded
+    assert(core.blockFromText(text) == block)
+    assert(core.blockFromText(core.blockToText([[c] * 500 for c in ("#ABCDEF", "#123456")])) == [["#ABCDEF"] * 500, ["#123456"] * 500])
+
+@pytest.mark.parametrize("text", [
+    "",
+    "hello",
+    "beadwork 2x1\nFF0000\n0",
+    "beadwork 1x2\nFF0000\n0",
+    "beadwork 1x1\nred\n0",
+    "beadwork 1x1\nFF0000\n3",
+    "beadwork axb\nFF0000\n0",
+])
+def test_core_blockFromText_invalid(text):
+    with pytest.raises(ValueError):
+        core.blockFromText(text)
+
+def test_core_floodFill():
+    data = [["#000000", "#FFFFFF", "#FFFFFF"],
+            ["#FFFFFF", "#000000", "#FFFFFF"],
+            ["#FFFFFF", "#FFFFFF", "#000000"]]
+    assert(sorted(core.floodFill(data, 0, 2)) == [(0, 1), (0, 2), (1, 2)])
+    assert(sorted(core.floodFill(data, 2, 0)) == [(1, 0), (2, 0), (2, 1)])
+    # diagonal beads are not connected, so a lone bead only finds itself
+    assert(core.floodFill(data, 1, 1) == [(1, 1)])
+
+def test_core_floodFill_large():
+    data = [["#FFFFFF"] * 300 for _ in range(300)]
+    assert(len(core.floodFill(data, 150, 150)) == 300 * 300)
+
+def test_core_floodFill_progress():
+    data = [["#FFFFFF"] * 300 for _ in range(300)]
+    reported = []
+    core.floodFill(data, 0, 0, reported.append)
+    assert(reported and reported == sorted(reported) and 0 < reported[-1] <= 1)
+
+def test_core_colorValue():
+    assert(core.colorValue("#1A2B3C") == 0x1A2B3C)
+    assert(core.colorValue("#ff0000") == 0xFF0000)
+    assert(core.hexColor(0x1A2B3C) == "#1A2B3C")
+    assert(core.hexColor(core.colorValue(core.BLANK_COLOR)) == core.BLANK_COLOR)
+
+def test_core_colorPositions():
+    data = [["#000000", "#FFFFFF"], ["#FFFFFF", "#FFFFFF"]]
+    assert(core.colorPositions(data) == {"#000000": [(0, 0)], "#FFFFFF": [(0, 1), (1, 0), (1, 1)]})
+    assert(core.colorPositions([["#000000", "#FFFFFF"]], transposed=True) == {"#000000": [(0, 0)], "#FFFFFF": [(1, 0)]})
+
+def test_core_patternStats(testGrid):
+    stats = core.patternStats(testGrid.rows)
+    assert(stats["width"] == 5 and stats["height"] == 7)
+    assert(stats["beads"] == 35)
+    assert(list(stats["colors"]) == ["#FF0000", "#0000FF"])
+    assert(sum(stats["colors"].values()) == 35)
+
+def test_core_Serialization(tmp_path, testGrid):
+    filename = str(tmp_path / "project.json")
+    project = core.newProject(testGrid.rows, {"width": 5, "height": 7, "defaultOrientation": "Vertical"})
+    core.saveProject(project, filename)
+    assert(core.loadProject(filename) == json.loads(json.dumps(project)))
+    assert(core.projectProblems(project) == [])
+
+    saved, loaded = [], []
+    core.saveProject(project, filename, saved.append)
+    assert(core.loadProject(filename, loaded.append) == json.loads(json.dumps(project)))
+    assert(saved == [i / 7 for i in range(7)])
+    assert(loaded[-1] == 1.0)
+
+    project["configs"]["width"] = 6
+    project["project"][1][1] = "red"
+    assert(len(core.projectProblems(project)) == 2)
+
+def test_core_normalizePattern():
+    data = [["#ff0000", "#FF0000"], ["#00ff00", "#ff0000"]]
+    normalized = core.normalizePattern(data)
+    assert(normalized == [["#FF0000", "#FF0000"], ["#00FF00", "#FF0000"]])
+    assert(normalized[0][0] is normalized[1][1])    # equal colors share one string
+    assert(data[0][0] == "#ff0000")                 # the input is not modified
+    assert(core.patternProblems(normalized) == [])
+
+@pytest.mark.parametrize("data", [
+    [],
+    [["#FF0000"], ["#FF0000", "#FF0000"]],
+    [["#FF0000", "red"]],
+    [["#FF0000", 7]],
+    [["#FF0000", ["#FF0000"]]],
+])
+def test_core_normalizePattern_invalid(data):
+    assert(core.patternProblems(data))
+    with pytest.raises(ValueError):
+        core.normalizePattern(data)